@@ -8,5 +8,7 @@ __AUTHOR_EMAIL__ = "opendilab.contact@gmail.com"
 __version__ = __VERSION__
 
 enable_hpc_rl = False
+# Backend of the functions with ``backend_fns`` in ``hpc_wrapper``, e.g. 'scan', 'jit' and 'numba' for reverse scan
+hpc_rl_backend = os.environ.get('HPC_RL_BACKEND', None)
 enable_linklink = os.environ.get('ENABLE_LINKLINK', 'false').lower() == 'true'
 enable_numba = True
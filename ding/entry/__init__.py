@@ -1,5 +1,6 @@
 from .cli import cli
 from .cli_ditask import cli_ditask
+from .cli_collector_benchmark import cli_collector_benchmark
 from .serial_entry import serial_pipeline
 from .serial_entry_td3_vae import serial_pipeline_td3_vae
 from .serial_entry_onpolicy import serial_pipeline_onpolicy
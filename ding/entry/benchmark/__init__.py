@@ -0,0 +1,3 @@
+from .utils import random_change, random_latency
+from .fake_env import FakeEnv
+from .fake_policy import FakePolicy
@@ -8,7 +8,7 @@ from ding.envs import BaseEnv, BaseEnvTimestep, BaseEnvInfo
 from ding.envs.common.env_element import EnvElement, EnvElementInfo
 from ding.torch_utils import to_ndarray
 
-from ding.worker.collector.tests.speed_test.utils import random_change
+from .utils import random_change, random_latency
 
 global env_sum
 env_sum = 0
@@ -28,6 +28,7 @@ class FakeEnv(BaseEnv):
         self._episode_step_base = cfg.get('episode_step', 200)
         self._reset_time = cfg.get('reset_time', 0.)
         self._step_time = cfg.get('step_time', 0.)
+        self._step_time_dist = cfg.get('step_time_dist', 'uniform')
         self.reset()
 
     def reset(self) -> np.ndarray:
@@ -37,7 +38,7 @@ class FakeEnv(BaseEnv):
         env_sleep(random_change(self._reset_time))
         self._step_count = 0
         self._final_eval_reward = 0
-        obs = np.random.randn(self._obs_dim)
+        obs = np.random.randn(self._obs_dim).astype(np.float32)
         return obs
 
     def close(self) -> None:
@@ -49,12 +50,14 @@ class FakeEnv(BaseEnv):
         np.random.seed(self._seed)
 
     def step(self, action: np.ndarray) -> BaseEnvTimestep:
-        env_sleep(random_change(self._step_time))
+        step_time = random_latency(self._step_time, self._step_time_dist)
+        env_sleep(step_time)
         self._step_count += 1
         obs = np.random.randn(self._obs_dim).astype(np.float32)
         rew = np.random.randint(2)
         done = True if self._step_count == self._episode_step else False
-        info = {}
+        # the simulated step latency, which is used to separate env time from manager overhead in benchmark
+        info = {'step_time': step_time}
         self._final_eval_reward += rew
         if done:
             info['final_eval_reward'] = self._final_eval_reward
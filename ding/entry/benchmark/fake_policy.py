@@ -3,6 +3,7 @@ from typing import Optional, List, Dict, Any, Tuple, Union
 import torch
 from easydict import EasyDict
 import time
+import numpy as np
 
 from ding.model import create_model
 from ding.utils import import_module, allreduce, broadcast, get_rank, POLICY_REGISTRY
@@ -10,7 +11,7 @@ from ding.utils.data import default_collate, default_decollate
 from ding.policy import Policy
 from ding.rl_utils import get_train_sample
 
-from ding.worker.collector.tests.speed_test.utils import random_change
+from .utils import random_change
 
 
 class FakePolicy(Policy):
@@ -18,6 +19,9 @@ class FakePolicy(Policy):
         cuda=False,
         on_policy=False,
         forward_time=0.002,
+        # dict(shape, min, max, dtype) of a real env's action space, random actions are sampled from it; \
+        # None means the fake action for FakeEnv.
+        action_space=None,
         learn=dict(),
         collect=dict(
             n_sample=80,
@@ -38,9 +42,12 @@ class FakePolicy(Policy):
         self._cuda = cfg.cuda and torch.cuda.is_available()
         self._init_collect()
         self._forward_time = cfg.forward_time
+        self._action_space = cfg.action_space
         self._on_policy = cfg.on_policy
         self.policy_sum = 0
         self.policy_times = 0
+        # wall time of the whole collect forward, including collate and decollate
+        self.forward_duration = 0.
 
     def policy_sleep(self, duration):
         time.sleep(duration)
@@ -71,14 +78,25 @@ class FakePolicy(Policy):
     # *************************************** collect function ************************************
 
     def _forward_collect(self, data: dict, **kwargs) -> dict:
+        start = time.time()
         data_id = list(data.keys())
         data = default_collate(list(data.values()))
         self.policy_sleep(random_change(self._forward_time))
-        output = {'action': torch.ones(data.shape[0], 2)}
+        output = {'action': self._random_action(data.shape[0])}
         output = default_decollate(output)
         output = {i: d for i, d in zip(data_id, output)}
+        self.forward_duration += time.time() - start
         return output
 
+    def _random_action(self, batch_size: int) -> torch.Tensor:
+        if self._action_space is None:
+            return torch.ones(batch_size, 2)
+        space = self._action_space
+        shape = (batch_size, *space['shape'])
+        if np.issubdtype(np.dtype(space['dtype']), np.integer):
+            return torch.randint(int(space['min']), int(space['max']), shape)
+        return torch.rand(shape) * (space['max'] - space['min']) + space['min']
+
     def _process_transition(self, obs: Any, armor_output: dict, timestep: namedtuple) -> dict:
         transition = {
             'obs': obs,
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def random_change(number):
+    return number * (1 + (np.random.random() - 0.5) * 0.6)
+
+
+def random_latency(mean, dist='uniform'):
+    """
+    Overview:
+        Sample a latency whose expectation is ``mean`` from the given distribution.
+    Arguments:
+        - mean (:obj:`float`): the mean latency
+        - dist (:obj:`str`): one of ['constant', 'uniform', 'exponential', 'lognormal'], 'uniform' is the \
+            +-30% change of ``random_change``, 'exponential' and 'lognormal' have long tails like a real simulator.
+    """
+    if mean <= 0:
+        return 0.
+    if dist == 'constant':
+        return mean
+    elif dist == 'uniform':
+        return random_change(mean)
+    elif dist == 'exponential':
+        return np.random.exponential(mean)
+    elif dist == 'lognormal':
+        sigma = 1.
+        return np.random.lognormal(np.log(mean) - sigma ** 2 / 2, sigma)
+    else:
+        raise KeyError("invalid latency dist: {}".format(dist))
@@ -0,0 +1,273 @@
+from typing import List, Optional
+import copy
+import json
+import time
+import itertools
+import importlib
+from functools import partial
+import click
+from click.core import Context, Option
+import numpy as np
+from easydict import EasyDict
+
+from ding import __TITLE__, __VERSION__, __AUTHOR__, __AUTHOR_EMAIL__
+
+
+def print_version(ctx: Context, param: Option, value: bool) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+    click.echo('{title}, version {version}.'.format(title=__TITLE__, version=__VERSION__))
+    click.echo('Developed by {author}, {email}.'.format(author=__AUTHOR__, email=__AUTHOR_EMAIL__))
+    ctx.exit()
+
+
+def collector_benchmark(
+        env_manager: str,
+        env_num: int,
+        obs_dim: int,
+        step_time: float,
+        step_time_dist: str,
+        shared_memory: bool,
+        forward_time: float = 0.002,
+        reset_time: float = 0.,
+        episode_step: int = 200,
+        n_sample: int = 80,
+        collect_times: int = 20,
+        seed: int = 0,
+        exp_name: str = 'collector_benchmark',
+        env: str = 'fake',
+        env_cfg: Optional[dict] = None,
+) -> dict:
+    """
+    Overview:
+        Benchmark ``SampleSerialCollector`` with the fake env and policy in ``ding.entry.benchmark``, whose step \
+        and forward latency are simulated by sleep. A real env can also be used, then the fake policy samples \
+        random actions from its action space, and ``obs_dim``, ``step_time`` and ``step_time_dist`` are ignored.
+    Arguments:
+        - env_manager (:obj:`str`): Env manager type registered in ``ENV_MANAGER_REGISTRY``.
+        - env_num (:obj:`int`): The number of collector envs.
+        - obs_dim (:obj:`int`): The size of obs vector.
+        - step_time (:obj:`float`): The mean latency of env step.
+        - step_time_dist (:obj:`str`): The distribution of env step latency, refer to ``random_latency``.
+        - shared_memory (:obj:`bool`): Whether to use shared memory, only valid for subprocess env managers.
+        - collect_times (:obj:`int`): The number of measured ``collect`` calls, an extra one is used to warm up.
+        - env (:obj:`str`): 'fake' or the path of env class like 'dizoo.classic_control.cartpole.envs:CartPoleEnv'.
+        - env_cfg (:obj:`Optional[dict]`): The config to create the real env.
+    Returns:
+        - result (:obj:`dict`): The benchmark config and metrics, including:
+            - launch_time: the time to launch env manager.
+            - steps_per_sec: env steps per second of the whole collect.
+            - forward_share: ratio of the time in policy forward.
+            - ipc_share: ratio of the time in env manager ``step`` that is not spent by envs, i.e. the overhead \
+                of communication and (de)serialization. The env time of a step is the max latency of the stepped \
+                envs for parallel env managers, and the sum for 'base' env manager. It is None for real envs, \
+                which don't report their step latency.
+            - step_latency_p50/step_latency_p99: percentiles of the duration of env manager ``step``.
+    """
+    from ding.envs import create_env_manager, get_env_manager_cls
+    from ding.worker import SampleSerialCollector
+    from ding.utils import deep_merge_dicts, set_pkg_seed
+    from ding.entry.benchmark import FakeEnv, FakePolicy
+
+    set_pkg_seed(seed, use_cuda=False)
+    policy_cfg = EasyDict(forward_time=forward_time)
+    if env == 'fake':
+        env_fn = partial(
+            FakeEnv,
+            cfg=dict(
+                obs_dim=obs_dim,
+                action_dim=2,
+                episode_step=episode_step,
+                reset_time=reset_time,
+                step_time=step_time,
+                step_time_dist=step_time_dist,
+            )
+        )
+    else:
+        module_name, cls_name = env.split(':')
+        env_fn = partial(getattr(importlib.import_module(module_name), cls_name), EasyDict(env_cfg or {}))
+        ref_env = env_fn()
+        act_space = ref_env.info().act_space
+        ref_env.close()
+        policy_cfg.action_space = dict(shape=act_space.shape, **act_space.value)
+    manager_cfg = get_env_manager_cls(EasyDict(type=env_manager)).default_config()
+    manager_cfg.type = env_manager
+    if 'shared_memory' in manager_cfg:
+        manager_cfg.shared_memory = shared_memory
+    env_manager_instance = create_env_manager(manager_cfg, [copy.deepcopy(env_fn) for _ in range(env_num)])
+    env_manager_instance.seed(seed)
+    policy = FakePolicy(deep_merge_dicts(FakePolicy.default_config(), policy_cfg))
+    collector_cfg = deep_merge_dicts(SampleSerialCollector.default_config(), EasyDict(collect_print_freq=int(1e9)))
+    start = time.time()
+    # env manager is launched by collector
+    collector = SampleSerialCollector(collector_cfg, env_manager_instance, policy.collect_mode, exp_name=exp_name)
+    launch_time = time.time() - start
+
+    # Time env manager ``step`` in the main process, envs report their own latency in ``info['step_time']``.
+    serial_env = env_manager == 'base'
+    step_latency = []
+    ipc_duration = [0.]
+    env_step = env_manager_instance.step
+
+    def timed_step(action: dict) -> dict:
+        start = time.time()
+        timesteps = env_step(action)
+        duration = time.time() - start
+        env_time = [t.info.get('step_time', 0.) for t in timesteps.values()]
+        env_time = sum(env_time) if serial_env else max(env_time, default=0.)
+        step_latency.append(duration)
+        ipc_duration[0] += max(0., duration - env_time)
+        return timesteps
+
+    env_manager_instance.step = timed_step
+    try:
+        collector.collect(n_sample=n_sample)
+        step_latency.clear()
+        ipc_duration[0] = 0.
+        policy.forward_duration = 0.
+        start_envstep = collector.envstep
+        start = time.time()
+        for _ in range(collect_times):
+            collector.collect(n_sample=n_sample)
+        duration = time.time() - start
+        envstep = collector.envstep - start_envstep
+    finally:
+        collector.close()
+
+    return {
+        'env_manager': env_manager,
+        'env_num': env_num,
+        'obs_dim': obs_dim,
+        'step_time': step_time,
+        'step_time_dist': step_time_dist,
+        'shared_memory': shared_memory,
+        'forward_time': forward_time,
+        'env': env,
+        'launch_time': launch_time,
+        'envstep': envstep,
+        'duration': duration,
+        'steps_per_sec': envstep / duration,
+        'forward_share': policy.forward_duration / duration,
+        'ipc_share': ipc_duration[0] / duration if env == 'fake' else None,
+        'step_latency_p50': float(np.percentile(step_latency, 50)),
+        'step_latency_p99': float(np.percentile(step_latency, 99)),
+    }
+
+
+def collector_benchmark_sweep(
+        env_manager: List[str],
+        env_num: List[int],
+        obs_dim: List[int],
+        step_time_dist: List[str],
+        shared_memory: List[bool],
+        **kwargs,
+) -> List[dict]:
+    """
+    Overview:
+        Run ``collector_benchmark`` on the cartesian product of the given settings. Shared memory only matters \
+        for subprocess env managers, so other env managers are run once without it.
+    Arguments:
+        - kwargs: The other arguments of ``collector_benchmark``, which are the same in all the runs.
+    Returns:
+        - results (:obj:`List[dict]`): The result of each run.
+    """
+    from ding.envs import get_env_manager_cls
+    results = []
+    for manager, num, dim, dist, shm in itertools.product(env_manager, env_num, obs_dim, step_time_dist, shared_memory):
+        if shm and 'shared_memory' not in get_env_manager_cls(EasyDict(type=manager)).default_config():
+            continue
+        results.append(collector_benchmark(manager, num, dim, step_time_dist=dist, shared_memory=shm, **kwargs))
+    return results
+
+
+def _split(value: str, type_: type = str) -> list:
+    if type_ is bool:
+        return [v.strip().lower() in ['1', 'true', 'on'] for v in value.split(',')]
+    return [type_(v.strip()) for v in value.split(',')]
+
+
+CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    '-v',
+    '--version',
+    is_flag=True,
+    callback=print_version,
+    expose_value=False,
+    is_eager=True,
+    help="Show package's version information."
+)
+@click.option(
+    '--env-manager',
+    type=str,
+    default='base,thread_pool,subprocess,async_subprocess',
+    help='Comma separated env manager types, default: base,thread_pool,subprocess,async_subprocess'
+)
+@click.option('--env-num', type=str, default='8', help='Comma separated collector env numbers, default: 8')
+@click.option('--obs-dim', type=str, default='64,3000', help='Comma separated obs sizes, default: 64,3000')
+@click.option(
+    '--step-time-dist',
+    type=str,
+    default='uniform',
+    help='Comma separated step latency distributions in [constant, uniform, exponential, lognormal], default: uniform'
+)
+@click.option(
+    '--shared-memory', type=str, default='false,true', help='Comma separated shm switches, default: false,true'
+)
+@click.option('--step-time', type=float, default=0.005, help='Mean env step latency in second, default: 0.005')
+@click.option('--forward-time', type=float, default=0.002, help='Policy forward latency in second, default: 0.002')
+@click.option('--reset-time', type=float, default=0., help='Env reset latency in second, default: 0')
+@click.option('--n-sample', type=int, default=80, help='Sample number of each collect, default: 80')
+@click.option('--collect-times', type=int, default=20, help='Collect times of each run, default: 20')
+@click.option(
+    '--env',
+    type=str,
+    default='fake',
+    help="'fake' or the path of a real env class, e.g. dizoo.classic_control.cartpole.envs:CartPoleEnv"
+)
+@click.option('--env-cfg', type=str, default='{}', help='Json config of the real env, default: {}')
+@click.option('-s', '--seed', type=int, default=0, help='Random seed, default: 0')
+@click.option('-o', '--output', type=str, default=None, help='Path of the output json, default: print to stdout')
+def cli_collector_benchmark(*args, **kwargs):
+    return _cli_collector_benchmark(*args, **kwargs)
+
+
+def _cli_collector_benchmark(
+        env_manager: str,
+        env_num: str,
+        obs_dim: str,
+        step_time_dist: str,
+        shared_memory: str,
+        step_time: float,
+        forward_time: float,
+        reset_time: float,
+        n_sample: int,
+        collect_times: int,
+        seed: int,
+        env: str,
+        env_cfg: str,
+        output: Optional[str] = None,
+) -> None:
+    results = collector_benchmark_sweep(
+        env_manager=_split(env_manager),
+        env_num=_split(env_num, int),
+        obs_dim=_split(obs_dim, int),
+        step_time_dist=_split(step_time_dist),
+        shared_memory=_split(shared_memory, bool),
+        step_time=step_time,
+        forward_time=forward_time,
+        reset_time=reset_time,
+        n_sample=n_sample,
+        collect_times=collect_times,
+        seed=seed,
+        env=env,
+        env_cfg=json.loads(env_cfg),
+    )
+    report = json.dumps({'version': __VERSION__, 'results': results}, indent=2)
+    if output is None:
+        click.echo(report)
+    else:
+        with open(output, 'w') as f:
+            f.write(report)
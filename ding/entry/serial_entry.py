@@ -7,7 +7,7 @@ from tensorboardX import SummaryWriter
 
 from ding.envs import get_vec_env_setting, create_env_manager
 from ding.worker import BaseLearner, InteractionSerialEvaluator, BaseSerialCommander, create_buffer, \
-    create_serial_collector
+    create_serial_collector, PrefetchSampler
 from ding.config import read_config, compile_config
 from ding.policy import create_policy
 from ding.utils import set_pkg_seed
@@ -73,6 +73,17 @@ def serial_pipeline(
     commander = BaseSerialCommander(
         cfg.policy.other.commander, learner, collector, evaluator, replay_buffer, policy.command_mode
     )
+    # Optionally sample the next batches in a background thread, which has the same sample/update interface.
+    prefetch_num = cfg.policy.other.replay_buffer.get('prefetch_num', 0)
+    if prefetch_num > 0:
+        sampler = PrefetchSampler(
+            replay_buffer,
+            prefetch_num=prefetch_num,
+            max_staleness=cfg.policy.other.replay_buffer.get('prefetch_max_staleness', 1),
+            priority=learner.policy.get_attribute('priority')
+        )
+    else:
+        sampler = replay_buffer
     # ==========
     # Main loop
     # ==========
@@ -102,7 +113,7 @@ def serial_pipeline(
         # Learn policy from collected data
         for i in range(cfg.policy.learn.update_per_collect):
             # Learner will train ``update_per_collect`` times in one iteration.
-            train_data = replay_buffer.sample(learner.policy.get_attribute('batch_size'), learner.train_iter)
+            train_data = sampler.sample(learner.policy.get_attribute('batch_size'), learner.train_iter)
             if train_data is None:
                 # It is possible that replay buffer's data count is too few to train ``update_per_collect`` times
                 logging.warning(
@@ -112,8 +123,17 @@ def serial_pipeline(
                 break
             learner.train(train_data, collector.envstep)
             if learner.policy.get_attribute('priority'):
-                replay_buffer.update(learner.priority_info)
+                sampler.update(learner.priority_info)
+        if prefetch_num > 0:
+            tb_logger.add_scalar('prefetch_sampler/overlap_time', sampler.overlap_time, learner.train_iter)
 
     # Learner's after_run hook.
     learner.call_hook('after_run')
+    if prefetch_num > 0:
+        sampler.close()
+        logging.info(
+            "Prefetch sampler saved {:.2f}s, sampling costs {:.2f}s, waiting for batches costs {:.2f}s".format(
+                sampler.overlap_time, sampler.prefetch_time, sampler.wait_time
+            )
+        )
     return policy
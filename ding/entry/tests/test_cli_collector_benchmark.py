@@ -0,0 +1,72 @@
+import os
+import json
+import shutil
+import pytest
+from click.testing import CliRunner
+
+from ding.entry.cli_collector_benchmark import cli_collector_benchmark, collector_benchmark_sweep
+
+
+@pytest.mark.unittest
+def test_collector_benchmark_sweep():
+    results = collector_benchmark_sweep(
+        env_manager=['base', 'async_subprocess'],
+        env_num=[2],
+        obs_dim=[8, 64],
+        step_time_dist=['lognormal'],
+        shared_memory=[False, True],
+        step_time=0.001,
+        forward_time=0.,
+        n_sample=16,
+        collect_times=2,
+        exp_name='test_collector_benchmark',
+    )
+    # 'base' env manager is run without shared memory only
+    assert len(results) == 6
+    assert [r['shared_memory'] for r in results if r['env_manager'] == 'base'] == [False, False]
+    for r in results:
+        assert r['envstep'] >= 32
+        assert r['steps_per_sec'] > 0
+        assert 0 <= r['forward_share'] < 1 and 0 <= r['ipc_share'] < 1
+        assert r['step_latency_p50'] <= r['step_latency_p99']
+    shutil.rmtree('test_collector_benchmark', ignore_errors=True)
+
+
+@pytest.mark.unittest
+def test_cli_collector_benchmark(tmp_path):
+    output = os.path.join(str(tmp_path), 'benchmark.json')
+    result = CliRunner().invoke(
+        cli_collector_benchmark, [
+            '--env-manager', 'base', '--env-num', '2', '--obs-dim', '8', '--shared-memory', 'false', '--step-time', '0',
+            '--forward-time', '0', '--n-sample', '8', '--collect-times', '1', '-o', output
+        ]
+    )
+    assert result.exit_code == 0, result.output
+    with open(output, 'r') as f:
+        report = json.load(f)
+    assert len(report['results']) == 1
+    assert report['results'][0]['env_manager'] == 'base'
+    shutil.rmtree('collector_benchmark', ignore_errors=True)
+
+
+@pytest.mark.unittest
+def test_collector_benchmark_dizoo_env():
+    results = collector_benchmark_sweep(
+        env_manager=['base', 'thread_pool'],
+        env_num=[2],
+        obs_dim=[4],
+        step_time_dist=['constant'],
+        shared_memory=[False],
+        step_time=0.,
+        forward_time=0.,
+        n_sample=16,
+        collect_times=2,
+        exp_name='test_collector_benchmark',
+        env='dizoo.classic_control.cartpole.envs:CartPoleEnv',
+    )
+    assert [r['env_manager'] for r in results] == ['base', 'thread_pool']
+    for r in results:
+        assert r['envstep'] >= 32
+        assert r['launch_time'] > 0
+        assert r['ipc_share'] is None
+    shutil.rmtree('test_collector_benchmark', ignore_errors=True)
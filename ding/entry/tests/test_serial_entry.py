@@ -59,6 +59,19 @@ def test_dqn():
         os.popen('rm -rf log ckpt*')
 
 
+@pytest.mark.unittest
+def test_dqn_prefetch():
+    config = [deepcopy(cartpole_dqn_config), deepcopy(cartpole_dqn_create_config)]
+    config[0].policy.learn.update_per_collect = 4
+    config[0].policy.other.replay_buffer.prefetch_num = 2
+    try:
+        serial_pipeline(config, seed=0, max_iterations=2)
+    except Exception:
+        assert False, "pipeline fail"
+    finally:
+        os.popen('rm -rf log ckpt*')
+
+
 @pytest.mark.unittest
 def test_ddpg():
     config = [deepcopy(pendulum_ddpg_config), deepcopy(pendulum_ddpg_create_config)]
@@ -228,6 +241,19 @@ def test_r2d2():
         assert False, "pipeline fail"
 
 
+@pytest.mark.unittest
+def test_r2d2_sequence_buffer():
+    config = [deepcopy(cartpole_r2d2_config), deepcopy(cartpole_r2d2_create_config)]
+    config[0].policy.learn.update_per_collect = 1
+    config[0].policy.other.replay_buffer.type = 'sequence'
+    config[0].policy.other.replay_buffer.seq_stride = 15
+    config[0].policy.other.replay_buffer.segment_len = 60
+    try:
+        serial_pipeline(config, seed=0, max_iterations=5)
+    except Exception:
+        assert False, "pipeline fail"
+
+
 @pytest.mark.unittest
 def test_impala():
     config = [deepcopy(cartpole_impala_config), deepcopy(cartpole_impala_create_config)]
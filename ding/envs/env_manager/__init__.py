@@ -1,2 +1,4 @@
 from .base_env_manager import BaseEnvManager, create_env_manager, get_env_manager_cls
 from .subprocess_env_manager import AsyncSubprocessEnvManager, SyncSubprocessEnvManager
+from .group_subprocess_env_manager import GroupSubprocessEnvManager
+from .thread_pool_env_manager import ThreadPoolEnvManager
@@ -1,5 +1,5 @@
 from types import MethodType
-from typing import Union, Any, List, Callable, Dict, Optional
+from typing import Union, Any, List, Callable, Dict, Optional, Tuple
 from functools import partial, wraps
 from easydict import EasyDict
 import copy
@@ -10,9 +10,10 @@ import logging
 import enum
 import time
 import traceback
+import numpy as np
 from ding.utils import ENV_MANAGER_REGISTRY, import_module, one_time_warning
 from ding.envs.env.base_env import BaseEnvTimestep
-from ding.utils.time_helper import WatchDog
+from ding.utils.time_helper import WatchDog, HeartbeatWatchDog
 
 
 class EnvState(enum.IntEnum):
@@ -57,6 +58,114 @@ def timeout_wrapper(func: Callable = None, timeout: Optional[int] = None) -> Cal
     return wrapper
 
 
+def start_watchdog() -> Optional[HeartbeatWatchDog]:
+    """
+    Overview:
+        Start a ``HeartbeatWatchDog``, which is armed once and watches all the step and reset calls of envs. \
+        Return None if the watchdog doesn't work on this platform or in this thread, then calls are not watched.
+    """
+    if platform.system().lower() == 'windows':
+        one_time_warning("Timeout watchdog is not implemented in windows platform, so ignore it default")
+        return None
+    watchdog = HeartbeatWatchDog()
+    try:
+        watchdog.start()
+    except ValueError:
+        # signal only works in main thread
+        return None
+    return watchdog
+
+
+class StepLatencyTracker(object):
+    """
+    Overview:
+        Track the step latency of each env by a histogram whose bins are log spaced, so the percentiles of heavy \
+        tailed latency can be estimated with a fixed small memory. Old records decay exponentially, which makes \
+        the statistics follow the recent latency.
+    Interfaces:
+        __init__, record, count, percentile, mean, stats
+    """
+
+    def __init__(
+            self,
+            env_num: int,
+            min_latency: float = 1e-4,
+            max_latency: float = 1e2,
+            bin_num: int = 64,
+            decay: float = 0.999,
+    ) -> None:
+        """
+        Overview:
+            Initialize the tracker.
+        Arguments:
+            - env_num (:obj:`int`): The number of envs.
+            - min_latency (:obj:`float`): Upper edge of the first bin in second, smaller latency is put into it.
+            - max_latency (:obj:`float`): Lower edge of the last bin in second, larger latency is put into it.
+            - bin_num (:obj:`int`): The number of histogram bins.
+            - decay (:obj:`float`): The weight of old records is multiplied by ``decay`` when a new one of the same \
+                env is recorded.
+        """
+        self._edges = np.geomspace(min_latency, max_latency, bin_num - 1)
+        # Representative latency of each bin, the geometric mean of its edges.
+        self._centers = np.concatenate([self._edges[:1], np.sqrt(self._edges[1:] * self._edges[:-1]), self._edges[-1:]])
+        self._decay = decay
+        self._hist = np.zeros((env_num, bin_num))
+        # decayed sum of latency, the decayed weight is the sum of ``self._hist``
+        self._sum = np.zeros(env_num)
+        self._count = np.zeros(env_num, dtype=np.int64)
+
+    def record(self, env_id: int, latency: float) -> None:
+        """
+        Overview:
+            Record a step latency of the env.
+        """
+        hist = self._hist[env_id]
+        hist *= self._decay
+        hist[np.searchsorted(self._edges, latency)] += 1
+        self._sum[env_id] = self._sum[env_id] * self._decay + latency
+        self._count[env_id] += 1
+
+    def count(self, env_id: Optional[int] = None) -> int:
+        return int(self._count.sum() if env_id is None else self._count[env_id])
+
+    def percentile(self, q: float, env_id: Optional[int] = None) -> float:
+        """
+        Overview:
+            Estimate the ``q``-th percentile of step latency of an env, or of all the envs if ``env_id`` is None. \
+            Return 0 if there is no record.
+        """
+        hist = self._hist.sum(0) if env_id is None else self._hist[env_id]
+        total = hist.sum()
+        if total == 0:
+            return 0.
+        cdf = np.cumsum(hist) / total
+        return float(self._centers[min(np.searchsorted(cdf, q / 100.), len(cdf) - 1)])
+
+    def mean(self, env_id: Optional[int] = None) -> float:
+        weight = self._hist.sum() if env_id is None else self._hist[env_id].sum()
+        if weight == 0:
+            return 0.
+        return float((self._sum.sum() if env_id is None else self._sum[env_id]) / weight)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Overview:
+            Return the scalar statistics of step latency for logging. ``straggler_ratio`` is the ratio of the \
+            largest median latency of envs to the median of all the envs.
+        """
+        if self.count() == 0:
+            return {}
+        p50 = self.percentile(50)
+        env_p50 = [self.percentile(50, i) for i in range(len(self._count)) if self._count[i] > 0]
+        return {
+            'step_latency_mean': self.mean(),
+            'step_latency_p50': p50,
+            'step_latency_p90': self.percentile(90),
+            'step_latency_p99': self.percentile(99),
+            'straggler_ratio': max(env_p50) / p50,
+        }
+
+
 @ENV_MANAGER_REGISTRY.register('base')
 class BaseEnvManager(object):
     """
@@ -65,7 +174,7 @@ class BaseEnvManager(object):
     Interfaces:
         reset, step, seed, close, enable_save_replay, launch, env_info, default_config
     Properties:
-        env_num, ready_obs, done, method_name_list，active_env
+        env_num, ready_obs, done, method_name_list，active_env, latency_stats
     """
 
     @classmethod
@@ -114,6 +223,9 @@ class BaseEnvManager(object):
         self._step_timeout = self._cfg.step_timeout
         self._reset_timeout = self._cfg.reset_timeout
         self._retry_waiting_time = self._cfg.retry_waiting_time
+        self._latency_tracker = StepLatencyTracker(self._env_num)
+        # False means the watchdog is not started yet
+        self._watchdog = False
 
     @property
     def env_num(self) -> int:
@@ -132,6 +244,26 @@ class BaseEnvManager(object):
         """
         return {i: self._ready_obs[i] for i in range(self.env_num) if self._env_episode_count[i] < self._episode_num}
 
+    def ready_obs_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Overview:
+            Get the next observations stacked in one array, which is used by batch policy forward.
+        Return:
+            - env_id (:obj:`np.ndarray`): Env ids of the ready envs, whose shape is (B, ).
+            - obs (:obj:`np.ndarray`): Stacked ``np.ndarray`` obs, the i-th row is the obs of ``env_id[i]``.
+        """
+        obs = self.ready_obs
+        env_id = np.array(list(obs.keys()), dtype=np.int64)
+        return env_id, np.stack(list(obs.values()))
+
+    @property
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Overview:
+            The statistics of env step latency, which are scalars and can be logged to tensorboard directly.
+        """
+        return self._latency_tracker.stats()
+
     @property
     def done(self) -> bool:
         return all([s == EnvState.DONE for s in self._env_states.values()])
@@ -225,9 +357,18 @@ class BaseEnvManager(object):
             self._env_states[env_id] = EnvState.RESET
             self._reset(env_id)
 
+    def _watch(self, func: Callable, timeout: Optional[int]) -> Callable:
+        # The watchdog is started once at the first watched call, each watched call only refreshes its deadline.
+        if timeout is None:
+            return func
+        if self._watchdog is False:
+            self._watchdog = start_watchdog()
+        if self._watchdog is None:
+            return func
+        return self._watchdog.watch(func, timeout)
+
     def _reset(self, env_id: int) -> None:
 
-        @timeout_wrapper(timeout=self._reset_timeout)
         def reset_fn():
             # if self._reset_param[env_id] is None, just reset specific env, not pass reset param
             if self._reset_param[env_id] is not None:
@@ -236,6 +377,7 @@ class BaseEnvManager(object):
             else:
                 return self._envs[env_id].reset()
 
+        reset_fn = self._watch(reset_fn, self._reset_timeout)
         exceptions = []
         for _ in range(self._max_retry):
             try:
@@ -286,7 +428,9 @@ class BaseEnvManager(object):
         self._check_closed()
         timesteps = {}
         for env_id, act in actions.items():
+            start = time.time()
             timesteps[env_id] = self._step(env_id, act)
+            self._latency_tracker.record(env_id, time.time() - start)
             if timesteps[env_id].done:
                 self._env_episode_count[env_id] += 1
                 if self._env_episode_count[env_id] < self._episode_num and self._auto_reset:
@@ -300,10 +444,10 @@ class BaseEnvManager(object):
 
     def _step(self, env_id: int, act: Any) -> namedtuple:
 
-        @timeout_wrapper(timeout=self._step_timeout)
         def step_fn():
             return self._envs[env_id].step(act)
 
+        step_fn = self._watch(step_fn, self._step_timeout)
         exceptions = []
         for _ in range(self._max_retry):
             try:
@@ -367,6 +511,9 @@ class BaseEnvManager(object):
             env.close()
         for i in range(self._env_num):
             self._env_states[i] = EnvState.VOID
+        if self._watchdog:
+            self._watchdog.stop()
+        self._watchdog = False
         self._closed = True
 
     def env_info(self) -> namedtuple:
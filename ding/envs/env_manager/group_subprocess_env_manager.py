@@ -0,0 +1,557 @@
+from typing import Any, Union, List, Dict, Callable, Optional, Tuple
+from multiprocessing import Pipe, connection, get_context
+from collections import namedtuple
+import logging
+import platform
+import time
+import traceback
+import numpy as np
+import torch
+from easydict import EasyDict
+from types import MethodType
+
+from ding.utils import ENV_MANAGER_REGISTRY
+from .base_env_manager import BaseEnvManager, EnvState, start_watchdog
+from ding.envs.env.base_env import BaseEnvTimestep
+from .subprocess_env_manager import ShmBuffer, CloudPickleWrapper, is_abnormal_timestep, get_shm_reward_space
+
+
+def _batch_action(actions: List[Any]) -> Union[np.ndarray, List[Any]]:
+    # Actions of the envs in the same worker are sent as one array if possible, otherwise as a list.
+    if all([isinstance(a, np.ndarray) for a in actions]) and len(set([(a.shape, a.dtype) for a in actions])) == 1:
+        return np.stack(actions)
+    return actions
+
+
+class ShmGroupTimestepContainer(object):
+    """
+    Overview:
+        Shared memory slabs for the timesteps of a group of envs hosted by one worker, obs, reward and done of \
+        each env are rows of the slabs. Worker fills the rows of the stepped envs and only sends the rest of \
+        the timesteps through pipe, i.e. non-empty info and reward which doesn't match the declared space.
+    Interfaces:
+        fill_obs, fill, get_obs, get
+    """
+
+    def __init__(
+            self,
+            env_num: int,
+            obs_dtype: np.generic,
+            obs_shape: tuple,
+            rew_dtype: Optional[np.generic] = None,
+            rew_shape: Optional[tuple] = None,
+    ) -> None:
+        """
+        Overview:
+            Initialize the slabs.
+        Arguments:
+            - env_num (:obj:`int`): Number of envs in the group.
+            - obs_dtype (:obj:`np.generic`): dtype of obs.
+            - obs_shape (:obj:`tuple`): shape of obs of one env.
+            - rew_dtype (:obj:`Optional[np.generic]`): dtype of reward.
+            - rew_shape (:obj:`Optional[tuple]`): shape of reward of one env, if None, reward is sent through pipe.
+        """
+        self.obs = ShmBuffer(obs_dtype, (env_num, *obs_shape))
+        self.reward = ShmBuffer(rew_dtype, (env_num, *rew_shape)) if rew_shape is not None else None
+        # [done, whether reward is in shared memory] of each env
+        self.flag = ShmBuffer(np.dtype(np.bool_), (env_num, 2))
+        self._views = None
+
+    def __getstate__(self) -> dict:
+        # Views are not picklable as shared memory, they are rebuilt in the spawned worker.
+        state = self.__dict__.copy()
+        state['_views'] = None
+        return state
+
+    def _get_views(self) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        if self._views is None:
+            reward = self.reward.view() if self.reward is not None else None
+            self._views = (self.obs.view(), reward, self.flag.view())
+        return self._views
+
+    def fill_obs(self, index: int, obs: np.ndarray) -> None:
+        self._get_views()[0][index] = obs
+
+    def fill(self, index: int, timestep: BaseEnvTimestep) -> Optional[BaseEnvTimestep]:
+        """
+        Overview:
+            Fill the rows of an env with a normal timestep in worker.
+        Arguments:
+            - index (:obj:`int`): Index of the env in the group.
+            - timestep (:obj:`BaseEnvTimestep`): Normal timestep returned by env.
+        Returns:
+            - rest (:obj:`Optional[BaseEnvTimestep]`): The part of timestep which is not in the slabs, \
+                None if the whole timestep is in the slabs.
+        """
+        obs_view, reward_view, flag_view = self._get_views()
+        obs_view[index] = timestep.obs
+        reward, info = timestep.reward, timestep.info
+        reward_in_shm = reward_view is not None and isinstance(reward, np.ndarray) and \
+            reward.shape == reward_view.shape[1:] and reward.dtype == reward_view.dtype
+        if reward_in_shm:
+            reward_view[index] = reward
+            reward = None
+        flag_view[index] = bool(timestep.done), reward_in_shm
+        if reward_in_shm and isinstance(info, dict) and len(info) == 0:
+            return None
+        return timestep._replace(obs=None, reward=reward, done=None)
+
+    def get_obs(self, index: int) -> np.ndarray:
+        return self._get_views()[0][index].copy()
+
+    def get(self, index: int, rest: Optional[BaseEnvTimestep]) -> BaseEnvTimestep:
+        """
+        Overview:
+            Assemble the timestep of an env from the slabs and the rest part received from pipe.
+        Arguments:
+            - index (:obj:`int`): Index of the env in the group.
+            - rest (:obj:`Optional[BaseEnvTimestep]`): The return value of ``fill`` in worker.
+        Returns:
+            - timestep (:obj:`BaseEnvTimestep`): The whole timestep, whose obs and reward are copied.
+        """
+        obs_view, reward_view, flag_view = self._get_views()
+        done, reward_in_shm = bool(flag_view[index, 0]), bool(flag_view[index, 1])
+        if rest is None:
+            reward, info = None, {}
+        else:
+            reward, info = rest.reward, rest.info
+        if reward_in_shm:
+            reward = reward_view[index].copy()
+        return BaseEnvTimestep(obs_view[index].copy(), reward, done, info)
+
+
+@ENV_MANAGER_REGISTRY.register('group_subprocess')
+class GroupSubprocessEnvManager(BaseEnvManager):
+    """
+    Overview:
+        Create a GroupSubprocessEnvManager to manage multiple environments.
+        Each subprocess hosts a group of ``env_per_worker`` environments and steps them one by one in a loop, \
+        so that many cheap environments share a few processes and pipes. Actions of a group are sent to the worker \
+        as one batched array, observations, rewards and dones of a group are written into shared memory slabs, \
+        and only the non-empty infos of a group come back in one message.
+        Envs are stepped synchronously like ``SyncSubprocessEnvManager``, and done envs are reset in batch by \
+        their workers at the end of ``step``.
+    Interfaces:
+        seed, launch, ready_obs, step, reset, env_info, active_env
+    """
+
+    config = dict(
+        episode_num=float("inf"),
+        max_retry=5,
+        step_timeout=None,
+        auto_reset=True,
+        retry_type='reset',
+        reset_timeout=None,
+        retry_waiting_time=0.1,
+        # subprocess specified args
+        shared_memory=True,
+        context='spawn' if platform.system().lower() == 'windows' else 'fork',
+        connect_timeout=60,
+        # Number of envs hosted by each subprocess
+        env_per_worker=8,
+    )
+
+    def __init__(
+            self,
+            env_fn: List[Callable],
+            cfg: EasyDict = EasyDict({}),
+    ) -> None:
+        """
+        Overview:
+            Initialize the GroupSubprocessEnvManager.
+        Arguments:
+            - env_fn (:obj:`List[Callable]`): The function to create environment
+            - cfg (:obj:`EasyDict`): Config
+        """
+        super().__init__(env_fn, cfg)
+        assert self._retry_type == 'reset', "GroupSubprocessEnvManager only supports 'reset' retry_type"
+        self._shared_memory = self._cfg.shared_memory
+        self._context = self._cfg.context
+        self._connect_timeout = self._cfg.connect_timeout
+        self._env_per_worker = self._cfg.env_per_worker
+        self._worker_num = (self._env_num + self._env_per_worker - 1) // self._env_per_worker
+        # env_id -> (worker_id, index in the worker's group)
+        self._env_location = {
+            env_id: (env_id // self._env_per_worker, env_id % self._env_per_worker)
+            for env_id in range(self._env_num)
+        }
+        self._worker_env_ids = [
+            list(range(w * self._env_per_worker, min((w + 1) * self._env_per_worker, self._env_num)))
+            for w in range(self._worker_num)
+        ]
+
+    def _create_state(self) -> None:
+        r"""
+        Overview:
+            Fork/spawn a subprocess for each group of envs, and create pipes and shared memory slabs.
+        """
+        self._env_episode_count = {env_id: 0 for env_id in range(self.env_num)}
+        self._ready_obs = {env_id: None for env_id in range(self.env_num)}
+        self._env_ref = self._env_fn[0]()
+        self._reset_param = {i: {} for i in range(self.env_num)}
+        if self._shared_memory:
+            env_info = self._env_ref.info()
+            obs_space, rew_space = env_info.obs_space, env_info.rew_space
+            obs_dtype = np.dtype(obs_space.value['dtype']) if obs_space.value is not None else np.dtype(np.float32)
+            assert isinstance(obs_space.shape, (tuple, list)), "shared memory only supports array obs"
+            rew_shape, rew_dtype = get_shm_reward_space(rew_space)
+            # Both the worker and the env manager write/read rows of the slabs, a reply in pipe means the rows are ready.
+            self._shm_buffers = [
+                ShmGroupTimestepContainer(len(env_ids), obs_dtype, tuple(obs_space.shape), rew_dtype, rew_shape)
+                for env_ids in self._worker_env_ids
+            ]
+        else:
+            self._shm_buffers = [None for _ in range(self._worker_num)]
+        self._pipe_parents, self._pipe_children = {}, {}
+        self._subprocesses = {}
+        for worker_id in range(self._worker_num):
+            self._create_worker_subprocess(worker_id)
+        for env_id in range(self.env_num):
+            self._env_states[env_id] = EnvState.INIT
+        self._closed = False
+
+    def _create_worker_subprocess(self, worker_id: int) -> None:
+        self._pipe_parents[worker_id], self._pipe_children[worker_id] = Pipe()
+        ctx = get_context(self._context)
+        env_ids = self._worker_env_ids[worker_id]
+        self._subprocesses[worker_id] = ctx.Process(
+            target=self.worker_fn,
+            args=(
+                self._pipe_parents[worker_id],
+                self._pipe_children[worker_id],
+                CloudPickleWrapper([self._env_fn[env_id] for env_id in env_ids]),
+                env_ids[0],
+                self._shm_buffers[worker_id],
+                self.method_name_list,
+                self._reset_timeout,
+                self._step_timeout,
+            ),
+            daemon=True,
+            name='group_subprocess_env_manager{}_{}'.format(worker_id, time.time())
+        )
+        self._subprocesses[worker_id].start()
+        self._pipe_children[worker_id].close()
+        if self._env_replay_path is not None:
+            self._pipe_parents[worker_id].send(
+                ['enable_save_replay', [[self._env_replay_path[env_id] for env_id in env_ids]], {}]
+            )
+            self._check_data(self._recv(worker_id))
+
+    @property
+    def ready_obs(self) -> Dict[int, Any]:
+        """
+        Overview:
+            Get the next observations of the running envs.
+        Return:
+            A dictionary with observations and their environment IDs.
+        """
+        return {i: self._ready_obs[i] for i in self.active_env}
+
+    def _group_by_worker(self, env_ids: List[int]) -> Dict[int, List[int]]:
+        groups = {}
+        for env_id in env_ids:
+            groups.setdefault(self._env_location[env_id][0], []).append(env_id)
+        return groups
+
+    def _recv(self, worker_id: int) -> Dict[int, Any]:
+        if not self._pipe_parents[worker_id].poll(self._connect_timeout):
+            self.close()
+            raise ConnectionError("env worker {} connection timeout".format(worker_id))
+        ret = self._pipe_parents[worker_id].recv()
+        if isinstance(ret, BaseException):
+            return {env_id: ret for env_id in self._worker_env_ids[worker_id]}
+        return ret
+
+    def reset(self, reset_param: Optional[Dict] = None) -> None:
+        """
+        Overview:
+            Reset the environments their parameters.
+        Arguments:
+            - reset_param (:obj:`List`): Dict of reset parameters for each environment, key is the env_id, \
+                value is the cooresponding reset parameters.
+        """
+        self._check_closed()
+        if reset_param is None:
+            reset_env_list = [env_id for env_id in range(self._env_num)]
+        else:
+            reset_env_list = list(reset_param.keys())
+            for env_id in reset_param:
+                self._reset_param[env_id] = reset_param[env_id]
+        seed_env_list = [env_id for env_id in reset_env_list if self._env_seed[env_id] is not None]
+        if len(seed_env_list) > 0:
+            groups = self._group_by_worker(seed_env_list)
+            for worker_id, env_ids in groups.items():
+                local_ids = [self._env_location[env_id][1] for env_id in env_ids]
+                seeds = [self._env_seed[env_id] for env_id in env_ids]
+                self._pipe_parents[worker_id].send(['seed', [local_ids, seeds, self._env_dynamic_seed], {}])
+            for worker_id, env_ids in groups.items():
+                self._check_data(self._recv(worker_id))
+            for env_id in seed_env_list:
+                self._env_seed[env_id] = None  # seed only use once
+        self._reset(reset_env_list)
+
+    def _reset(self, env_ids: List[int]) -> None:
+        for env_id in env_ids:
+            self._env_states[env_id] = EnvState.RESET
+        exceptions = []
+        for _ in range(self._max_retry):
+            groups = self._group_by_worker(env_ids)
+            for worker_id, group_env_ids in groups.items():
+                local_ids = [self._env_location[env_id][1] for env_id in group_env_ids]
+                params = [self._reset_param[env_id] for env_id in group_env_ids]
+                self._pipe_parents[worker_id].send(['reset', [local_ids, params], {}])
+            failed_env_ids = []
+            for worker_id, group_env_ids in groups.items():
+                ret = self._recv(worker_id)
+                for env_id in group_env_ids:
+                    obs = ret[env_id]
+                    if isinstance(obs, BaseException):
+                        exceptions.append(obs)
+                        failed_env_ids.append(env_id)
+                        continue
+                    if self._shared_memory:
+                        obs = self._shm_buffers[worker_id].get_obs(self._env_location[env_id][1])
+                    self._ready_obs[env_id] = obs
+                    self._env_states[env_id] = EnvState.RUN
+            if len(failed_env_ids) == 0:
+                return
+            env_ids = failed_env_ids
+            time.sleep(self._retry_waiting_time)
+
+        for env_id in env_ids:
+            self._env_states[env_id] = EnvState.ERROR
+        logging.error("Env {} reset has exceeded max retries({})".format(env_ids, self._max_retry))
+        runtime_error = RuntimeError(
+            "Env {} reset has exceeded max retries({}), and the latest exception is: {}".format(
+                env_ids, self._max_retry, repr(exceptions[-1])
+            )
+        )
+        runtime_error.__traceback__ = exceptions[-1].__traceback__
+        self.close()
+        raise runtime_error
+
+    def step(self, actions: Dict[int, Any]) -> Dict[int, namedtuple]:
+        """
+        Overview:
+            Step all environments. Reset an env if done.
+        Arguments:
+            - actions (:obj:`Dict[int, Any]`): {env_id: action}
+        Returns:
+            - timesteps (:obj:`Dict[int, namedtuple]`): {env_id: timestep}. Timestep is a \
+                ``BaseEnvTimestep`` tuple with observation, reward, done, env_info.
+
+        .. note::
+
+            - The env_id that appears in ``actions`` will also be returned in ``timesteps``.
+            - Actions of each worker are sent in one message, and envs are stepped in the worker one by one.
+        """
+        self._check_closed()
+        env_ids = list(actions.keys())
+        assert all([self._env_states[env_id] == EnvState.RUN for env_id in env_ids]
+                   ), 'current env state are: {}, please check whether the requested env is in reset or done'.format(
+                       {env_id: self._env_states[env_id]
+                        for env_id in env_ids}
+                   )
+        groups = self._group_by_worker(env_ids)
+        for worker_id, group_env_ids in groups.items():
+            local_ids = [self._env_location[env_id][1] for env_id in group_env_ids]
+            batch_action = _batch_action([actions[env_id] for env_id in group_env_ids])
+            self._pipe_parents[worker_id].send(['step', [local_ids, batch_action], {}])
+
+        timesteps = {}
+        for worker_id, group_env_ids in groups.items():
+            ret = self._recv(worker_id)
+            self._check_data(ret)
+            for env_id in group_env_ids:
+                if self._shared_memory:
+                    # Only the timesteps with info or unmatched reward are in the reply, others are all in the slabs
+                    rest = ret.get(env_id)
+                    if rest is None or not is_abnormal_timestep(rest):
+                        timesteps[env_id] = self._shm_buffers[worker_id].get(self._env_location[env_id][1], rest)
+                        continue
+                    timesteps[env_id] = rest
+                else:
+                    timesteps[env_id] = ret[env_id]
+
+        reset_env_ids = []
+        for env_id in env_ids:
+            timestep = timesteps[env_id]
+            if is_abnormal_timestep(timestep):
+                self._env_states[env_id] = EnvState.ERROR
+                continue
+            if timestep.done:
+                self._env_episode_count[env_id] += 1
+                if self._env_episode_count[env_id] < self._episode_num and self._auto_reset:
+                    reset_env_ids.append(env_id)
+                else:
+                    self._env_states[env_id] = EnvState.DONE
+            else:
+                self._ready_obs[env_id] = timestep.obs
+        if len(reset_env_ids) > 0:
+            # All the done envs are reset in one round trip for each worker
+            self._reset(reset_env_ids)
+        return timesteps
+
+    # This method must be staticmethod, otherwise there will be some resource conflicts(e.g. port or file)
+    # Env must be created in worker, which is a trick of avoiding env pickle errors.
+    @staticmethod
+    def worker_fn(
+            parent: connection.Connection,
+            child: connection.Connection,
+            env_fn_wrapper: 'CloudPickleWrapper',
+            offset: int,
+            shm_buffer: Optional[ShmGroupTimestepContainer],
+            method_name_list: list,
+            reset_timeout: Optional[int] = None,
+            step_timeout: Optional[int] = None,
+    ) -> None:
+        """
+        Overview:
+            Subprocess's target function to run, which hosts a group of envs. Replies of ``step`` and ``reset`` \
+            are dicts whose keys are local env indices, an exception of an env is put in its value. With shared \
+            memory, the reply of ``step`` only contains the rest of the timesteps which are not in the slabs.
+        """
+        torch.set_num_threads(1)
+        envs = [env_fn() for env_fn in env_fn_wrapper.data]
+        parent.close()
+        # Armed once in this worker, each step and reset only refreshes the deadline of the watchdog.
+        watchdog = start_watchdog() if step_timeout is not None or reset_timeout is not None else None
+
+        def step_fn(env, action):
+            return env.step(action)
+
+        def reset_fn(env, param):
+            return env.reset(**param) if param is not None else env.reset()
+
+        if watchdog is not None:
+            step_fn = watchdog.watch(step_fn, step_timeout)
+            reset_fn = watchdog.watch(reset_fn, reset_timeout)
+
+        def wrap_exception(e: BaseException) -> BaseException:
+            # directly send error to another process will lose the stack trace, so we create a new Exception
+            return e.__class__('\nEnv Process Exception:\n' + ''.join(traceback.format_tb(e.__traceback__)) + repr(e))
+
+        def step(local_ids, batch_action):
+            ret = {}
+            for i, local_id in enumerate(local_ids):
+                # ``batch_action[i, ...]`` keeps the action of an env as an array even if it is 0-dim
+                action = batch_action[i, ...] if isinstance(batch_action, np.ndarray) else batch_action[i]
+                timestep = step_fn(envs[local_id], action)
+                if shm_buffer is not None and not is_abnormal_timestep(timestep):
+                    timestep = shm_buffer.fill(local_id, timestep)
+                    if timestep is None:
+                        continue
+                ret[local_id] = timestep
+            return ret
+
+        def reset(local_ids, params):
+            ret = {}
+            for local_id, param in zip(local_ids, params):
+                try:
+                    obs = reset_fn(envs[local_id], param)
+                    if shm_buffer is not None:
+                        shm_buffer.fill_obs(local_id, obs)
+                        obs = None
+                    ret[local_id] = obs
+                except BaseException as e:
+                    ret[local_id] = wrap_exception(e)
+            return ret
+
+        while True:
+            try:
+                cmd, args, kwargs = child.recv()
+            except EOFError:  # for the case when the pipe has been closed
+                child.close()
+                break
+            try:
+                if cmd == 'getattr':
+                    ret = [getattr(env, args[0]) for env in envs]
+                elif cmd == 'step':
+                    ret = step(*args)
+                elif cmd == 'reset':
+                    ret = reset(*args)
+                elif cmd == 'seed':
+                    local_ids, seeds, dynamic_seed = args
+                    for local_id, seed in zip(local_ids, seeds):
+                        if dynamic_seed is not None:
+                            envs[local_id].seed(seed, dynamic_seed)
+                        else:
+                            envs[local_id].seed(seed)
+                    ret = None
+                elif cmd == 'enable_save_replay':
+                    for env, replay_path in zip(envs, args[0]):
+                        env.enable_save_replay(replay_path)
+                    ret = None
+                elif cmd == 'close':
+                    ret = [env.close() for env in envs]
+                elif cmd in method_name_list:
+                    ret = [getattr(env, cmd)(*args, **kwargs) for env in envs]
+                else:
+                    raise KeyError("not support env cmd: {}".format(cmd))
+                if isinstance(ret, dict):
+                    # Keys of replies are global env ids, ``offset`` is the id of the first env in the group.
+                    ret = {offset + k: v for k, v in ret.items()}
+                child.send(ret)
+            except BaseException as e:
+                logging.debug("Sub env group error when executing {}".format(cmd))
+                child.send(wrap_exception(e))
+            if cmd == 'close':
+                child.close()
+                break
+
+    def _check_data(self, data: Any, close: bool = True) -> None:
+        if not isinstance(data, dict):
+            return
+        exceptions = []
+        for i, d in data.items():
+            if isinstance(d, BaseException):
+                self._env_states[i] = EnvState.ERROR
+                exceptions.append(d)
+        # when receiving env Exception, env manager will safely close and raise this Exception to caller
+        if len(exceptions) > 0:
+            if close:
+                self.close()
+            raise exceptions[0]
+
+    # override
+    def __getattr__(self, key: str) -> Any:
+        self._check_closed()
+        # we suppose that all the envs has the same attributes, if you need different envs, please
+        # create different env managers.
+        if not hasattr(self._env_ref, key):
+            raise AttributeError("env `{}` doesn't have the attribute `{}`".format(type(self._env_ref), key))
+        if isinstance(getattr(self._env_ref, key), MethodType) and key not in self.method_name_list:
+            raise RuntimeError("env getattr doesn't supports method({}), please override method_name_list".format(key))
+        for _, p in self._pipe_parents.items():
+            p.send(['getattr', [key], {}])
+        ret = []
+        for worker_id in range(self._worker_num):
+            data = self._pipe_parents[worker_id].recv()
+            if isinstance(data, BaseException):
+                self.close()
+                raise data
+            ret += data
+        return ret
+
+    # override
+    def close(self) -> None:
+        """
+        Overview:
+            CLose the env manager and release all related resources.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._env_ref.close()
+        for _, p in self._pipe_parents.items():
+            p.send(['close', None, None])
+        for _, p in self._pipe_parents.items():
+            if not p.poll(5):
+                continue
+            p.recv()
+        for i in range(self._env_num):
+            self._env_states[i] = EnvState.VOID
+        for _, p in self._subprocesses.items():
+            p.terminate()
+        for _, p in self._pipe_parents.items():
+            p.close()
@@ -3,6 +3,7 @@ from multiprocessing import Pipe, connection, get_context, Array
 from collections import namedtuple
 import logging
 import platform
+import threading
 import time
 import copy
 import traceback
@@ -15,7 +16,7 @@ from easydict import EasyDict
 from types import MethodType
 
 from ding.utils import PropagatingThread, LockContextType, LockContext, ENV_MANAGER_REGISTRY
-from .base_env_manager import BaseEnvManager, EnvState, timeout_wrapper
+from .base_env_manager import BaseEnvManager, EnvState, start_watchdog
 from ding.envs.env.base_env import BaseEnvTimestep
 
 _NTYPE_TO_CTYPE = {
@@ -32,6 +33,9 @@ _NTYPE_TO_CTYPE = {
     np.float64: ctypes.c_double,
 }
 
+# Step commands whose action is in shared memory, which are pickled only once.
+_SHM_STEP_CMD = {cmd: pickle.dumps([cmd, None, None]) for cmd in ['step', 'step_reset']}
+
 
 def is_abnormal_timestep(timestep: namedtuple) -> bool:
     if isinstance(timestep.info, dict):
@@ -42,6 +46,26 @@ def is_abnormal_timestep(timestep: namedtuple) -> bool:
         raise TypeError("invalid env timestep type: {}".format(type(timestep.info)))
 
 
+def get_shm_reward_space(rew_space: Optional[namedtuple]) -> Tuple[Optional[tuple], Optional[np.dtype]]:
+    """
+    Overview:
+        Get the shape and dtype of the reward slot in shared memory from the reward space of env info, reward \
+        which doesn't match them is sent through pipe.
+    Arguments:
+        - rew_space (:obj:`Optional[namedtuple]`): ``EnvElementInfo`` of reward.
+    Returns:
+        - rew_shape (:obj:`Optional[tuple]`): Shape of reward, None if the space has no array shape.
+        - rew_dtype (:obj:`Optional[np.dtype]`): Declared dtype of reward, float64 by default, which is the dtype \
+            of reward wrapped by ``to_ndarray([rew])`` in most envs.
+    """
+    if rew_space is None or not isinstance(rew_space.shape, (tuple, list)):
+        return None, None
+    rew_dtype = np.dtype(np.float64)
+    if isinstance(rew_space.value, dict) and 'dtype' in rew_space.value:
+        rew_dtype = np.dtype(rew_space.value['dtype'])
+    return tuple(rew_space.shape), rew_dtype
+
+
 class ShmBuffer():
     """
     Overview:
@@ -79,8 +103,16 @@ class ShmBuffer():
         Return:
             - copy_data (:obj:`np.ndarray`): A copy of the data stored in the buffer.
         """
-        arr = np.frombuffer(self.buffer.get_obj(), dtype=self.dtype).reshape(self.shape)
-        return arr.copy()
+        return self.view().copy()
+
+    def view(self) -> np.ndarray:
+        """
+        Overview:
+            Get a numpy view of the buffer without copy, whose content changes when the buffer is filled again.
+        Return:
+            - view (:obj:`np.ndarray`): A view of the shared memory.
+        """
+        return np.frombuffer(self.buffer.get_obj(), dtype=self.dtype).reshape(self.shape)
 
 
 class ShmBufferContainer(object):
@@ -131,6 +163,151 @@ class ShmBufferContainer(object):
         elif isinstance(self._shape, (tuple, list)):
             return self._data.get()
 
+    def view(self) -> Union[Dict[Any, np.ndarray], np.ndarray]:
+        """
+        Overview:
+            Get the views of one or many buffers without copy.
+        Return:
+            - data (:obj:`np.ndarray`): The view(s) of the buffer(s).
+        """
+        if isinstance(self._shape, dict):
+            return {k: self._data[k].view() for k in self._shape.keys()}
+        elif isinstance(self._shape, (tuple, list)):
+            return self._data.view()
+
+
+class ShmTimestepContainer(object):
+    """
+    Overview:
+        Shared memory slots for a whole env timestep: obs, reward, done and some declared scalar info keys. \
+        Subprocess fills the slots and only sends the rest of the timestep (``None`` if everything is in the slots) \
+        through the pipe, so a normal step costs a tiny completion signal instead of a pickled timestep.
+        There is also an action slot written by env manager and read by subprocess.
+    Interfaces:
+        fill_obs, fill, get_obs, get, fill_action, get_action
+    """
+
+    def __init__(
+            self,
+            obs_dtype: np.generic,
+            obs_shape: Union[Dict[Any, tuple], tuple],
+            rew_dtype: Optional[np.generic] = None,
+            rew_shape: Optional[tuple] = None,
+            info_keys: Optional[List[str]] = None,
+            act_dtype: Optional[np.generic] = None,
+            act_shape: Optional[tuple] = None,
+    ) -> None:
+        """
+        Overview:
+            Initialize the slots.
+        Arguments:
+            - obs_dtype (:obj:`np.generic`): dtype of obs.
+            - obs_shape (:obj:`Union[Dict[Any, tuple], tuple]`): shape of obs, the same as ``ShmBufferContainer``.
+            - rew_dtype (:obj:`Optional[np.generic]`): dtype of reward.
+            - rew_shape (:obj:`Optional[tuple]`): shape of reward, if None, reward is sent through pipe.
+            - info_keys (:obj:`Optional[List[str]]`): Keys of scalar info values stored as float in shared memory.
+            - act_dtype (:obj:`Optional[np.generic]`): dtype of action.
+            - act_shape (:obj:`Optional[tuple]`): shape of action, if None, action is always sent through pipe.
+        """
+        self.obs = ShmBufferContainer(obs_dtype, obs_shape)
+        self.reward = ShmBuffer(rew_dtype, rew_shape) if rew_shape is not None else None
+        # [done, whether reward is in shared memory]
+        self.flag = ShmBuffer(np.dtype(np.bool_), (2, ))
+        self.info_keys = list(info_keys) if info_keys else []
+        if len(self.info_keys) > 0:
+            self.info = ShmBuffer(np.dtype(np.float64), (len(self.info_keys), ))
+            # whether the key is in info of current timestep
+            self.info_mask = ShmBuffer(np.dtype(np.bool_), (len(self.info_keys), ))
+        self.action = ShmBuffer(act_dtype, act_shape) if act_shape is not None else None
+
+    def fill_obs(self, obs: Union[Dict[Any, np.ndarray], np.ndarray]) -> None:
+        self.obs.fill(obs)
+
+    def fill_action(self, action: Any) -> bool:
+        """
+        Overview:
+            Write action into the action slot in env manager if it is an array matching the slot.
+        Arguments:
+            - action (:obj:`Any`): Action of the env.
+        Returns:
+            - success (:obj:`bool`): Whether the action is written, if not, it should be sent through pipe.
+        """
+        if self.action is None or not isinstance(action, np.ndarray):
+            return False
+        if action.shape != self.action.shape or action.dtype != self.action.dtype:
+            return False
+        # Subprocess only reads the slot after receiving step command, no lock is needed.
+        np.copyto(self.action.view(), action)
+        return True
+
+    def get_action(self) -> np.ndarray:
+        # Copy action because env may keep it, while the slot is overwritten in the next step.
+        return self.action.get()
+
+    def fill(self, timestep: BaseEnvTimestep) -> Optional[BaseEnvTimestep]:
+        """
+        Overview:
+            Fill the slots with a timestep in subprocess.
+        Arguments:
+            - timestep (:obj:`BaseEnvTimestep`): Normal timestep returned by env.
+        Returns:
+            - rest (:obj:`Optional[BaseEnvTimestep]`): The part of timestep which is not in the slots, \
+                None if the whole timestep is in the slots.
+        """
+        self.obs.fill(timestep.obs)
+        reward, info = timestep.reward, timestep.info
+        flag = self.flag.view()
+        reward_in_shm = self.reward is not None and isinstance(reward, np.ndarray) and \
+            reward.shape == self.reward.shape and reward.dtype == self.reward.dtype
+        if reward_in_shm:
+            np.copyto(self.reward.view(), reward)
+            reward = None
+        if len(self.info_keys) > 0 and isinstance(info, dict):
+            info_view, mask_view = self.info.view(), self.info_mask.view()
+            rest_info = dict(info)
+            for i, k in enumerate(self.info_keys):
+                v = info.get(k)
+                mask_view[i] = isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+                if mask_view[i]:
+                    info_view[i] = v
+                    rest_info.pop(k)
+            info = rest_info
+        flag[0], flag[1] = bool(timestep.done), reward_in_shm
+        if reward is None and isinstance(info, dict) and len(info) == 0 and reward_in_shm:
+            return None
+        return timestep._replace(obs=None, reward=reward, done=None, info=info)
+
+    def get_obs(self, copy: bool = True) -> Union[Dict[Any, np.ndarray], np.ndarray]:
+        return self.obs.get() if copy else self.obs.view()
+
+    def get(self, rest: Optional[BaseEnvTimestep], copy: bool = True) -> BaseEnvTimestep:
+        """
+        Overview:
+            Assemble the timestep from the slots and the rest part received from pipe.
+        Arguments:
+            - rest (:obj:`Optional[BaseEnvTimestep]`): The return value of ``fill`` in subprocess.
+            - copy (:obj:`bool`): Whether to copy obs and reward, if False, they are views of the shared memory, \
+                which are valid until the next step or reset of the env.
+        Returns:
+            - timestep (:obj:`BaseEnvTimestep`): The whole timestep.
+        """
+        flag = self.flag.view()
+        done = bool(flag[0])
+        if rest is None:
+            reward, info = None, {}
+        else:
+            reward, info = rest.reward, rest.info
+        if flag[1]:
+            reward = self.reward.get() if copy else self.reward.view()
+        if len(self.info_keys) > 0 and isinstance(info, dict):
+            mask = self.info_mask.view()
+            value = self.info.view()
+            shm_info = {k: value[i].item() for i, k in enumerate(self.info_keys) if mask[i]}
+            shm_info.update(info)
+            info = shm_info
+        # Obs of the last timestep is always copied, because the slot is overwritten by auto reset soon.
+        return BaseEnvTimestep(self.get_obs(copy or done), reward, done, info)
+
 
 class CloudPickleWrapper:
     """
@@ -171,10 +348,25 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
         retry_waiting_time=0.1,
         # subprocess specified args
         shared_memory=True,
+        # Scalar info keys stored in shared memory when ``shared_memory`` is True, other keys are sent through pipe.
+        shm_info_keys=[],
+        # Whether to copy obs and reward out of shared memory. If False, they are numpy views of shared memory, \
+        # which are valid until the next step or reset of the env.
+        copy_shm_data=True,
+        # Whether to reset a done env in its subprocess right after the terminal step, the first obs of the next \
+        # episode is returned with the terminal timestep. If False or failed, env is reset by a thread of manager.
+        reset_in_subprocess=True,
         context='spawn' if platform.system().lower() == 'windows' else 'fork',
         wait_num=2,
         step_wait_timeout=0.01,
+        # Whether to adapt ``wait_num`` and ``step_wait_timeout`` by the tracked step latency, so that each step \
+        # returns about ``target_fill_rate`` of the stepping envs without waiting for stragglers.
+        adaptive_wait=False,
+        target_fill_rate=0.75,
         connect_timeout=60,
+        # If an env doesn't reply in ``step_timeout + step_hang_grace`` seconds, i.e. the watchdog in its \
+        # subprocess fails to interrupt the step, the subprocess is killed and restarted.
+        step_hang_grace=1.,
     )
 
     def __init__(
@@ -193,15 +385,30 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
 
             - wait_num: for each time the minimum number of env return to gather
             - step_wait_timeout: for each time the minimum number of env return to gather
+            - adaptive_wait: if True, ``wait_num`` is ``target_fill_rate`` of the stepping envs and \
+                ``step_wait_timeout`` is the ``target_fill_rate`` percentile of the tracked step latency.
         """
         super().__init__(env_fn, cfg)
         self._shared_memory = self._cfg.shared_memory
+        self._shm_info_keys = self._cfg.shm_info_keys
+        self._copy_shm_data = self._cfg.copy_shm_data
+        self._reset_in_subprocess = self._cfg.reset_in_subprocess
         self._context = self._cfg.context
         self._wait_num = self._cfg.wait_num
         self._step_wait_timeout = self._cfg.step_wait_timeout
+        # Sync manager waits for all the envs, so it doesn't have these keys.
+        self._adaptive_wait = self._cfg.get('adaptive_wait', False)
+        self._target_fill_rate = self._cfg.get('target_fill_rate', 1.)
+        # Moving average of the ratio of returned envs to stepping envs of each step
+        self._fill_rate = 1.
+        # Send time of the last action of each env, which is used to track step latency
+        self._step_send_time = {}
 
         self._lock = LockContext(LockContextType.THREAD_LOCK)
+        # Notified when an env finishes resetting, instead of polling env states.
+        self._env_state_cond = threading.Condition()
         self._connect_timeout = self._cfg.connect_timeout
+        self._step_hang_grace = self._cfg.step_hang_grace
         self._async_args = {
             'step': {
                 'wait_num': min(self._wait_num, self._env_num),
@@ -219,17 +426,32 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
         self._env_ref = self._env_fn[0]()
         self._reset_param = {i: {} for i in range(self.env_num)}
         if self._shared_memory:
-            obs_space = self._env_ref.info().obs_space
-            shape = obs_space.shape
-            dtype = np.dtype(obs_space.value['dtype']) if obs_space.value is not None else np.dtype(np.float32)
-            self._obs_buffers = {env_id: ShmBufferContainer(dtype, shape) for env_id in range(self.env_num)}
+            env_info = self._env_ref.info()
+            obs_space, rew_space = env_info.obs_space, env_info.rew_space
+            obs_dtype = np.dtype(obs_space.value['dtype']) if obs_space.value is not None else np.dtype(np.float32)
+            rew_shape, rew_dtype = get_shm_reward_space(rew_space)
+            act_space = env_info.act_space
+            act_shape, act_dtype = None, None
+            if act_space is not None and isinstance(act_space.shape, (tuple, list)) and \
+                    isinstance(act_space.value, dict) and 'dtype' in act_space.value:
+                act_dtype = np.dtype(act_space.value['dtype'])
+                # Action whose dtype can't be put into shared memory is sent through pipe.
+                act_shape = tuple(act_space.shape) if act_dtype.type in _NTYPE_TO_CTYPE else None
+            self._shm_buffers = {
+                env_id: ShmTimestepContainer(
+                    obs_dtype, obs_space.shape, rew_dtype, rew_shape, self._shm_info_keys, act_dtype, act_shape
+                )
+                for env_id in range(self.env_num)
+            }
         else:
-            self._obs_buffers = {env_id: None for env_id in range(self.env_num)}
+            self._shm_buffers = {env_id: None for env_id in range(self.env_num)}
         self._pipe_parents, self._pipe_children = {}, {}
         self._subprocesses = {}
         for env_id in range(self.env_num):
             self._create_env_subprocess(env_id)
         self._waiting_env = {'step': set()}
+        # The first obs(or the exception) of the next episode, which is reset in subprocess
+        self._next_obs = {}
         self._closed = False
 
     def _create_env_subprocess(self, env_id):
@@ -243,7 +465,7 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
                 self._pipe_parents[env_id],
                 self._pipe_children[env_id],
                 CloudPickleWrapper(self._env_fn[env_id]),
-                self._obs_buffers[env_id],
+                self._shm_buffers[env_id],
                 self.method_name_list,
                 self._reset_timeout,
                 self._step_timeout,
@@ -277,16 +499,23 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             >>>     actions_dict = {env_id: model.forward(obs) for env_id, obs in obs_dict.items())}
         """
         no_done_env_idx = [i for i, s in self._env_states.items() if s != EnvState.DONE]
-        sleep_count = 0
-        while not any([self._env_states[i] == EnvState.RUN for i in no_done_env_idx]):
-            if sleep_count % 1000 == 0:
-                logging.warning(
-                    'VEC_ENV_MANAGER: all the not done envs are resetting, sleep {} times'.format(sleep_count)
-                )
-            time.sleep(0.001)
-            sleep_count += 1
+        self._wait_env_state(lambda: any([self._env_states[i] == EnvState.RUN for i in no_done_env_idx]))
         return {i: self._ready_obs[i] for i in self.ready_env}
 
+    def _wait_env_state(self, predicate: Callable[[], bool]) -> None:
+        # Reset threads notify the condition when env state changes, timeout is only used to log warnings.
+        wait_count = 0
+        with self._env_state_cond:
+            while not predicate():
+                if not self._env_state_cond.wait(timeout=1.0):
+                    wait_count += 1
+                    logging.warning('VEC_ENV_MANAGER: envs are still resetting after {}s'.format(wait_count))
+
+    def _set_env_state(self, env_id: int, state: EnvState) -> None:
+        with self._env_state_cond:
+            self._env_states[env_id] = state
+            self._env_state_cond.notify_all()
+
     def launch(self, reset_param: Optional[Dict] = None) -> None:
         """
         Overview:
@@ -324,14 +553,7 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
                 self._pipe_parents[env_id].recv()
                 self._waiting_env['step'].remove(env_id)
 
-        sleep_count = 0
-        while any([self._env_states[i] == EnvState.RESET for i in reset_env_list]):
-            if sleep_count % 1000 == 0:
-                logging.warning(
-                    'VEC_ENV_MANAGER: not all the envs finish resetting, sleep {} times'.format(sleep_count)
-                )
-            time.sleep(0.001)
-            sleep_count += 1
+        self._wait_env_state(lambda: not any([self._env_states[i] == EnvState.RESET for i in reset_env_list]))
 
         # reset env
         reset_thread_list = []
@@ -377,10 +599,10 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             obs = self._pipe_parents[env_id].recv()
             self._check_data({env_id: obs}, close=False)
             if self._shared_memory:
-                obs = self._obs_buffers[env_id].get()
+                obs = self._shm_buffers[env_id].get_obs(self._copy_shm_data)
             # Because each thread updates the corresponding env_id value, they won't lead to a thread-safe problem.
-            self._env_states[env_id] = EnvState.RUN
             self._ready_obs[env_id] = obs
+            self._set_env_state(env_id, EnvState.RUN)
 
         exceptions = []
         for _ in range(self._max_retry):
@@ -403,6 +625,7 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             )
         )
         runtime_error.__traceback__ = exceptions[-1].__traceback__
+        self._set_env_state(env_id, EnvState.ERROR)
         if self._closed:  # exception cased by main thread closing parent_remote
             return
         else:
@@ -439,23 +662,33 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
                    )
 
         for env_id, act in actions.items():
-            self._pipe_parents[env_id].send(['step', [act], {}])
+            self._send_action(env_id, act)
 
         timesteps = {}
+        rest_env_ids = list(set(env_ids).union(self._waiting_env['step']))
+        if self._adaptive_wait:
+            self._adapt_async_args(len(rest_env_ids))
         step_args = self._async_args['step']
         wait_num, timeout = min(step_args['wait_num'], len(env_ids)), step_args['timeout']
-        rest_env_ids = list(set(env_ids).union(self._waiting_env['step']))
         ready_env_ids = []
         cur_rest_env_ids = copy.deepcopy(rest_env_ids)
         while True:
             rest_conn = [self._pipe_parents[env_id] for env_id in cur_rest_env_ids]
-            ready_conn, ready_ids = AsyncSubprocessEnvManager.wait(rest_conn, min(wait_num, len(rest_conn)), timeout)
+            ready_time = {}
+            ready_conn, ready_ids = AsyncSubprocessEnvManager.wait(
+                rest_conn, min(wait_num, len(rest_conn)), timeout, ready_time, self._hang_deadline(cur_rest_env_ids)
+            )
             cur_ready_env_ids = [cur_rest_env_ids[env_id] for env_id in ready_ids]
             assert len(cur_ready_env_ids) == len(ready_conn)
+            for i, t in ready_time.items():
+                self._record_latency(cur_rest_env_ids[i], t)
+            for env_id in self._hung_env(set(cur_rest_env_ids).difference(cur_ready_env_ids)):
+                timesteps[env_id] = self._restart_hung_env(env_id)
+                cur_ready_env_ids.append(env_id)
             # timesteps.update({env_id: p.recv() for env_id, p in zip(cur_ready_env_ids, ready_conn)})
             for env_id, p in zip(cur_ready_env_ids, ready_conn):
                 try:
-                    timesteps.update({env_id: p.recv()})
+                    timesteps.update({env_id: self._recv_timestep(env_id, p)})
                 except pickle.UnpicklingError as e:
                     timestep = BaseEnvTimestep(None, None, None, {'abnormal': True})
                     timesteps.update({env_id: timestep})
@@ -467,7 +700,7 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             ready_env_ids += cur_ready_env_ids
             cur_rest_env_ids = list(set(cur_rest_env_ids).difference(set(cur_ready_env_ids)))
             # At least one not done env timestep, or all envs' steps are finished
-            if any([not t.done for t in timesteps.values()]) or len(ready_conn) == len(rest_conn):
+            if any([not t.done for t in timesteps.values()]) or len(cur_rest_env_ids) == 0:
                 break
         self._waiting_env['step']: set
         for env_id in rest_env_ids:
@@ -477,10 +710,6 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             else:
                 self._waiting_env['step'].add(env_id)
 
-        if self._shared_memory:
-            for i, (env_id, timestep) in enumerate(timesteps.items()):
-                timesteps[env_id] = timestep._replace(obs=self._obs_buffers[env_id].get())
-
         for env_id, timestep in timesteps.items():
             if is_abnormal_timestep(timestep):
                 self._env_states[env_id] = EnvState.ERROR
@@ -488,6 +717,8 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             if timestep.done:
                 self._env_episode_count[env_id] += 1
                 if self._env_episode_count[env_id] < self._episode_num and self._auto_reset:
+                    if self._pop_next_obs(env_id):
+                        continue
                     self._env_states[env_id] = EnvState.RESET
                     reset_thread = PropagatingThread(target=self._reset, args=(env_id, ), name='regular_reset')
                     reset_thread.daemon = True
@@ -496,15 +727,50 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
                     self._env_states[env_id] = EnvState.DONE
             else:
                 self._ready_obs[env_id] = timestep.obs
+        self._fill_rate = 0.9 * self._fill_rate + 0.1 * len(timesteps) / len(rest_env_ids)
         return timesteps
 
+    def _adapt_async_args(self, stepping_num: int) -> None:
+        """
+        Overview:
+            Set ``wait_num`` to ``target_fill_rate`` of the stepping envs, and the timeout to the time by which \
+            ``target_fill_rate`` of envs usually finish a step, i.e. the corresponding order statistic of per-env \
+            median latency. ``AsyncSubprocessEnvManager.wait`` returns when both of them are satisfied, so the envs \
+            which finish at the usual time are gathered into one batch, and the stragglers are left to the next \
+            step. Config values are used until there are enough records.
+        Arguments:
+            - stepping_num (:obj:`int`): The number of envs whose step is not returned yet.
+        """
+        step_args = self._async_args['step']
+        step_args['wait_num'] = max(1, int(np.ceil(self._target_fill_rate * stepping_num)))
+        if self._latency_tracker.count() >= 4 * self._env_num:
+            env_latency = sorted([self._latency_tracker.percentile(50, i) for i in range(self._env_num)])
+            step_args['timeout'] = env_latency[max(1, int(np.ceil(self._target_fill_rate * self._env_num))) - 1]
+
+    @property
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Overview:
+            The statistics of env step latency, i.e. the time from sending action to timestep being ready, and the \
+            current ``wait_num``, timeout and moving average of batch fill rate of async step.
+        """
+        stats = self._latency_tracker.stats()
+        stats.update(
+            {
+                'fill_rate': self._fill_rate,
+                'wait_num': self._async_args['step']['wait_num'],
+                'step_wait_timeout': self._async_args['step']['timeout'] or 0.,
+            }
+        )
+        return stats
+
     # This method must be staticmethod, otherwise there will be some resource conflicts(e.g. port or file)
     # Env must be created in worker, which is a trick of avoiding env pickle errors.
     # A more robust version is used by default. But this one is also preserved.
     @staticmethod
     def worker_fn(
             p: connection.Connection, c: connection.Connection, env_fn_wrapper: 'CloudPickleWrapper',
-            obs_buffer: ShmBuffer, method_name_list: list
+            shm_buffer: ShmTimestepContainer, method_name_list: list
     ) -> None:  # noqa
         """
         Overview:
@@ -526,18 +792,19 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
                         ret = getattr(env, args[0])
                     elif cmd in method_name_list:
                         if cmd == 'step':
+                            if args is None:  # action is in shared memory
+                                args, kwargs = [shm_buffer.get_action()], {}
                             timestep = env.step(*args, **kwargs)
                             if is_abnormal_timestep(timestep):
                                 ret = timestep
                             else:
-                                if obs_buffer is not None:
-                                    obs_buffer.fill(timestep.obs)
-                                    timestep = timestep._replace(obs=None)
+                                if shm_buffer is not None:
+                                    timestep = shm_buffer.fill(timestep)
                                 ret = timestep
                         elif cmd == 'reset':
                             ret = env.reset(*args, **kwargs)  # obs
-                            if obs_buffer is not None:
-                                obs_buffer.fill(ret)
+                            if shm_buffer is not None:
+                                shm_buffer.fill_obs(ret)
                                 ret = None
                         elif args is None and kwargs is None:
                             ret = getattr(env, cmd)()
@@ -565,7 +832,7 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             parent,
             child,
             env_fn_wrapper,
-            obs_buffer,
+            shm_buffer,
             method_name_list,
             reset_timeout=None,
             step_timeout=None,
@@ -578,32 +845,45 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
         env_fn = env_fn_wrapper.data
         env = env_fn()
         parent.close()
+        # Armed once in this worker, each step and reset only refreshes the deadline of the watchdog.
+        watchdog = start_watchdog() if step_timeout is not None or reset_timeout is not None else None
+        step_fn = env.step
 
-        @timeout_wrapper(timeout=step_timeout)
-        def step_fn(*args, **kwargs):
-            timestep = env.step(*args, **kwargs)
-            if is_abnormal_timestep(timestep):
-                ret = timestep
-            else:
-                if obs_buffer is not None:
-                    obs_buffer.fill(timestep.obs)
-                    timestep = timestep._replace(obs=None)
-                ret = timestep
-            return ret
+        def pack_timestep(timestep):
+            if is_abnormal_timestep(timestep) or shm_buffer is None:
+                return timestep
+            return shm_buffer.fill(timestep)
+
+        def wrap_exception(e):
+            # directly send error to another process will lose the stack trace, so we create a new Exception
+            return e.__class__('\nEnv Process Exception:\n' + ''.join(traceback.format_tb(e.__traceback__)) + repr(e))
 
         # self._reset method has add retry_wrapper decorator
-        @timeout_wrapper(timeout=reset_timeout)
         def reset_fn(*args, **kwargs):
             try:
                 ret = env.reset(*args, **kwargs)
-                if obs_buffer is not None:
-                    obs_buffer.fill(ret)
+                if shm_buffer is not None:
+                    shm_buffer.fill_obs(ret)
                     ret = None
                 return ret
             except BaseException as e:
                 env.close()
                 raise e
 
+        # The obs slot keeps the terminal obs, so the first obs of the next episode is sent through pipe.
+        def auto_reset_fn():
+            try:
+                return env.reset(**reset_kwargs)
+            except BaseException as e:
+                env.close()
+                raise e
+
+        if watchdog is not None:
+            step_fn = watchdog.watch(step_fn, step_timeout)
+            reset_fn = watchdog.watch(reset_fn, reset_timeout)
+            auto_reset_fn = watchdog.watch(auto_reset_fn, reset_timeout)
+
+        reset_kwargs = {}
         while True:
             try:
                 cmd, args, kwargs = child.recv()
@@ -613,10 +893,25 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             try:
                 if cmd == 'getattr':
                     ret = getattr(env, args[0])
+                elif cmd == 'step_reset':
+                    if args is None:  # action is in shared memory
+                        args, kwargs = [shm_buffer.get_action()], {}
+                    timestep = step_fn(*args, **kwargs)
+                    ret = pack_timestep(timestep)
+                    # Reset immediately on done, and reply the terminal timestep with the first obs of next episode.
+                    if timestep.done and not is_abnormal_timestep(timestep):
+                        try:
+                            next_obs = auto_reset_fn()
+                        except BaseException as e:
+                            next_obs = wrap_exception(e)
+                        ret = (ret, next_obs)
                 elif cmd in method_name_list:
                     if cmd == 'step':
-                        ret = step_fn(*args, **kwargs)
+                        if args is None:  # action is in shared memory
+                            args, kwargs = [shm_buffer.get_action()], {}
+                        ret = pack_timestep(step_fn(*args, **kwargs))
                     elif cmd == 'reset':
+                        reset_kwargs = kwargs if kwargs is not None else {}
                         ret = reset_fn(*args, **kwargs)
                     elif args is None and kwargs is None:
                         ret = getattr(env, cmd)()
@@ -628,14 +923,76 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             except BaseException as e:
                 logging.debug("Sub env '{}' error when executing {}".format(str(env), cmd))
                 # when there are some errors in env, worker_fn will send the errors to env manager
-                # directly send error to another process will lose the stack trace, so we create a new Exception
-                child.send(
-                    e.__class__('\nEnv Process Exception:\n' + ''.join(traceback.format_tb(e.__traceback__)) + repr(e))
-                )
+                child.send(wrap_exception(e))
             if cmd == 'close':
                 child.close()
                 break
 
+    def _send_action(self, env_id: int, act: Any) -> None:
+        # Ask subprocess to reset the env on done if the env will be reset after this episode.
+        if self._reset_in_subprocess and self._auto_reset and \
+                self._env_episode_count[env_id] + 1 < self._episode_num:
+            cmd = 'step_reset'
+        else:
+            cmd = 'step'
+        self._step_send_time[env_id] = time.time()
+        if self._shared_memory and self._shm_buffers[env_id].fill_action(act):
+            self._pipe_parents[env_id].send_bytes(_SHM_STEP_CMD[cmd])
+        else:
+            self._pipe_parents[env_id].send([cmd, [act], {}])
+
+    def _recv_timestep(self, env_id: int, conn: connection.Connection) -> Any:
+        # Subprocess doesn't write shared memory until next command, so the slots can be read right after recv.
+        data = conn.recv()
+        if type(data) is tuple:  # reply of 'step_reset' on done: (timestep, the first obs of next episode)
+            data, self._next_obs[env_id] = data
+        if not self._shared_memory or isinstance(data, BaseException):
+            return data
+        if data is not None and is_abnormal_timestep(data):
+            return data
+        return self._shm_buffers[env_id].get(data, copy=self._copy_shm_data)
+
+    def _hang_deadline(self, env_ids: List[int], reduce_fn: Callable = min) -> Optional[float]:
+        # The time when the earliest(or latest) sent one of ``env_ids`` is regarded as hung.
+        if self._step_timeout is None or len(env_ids) == 0:
+            return None
+        send_time = reduce_fn(self._step_send_time.get(env_id, time.time()) for env_id in env_ids)
+        return send_time + self._step_timeout + self._step_hang_grace
+
+    def _hung_env(self, env_ids: List[int]) -> List[int]:
+        if self._step_timeout is None:
+            return []
+        now = time.time()
+        limit = self._step_timeout + self._step_hang_grace
+        return [env_id for env_id in env_ids if now - self._step_send_time.get(env_id, now) >= limit]
+
+    def _restart_hung_env(self, env_id: int) -> namedtuple:
+        logging.warning(
+            "Env {} doesn't reply in step_timeout({}s), restart its subprocess".format(env_id, self._step_timeout)
+        )
+        self._step_send_time.pop(env_id, None)
+        self._next_obs.pop(env_id, None)
+        self._pipe_parents[env_id].close()
+        if self._subprocesses[env_id].is_alive():
+            self._subprocesses[env_id].terminate()
+        self._create_env_subprocess(env_id)
+        return BaseEnvTimestep(None, None, None, {'abnormal': True})
+
+    def _record_latency(self, env_id: int, ready_time: float) -> None:
+        if env_id in self._step_send_time:
+            self._latency_tracker.record(env_id, ready_time - self._step_send_time.pop(env_id))
+
+    def _pop_next_obs(self, env_id: int) -> bool:
+        # Use the first obs of next episode which is reset in subprocess, return False if it should be reset again.
+        if env_id not in self._next_obs:
+            return False
+        next_obs = self._next_obs.pop(env_id)
+        if isinstance(next_obs, BaseException):
+            logging.warning("Env {} reset in subprocess failed, reset it again: {}".format(env_id, repr(next_obs)))
+            return False
+        self._ready_obs[env_id] = next_obs
+        return True
+
     def _check_data(self, data: Dict, close: bool = True) -> None:
         exceptions = []
         for i, d in data.items():
@@ -704,13 +1061,22 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             p.close()
 
     @staticmethod
-    def wait(rest_conn: list, wait_num: int, timeout: Optional[float] = None) -> Tuple[list, list]:
+    def wait(
+            rest_conn: list,
+            wait_num: int,
+            timeout: Optional[float] = None,
+            ready_time: Optional[Dict[int, float]] = None,
+            deadline: Optional[float] = None,
+    ) -> Tuple[list, list]:
         """
         Overview:
             Wait at least enough(len(ready_conn) >= wait_num) connections within timeout constraint.
             If timeout is None and wait_num == len(ready_conn), means sync mode;
             If timeout is not None, will return when len(ready_conn) >= wait_num and
             this method takes more than timeout seconds.
+            If ``ready_time`` is not None, the time when each connection becomes ready is put into it, whose key \
+            is the index of connection in ``rest_conn``.
+            If ``deadline`` is not None, return the ready connections at this time even if they are not enough.
         """
         assert 1 <= wait_num <= len(rest_conn
                                     ), 'please indicate proper wait_num: <wait_num: {}, rest_conn_num: {}>'.format(
@@ -723,7 +1089,16 @@ class AsyncSubprocessEnvManager(BaseEnvManager):
             if len(ready_conn) >= wait_num and timeout:
                 if (time.time() - start_time) >= timeout:
                     break
-            finish_conn = set(connection.wait(rest_conn_set, timeout=timeout))
+            wait_timeout = timeout
+            if deadline is not None:
+                remain_time = deadline - time.time()
+                if remain_time <= 0:
+                    break
+                wait_timeout = remain_time if timeout is None else min(timeout, remain_time)
+            finish_conn = set(connection.wait(rest_conn_set, timeout=wait_timeout))
+            if ready_time is not None:
+                now = time.time()
+                ready_time.update({rest_conn.index(c): now for c in finish_conn})
             ready_conn = ready_conn.union(finish_conn)
             rest_conn_set = rest_conn_set.difference(finish_conn)
         ready_ids = [rest_conn.index(c) for c in ready_conn]
@@ -742,10 +1117,19 @@ class SyncSubprocessEnvManager(AsyncSubprocessEnvManager):
         retry_waiting_time=0.1,
         # subprocess specified args
         shared_memory=True,
+        # Scalar info keys stored in shared memory when ``shared_memory`` is True, other keys are sent through pipe.
+        shm_info_keys=[],
+        # Whether to copy obs and reward out of shared memory. If False, they are numpy views of shared memory, \
+        # which are valid until the next step or reset of the env.
+        copy_shm_data=True,
+        # Whether to reset a done env in its subprocess right after the terminal step, the first obs of the next \
+        # episode is returned with the terminal timestep. If False or failed, env is reset by a thread of manager.
+        reset_in_subprocess=True,
         context='spawn' if platform.system().lower() == 'windows' else 'fork',
         wait_num=float("inf"),  # inf mean all the environments
         step_wait_timeout=None,
         connect_timeout=60,
+        step_hang_grace=1.,
         force_reproducibility=False,
     )
 
@@ -785,16 +1169,28 @@ class SyncSubprocessEnvManager(AsyncSubprocessEnvManager):
                         for env_id in env_ids}
                    )
         for env_id, act in actions.items():
-            self._pipe_parents[env_id].send(['step', [act], {}])
+            self._send_action(env_id, act)
 
         # ===     This part is different from async one.     ===
         # === Because operate in this way is more efficient. ===
         timesteps = {}
         ready_conn = [self._pipe_parents[env_id] for env_id in env_ids]
+        ready_time = {}
+        if len(ready_conn) > 0:
+            # Only wait for the time when each env finishes, which is used to track step latency.
+            AsyncSubprocessEnvManager.wait(
+                ready_conn, len(ready_conn), None, ready_time, self._hang_deadline(env_ids, reduce_fn=max)
+            )
+            for i, t in ready_time.items():
+                self._record_latency(env_ids[i], t)
         # timesteps.update({env_id: p.recv() for env_id, p in zip(env_ids, ready_conn)})
-        for env_id, p in zip(env_ids, ready_conn):
+        for i, (env_id, p) in enumerate(zip(env_ids, ready_conn)):
+            if i not in ready_time:
+                # The wait only returns before all the envs are ready when some envs hang
+                timesteps[env_id] = self._restart_hung_env(env_id)
+                continue
             try:
-                timesteps.update({env_id: p.recv()})
+                timesteps.update({env_id: self._recv_timestep(env_id, p)})
             except pickle.UnpicklingError as e:
                 timestep = BaseEnvTimestep(None, None, None, {'abnormal': True})
                 timesteps.update({env_id: timestep})
@@ -805,9 +1201,6 @@ class SyncSubprocessEnvManager(AsyncSubprocessEnvManager):
         self._check_data(timesteps)
         # ======================================================
 
-        if self._shared_memory:
-            for i, (env_id, timestep) in enumerate(timesteps.items()):
-                timesteps[env_id] = timestep._replace(obs=self._obs_buffers[env_id].get())
         for env_id, timestep in timesteps.items():
             if is_abnormal_timestep(timestep):
                 self._env_states[env_id] = EnvState.ERROR
@@ -815,6 +1208,8 @@ class SyncSubprocessEnvManager(AsyncSubprocessEnvManager):
             if timestep.done:
                 self._env_episode_count[env_id] += 1
                 if self._env_episode_count[env_id] < self._episode_num and self._auto_reset:
+                    if self._pop_next_obs(env_id):
+                        continue
                     self._env_states[env_id] = EnvState.RESET
                     reset_thread = PropagatingThread(target=self._reset, args=(env_id, ), name='regular_reset')
                     reset_thread.daemon = True
@@ -1,4 +1,5 @@
 import random
+import signal
 import time
 from collections import namedtuple
 
@@ -10,7 +11,8 @@ from functools import partial
 from ding.envs.common.env_element import EnvElement, EnvElementInfo
 from ding.envs.env.base_env import BaseEnvTimestep, BaseEnvInfo
 from ding.envs.env_manager.base_env_manager import EnvState
-from ding.envs.env_manager import BaseEnvManager, SyncSubprocessEnvManager, AsyncSubprocessEnvManager
+from ding.envs.env_manager import BaseEnvManager, SyncSubprocessEnvManager, AsyncSubprocessEnvManager, \
+    GroupSubprocessEnvManager, ThreadPoolEnvManager
 from ding.torch_utils import to_tensor, to_ndarray, to_list
 from ding.utils import deep_merge_dicts
 
@@ -63,6 +65,8 @@ class FakeEnv(object):
                 time.sleep(3)
         if isinstance(action, str) and action == 'block':
             self.block()
+        if isinstance(action, str) and action == 'hang':
+            self.hang()
         obs = to_ndarray(torch.randn(3))
         reward = to_ndarray(torch.randint(0, 2, size=[1]).numpy())
         done = self._current_time >= self._target_time
@@ -83,6 +87,11 @@ class FakeEnv(object):
         self._state = EnvState.ERROR
         time.sleep(1000)
 
+    def hang(self):
+        # A hung env can't be interrupted by the watchdog signal
+        signal.signal(signal.SIGALRM, signal.SIG_IGN)
+        self.block()
+
     def info(self):
         T = EnvElementInfo
         return BaseEnvInfo(
@@ -133,6 +142,43 @@ class FakeAsyncEnv(FakeEnv):
         return to_ndarray(torch.randn(3))
 
 
+class FakeCheapEnv(FakeEnv):
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        self._last_action = None
+
+    def reset(self, stat):
+        super().reset(stat)
+        return to_ndarray(torch.randn(3))
+
+    def step(self, action):
+        assert self._launched
+        if isinstance(action, str) and action == 'error':
+            self.dead()
+        self._last_action = action
+        obs = to_ndarray(torch.randn(3))
+        reward = to_ndarray(torch.randint(0, 2, size=[1]).numpy())
+        self._current_time += 1
+        self._data_count += 1
+        done = self._current_time >= self._target_time
+        info = {'name': self._name, 'tgt': self._target_time, 'cur': self._current_time}
+        return BaseEnvTimestep(obs, reward, done, info)
+
+    def info(self):
+        info = super().info()
+        act_space = EnvElementInfo((4, ), {'min': -1.0, 'max': 1.0, 'dtype': np.float32})
+        return info._replace(act_space=act_space)
+
+
+class FakeStragglerEnv(FakeCheapEnv):
+
+    def step(self, action):
+        # the first env is much slower than the others
+        time.sleep(0.05 if self._name == 'name0' else 0.002)
+        return super().step(action)
+
+
 class FakeModel(object):
 
     def forward(self, obs):
@@ -203,3 +249,44 @@ def setup_async_manager_cfg():
     manager_cfg['env_fn'] = [partial(FakeAsyncEnv, cfg=c) for c in env_cfg]
     manager_cfg['shared_memory'] = False
     return deep_merge_dicts(AsyncSubprocessEnvManager.default_config(), EasyDict(manager_cfg))
+
+
+@pytest.fixture(scope='function')
+def setup_group_manager_cfg():
+    manager_cfg = get_subprecess_manager_cfg(5)
+    env_cfg = manager_cfg.pop('env_cfg')
+    manager_cfg['env_fn'] = [partial(FakeCheapEnv, cfg=c) for c in env_cfg]
+    manager_cfg['env_per_worker'] = 2
+    return deep_merge_dicts(GroupSubprocessEnvManager.default_config(), EasyDict(manager_cfg))
+
+
+@pytest.fixture(scope='function')
+def setup_shm_manager_cfg():
+    manager_cfg = get_subprecess_manager_cfg(3)
+    env_cfg = manager_cfg.pop('env_cfg')
+    manager_cfg['env_fn'] = [partial(FakeCheapEnv, cfg=c) for c in env_cfg]
+    manager_cfg['shared_memory'] = True
+    manager_cfg['shm_info_keys'] = ['cur', 'tgt']
+    manager_cfg['copy_shm_data'] = False
+    return deep_merge_dicts(SyncSubprocessEnvManager.default_config(), EasyDict(manager_cfg))
+
+
+@pytest.fixture(scope='function')
+def setup_straggler_manager_cfg():
+    manager_cfg = get_subprecess_manager_cfg(4)
+    env_cfg = manager_cfg.pop('env_cfg')
+    manager_cfg['env_fn'] = [partial(FakeStragglerEnv, cfg=c) for c in env_cfg]
+    manager_cfg['episode_num'] = float('inf')
+    manager_cfg['adaptive_wait'] = True
+    manager_cfg['target_fill_rate'] = 0.75
+    return deep_merge_dicts(AsyncSubprocessEnvManager.default_config(), EasyDict(manager_cfg))
+
+
+@pytest.fixture(scope='function')
+def setup_thread_pool_manager_cfg():
+    manager_cfg = get_base_manager_cfg(4)
+    env_cfg = manager_cfg.pop('env_cfg')
+    manager_cfg.pop('step_timeout')
+    manager_cfg.pop('reset_timeout')
+    manager_cfg['env_fn'] = [partial(FakeEnv, cfg=c) for c in env_cfg]
+    return deep_merge_dicts(ThreadPoolEnvManager.default_config(), EasyDict(manager_cfg))
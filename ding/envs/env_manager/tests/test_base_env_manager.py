@@ -4,7 +4,7 @@ import pytest
 import torch
 import numpy as np
 
-from ..base_env_manager import BaseEnvManager, EnvState
+from ..base_env_manager import BaseEnvManager, EnvState, StepLatencyTracker
 
 
 @pytest.mark.unittest
@@ -44,6 +44,10 @@ class TestBaseEnvManager:
             count += 1
         end_time = time.time()
         print('total step time: {}'.format(end_time - start_time))
+        # Fake env sleeps 0.5~1s in each step
+        latency_stats = env_manager.latency_stats
+        assert 0.4 < latency_stats['step_latency_p50'] < 1.2
+        assert 0.4 < latency_stats['step_latency_mean'] < 1.2
         assert all([env_manager._env_states[env_id] == EnvState.DONE for env_id in range(env_manager.env_num)])
         assert all([c == setup_base_manager_cfg.episode_num for c in env_manager._env_episode_count.values()])
         # Test close
@@ -140,3 +144,28 @@ class TestBaseEnvManager:
         assert len(timestep) == env_manager.env_num
 
         env_manager.close()
+
+
+@pytest.mark.unittest
+def test_step_latency_tracker():
+    tracker = StepLatencyTracker(env_num=2, decay=1.)
+    assert tracker.stats() == {}
+    for latency in np.linspace(0.01, 0.1, 100):
+        tracker.record(0, latency)
+        tracker.record(1, latency * 10)
+    assert tracker.count() == 200 and tracker.count(0) == 100
+    # The relative error is bounded by the ratio of adjacent bin edges
+    assert tracker.percentile(50, 0) == pytest.approx(0.055, rel=0.15)
+    assert tracker.percentile(99, 1) == pytest.approx(1., rel=0.15)
+    assert tracker.mean(1) == pytest.approx(0.55)
+    stats = tracker.stats()
+    assert stats['straggler_ratio'] > 5
+    assert stats['step_latency_p50'] < stats['step_latency_p90'] < stats['step_latency_p99']
+
+    # Old records decay, so the statistics follow the recent latency
+    tracker = StepLatencyTracker(env_num=1, decay=0.9)
+    for _ in range(100):
+        tracker.record(0, 0.01)
+    for _ in range(100):
+        tracker.record(0, 1.)
+    assert tracker.percentile(10) == pytest.approx(1., rel=0.15)
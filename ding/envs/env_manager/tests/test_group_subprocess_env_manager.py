@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+
+from ding.envs.env.base_env import BaseEnvTimestep
+from ..base_env_manager import EnvState
+from ..group_subprocess_env_manager import GroupSubprocessEnvManager, ShmGroupTimestepContainer
+
+
+@pytest.mark.unittest
+class TestGroupSubprocessEnvManager:
+
+    @pytest.mark.parametrize('shared_memory', [True, False])
+    def test_naive(self, setup_group_manager_cfg, shared_memory):
+        env_fn = setup_group_manager_cfg.pop('env_fn')
+        setup_group_manager_cfg.shared_memory = shared_memory
+        env_manager = GroupSubprocessEnvManager(env_fn, setup_group_manager_cfg)
+        # 5 envs are hosted by 3 workers
+        assert env_manager._worker_num == 3
+        assert env_manager._worker_env_ids == [[0, 1], [2, 3], [4]]
+
+        env_manager.seed([314 for _ in range(env_manager.env_num)])
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        assert all([s == 314 for s in env_manager._seed])
+        assert all([s == 'stat_test' for s in env_manager._stat])
+        name = env_manager.name
+        assert name == ['name{}'.format(i) for i in range(env_manager.env_num)]
+        with pytest.raises(AttributeError):
+            env_manager.xxx
+        with pytest.raises(RuntimeError):
+            env_manager.user_defined()
+
+        env_count = [0 for _ in range(env_manager.env_num)]
+        data_count = 0
+        while not env_manager.done:
+            obs = env_manager.ready_obs
+            assert all([isinstance(o, np.ndarray) and o.shape == (3, ) for o in obs.values()])
+            action = {env_id: np.array([env_id]) for env_id in obs}
+            timestep = env_manager.step(action)
+            assert set(timestep.keys()) == set(obs.keys())
+            data_count += len(timestep)
+            for env_id, t in timestep.items():
+                assert t.info['name'] == 'name{}'.format(env_id)
+                assert isinstance(t.obs, np.ndarray) and t.obs.shape == (3, )
+                assert isinstance(t.reward, np.ndarray) and t.reward.shape == (1, )
+                if t.done:
+                    env_count[env_id] += 1
+        assert all([c == setup_group_manager_cfg.episode_num for c in env_count])
+        assert data_count == sum(env_manager._data_count)
+        assert all([s == EnvState.DONE for s in env_manager._env_states.values()])
+        env_manager.close()
+        assert all([s == EnvState.VOID for s in env_manager._env_states.values()])
+
+    def test_error(self, setup_group_manager_cfg):
+        env_fn = setup_group_manager_cfg.pop('env_fn')
+        env_manager = GroupSubprocessEnvManager(env_fn, setup_group_manager_cfg)
+        # Reset error exceeds max retry
+        with pytest.raises(RuntimeError):
+            env_manager.launch(reset_param={i: {'stat': 'error'} for i in range(env_manager.env_num)})
+        assert env_manager._closed
+        # Step error is raised to caller
+        env_manager = GroupSubprocessEnvManager(env_fn, setup_group_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        action = {i: np.array([0]) for i in range(env_manager.env_num)}
+        action[3] = 'error'
+        with pytest.raises(RuntimeError):
+            env_manager.step(action)
+        assert env_manager._closed
+
+    def test_shm_timestep(self):
+        buffer = ShmGroupTimestepContainer(2, np.dtype(np.float32), (3, ), np.dtype(np.float32), (1, ))
+        obs, reward = np.random.randn(3).astype(np.float32), np.array([1.], dtype=np.float32)
+        # Everything is in shared memory
+        assert buffer.fill(1, BaseEnvTimestep(obs, reward, True, {})) is None
+        timestep = buffer.get(1, None)
+        assert (timestep.obs == obs).all() and timestep.reward == reward and timestep.done and timestep.info == {}
+        # Info and reward with other dtype are sent through pipe
+        reward = np.array([2.])
+        rest = buffer.fill(0, BaseEnvTimestep(obs * 2, reward, False, {'name': 'env0'}))
+        assert rest.obs is None and rest.done is None and rest.reward is reward and rest.info == {'name': 'env0'}
+        timestep = buffer.get(0, rest)
+        assert (timestep.obs == obs * 2).all() and timestep.reward is reward and not timestep.done
+        assert timestep.info == {'name': 'env0'}
+        # Rows of other envs are not changed
+        assert buffer.get(1, None).done
+        buffer.fill_obs(1, obs * 3)
+        assert (buffer.get_obs(1) == obs * 3).all() and (buffer.get_obs(0) == obs * 2).all()
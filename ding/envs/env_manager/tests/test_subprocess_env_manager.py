@@ -5,7 +5,8 @@ import torch
 import numpy as np
 
 from ..base_env_manager import EnvState
-from ..subprocess_env_manager import AsyncSubprocessEnvManager, SyncSubprocessEnvManager
+from ..subprocess_env_manager import AsyncSubprocessEnvManager, SyncSubprocessEnvManager, ShmTimestepContainer
+from ding.envs.env.base_env import BaseEnvTimestep
 
 
 class TestSubprocessEnvManager:
@@ -212,3 +213,116 @@ class TestSubprocessEnvManager:
             if env_manager.done:
                 break
         assert all(env_manager._env_episode_count[i] == 1 for i in range(env_manager.env_num))
+
+    @pytest.mark.unittest
+    def test_shm_timestep(self, setup_shm_manager_cfg):
+        buffer = ShmTimestepContainer(np.dtype(np.float32), (3, ), np.dtype(np.float32), (1, ), ['cur', 'tgt'])
+        obs, reward = np.random.randn(3).astype(np.float32), np.array([1.], dtype=np.float32)
+        rest = buffer.fill(BaseEnvTimestep(obs, reward, False, {'cur': 2, 'tgt': 3.5}))
+        # Everything is in shared memory
+        assert rest is None
+        timestep = buffer.get(rest, copy=False)
+        assert (timestep.obs == obs).all() and timestep.reward == reward and not timestep.done
+        assert timestep.info == {'cur': 2., 'tgt': 3.5}
+        # Non-scalar info, missing key and reward with other dtype are sent through pipe
+        reward = np.array([2.])
+        rest = buffer.fill(BaseEnvTimestep(obs * 2, reward, True, {'cur': 3, 'name': 'env0'}))
+        assert rest.obs is None and rest.reward is reward and rest.info == {'name': 'env0'}
+        new_timestep = buffer.get(rest, copy=False)
+        assert new_timestep.done and new_timestep.info == {'cur': 3., 'name': 'env0'}
+        # The view is changed by the next fill, while obs of done timestep is copied
+        assert (timestep.obs == obs * 2).all()
+        buffer.fill_obs(obs)
+        assert (new_timestep.obs == obs * 2).all()
+
+        env_fn = setup_shm_manager_cfg.pop('env_fn')
+        env_manager = SyncSubprocessEnvManager(env_fn, setup_shm_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        # Float32 action is sent by shared memory, and other actions are sent through pipe
+        actions = {0: np.random.randn(4).astype(np.float32), 1: np.random.randn(4), 2: 'act'}
+        env_manager.step(actions)
+        last_action = env_manager._last_action
+        assert env_manager._shm_buffers[0].action.shape == (4, )
+        # Reward dtype isn't declared by env info, which is float64 by default
+        assert env_manager._shm_buffers[0].reward.dtype == np.float64
+        assert last_action[0].dtype == np.float32 and (last_action[0] == actions[0]).all()
+        assert last_action[1].dtype == np.float64 and (last_action[1] == actions[1]).all()
+        assert last_action[2] == 'act'
+        while not env_manager.done:
+            obs = env_manager.ready_obs
+            timestep = env_manager.step({i: np.random.randn(4).astype(np.float32) for i in obs})
+            for env_id, t in timestep.items():
+                assert t.obs.shape == (3, ) and t.reward.shape == (1, )
+                assert t.info['name'] == 'name{}'.format(env_id)
+                assert t.info['cur'] <= t.info['tgt']
+        assert all([c == setup_shm_manager_cfg.episode_num for c in env_manager._env_episode_count.values()])
+        env_manager.close()
+
+    @pytest.mark.unittest
+    def test_reset_in_subprocess(self, setup_shm_manager_cfg):
+        env_fn = setup_shm_manager_cfg.pop('env_fn')
+        setup_shm_manager_cfg['wait_num'] = 3
+        env_manager = AsyncSubprocessEnvManager(env_fn, setup_shm_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        first_episode_done = set()
+        while len(first_episode_done) < env_manager.env_num:
+            obs = env_manager.ready_obs
+            timestep = env_manager.step({i: np.random.randn(4).astype(np.float32) for i in obs})
+            for env_id, t in timestep.items():
+                if t.done and env_id not in first_episode_done:
+                    first_episode_done.add(env_id)
+                    # The env is reset in subprocess with the terminal step, so it is ready without waiting
+                    assert env_manager._env_states[env_id] == EnvState.RUN
+                    assert env_id in env_manager.ready_obs
+        assert len(env_manager._next_obs) == 0
+        assert env_manager._stat == ['stat_test' for _ in range(env_manager.env_num)]
+        while not env_manager.done:
+            obs = env_manager.ready_obs
+            env_manager.step({i: np.random.randn(4).astype(np.float32) for i in obs})
+        assert all([c == setup_shm_manager_cfg.episode_num for c in env_manager._env_episode_count.values()])
+        env_manager.close()
+
+    @pytest.mark.unittest
+    def test_adaptive_wait(self, setup_straggler_manager_cfg):
+        env_fn = setup_straggler_manager_cfg.pop('env_fn')
+        env_manager = AsyncSubprocessEnvManager(env_fn, setup_straggler_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        step_count = {i: 0 for i in range(env_manager.env_num)}
+        for _ in range(100):
+            obs = env_manager.ready_obs
+            timestep = env_manager.step({i: np.random.randn(4).astype(np.float32) for i in obs})
+            for env_id in timestep:
+                step_count[env_id] += 1
+        # The straggler doesn't block the other envs
+        assert step_count[0] * 4 < min([step_count[i] for i in range(1, env_manager.env_num)])
+        stats = env_manager.latency_stats
+        assert stats['wait_num'] == 3
+        assert 0 < stats['step_wait_timeout'] < 0.05
+        assert stats['straggler_ratio'] > 5
+        assert stats['step_latency_p50'] <= stats['step_latency_p99']
+        assert 0 < stats['fill_rate'] <= 1
+        env_manager.close()
+
+    @pytest.mark.unittest
+    def test_hang(self, setup_sync_manager_cfg):
+        env_fn = setup_sync_manager_cfg.pop('env_fn')
+        setup_sync_manager_cfg['step_timeout'] = 2
+        setup_sync_manager_cfg['step_hang_grace'] = 0.5
+        env_manager = SyncSubprocessEnvManager(env_fn, setup_sync_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        old_process = env_manager._subprocesses[0]
+        action = {i: np.random.randn(4) for i in range(env_manager.env_num)}
+        action[0] = 'hang'
+        # The hung env ignores the watchdog signal, so its subprocess is killed and restarted by manager
+        start_time = time.time()
+        timestep = env_manager.step(action)
+        assert time.time() - start_time < 5
+        assert timestep[0].info['abnormal']
+        assert all([not t.info.get('abnormal', False) for i, t in timestep.items() if i != 0])
+        assert env_manager._subprocesses[0] is not old_process
+        assert env_manager._env_states[0] == EnvState.ERROR
+        env_manager.reset({0: {'stat': 'stat_test'}})
+        assert env_manager._env_states[0] == EnvState.RUN
+        timestep = env_manager.step({0: np.random.randn(4)})
+        assert not timestep[0].info.get('abnormal', False)
+        env_manager.close()
@@ -0,0 +1,65 @@
+import time
+import pytest
+import numpy as np
+from functools import partial
+
+from ..base_env_manager import EnvState
+from ..thread_pool_env_manager import ThreadPoolEnvManager
+from .conftest import FakeCheapEnv
+
+
+@pytest.mark.unittest
+class TestThreadPoolEnvManager:
+
+    def test_naive(self, setup_thread_pool_manager_cfg):
+        env_fn = setup_thread_pool_manager_cfg.pop('env_fn')
+        env_manager = ThreadPoolEnvManager(env_fn, setup_thread_pool_manager_cfg)
+        env_manager.seed([314 for _ in range(env_manager.env_num)])
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        assert all([env_manager._env_states[env_id] == EnvState.RUN for env_id in range(env_manager.env_num)])
+        assert all([s == 314 for s in env_manager._seed])
+        assert all([s == 'stat_test' for s in env_manager._stat])
+        # Fake env sleeps 0.5~1s in each step, envs are stepped in parallel
+        start_time = time.time()
+        timestep = env_manager.step({i: np.random.randn(4) for i in env_manager.ready_obs})
+        assert len(timestep) == env_manager.env_num
+        assert time.time() - start_time < 2
+        while not env_manager.done:
+            env_id = env_manager.ready_obs.keys()
+            timestep = env_manager.step({i: np.random.randn(4) for i in env_id})
+            assert len(timestep) == len(env_id)
+        assert all([c == setup_thread_pool_manager_cfg.episode_num for c in env_manager._env_episode_count.values()])
+        assert 0.4 < env_manager.latency_stats['step_latency_p50'] < 1.2
+        env_manager.close()
+        assert env_manager._closed
+        assert all([env_manager._env_states[env_id] == EnvState.VOID for env_id in range(env_manager.env_num)])
+
+    def test_ready_obs_batch(self, setup_thread_pool_manager_cfg):
+        setup_thread_pool_manager_cfg.pop('env_fn')
+        env_fn = [partial(FakeCheapEnv, cfg={'name': 'name{}'.format(i)}) for i in range(4)]
+        env_manager = ThreadPoolEnvManager(env_fn, setup_thread_pool_manager_cfg)
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        assert env_manager._obs_buffer.shape == (4, 3)
+        while not env_manager.done:
+            env_id, obs = env_manager.ready_obs_batch()
+            ready_obs = env_manager.ready_obs
+            assert env_id.tolist() == list(ready_obs.keys())
+            assert (obs == np.stack(list(ready_obs.values()))).all()
+            env_manager.step({i: np.random.randn(4).astype(np.float32) for i in env_id.tolist()})
+        env_manager.close()
+
+    def test_error(self, setup_thread_pool_manager_cfg):
+        env_fn = setup_thread_pool_manager_cfg.pop('env_fn')
+        env_manager = ThreadPoolEnvManager(env_fn, setup_thread_pool_manager_cfg)
+        # Test reset error
+        with pytest.raises(RuntimeError):
+            env_manager.launch(reset_param={i: {'stat': 'error'} for i in range(env_manager.env_num)})
+        assert env_manager._closed
+        env_manager.launch(reset_param={i: {'stat': 'stat_test'} for i in range(env_manager.env_num)})
+        # Test step error
+        action = {i: np.random.randn(4) for i in range(env_manager.env_num)}
+        action[0] = 'error'
+        with pytest.raises(RuntimeError):
+            env_manager.step(action)
+        assert env_manager._env_states[0] == EnvState.ERROR
+        env_manager.close()
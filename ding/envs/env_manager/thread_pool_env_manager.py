@@ -0,0 +1,186 @@
+from typing import Any, List, Dict, Callable, Optional, Tuple
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+import numpy as np
+from easydict import EasyDict
+
+from ding.utils import ENV_MANAGER_REGISTRY, one_time_warning
+from .base_env_manager import BaseEnvManager, EnvState
+
+
+@ENV_MANAGER_REGISTRY.register('thread_pool')
+class ThreadPoolEnvManager(BaseEnvManager):
+    """
+    Overview:
+        Create a ThreadPoolEnvManager to manage multiple environments in the main process, whose step and reset \
+        are run by a thread pool. It launches much faster than subprocess env managers and has no IPC cost, and \
+        envs are stepped in parallel if they release the GIL in step(e.g. MuJoCo, pybullet and ALE).
+        The next obs of envs are written into a preallocated array, so ``ready_obs_batch`` doesn't stack obs.
+    Interfaces:
+        reset, step, seed, close, enable_save_replay, launch, env_info, default_config, ready_obs_batch
+    Properties:
+        env_num, ready_obs, done, method_name_list, active_env, latency_stats
+
+    .. note::
+        ``step_timeout`` and ``reset_timeout`` don't work because threads can't be interrupted.
+    """
+
+    config = dict(
+        episode_num=float("inf"),
+        max_retry=1,
+        retry_type='reset',
+        auto_reset=True,
+        step_timeout=None,
+        reset_timeout=None,
+        retry_waiting_time=0.1,
+        # The number of threads, None means one thread for each env.
+        thread_num=None,
+    )
+
+    def __init__(
+            self,
+            env_fn: List[Callable],
+            cfg: EasyDict = EasyDict({}),
+    ) -> None:
+        """
+        Overview:
+            Initialize the ThreadPoolEnvManager.
+        Arguments:
+            - env_fn (:obj:`List[Callable]`): The function to create environment
+            - cfg (:obj:`EasyDict`): Config
+        """
+        super().__init__(env_fn, cfg)
+        self._thread_num = self._cfg.thread_num if self._cfg.thread_num is not None else self._env_num
+        if self._step_timeout is not None or self._reset_timeout is not None:
+            one_time_warning("ThreadPoolEnvManager doesn't support step_timeout and reset_timeout, ignore them")
+            self._step_timeout, self._reset_timeout = None, None
+        self._pool = None
+        self._obs_buffer = None
+
+    def _create_state(self) -> None:
+        super()._create_state()
+        self._pool = ThreadPoolExecutor(max_workers=self._thread_num, thread_name_prefix='env_manager')
+        self._obs_buffer = self._create_obs_buffer()
+
+    def _create_obs_buffer(self) -> Optional[np.ndarray]:
+        # Only obs whose shape is declared in obs_space are put into the preallocated array.
+        obs_space = self._env_ref.info().obs_space
+        if obs_space is None or not isinstance(obs_space.shape, (tuple, list)):
+            return None
+        dtype = np.float32
+        if isinstance(obs_space.value, dict) and 'dtype' in obs_space.value:
+            dtype = obs_space.value['dtype']
+        return np.zeros((self._env_num, *obs_space.shape), dtype=dtype)
+
+    def _update_obs_buffer(self, env_id: int) -> None:
+        buffer = self._obs_buffer
+        if buffer is None:
+            return
+        obs = self._ready_obs[env_id]
+        if isinstance(obs, np.ndarray) and obs.shape == buffer.shape[1:]:
+            buffer[env_id] = obs
+        else:
+            # obs doesn't match the declared space, fall back to stacking ``ready_obs``
+            self._obs_buffer = None
+
+    def ready_obs_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Overview:
+            Get the next observations stacked in one array, which is gathered from the preallocated array.
+        Return:
+            - env_id (:obj:`np.ndarray`): Env ids of the ready envs, whose shape is (B, ).
+            - obs (:obj:`np.ndarray`): Stacked ``np.ndarray`` obs, the i-th row is the obs of ``env_id[i]``.
+        """
+        if self._obs_buffer is None:
+            return super().ready_obs_batch()
+        env_id = np.array(
+            [i for i in range(self.env_num) if self._env_episode_count[i] < self._episode_num], dtype=np.int64
+        )
+        return env_id, self._obs_buffer[env_id]
+
+    def reset(self, reset_param: Optional[Dict] = None) -> None:
+        """
+        Overview:
+            Reset the environments their parameters, envs are reset in parallel by the thread pool.
+        Arguments:
+            - reset_param (:obj:`List`): Dict of reset parameters for each environment, key is the env_id, \
+                value is the cooresponding reset parameters.
+        """
+        self._check_closed()
+        # set seed if necessary
+        env_ids = list(range(self._env_num)) if reset_param is None else list(reset_param.keys())
+        for i, env_id in enumerate(env_ids):  # loop-type is necessary
+            if self._env_seed[env_id] is not None:
+                if self._env_dynamic_seed is not None:
+                    self._envs[env_id].seed(self._env_seed[env_id], self._env_dynamic_seed)
+                else:
+                    self._envs[env_id].seed(self._env_seed[env_id])
+                self._env_seed[env_id] = None  # seed only use once
+        # reset env
+        if reset_param is None:
+            env_range = range(self.env_num)
+        else:
+            for env_id in reset_param:
+                self._reset_param[env_id] = reset_param[env_id]
+            env_range = reset_param.keys()
+        futures = []
+        for env_id in env_range:
+            if self._env_replay_path is not None and self._env_states[env_id] == EnvState.RUN:
+                logging.warning("please don't reset a unfinished env when you enable save replay, we just skip it")
+                continue
+            self._env_states[env_id] = EnvState.RESET
+            futures.append(self._pool.submit(self._reset, env_id))
+        for f in futures:
+            f.result()
+
+    def _reset(self, env_id: int) -> None:
+        super()._reset(env_id)
+        self._update_obs_buffer(env_id)
+
+    def step(self, actions: Dict[int, Any]) -> Dict[int, namedtuple]:
+        """
+        Overview:
+            Step all environments in parallel by the thread pool. Reset an env if done.
+        Arguments:
+            - actions (:obj:`Dict[int, Any]`): {env_id: action}
+        Returns:
+            - timesteps (:obj:`Dict[int, namedtuple]`): {env_id: timestep}. Timestep is a \
+                ``BaseEnvTimestep`` tuple with observation, reward, done, env_info.
+
+        .. note:
+
+            - The env_id that appears in ``actions`` will also be returned in ``timesteps``.
+            - Once an environment is done, it is reset immediately in the same thread.
+        """
+        self._check_closed()
+        futures = {env_id: self._pool.submit(self._step_and_reset, env_id, act) for env_id, act in actions.items()}
+        return {env_id: f.result() for env_id, f in futures.items()}
+
+    def _step_and_reset(self, env_id: int, act: Any) -> namedtuple:
+        start = time.time()
+        timestep = self._step(env_id, act)
+        self._latency_tracker.record(env_id, time.time() - start)
+        if timestep.done:
+            self._env_episode_count[env_id] += 1
+            if self._env_episode_count[env_id] < self._episode_num and self._auto_reset:
+                self._env_states[env_id] = EnvState.RESET
+                self._reset(env_id)
+            else:
+                self._env_states[env_id] = EnvState.DONE
+        else:
+            self._ready_obs[env_id] = timestep.obs
+            self._update_obs_buffer(env_id)
+        return timestep
+
+    def close(self) -> None:
+        """
+        Overview:
+            Release the environment resources and shutdown the thread pool.
+        """
+        if self._closed:
+            return
+        super().close()
+        # Don't wait, ``close`` may be called by a thread of the pool when env reset fails.
+        self._pool.shutdown(wait=False)
@@ -289,6 +289,42 @@ class ClipRewardEnv(gym.RewardWrapper):
         return obs_shape, act_shape, rew_shape
 
 
+class LazyFrames(object):
+    """
+    Overview:
+       Keep references of the stacked frames, the frames are only stacked into one array when it is needed, \
+       so that the frames shared by consecutive observations are not copied.
+    Interface:
+        ``__init__``, ``__array__``, ``__len__``, ``__getitem__``
+    Properties:
+        - frames (:obj:`List[np.ndarray]`): the frames, ordered from old to new.
+        - ``shape``, ``dtype``
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def __array__(self, dtype=None):
+        out = np.stack(self.frames, axis=0)
+        if dtype is not None:
+            out = out.astype(dtype)
+        return out
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, i):
+        return self.frames[i]
+
+    @property
+    def shape(self):
+        return (len(self.frames), ) + self.frames[0].shape
+
+    @property
+    def dtype(self):
+        return self.frames[0].dtype
+
+
 class FrameStack(gym.Wrapper):
     """
     Overview:
@@ -298,19 +334,22 @@ class FrameStack(gym.Wrapper):
     Properties:
         - env (:obj:`gym.Env`): the environment to wrap.
         - n_frame (:obj:`int`): the number of frames to stack.
+        - lazy (:obj:`bool`): whether to return ``LazyFrames`` instead of the stacked array.
         - ``observation_space``, ``frames``
     """
 
-    def __init__(self, env, n_frames):
+    def __init__(self, env, n_frames, lazy=False):
         """
         Overview:
             Initialize ``self.`` See ``help(type(self))`` for accurate signature; setup the properties.
         Arguments:
             - env (:obj:`gym.Env`): the environment to wrap.
             - n_frame (:obj:`int`): the number of frames to stack.
+            - lazy (:obj:`bool`): whether to defer stacking by returning ``LazyFrames``.
         """
         super().__init__(env)
         self.n_frames = n_frames
+        self.lazy = lazy
         self.frames = deque([], maxlen=n_frames)
         obs_space = env.observation_space
         if not isinstance(obs_space, gym.spaces.tuple.Tuple):
@@ -361,8 +400,11 @@ class FrameStack(gym.Wrapper):
     def _get_ob(self):
         """
         Overview:
-            The original wrapper use `LazyFrames` but since we use np buffer, it has no effect
+            Stack the frames. If ``lazy`` is True, return ``LazyFrames`` which keeps references of the frames, \
+            it can be stacked by ``np.asarray`` later or be stored by frame-dedup replay buffer directly.
         """
+        if self.lazy:
+            return LazyFrames(list(self.frames))
         return np.stack(self.frames, axis=0)
 
     @staticmethod
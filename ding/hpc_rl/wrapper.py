@@ -34,6 +34,10 @@ Parameters:
     - is_cls_method (:obj:`bool`): If True, it means the function we wrap is a method of a class. `self` will be put
         into args. We will get rid of `self` in args. Besides, we will use its classname as its fn_name.
         If False, it means the function is a simple method.
+    - backend_fns (:obj:`dict`): a dict of alternative implementations of the function, whose key is the backend name.
+        If `ding.hpc_rl_backend` is one of the keys, the corresponding implementation is called with the same args
+        and kwargs instead of the function itself. It is checked before hpc function, and it is used for functions
+        which can be accelerated without hpc kernels, e.g. `reverse_linear_scan` in `ding.rl_utils.scan`.
 Q&A:
     - Q: Is `include_args` and `include_kwargs` need to be set at the same time?
     - A: Yes. `include_args` and `include_kwargs` can deal with all type of input, such as (data, gamma, v_min=v_min,
@@ -83,13 +87,17 @@ def register_runtime_fn(fn_name, runtime_name, shape):
     return hpc_fn
 
 
-def hpc_wrapper(shape_fn=None, namedtuple_data=False, include_args=[], include_kwargs=[], is_cls_method=False):
+def hpc_wrapper(
+    shape_fn=None, namedtuple_data=False, include_args=[], include_kwargs=[], is_cls_method=False, backend_fns=None
+):
 
     def decorate(fn):
 
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            if ding.enable_hpc_rl:
+            if backend_fns is not None and ding.hpc_rl_backend in backend_fns:
+                return backend_fns[ding.hpc_rl_backend](*args, **kwargs)
+            if ding.enable_hpc_rl and shape_fn is not None:
                 shape = shape_fn(args, kwargs)
                 if is_cls_method:
                     fn_name = args[0].__class__.__name__
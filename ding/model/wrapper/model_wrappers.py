@@ -1,4 +1,4 @@
-from typing import Any, Tuple, Callable, Optional, List
+from typing import Any, Tuple, Callable, Optional, List, Union
 from abc import ABC
 
 import numpy as np
@@ -614,6 +614,9 @@ class TargetNetworkWrapper(IModelWrapper):
         self._update_type = update_type
         self._update_kwargs = update_kwargs
         self._update_count = 0
+        # Target and source parameter lists of momentum update, which are cached for the same source model
+        self._momentum_source = None
+        self._momentum_params = None
 
     def reset(self, *args, **kwargs):
         target_update_count = kwargs.pop('target_update_count', None)
@@ -621,29 +624,70 @@ class TargetNetworkWrapper(IModelWrapper):
         if hasattr(self._model, 'reset'):
             return self._model.reset(*args, **kwargs)
 
-    def update(self, state_dict: dict, direct: bool = False) -> None:
+    def update(self, state_dict: Union[dict, Any], direct: bool = False) -> None:
         r"""
         Overview:
             Update the target network state dict
-
         Arguments:
-            - state_dict (:obj:`dict`): the state_dict from learner model
+            - state_dict (:obj:`Union[dict, Any]`): the state_dict from learner model, or the learner model itself \
+                (``nn.Module`` or model wrapper), whose state is only read when an update is due
             - direct (:obj:`bool`): whether to update the target network directly, \
                 if true then will simply call the load_state_dict method of the model
+
+        .. note::
+            Momentum update runs in place over all the parameters and buffers by multi-tensor ops, floating \
+            buffers(e.g. BatchNorm running stats) are updated with momentum too, and the others are copied.
         """
         if direct:
-            self._model.load_state_dict(state_dict, strict=True)
+            self._model.load_state_dict(self._materialize(state_dict), strict=True)
             self._update_count = 0
         else:
             if self._update_type == 'assign':
                 if (self._update_count + 1) % self._update_kwargs['freq'] == 0:
-                    self._model.load_state_dict(state_dict, strict=True)
+                    self._model.load_state_dict(self._materialize(state_dict), strict=True)
                 self._update_count += 1
             elif self._update_type == 'momentum':
-                theta = self._update_kwargs['theta']
-                for name, p in self._model.named_parameters():
-                    # default theta = 0.001
-                    p.data = (1 - theta) * p.data + theta * state_dict[name]
+                self._momentum_update(state_dict, self._update_kwargs['theta'])
+
+    @staticmethod
+    def _materialize(source: Union[dict, Any]) -> dict:
+        return source if isinstance(source, dict) else source.state_dict()
+
+    def _momentum_update(self, source: Union[dict, Any], theta: float) -> None:
+        if isinstance(source, dict):
+            target_params, source_params = [], []
+            for name, p in self._model.named_parameters():
+                target_params.append(p)
+                source_params.append(source[name])
+            target_buffers = list(self._model.named_buffers())
+            source_buffers = [source[name] for name, _ in target_buffers]
+        else:
+            # Parameters are not replaced during training, so they are only collected once.
+            if self._momentum_source is not source:
+                target_named = dict(self._model.named_parameters())
+                source_named = dict(source.named_parameters())
+                assert target_named.keys() == source_named.keys(), 'target and source model mismatch'
+                self._momentum_params = (list(target_named.values()), [source_named[k] for k in target_named])
+                self._momentum_source = source
+            target_params, source_params = self._momentum_params
+            target_buffers = list(self._model.named_buffers())
+            source_named = dict(source.named_buffers())
+            source_buffers = [source_named[name] for name, _ in target_buffers]
+
+        float_target, float_source = [], []
+        with torch.no_grad():
+            for (_, t), s in zip(target_buffers, source_buffers):
+                if t.is_floating_point():
+                    float_target.append(t)
+                    float_source.append(s)
+                else:
+                    t.copy_(s)
+            target = target_params + float_target
+            source = source_params + float_source
+            if len(target) > 0:
+                # default theta = 0.001, target = (1 - theta) * target + theta * source
+                torch._foreach_mul_(target, 1 - theta)
+                torch._foreach_add_(target, source, alpha=theta)
 
     def reset_state(self, target_update_count: int = None) -> None:
         r"""
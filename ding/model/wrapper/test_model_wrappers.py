@@ -146,11 +146,52 @@ class TestModelWrappers:
         target_model2.update(model.state_dict(), direct=True)
         assert model.fc1.weight.eq(target_model2.fc1.weight).sum() == 12
         model.fc1.weight.data = torch.randn_like(model.fc1.weight)
-        old_state_dict = target_model2.state_dict()
+        # momentum update is in place, so copy the old state
+        old_state_dict = deepcopy(target_model2.state_dict())
         target_model2.update(model.state_dict())
         assert target_model2.fc1.weight.data.eq(
             old_state_dict['fc1.weight'] * (1 - 0.01) + model.fc1.weight.data * 0.01
         ).all()
+        # the learner model can be passed directly, then its state is read lazily
+        old_state_dict = deepcopy(target_model2.state_dict())
+        target_model2.update(model)
+        assert torch.allclose(
+            target_model2.fc1.weight.data, old_state_dict['fc1.weight'] * (1 - 0.01) + model.fc1.weight.data * 0.01
+        )
+
+    def test_target_network_wrapper_lazy(self):
+        source_model = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        target_model = model_wrap(
+            deepcopy(source_model), wrapper_name='target', update_type='assign', update_kwargs={'freq': 3}
+        )
+        model = model_wrap(source_model, wrapper_name='base')
+        state_dict_count = [0]
+        origin_state_dict = model.state_dict
+
+        def state_dict():
+            state_dict_count[0] += 1
+            return origin_state_dict()
+
+        model.state_dict = state_dict
+        for _ in range(6):
+            target_model.update(model)
+        # the state of learner model is only read when the update is due
+        assert state_dict_count[0] == 2
+
+        target_model2 = model_wrap(
+            deepcopy(source_model), wrapper_name='target', update_type='momentum', update_kwargs={'theta': 0.1}
+        )
+        model.train()
+        model.forward(torch.randn(8, 3))
+        old_state_dict = deepcopy(target_model2.state_dict())
+        target_model2.update(model)
+        assert state_dict_count[0] == 2
+        new_state_dict = target_model2.state_dict()
+        source_state_dict = origin_state_dict()
+        # floating buffers are updated with momentum, and the others are copied
+        for k in ['0.weight', '1.running_mean', '1.running_var']:
+            assert torch.allclose(new_state_dict[k], old_state_dict[k] * 0.9 + source_state_dict[k] * 0.1)
+        assert new_state_dict['1.num_batches_tracked'] == source_state_dict['1.num_batches_tracked'] == 1
 
     def test_eps_greedy_wrapper(self):
         model = ActorMLP()
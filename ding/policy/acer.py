@@ -264,7 +264,7 @@ class ACERPolicy(Policy):
         self._optimizer_critic.zero_grad()
         critic_loss.backward()
         self._optimizer_critic.step()
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
 
         with torch.no_grad():
             kl_div = avg_pi * ((avg_pi + EPS).log() - (target_pi + EPS).log())
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from collections import namedtuple
-from typing import Optional, List, Dict, Any, Tuple, Union
+from typing import Optional, List, Dict, Any, Tuple, Union, Callable
 
 import torch
 import copy
@@ -40,6 +40,8 @@ class Policy(ABC):
             'set_attribute',
             'state_dict',
             'load_state_dict',
+            'forward_batch',
+            'get_train_sample_columnar',
         ]
     )
     eval_function = namedtuple(
@@ -171,6 +173,8 @@ class Policy(ABC):
             self._set_attribute,
             self._state_dict_collect,
             self._load_state_dict_collect,
+            self._get_overridden_method('_forward_collect_batch'),
+            self._get_overridden_method('_get_train_sample_columnar'),
         )
 
     @property
@@ -195,6 +199,12 @@ class Policy(ABC):
         else:
             raise NotImplementedError
 
+    def _get_overridden_method(self, name: str) -> Optional[Callable]:
+        # Optional methods, which are ``None`` in policy mode if the policy class doesn't override them
+        if getattr(type(self), name) is getattr(Policy, name):
+            return None
+        return getattr(self, name)
+
     def __repr__(self) -> str:
         return "DI-engine DRL Policy\n{}".format(repr(self._model))
 
@@ -238,6 +248,10 @@ class Policy(ABC):
     def _forward_collect(self, data: dict, **kwargs) -> dict:
         raise NotImplementedError
 
+    # don't need to implement _forward_collect_batch method by force
+    def _forward_collect_batch(self, data: torch.Tensor, **kwargs) -> Dict[str, torch.Tensor]:
+        raise NotImplementedError("{} doesn't support batch collect forward".format(type(self).__name__))
+
     @abstractmethod
     def _process_transition(self, obs: Any, model_output: dict, timestep: namedtuple) -> dict:
         raise NotImplementedError
@@ -246,6 +260,10 @@ class Policy(ABC):
     def _get_train_sample(self, data: list) -> Union[None, List[Any]]:
         raise NotImplementedError
 
+    # don't need to implement _get_train_sample_columnar method by force
+    def _get_train_sample_columnar(self, data: Dict[str, Any]) -> Union[None, List[Any]]:
+        raise NotImplementedError("{} doesn't support columnar traj".format(type(self).__name__))
+
     # don't need to implement _reset_collect method by force
     def _reset_collect(self, data_id: Optional[List[int]] = None) -> None:
         pass
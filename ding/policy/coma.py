@@ -207,7 +207,7 @@ class COMAPolicy(Policy):
         total_loss.backward()
         self._optimizer.step()
         # after update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': total_loss.item(),
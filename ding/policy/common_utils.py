@@ -1,5 +1,6 @@
-from typing import List, Any
+from typing import List, Any, Dict, Optional, Tuple
 import torch
+import torch.nn as nn
 from ding.utils.data import default_collate
 
 
@@ -31,3 +32,86 @@ def default_preprocess_learn(
         data['reward'] = reward.permute(1, 0).contiguous()
 
     return data
+
+
+_target_streams = {}
+
+
+def _has_train_batch_norm(model: Any) -> bool:
+    # model wrappers delegate ``modules`` to the wrapped model
+    return any([isinstance(m, nn.modules.batchnorm._BatchNorm) and m.training for m in model.modules()])
+
+
+def _split_output(output: Dict[str, Any], batch_size: int, split_dims: Dict[str, Optional[int]]) -> Tuple[dict, dict]:
+    first, second = {}, {}
+    for k, v in output.items():
+        dim = split_dims.get(k, 0)
+        if not isinstance(v, torch.Tensor) or dim is None:
+            first[k], second[k] = v, v
+        else:
+            first[k] = v.narrow(dim, 0, batch_size)
+            second[k] = v.narrow(dim, batch_size, v.shape[dim] - batch_size).detach()
+    return first, second
+
+
+def q_learning_forward(
+        learn_model: Any,
+        target_model: Any,
+        obs: torch.Tensor,
+        next_obs: torch.Tensor,
+        fused: bool = False,
+        split_dims: Optional[Dict[str, Optional[int]]] = None,
+) -> Tuple[dict, dict, dict]:
+    """
+    Overview:
+        Learn forward shared by double Q-learning policies, i.e. the online model on ``obs`` (with grad) and \
+        ``next_obs`` (for the target action), and the target model on ``next_obs``.
+        If ``fused``, ``obs`` and ``next_obs`` are concatenated into one online forward, which saves the launch \
+        overhead of small models on GPU, but the backward also runs on the ``next_obs`` half. It falls back to two \
+        forwards when the inputs are not tensors or the model has BatchNorm in training mode, whose statistics \
+        would be changed by ``next_obs``.
+        On GPU, the target model runs on a side CUDA stream to overlap with the online forward.
+    Arguments:
+        - learn_model (:obj:`Any`): The online model, e.g. ``self._learn_model``.
+        - target_model (:obj:`Any`): The target model, e.g. ``self._target_model``.
+        - obs (:obj:`torch.Tensor`): The current observation.
+        - next_obs (:obj:`torch.Tensor`): The next observation.
+        - fused (:obj:`bool`): Whether to fuse the two online forwards.
+        - split_dims (:obj:`Optional[Dict[str, Optional[int]]]`): The batch dim of each output key to split the \
+            fused output, default 0. None means the value is not split and returned in both outputs.
+    Returns:
+        - output (:obj:`dict`): The online output of ``obs``.
+        - next_output (:obj:`dict`): The online output of ``next_obs``, without grad.
+        - target_output (:obj:`dict`): The target output of ``next_obs``, without grad.
+    """
+    target_stream = None
+    if isinstance(next_obs, torch.Tensor) and next_obs.is_cuda:
+        device = next_obs.device
+        if device not in _target_streams:
+            _target_streams[device] = torch.cuda.Stream(device)
+        target_stream = _target_streams[device]
+        # the inputs are produced on the current stream
+        target_stream.wait_stream(torch.cuda.current_stream(device))
+        with torch.cuda.stream(target_stream), torch.no_grad():
+            target_output = target_model.forward(next_obs)
+    else:
+        with torch.no_grad():
+            target_output = target_model.forward(next_obs)
+
+    fused = fused and isinstance(obs, torch.Tensor) and isinstance(next_obs, torch.Tensor)
+    if fused and not _has_train_batch_norm(learn_model):
+        output = learn_model.forward(torch.cat([obs, next_obs]))
+        output, next_output = _split_output(output, obs.shape[0], split_dims or {})
+    else:
+        output = learn_model.forward(obs)
+        with torch.no_grad():
+            next_output = learn_model.forward(next_obs)
+
+    if target_stream is not None:
+        current_stream = torch.cuda.current_stream(next_obs.device)
+        current_stream.wait_stream(target_stream)
+        next_obs.record_stream(target_stream)
+        for v in target_output.values():
+            if isinstance(v, torch.Tensor):
+                v.record_stream(current_stream)
+    return output, next_output, target_output
@@ -496,11 +496,11 @@ class CQLPolicy(SACPolicy):
         # =============
         self._forward_learn_cnt += 1
         # target update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr_q': self._optimizer_q.defaults['lr'],
             'cur_lr_p': self._optimizer_policy.defaults['lr'],
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'td_error': td_error_per_sample.detach().mean().item(),
             'alpha': self._alpha.item(),
             'target_q_value': target_q_value.detach().mean().item(),
@@ -709,11 +709,11 @@ class CQLDiscretePolicy(DQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'q_target': target_q_value.mean().item(),
             'q_value': q_value.mean().item(),
             # Only discrete action satisfying len(data['action'])==1 can return this and draw histogram on tensorboard.
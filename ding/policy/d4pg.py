@@ -275,13 +275,13 @@ class D4PGPolicy(DDPGPolicy):
         # =============
         loss_dict['total_loss'] = sum(loss_dict.values())
         self._forward_learn_cnt += 1
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr_actor': self._optimizer_actor.defaults['lr'],
             'cur_lr_critic': self._optimizer_critic.defaults['lr'],
             'q_value': q_value['q_value'].mean().item(),
             'action': data['action'].mean().item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             **loss_dict,
             **q_value_dict,
         }
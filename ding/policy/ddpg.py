@@ -290,7 +290,7 @@ class DDPGPolicy(Policy):
         # =============
         loss_dict['total_loss'] = sum(loss_dict.values())
         self._forward_learn_cnt += 1
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         if self._cfg.action_space == 'hybrid':
             action_log_value = -1.  # TODO(nyz) better way to viz hybrid action
         else:
@@ -300,7 +300,7 @@ class DDPGPolicy(Policy):
             'cur_lr_critic': self._optimizer_critic.defaults['lr'],
             # 'q_value': np.array(q_value).mean(),
             'action': action_log_value,
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'td_error': td_error_per_sample.abs().mean(),
             **loss_dict,
             **q_value_dict,
@@ -5,9 +5,9 @@ import torch
 
 from ding.torch_utils import Adam, to_device
 from ding.rl_utils import q_nstep_td_data, q_nstep_td_error, get_nstep_return_data, get_train_sample, \
-    dqfd_nstep_td_error, dqfd_nstep_td_data
+    dqfd_nstep_td_error, dqfd_nstep_td_data, get_nstep_return_columns
 from ding.model import model_wrap
-from ding.utils import POLICY_REGISTRY
+from ding.utils import POLICY_REGISTRY, dicts_to_lists
 from ding.utils.data import default_collate, default_decollate
 from .dqn import DQNPolicy
 from .common_utils import default_preprocess_learn
@@ -231,11 +231,11 @@ class DQFDPolicy(DQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             # Only discrete action satisfying len(data['action'])==1 can return this and draw histogram on tensorboard.
             # '[histogram]action_distribution': data['action'],
         }
@@ -265,3 +265,9 @@ class DQFDPolicy(DQNPolicy):
             data[i]['next_obs_1'] = data_1[i]['next_obs']  # concat the one-step next observation
             data[i]['done_1'] = data_1[i]['done']
         return get_train_sample(data, self._unroll_len)
+
+    def _get_train_sample_columnar(self, data: Dict[str, torch.Tensor]) -> List[Dict[str, Any]]:
+        one_step_data = {'next_obs_1': data['next_obs'], 'done_1': data['done']}
+        data = get_nstep_return_columns(data, self._nstep, gamma=self._gamma)
+        data.update(one_step_data)
+        return get_train_sample(dicts_to_lists(data), self._unroll_len)
@@ -4,12 +4,13 @@ import copy
 import torch
 
 from ding.torch_utils import Adam, to_device
-from ding.rl_utils import q_nstep_td_data, q_nstep_td_error, get_nstep_return_data, get_train_sample
+from ding.rl_utils import q_nstep_td_data, q_nstep_td_error, get_nstep_return_data, get_nstep_return_columns, \
+    get_train_sample
 from ding.model import model_wrap
-from ding.utils import POLICY_REGISTRY
+from ding.utils import POLICY_REGISTRY, dicts_to_lists
 from ding.utils.data import default_collate, default_decollate
 from .base_policy import Policy
-from .common_utils import default_preprocess_learn
+from .common_utils import default_preprocess_learn, q_learning_forward
 
 
 @POLICY_REGISTRY.register('dqn')
@@ -101,6 +102,9 @@ class DQNPolicy(Policy):
             target_update_freq=100,
             # (bool) Whether ignore done(usually for max step termination env)
             ignore_done=False,
+            # (bool) Whether to forward obs and next_obs in one batch by the online model, which saves the launch
+            # overhead of small models on GPU but makes the backward run on the next_obs half too.
+            fused_forward=False,
         ),
         # collect_mode config
         collect=dict(
@@ -184,13 +188,12 @@ class DQNPolicy(Policy):
         # ====================
         self._learn_model.train()
         self._target_model.train()
-        # Current q value (main model)
-        q_value = self._learn_model.forward(data['obs'])['logit']
-        # Target q value
-        with torch.no_grad():
-            target_q_value = self._target_model.forward(data['next_obs'])['logit']
-            # Max q value action (main model)
-            target_q_action = self._learn_model.forward(data['next_obs'])['action']
+        # Current q value and max q value action of next obs (main model), target q value (target model)
+        output, next_output, target_output = q_learning_forward(
+            self._learn_model, self._target_model, data['obs'], data['next_obs'], fused=self._cfg.learn.fused_forward
+        )
+        q_value, target_q_action = output['logit'], next_output['action']
+        target_q_value = target_output['logit']
 
         data_n = q_nstep_td_data(
             q_value, target_q_value, data['action'], target_q_action, data['reward'], data['done'], data['weight']
@@ -210,12 +213,12 @@ class DQNPolicy(Policy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
-            'total_loss': loss.item(),
-            'q_value': q_value.mean().item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'total_loss': loss.detach(),
+            'q_value': q_value.mean().detach(),
+            'priority': td_error_per_sample.abs(),
             # Only discrete action satisfying len(data['action'])==1 can return this and draw histogram on tensorboard.
             # '[histogram]action_distribution': data['action'],
         }
@@ -292,6 +295,25 @@ class DQNPolicy(Policy):
         output = default_decollate(output)
         return {i: d for i, d in zip(data_id, output)}
 
+    def _forward_collect_batch(self, data: torch.Tensor, eps: float) -> Dict[str, torch.Tensor]:
+        """
+        Overview:
+            Batch version of ``_forward_collect``, whose input and output are not split by env id.
+        Arguments:
+            - data (:obj:`torch.Tensor`): Stacked obs of the ready envs, which can be a pinned tensor.
+            - eps (:obj:`float`): epsilon value for exploration, which is decayed by collected env step.
+        Returns:
+            - output (:obj:`Dict[str, torch.Tensor]`): The batch of ``logit`` and ``action``.
+        """
+        if self._cuda:
+            data = data.to(self._device, non_blocking=data.is_pinned())
+        self._collect_model.eval()
+        with torch.no_grad():
+            output = self._collect_model.forward(data, eps=eps)
+        if self._cuda:
+            output = to_device(output, 'cpu')
+        return output
+
     def _get_train_sample(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Overview:
@@ -312,6 +334,20 @@ class DQNPolicy(Policy):
         data = get_nstep_return_data(data, self._nstep, gamma=self._gamma)
         return get_train_sample(data, self._unroll_len)
 
+    def _get_train_sample_columnar(self, data: Dict[str, torch.Tensor]) -> List[Dict[str, Any]]:
+        """
+        Overview:
+            Columnar version of ``_get_train_sample``, whose input is a trajectory of stacked transitions. \
+            The nstep return is computed on the whole trajectory, and samples are split only at the end.
+        Arguments:
+            - data (:obj:`Dict[str, torch.Tensor]`): The trajectory data, each value is a tensor whose leading dim \
+                is the trajectory length, keys are the same as the return value of ``self._process_transition``.
+        Returns:
+            - samples (:obj:`dict`): The list of training samples.
+        """
+        data = get_nstep_return_columns(data, self._nstep, gamma=self._gamma)
+        return get_train_sample(dicts_to_lists(data), self._unroll_len)
+
     def _process_transition(self, obs: Any, policy_output: Dict[str, Any], timestep: namedtuple) -> Dict[str, Any]:
         """
         Overview:
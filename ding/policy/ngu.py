@@ -5,7 +5,7 @@ import copy
 
 from ding.torch_utils import Adam, to_device
 from ding.rl_utils import q_nstep_td_data, q_nstep_td_error, q_nstep_td_error_with_rescale, q_nstep_td_error_ngu, \
-    q_nstep_td_error_with_rescale_ngu, get_nstep_return_data, get_train_sample
+    q_nstep_td_error_with_rescale_ngu, get_nstep_return_data, get_train_sample, get_sequence_window
 from ding.model import model_wrap
 from ding.utils import POLICY_REGISTRY
 from ding.utils.data import timestep_collate, default_collate, default_decollate
@@ -356,7 +356,7 @@ class NGUPolicy(Policy):
         loss.backward()
         self._optimizer.step()
         # after update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
 
         # the information for debug
         batch_range = torch.arange(action[0].shape[0])
@@ -366,7 +366,7 @@ class NGUPolicy(Policy):
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             # the first timestep in the sequence, may not be the start of episode
             'q_s_taken-a_t0': q_s_a_t0.mean().item(),
             'target_q_s_max-a_t0': target_q_s_a_t0.mean().item(),
@@ -399,6 +399,13 @@ class NGUPolicy(Policy):
         self._gamma = self._cfg.discount_factor
         self._unroll_len_add_burnin_step = self._cfg.unroll_len + self._cfg.burnin_step
         self._unroll_len = self._unroll_len_add_burnin_step  # for compatibility
+        # ``SequenceReplayBuffer`` stores each traj once, so train samples are windows referring to the traj
+        replay_buffer_cfg = self._cfg.other.replay_buffer
+        self._sequence_window = replay_buffer_cfg.get('type', None) == 'sequence'
+        self._sequence_stride = replay_buffer_cfg.get('seq_stride', None)
+        if self._sequence_window and replay_buffer_cfg.get('segment_len', None) is not None:
+            # Collector cuts traj into segments of this length, each of which has several overlapping windows
+            self._unroll_len = max(replay_buffer_cfg.segment_len, self._unroll_len_add_burnin_step)
         self._collect_model = model_wrap(
             self._model, wrapper_name='hidden_state', state_num=self._cfg.collect.env_num, save_prev_state=True
         )
@@ -498,6 +505,8 @@ class NGUPolicy(Policy):
             - samples (:obj:`dict`): The training samples generated
         """
         data = get_nstep_return_data(data, self._nstep, gamma=self.index_to_gamma[int(data[0]['beta'])].item())
+        if self._sequence_window:
+            return get_sequence_window(data, self._unroll_len_add_burnin_step, self._sequence_stride)
         return get_train_sample(data, self._unroll_len_add_burnin_step)
 
     def _init_eval(self) -> None:
@@ -249,14 +249,14 @@ class PDQNPolicy(Policy):
             # =============
             # after update
             # =============
-            self._target_model.update(self._learn_model.state_dict())
+            self._target_model.update(self._learn_model)
 
         return {
             'cur_lr': self._dis_optimizer.defaults['lr'],
             'q_loss': dis_loss.item(),
             'continuous_loss': cont_loss.item(),
             'q_value': q_pi_action_value.mean().item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'reward': data['reward'].mean().item(),
             'target_q_value': target_q_value.mean().item(),
         }
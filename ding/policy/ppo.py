@@ -238,8 +238,8 @@ class PPOPolicy(Policy):
                         ppo_continuous_loss.entropy_loss + ppo_discrete_loss.entropy_loss
                     )
                     ppo_info = type(ppo_continuous_info)(
-                        max(ppo_continuous_info.approx_kl, ppo_discrete_info.approx_kl),
-                        max(ppo_continuous_info.clipfrac, ppo_discrete_info.clipfrac)
+                        torch.max(ppo_continuous_info.approx_kl, ppo_discrete_info.approx_kl),
+                        torch.max(ppo_continuous_info.clipfrac, ppo_discrete_info.clipfrac)
                     )
                 wv, we = self._value_weight, self._entropy_weight
                 total_loss = ppo_loss.policy_loss + wv * ppo_loss.value_loss - we * ppo_loss.entropy_loss
@@ -250,23 +250,23 @@ class PPOPolicy(Policy):
 
                 return_info = {
                     'cur_lr': self._optimizer.defaults['lr'],
-                    'total_loss': total_loss.item(),
-                    'policy_loss': ppo_loss.policy_loss.item(),
-                    'value_loss': ppo_loss.value_loss.item(),
-                    'entropy_loss': ppo_loss.entropy_loss.item(),
-                    'adv_max': adv.max().item(),
-                    'adv_mean': adv.mean().item(),
-                    'value_mean': output['value'].mean().item(),
-                    'value_max': output['value'].max().item(),
+                    'total_loss': total_loss.detach(),
+                    'policy_loss': ppo_loss.policy_loss.detach(),
+                    'value_loss': ppo_loss.value_loss.detach(),
+                    'entropy_loss': ppo_loss.entropy_loss.detach(),
+                    'adv_max': adv.max().detach(),
+                    'adv_mean': adv.mean().detach(),
+                    'value_mean': output['value'].mean().detach(),
+                    'value_max': output['value'].max().detach(),
                     'approx_kl': ppo_info.approx_kl,
                     'clipfrac': ppo_info.clipfrac,
                 }
                 if self._action_space == 'continuous':
                     return_info.update(
                         {
-                            'act': batch['action'].float().mean().item(),
-                            'mu_mean': output['logit']['mu'].mean().item(),
-                            'sigma_mean': output['logit']['sigma'].mean().item(),
+                            'act': batch['action'].float().mean().detach(),
+                            'mu_mean': output['logit']['mu'].mean().detach(),
+                            'sigma_mean': output['logit']['sigma'].mean().detach(),
                         }
                     )
                 return_infos.append(return_info)
@@ -630,11 +630,11 @@ class PPOOffPolicy(Policy):
         self._optimizer.step()
         return {
             'cur_lr': self._optimizer.defaults['lr'],
-            'total_loss': total_loss.item(),
-            'policy_loss': ppo_loss.policy_loss.item(),
-            'value_loss': ppo_loss.value_loss.item(),
-            'entropy_loss': ppo_loss.entropy_loss.item(),
-            'adv_abs_max': adv.abs().max().item(),
+            'total_loss': total_loss.detach(),
+            'policy_loss': ppo_loss.policy_loss.detach(),
+            'value_loss': ppo_loss.value_loss.detach(),
+            'entropy_loss': ppo_loss.entropy_loss.detach(),
+            'adv_abs_max': adv.abs().max().detach(),
             'approx_kl': ppo_info.approx_kl,
             'clipfrac': ppo_info.clipfrac,
         }
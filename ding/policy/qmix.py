@@ -227,7 +227,7 @@ class QMIXPolicy(Policy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
@@ -8,7 +8,7 @@ from ding.model import model_wrap
 from ding.utils import POLICY_REGISTRY
 from ding.utils.data import default_collate, default_decollate
 from .dqn import DQNPolicy
-from .common_utils import default_preprocess_learn
+from .common_utils import default_preprocess_learn, q_learning_forward
 
 
 @POLICY_REGISTRY.register('qrdqn')
@@ -73,6 +73,9 @@ class QRDQNPolicy(DQNPolicy):
             target_update_freq=100,
             # (bool) Whether ignore done(usually for max step termination env)
             ignore_done=False,
+            # (bool) Whether to forward obs and next_obs in one batch by the online model, which saves the launch
+            # overhead of small models on GPU but makes the backward run on the next_obs half too.
+            fused_forward=False,
         ),
         # collect_mode config
         collect=dict(
@@ -141,14 +144,12 @@ class QRDQNPolicy(DQNPolicy):
         # ====================
         self._learn_model.train()
         self._target_model.train()
-        # Current q value (main model)
-        ret = self._learn_model.forward(data['obs'])
-        q_value, tau = ret['q'], ret['tau']
-        # Target q value
-        with torch.no_grad():
-            target_q_value = self._target_model.forward(data['next_obs'])['q']
-            # Max q value action (main model)
-            target_q_action = self._learn_model.forward(data['next_obs'])['action']
+        # Current q value and max q value action of next obs (main model), target q value (target model)
+        ret, next_ret, target_ret = q_learning_forward(
+            self._learn_model, self._target_model, data['obs'], data['next_obs'], fused=self._cfg.learn.fused_forward
+        )
+        q_value, tau, target_q_action = ret['q'], ret['tau'], next_ret['action']
+        target_q_value = target_ret['q']
 
         data_n = qrdqn_nstep_td_data(
             q_value, target_q_value, data['action'], target_q_action, data['reward'], data['done'], tau, data['weight']
@@ -170,11 +171,11 @@ class QRDQNPolicy(DQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
-            'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'total_loss': loss.detach(),
+            'priority': td_error_per_sample.abs(),
             # Only discrete action satisfying len(data['action'])==1 can return this and draw histogram on tensorboard.
             # '[histogram]action_distribution': data['action'],
         }
@@ -319,7 +319,7 @@ class R2D2CollectTrajPolicy(Policy):
         loss.backward()
         self._optimizer.step()
         # after update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
 
         # the information for debug
         batch_range = torch.arange(action[0].shape[0])
@@ -329,7 +329,7 @@ class R2D2CollectTrajPolicy(Policy):
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             # the first timestep in the sequence, may not be the start of episode TODO(pu)
             'q_s_taken-a_t0': q_s_a_t0.mean().item(),
             'target_q_s_max-a_t0': target_q_s_a_t0.mean().item(),
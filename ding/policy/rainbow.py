@@ -223,11 +223,11 @@ class RainbowDQNPolicy(DQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
-            'total_loss': loss.item(),
-            'priority': td_error_per_sample.abs().tolist(),
+            'total_loss': loss.detach(),
+            'priority': td_error_per_sample.abs(),
         }
 
     def _init_collect(self) -> None:
@@ -273,6 +273,10 @@ class RainbowDQNPolicy(DQNPolicy):
         output = default_decollate(output)
         return {i: d for i, d in zip(data_id, output)}
 
+    def _forward_collect_batch(self, data: torch.Tensor, eps: float) -> Dict[str, torch.Tensor]:
+        self._reset_noise(self._collect_model)
+        return super()._forward_collect_batch(data, eps)
+
     def _get_train_sample(self, traj: list) -> Union[None, List[Any]]:
         r"""
         Overview:
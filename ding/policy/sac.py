@@ -364,11 +364,11 @@ class SACDiscretePolicy(Policy):
         # =============
         self._forward_learn_cnt += 1
         # target update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr_q': self._optimizer_q.defaults['lr'],
             'cur_lr_p': self._optimizer_policy.defaults['lr'],
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'td_error': td_error_per_sample.detach().mean().item(),
             'alpha': self._alpha.item(),
             'q_value_1': target_q_value[0].detach().mean().item(),
@@ -904,11 +904,11 @@ class SACPolicy(Policy):
         # =============
         self._forward_learn_cnt += 1
         # target update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr_q': self._optimizer_q.defaults['lr'],
             'cur_lr_p': self._optimizer_policy.defaults['lr'],
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
             'td_error': td_error_per_sample.detach().mean().item(),
             'alpha': self._alpha.item(),
             'target_q_value': target_q_value.detach().mean().item(),
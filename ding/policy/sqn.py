@@ -204,7 +204,7 @@ class SQNPolicy(Policy):
         self._optimizer_alpha.step()
 
         # target update
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         self._forward_learn_cnt += 1
         # some useful info
         return {
@@ -448,7 +448,7 @@ class TD3VAEPolicy(DDPGPolicy):
                 # =============
                 loss_dict['total_loss'] = sum(loss_dict.values())
                 # self._forward_learn_cnt += 1
-                self._target_model.update(self._learn_model.state_dict())
+                self._target_model.update(self._learn_model)
                 if self._cfg.action_space == 'hybrid':
                     action_log_value = -1.  # TODO(nyz) better way to viz hybrid action
                 else:
@@ -458,7 +458,7 @@ class TD3VAEPolicy(DDPGPolicy):
                     'cur_lr_actor': self._optimizer_actor.defaults['lr'],
                     'cur_lr_critic': self._optimizer_critic.defaults['lr'],
                     'action': action_log_value,
-                    'priority': td_error_per_sample.abs().tolist(),
+                    'priority': td_error_per_sample.abs(),
                     'td_error': td_error_per_sample.abs().mean(),
                     **loss_dict,
                     **q_value_dict,
@@ -0,0 +1,106 @@
+import time
+import copy
+import pytest
+import torch
+import torch.nn as nn
+from easydict import EasyDict
+
+from ding.model import DQN, QRDQN, IQN, C51DQN, model_wrap
+from ding.policy import DQNPolicy, C51Policy, QRDQNPolicy, IQNPolicy
+from ding.policy.common_utils import q_learning_forward
+from ding.utils import deep_merge_dicts
+
+B, obs_shape, action_shape = 8, 4, 3
+
+
+def wrap(model):
+    learn_model = model_wrap(model, wrapper_name='argmax_sample')
+    target_model = model_wrap(copy.deepcopy(model), wrapper_name='target', update_type='assign', update_kwargs={})
+    return learn_model, target_model
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('model_type', [DQN, C51DQN, QRDQN])
+def test_q_learning_forward(model_type):
+    torch.manual_seed(0)
+    learn_model, target_model = wrap(model_type(obs_shape, action_shape))
+    obs, next_obs = torch.randn(B, obs_shape), torch.randn(B, obs_shape)
+    expected = q_learning_forward(learn_model, target_model, obs, next_obs, fused=False)
+    outputs = q_learning_forward(learn_model, target_model, obs, next_obs, fused=True)
+    for e, o in zip(expected, outputs):
+        assert e.keys() == o.keys()
+        for k in e:
+            assert e[k].shape == o[k].shape
+            assert torch.allclose(e[k], o[k], atol=1e-6)
+    # only the output of obs requires grad
+    assert outputs[0]['logit'].requires_grad
+    assert not outputs[1]['logit'].requires_grad
+    assert not outputs[2]['logit'].requires_grad
+
+
+@pytest.mark.unittest
+def test_q_learning_forward_split_dims():
+    learn_model, target_model = wrap(IQN(obs_shape, action_shape))
+    obs, next_obs = torch.randn(B, obs_shape), torch.randn(B, obs_shape)
+    output, next_output, _ = q_learning_forward(
+        learn_model, target_model, obs, next_obs, fused=True, split_dims={
+            'q': 1,
+            'quantiles': None
+        }
+    )
+    assert output['q'].shape == next_output['q'].shape == (32, B, action_shape)
+    assert output['logit'].shape == next_output['action'].shape[:1] + (action_shape, )
+    assert output['quantiles'].shape == (32 * 2 * B, 1)
+
+
+@pytest.mark.unittest
+def test_q_learning_forward_batch_norm():
+    model = nn.Sequential(nn.Linear(obs_shape, 16), nn.BatchNorm1d(16), nn.Linear(16, action_shape))
+
+    class Model(nn.Module):
+
+        def __init__(self):
+            super().__init__()
+            self.main = model
+            self.call_count = 0
+
+        def forward(self, x):
+            self.call_count += 1
+            return {'logit': self.main(x)}
+
+    learn_model, target_model = wrap(Model())
+    obs, next_obs = torch.randn(B, obs_shape), torch.randn(B, obs_shape)
+    # BatchNorm statistics of obs can't be mixed with next_obs, so it isn't fused
+    q_learning_forward(learn_model, target_model, obs, next_obs, fused=True)
+    assert learn_model.call_count == 2
+    learn_model.eval()
+    q_learning_forward(learn_model, target_model, obs, next_obs, fused=True)
+    assert learn_model.call_count == 3
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    'policy_type, model_type', [(DQNPolicy, DQN), (C51Policy, C51DQN), (QRDQNPolicy, QRDQN), (IQNPolicy, IQN)]
+)
+def test_q_learning_forward_benchmark(policy_type, model_type):
+    repeat, batch_size, obs_dim = 50, 64, 64
+    data = [
+        {
+            'obs': torch.randn(obs_dim),
+            'next_obs': torch.randn(obs_dim),
+            'action': torch.randint(0, action_shape, (1, )).squeeze(0),
+            'reward': torch.randn(1),
+            'done': False,
+        } for _ in range(batch_size)
+    ]
+    latency = {}
+    for fused in [False, True]:
+        cfg = deep_merge_dicts(policy_type.default_config(), EasyDict(learn=dict(fused_forward=fused)))
+        policy = policy_type(cfg, model=model_type(obs_dim, action_shape), enable_field=['learn'])
+        policy._forward_learn(data)  # warm up
+        start = time.time()
+        for _ in range(repeat):
+            policy._forward_learn(data)
+        latency[fused] = (time.time() - start) / repeat
+    # fused forward only pays off when the small model is launch bound, e.g. on GPU
+    print('{}: separate {:.6f}s, fused {:.6f}s'.format(policy_type.__name__, latency[False], latency[True]))
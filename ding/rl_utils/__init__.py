@@ -2,6 +2,7 @@ from .exploration import get_epsilon_greedy_fn, create_noise_generator
 from .ppo import ppo_data, ppo_loss, ppo_info, ppo_policy_data, ppo_policy_error, ppo_value_data, ppo_value_error,\
     ppo_error, ppo_error_continuous
 from .ppg import ppg_data, ppg_joint_loss, ppg_joint_error
+from .scan import reverse_linear_scan, reverse_linear_scan_np
 from .gae import gae_data, gae
 from .a2c import a2c_data, a2c_error
 from .coma import coma_data, coma_error
@@ -13,7 +14,8 @@ from .td import q_nstep_td_data, q_nstep_td_error, q_1step_td_data, q_1step_td_e
     q_nstep_td_error_ngu, q_nstep_td_error_with_rescale_ngu, dqfd_nstep_td_error_with_rescale
 from .vtrace import vtrace_loss, compute_importance_weights
 from .upgo import upgo_loss
-from .adder import get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_train_sample
+from .adder import get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_train_sample, \
+    get_sequence_window, get_nstep_return_columns
 from .value_rescale import value_transform, value_inv_transform
 from .vtrace import vtrace_data, vtrace_error
 from .beta_function import beta_function_map
@@ -13,7 +13,8 @@ class Adder(object):
         Adder is a component that handles different transformations and calculations for transitions
         in Collector Module(data generation and processing), such as GAE, n-step return, transition sampling etc.
     Interface:
-        __init__, get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_train_sample
+        __init__, get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_nstep_return_columns, \
+        get_train_sample, get_sequence_window
     """
 
     @classmethod
@@ -130,6 +131,48 @@ class Adder(object):
                 data[i]['value_gamma'] = gamma ** (len(data) - i - 1)
         return data
 
+    @classmethod
+    def get_nstep_return_columns(
+            cls,
+            data: Dict[str, torch.Tensor],
+            nstep: int,
+            correct_terminate_gamma=True,
+            gamma=0.99,
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Overview:
+            Columnar version of ``get_nstep_return_data``, whose input is a traj of stacked transitions, i.e. each \
+            value has the leading dim T. Keys ['next_obs', 'reward', 'done'] are updated by tensor operations \
+            rather than a python loop over transitions.
+        Arguments:
+            - data (:obj:`Dict[str, torch.Tensor]`): Traj dict, each value is a tensor whose shape is (T, ...)
+            - nstep (:obj:`int`): Number of steps. If equals to 1, return ``data`` directly; \
+                Otherwise update with nstep value.
+        Returns:
+            - data (:obj:`Dict[str, torch.Tensor]`): Traj dict like input one, reward's shape is (T, nstep * R) \
+                where R is the size of reward in a step, which is the same as the output of ``get_nstep_return_data``.
+        """
+        if nstep == 1:
+            return data
+        T = data['done'].shape[0]
+        # transitions in [0, split) have complete n steps, the rest are aligned to the last transition
+        split = max(0, T - nstep)
+        data = dict(data)
+        if 'next_obs' in data:
+            next_obs = data['next_obs'].clone()
+            next_obs[:split] = data['obs'][nstep:]
+            next_obs[split:] = data['next_obs'][-1]
+            data['next_obs'] = next_obs
+        reward = data['reward']
+        padded_reward = torch.cat([reward, reward.new_zeros(nstep - 1, *reward.shape[1:])])
+        data['reward'] = torch.stack([padded_reward[j:j + T] for j in range(nstep)], dim=1).reshape(T, -1)
+        data['done'] = data['done'][torch.clamp(torch.arange(T) + nstep - 1, max=T - 1)]
+        if correct_terminate_gamma:
+            value_gamma = torch.pow(gamma, torch.arange(T - 1, -1, -1, dtype=torch.float32))
+            value_gamma[:split] = gamma ** nstep
+            data['value_gamma'] = value_gamma
+        return data
+
     @classmethod
     def get_train_sample(
             cls,
@@ -195,6 +238,37 @@ class Adder(object):
                 split_data = [lists_to_dicts(d, recursive=True) for d in split_data]
             return split_data
 
+    @classmethod
+    def get_sequence_window(cls,
+                            data: List[Dict[str, Any]],
+                            unroll_len: int,
+                            stride: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Overview:
+            Split raw traj data into sequence windows without copying any transition. Each window is a dict \
+            referring to the whole ``data`` list and its start position, so ``SequenceReplayBuffer`` stores the \
+            traj only once and slices (and pads) the windows at sample time.
+            Window starts are ``0, stride, 2 * stride, ...``, and the last window is aligned to the end of traj \
+            like the ``last`` type of ``get_train_sample``. A traj shorter than ``unroll_len`` has only one window.
+        Arguments:
+            - data (:obj:`List[Dict[str, Any]]`): Transitions list, each element is a transition dict
+            - unroll_len (:obj:`int`): Learn training unroll length, i.e. the length of each window
+            - stride (:obj:`Optional[int]`): Step between starts of two adjacent windows, windows overlap when it \
+                is less than ``unroll_len``, None means ``unroll_len``
+        Returns:
+            - window (:obj:`List[Dict[str, Any]]`): Window list, each element contains keys \
+                ['segment', 'segment_start', 'seq_len']
+        """
+        stride = unroll_len if stride is None else stride
+        assert stride > 0, stride
+        if len(data) <= unroll_len:
+            starts = [0]
+        else:
+            starts = list(range(0, len(data) - unroll_len + 1, stride))
+            if starts[-1] != len(data) - unroll_len:
+                starts.append(len(data) - unroll_len)
+        return [{'segment': data, 'segment_start': start, 'seq_len': unroll_len} for start in starts]
+
     @classmethod
     def _get_null_transition(cls, template: dict, null_transition: Optional[dict] = None) -> dict:
         """
@@ -215,4 +289,6 @@ class Adder(object):
 get_gae = Adder.get_gae
 get_gae_with_default_last_value = Adder.get_gae_with_default_last_value
 get_nstep_return_data = Adder.get_nstep_return_data
+get_nstep_return_columns = Adder.get_nstep_return_columns
 get_train_sample = Adder.get_train_sample
+get_sequence_window = Adder.get_sequence_window
@@ -1,6 +1,7 @@
 from collections import namedtuple
 import torch
 from ding.hpc_rl import hpc_wrapper
+from .scan import reverse_linear_scan
 
 gae_data = namedtuple('gae_data', ['value', 'next_value', 'reward', 'done', 'traj_flag'])
 # gae_data_traj_flag = namedtuple('gae_data', ['value', 'next_value', 'reward', 'done', 'traj_flag'])
@@ -52,13 +53,12 @@ def gae(data: namedtuple, gamma: float = 0.99, lambda_: float = 0.97) -> torch.F
         done = done.unsqueeze(-1)
     delta = reward + (1 - done) * gamma * next_value - value
     factor = gamma * lambda_
-    adv = torch.zeros_like(value, device=value.device)
-    gae_item = torch.zeros_like(value[0])
-
-    for t in reversed(range(reward.shape[0])):
-        if traj_flag is None:
-            gae_item = delta[t] + factor * gae_item * (1 - done[t])
-        else:
-            gae_item = delta[t] + factor * gae_item * (1 - traj_flag[t].float())
-        adv[t] += gae_item
-    return adv
+    if traj_flag is None:
+        coef = factor * (1 - done)
+    else:
+        traj_flag = traj_flag.float()
+        if len(traj_flag.shape) < len(delta.shape):
+            traj_flag = traj_flag.unsqueeze(-1)
+        coef = factor * (1 - traj_flag)
+    # adv[t] = delta[t] + factor * (1 - done[t]) * adv[t + 1]
+    return reverse_linear_scan(coef, delta)
@@ -51,7 +51,8 @@ def ppo_error(
         defaults to 5.0, if you don't want to use it, set this parameter to None
     Returns:
         - ppo_loss (:obj:`namedtuple`): the ppo loss item, all of them are the differentiable 0-dim tensor
-        - ppo_info (:obj:`namedtuple`): the ppo optim information for monitoring, all of them are Python scalar
+        - ppo_info (:obj:`namedtuple`): the ppo optim information for monitoring, all of them are 0-dim \
+            tensors without gradient, so that they are not synchronized to host in each iteration
     Shapes:
         - logit_new (:obj:`torch.FloatTensor`): :math:`(B, N)`, where B is batch size and N is action dim
         - logit_old (:obj:`torch.FloatTensor`): :math:`(B, N)`
@@ -110,9 +111,9 @@ def ppo_policy_error(data: namedtuple,
     else:
         policy_loss = (-torch.min(surr1, surr2) * weight).mean()
     with torch.no_grad():
-        approx_kl = (logp_old - logp_new).mean().item()
+        approx_kl = (logp_old - logp_new).mean()
         clipped = ratio.gt(1 + clip_ratio) | ratio.lt(1 - clip_ratio)
-        clipfrac = torch.as_tensor(clipped).float().mean().item()
+        clipfrac = torch.as_tensor(clipped).float().mean()
     return ppo_policy_loss(policy_loss, entropy_loss), ppo_info(approx_kl, clipfrac)
 
 
@@ -152,7 +153,8 @@ def ppo_error_continuous(
         defaults to 5.0, if you don't want to use it, set this parameter to None
     Returns:
         - ppo_loss (:obj:`namedtuple`): the ppo loss item, all of them are the differentiable 0-dim tensor
-        - ppo_info (:obj:`namedtuple`): the ppo optim information for monitoring, all of them are Python scalar
+        - ppo_info (:obj:`namedtuple`): the ppo optim information for monitoring, all of them are 0-dim \
+            tensors without gradient, so that they are not synchronized to host in each iteration
     Shapes:
         - mu_sigma_new (:obj:`tuple`): :math:`((B, N), (B, N))`, where B is batch size and N is action dim
         - mu_sigma_old (:obj:`tuple`): :math:`((B, N), (B, N))`, where B is batch size and N is action dim
@@ -195,9 +197,9 @@ def ppo_error_continuous(
     else:
         policy_loss = (-torch.min(surr1, surr2) * weight).mean()
     with torch.no_grad():
-        approx_kl = (logp_old - logp_new).mean().item()
+        approx_kl = (logp_old - logp_new).mean()
         clipped = ratio.gt(1 + clip_ratio) | ratio.lt(1 - clip_ratio)
-        clipfrac = torch.as_tensor(clipped).float().mean().item()
+        clipfrac = torch.as_tensor(clipped).float().mean()
     # value_loss
     if use_value_clip:
         value_clip = value_old + (value_new - value_old).clamp(-clip_ratio, clip_ratio)
@@ -0,0 +1,143 @@
+from functools import lru_cache
+from typing import Optional, Union
+
+import numpy as np
+import torch
+
+import ding
+from ding.hpc_rl import hpc_wrapper
+from ding.utils import one_time_warning
+
+
+def _reverse_linear_scan_loop(coef: torch.Tensor, bias: torch.Tensor, init: torch.Tensor) -> torch.Tensor:
+    result = torch.empty_like(bias)
+    x = init
+    for t in range(bias.shape[0] - 1, -1, -1):
+        x = bias[t] + coef[t] * x
+        result[t] = x
+    return result
+
+
+def _reverse_linear_scan_assoc(coef: torch.Tensor, bias: torch.Tensor, init: torch.Tensor) -> torch.Tensor:
+    # Element t is the affine map (a, b) from x[t + step] to x[t], i.e. x[t] = b + a * x[t + step]. Composing it with
+    # the map of element t + step doubles the span, so all the maps reach x[T] after log2(T) steps.
+    a, b = coef, bias
+    step = 1
+    while step < bias.shape[0]:
+        b = torch.cat([b[:-step] + a[:-step] * b[step:], b[-step:]])
+        a = torch.cat([a[:-step] * a[step:], a[-step:]])
+        step *= 2
+    return b + a * init
+
+
+@lru_cache()
+def _jit_kernel():
+    return torch.jit.script(_reverse_linear_scan_loop)
+
+
+def _reverse_linear_scan_jit(coef: torch.Tensor, bias: torch.Tensor, init: torch.Tensor) -> torch.Tensor:
+    return _jit_kernel()(coef, bias, init)
+
+
+def _reverse_linear_scan_np_kernel(coef: np.ndarray, bias: np.ndarray, init: np.ndarray, out: np.ndarray) -> None:
+    x = init.copy()
+    for t in range(bias.shape[0] - 1, -1, -1):
+        for i in range(bias.shape[1]):
+            x[i] = bias[t, i] + coef[t, i] * x[i]
+            out[t, i] = x[i]
+
+
+@lru_cache()
+def _numba_kernel():
+    try:
+        if ding.enable_numba:
+            from numba import njit
+            return njit(cache=False, nogil=True)(_reverse_linear_scan_np_kernel)
+    except ImportError:
+        one_time_warning("If you want to use numba to speed up reverse linear scan, please install numba first")
+    return _reverse_linear_scan_np_kernel
+
+
+def reverse_linear_scan_np(coef: np.ndarray, bias: np.ndarray, init: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Overview:
+        NumPy version of ``reverse_linear_scan``, which is compiled by numba if it is available. It is used for \
+        the data on the collector side, and doesn't support gradient.
+    Arguments:
+        - coef (:obj:`np.ndarray`): :math:`(T, *)`, the coefficient of the next value.
+        - bias (:obj:`np.ndarray`): :math:`(T, *)`, the bias of each step.
+        - init (:obj:`Optional[np.ndarray]`): :math:`(*)`, the value after the last step, None means zero.
+    Returns:
+        - result (:obj:`np.ndarray`): :math:`(T, *)`, the value of each step.
+    """
+    coef, bias = np.broadcast_arrays(coef, bias)
+    shape = bias.shape
+    dtype = np.result_type(coef.dtype, bias.dtype, np.float32)
+    coef = np.ascontiguousarray(coef, dtype=dtype).reshape(shape[0], -1)
+    bias = np.ascontiguousarray(bias, dtype=dtype).reshape(shape[0], -1)
+    if init is None:
+        init = np.zeros(bias.shape[1], dtype=dtype)
+    else:
+        init = np.ascontiguousarray(np.broadcast_to(init, shape[1:]), dtype=dtype).reshape(-1)
+    out = np.empty_like(bias)
+    _numba_kernel()(coef, bias, init, out)
+    return out.reshape(shape)
+
+
+def _reverse_linear_scan_numba(coef: torch.Tensor, bias: torch.Tensor, init: torch.Tensor) -> torch.Tensor:
+    if torch.is_grad_enabled() and any([t.requires_grad for t in [coef, bias, init]]):
+        one_time_warning("numba backend of reverse linear scan doesn't support gradient, use the loop instead")
+        return _reverse_linear_scan_loop(coef, bias, init)
+    result = reverse_linear_scan_np(coef.detach().cpu().numpy(), bias.detach().cpu().numpy(), init.cpu().numpy())
+    return torch.from_numpy(result).to(device=bias.device, dtype=bias.dtype)
+
+
+def _prepare(coef: torch.Tensor, bias: torch.Tensor, init: Optional[Union[torch.Tensor, float]] = None):
+    coef, bias = torch.broadcast_tensors(coef, bias)
+    if init is None:
+        init = torch.zeros_like(bias[0])
+    elif not isinstance(init, torch.Tensor):
+        init = torch.full_like(bias[0], init)
+    else:
+        init = init.expand_as(bias[0])
+    return coef, bias, init
+
+
+def _backend_fn(scan_fn):
+
+    def wrapper(coef: torch.Tensor, bias: torch.Tensor, init: Optional[Union[torch.Tensor, float]] = None):
+        return scan_fn(*_prepare(coef, bias, init))
+
+    return wrapper
+
+
+@hpc_wrapper(
+    backend_fns={
+        'scan': _backend_fn(_reverse_linear_scan_assoc),
+        'jit': _backend_fn(_reverse_linear_scan_jit),
+        'numba': _backend_fn(_reverse_linear_scan_numba),
+    }
+)
+def reverse_linear_scan(
+        coef: torch.Tensor,
+        bias: torch.Tensor,
+        init: Optional[Union[torch.Tensor, float]] = None,
+) -> torch.Tensor:
+    """
+    Overview:
+        Compute the discounted reverse recurrence ``x[t] = bias[t] + coef[t] * x[t + 1]`` with ``x[T] = init``, \
+        which is the core of GAE, V-trace, TD(lambda) and retrace returns. The implementation is selected by \
+        ``ding.hpc_rl_backend`` through ``hpc_wrapper``:
+            - None: the python loop over time.
+            - 'scan': log-depth associative scan by PyTorch ops, which runs log2(T) steps over the whole sequence.
+            - 'jit': the loop compiled by TorchScript.
+            - 'numba': the loop compiled by numba on CPU, without gradient.
+    Arguments:
+        - coef (:obj:`torch.Tensor`): :math:`(T, *)`, the coefficient of the next value, e.g. gamma * lambda.
+        - bias (:obj:`torch.Tensor`): :math:`(T, *)`, the bias of each step, e.g. td error.
+        - init (:obj:`Optional[Union[torch.Tensor, float]]`): :math:`(*)`, the value after the last step, \
+            None means zero.
+    Returns:
+        - result (:obj:`torch.Tensor`): :math:`(T, *)`, the value of each step.
+    """
+    return _reverse_linear_scan_loop(*_prepare(coef, bias, init))
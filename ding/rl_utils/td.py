@@ -7,6 +7,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 
 from ding.hpc_rl import hpc_wrapper
+from ding.rl_utils.scan import reverse_linear_scan
 from ding.rl_utils.value_rescale import value_transform, value_inv_transform
 from ding.torch_utils import to_tensor
 
@@ -1122,13 +1123,7 @@ def multistep_forward_view(
         - ret (:obj:`torch.Tensor`): Computed lambda return value \
             for each state from 0 to T-1, of size [T_traj, batchsize]
     """
-    result = torch.empty_like(rewards)
-    # Forced cutoff at the last one
-    result[-1, :] = rewards[-1, :] + gammas[-1, :] * bootstrap_values[-1, :]
     discounts = gammas * lambda_
-    for t in reversed(range(rewards.size()[0] - 1)):
-        result[t, :] = rewards[t, :] \
-                       + discounts[t, :] * result[t + 1, :] \
-                       + (gammas[t, :] - discounts[t, :]) * bootstrap_values[t, :]
-
-    return result
+    # Forced cutoff at the last one, i.e. result[T-1] = rewards[T-1] + gammas[T-1] * bootstrap_values[T-1]
+    discounts = torch.cat([discounts[:-1], torch.zeros_like(discounts[-1:])])
+    return reverse_linear_scan(discounts, rewards + (gammas - discounts) * bootstrap_values)
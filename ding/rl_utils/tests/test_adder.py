@@ -3,7 +3,8 @@ import copy
 from collections import deque
 import numpy as np
 import torch
-from ding.rl_utils import get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_train_sample
+from ding.rl_utils import get_gae, get_gae_with_default_last_value, get_nstep_return_data, get_train_sample, \
+    get_sequence_window, get_nstep_return_columns
 
 
 @pytest.mark.unittest
@@ -105,6 +106,26 @@ class TestAdder:
         output_data = get_nstep_return_data(data, nstep=nstep)
         assert len(output_data) == 12
 
+    def test_get_nstep_return_columns(self):
+        nstep = 3
+        for T in [2, 10]:
+            data = [self.get_transition() for _ in range(T)]
+            for d in data:
+                d['next_obs'] = torch.randn(3)
+            data[-1]['done'] = True
+            keys = ['obs', 'next_obs', 'reward', 'done']
+            columns = {k: torch.stack([torch.as_tensor(d[k]) for d in data]) for k in keys}
+            output = get_nstep_return_columns(columns, nstep=nstep)
+            expected = get_nstep_return_data(copy.deepcopy(data), nstep=nstep)
+            assert output['reward'].shape == (T, nstep)
+            for i, o in enumerate(expected):
+                for k in ['next_obs', 'reward']:
+                    assert torch.equal(output[k][i], o[k])
+                assert output['done'][i].item() == o['done']
+                assert output['value_gamma'][i].item() == pytest.approx(o['value_gamma'])
+            # input columns are not modified in place
+            assert columns['reward'].shape == (T, 1)
+
     def test_get_train_sample(self):
         data = [self.get_transition() for _ in range(10)]
         output = get_train_sample(data, unroll_len=1, last_fn_type='drop')
@@ -141,6 +162,17 @@ class TestAdder:
         assert output[-1]['done'][0] is False
         assert id(output[-1]['obs'][-1]) != id(output[-1]['obs'][0])
 
+    def test_get_sequence_window(self):
+        data = [self.get_transition() for _ in range(10)]
+        output = get_sequence_window(data, unroll_len=4)
+        assert [o['segment_start'] for o in output] == [0, 4, 6]
+        # All the windows refer to the same traj without copy
+        assert all([o['segment'] is data for o in output])
+        output = get_sequence_window(data, unroll_len=4, stride=2)
+        assert [o['segment_start'] for o in output] == [0, 2, 4, 6]
+        output = get_sequence_window(data, unroll_len=11)
+        assert len(output) == 1 and output[0]['seq_len'] == 11
+
 
 test = TestAdder()
 test.test_get_gae_multi_agent()
@@ -1,6 +1,5 @@
 import pytest
 from itertools import product
-import numpy as np
 import torch
 
 from ding.rl_utils import ppo_data, ppo_error, ppo_error_continuous
@@ -35,7 +34,7 @@ def test_ppo(use_value_clip, dual_clip, weight):
     data = ppo_data(logit_new, logit_old, action, value_new, value_old, adv, return_, weight)
     loss, info = ppo_error(data, use_value_clip=use_value_clip, dual_clip=dual_clip)
     assert all([l.shape == tuple() for l in loss])
-    assert all([np.isscalar(i) for i in info])
+    assert all([isinstance(i, torch.Tensor) and i.dim() == 0 and not i.requires_grad for i in info])
     assert logit_new.grad is None
     assert value_new.grad is None
     total_loss = sum(loss)
@@ -57,7 +56,7 @@ def test_mappo():
     data = ppo_data(logit_new, logit_old, action, value_new, value_old, adv, return_, None)
     loss, info = ppo_error(data)
     assert all([l.shape == tuple() for l in loss])
-    assert all([np.isscalar(i) for i in info])
+    assert all([isinstance(i, torch.Tensor) and i.dim() == 0 and not i.requires_grad for i in info])
     assert logit_new.grad is None
     assert value_new.grad is None
     total_loss = sum(loss)
@@ -83,7 +82,7 @@ def test_ppo_error_continous(use_value_clip, dual_clip, weight):
     data = ppo_data(mu_sigma_new, mu_sigma_old, action, value_new, value_old, adv, return_, weight)
     loss, info = ppo_error_continuous(data, use_value_clip=use_value_clip, dual_clip=dual_clip)
     assert all([l.shape == tuple() for l in loss])
-    assert all([np.isscalar(i) for i in info])
+    assert all([isinstance(i, torch.Tensor) and i.dim() == 0 and not i.requires_grad for i in info])
     assert mu_sigma_new['mu'].grad is None
     assert value_new.grad is None
     total_loss = sum(loss)
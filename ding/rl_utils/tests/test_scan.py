@@ -0,0 +1,114 @@
+import time
+import pytest
+import numpy as np
+import torch
+
+import ding
+from ding.rl_utils import reverse_linear_scan, reverse_linear_scan_np, gae, gae_data, compute_q_retraces
+from ding.rl_utils.vtrace import vtrace_nstep_return
+from ding.rl_utils.td import multistep_forward_view
+from ding.rl_utils.upgo import upgo_returns
+
+backends = [None, 'scan', 'jit', 'numba']
+
+
+def naive_reverse_scan(coef, bias, init):
+    result = []
+    x = init
+    for t in reversed(range(bias.shape[0])):
+        x = bias[t] + coef[t] * x
+        result.append(x)
+    return torch.stack(result[::-1])
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('T', [1, 7, 64])
+def test_reverse_linear_scan(backend, T, monkeypatch):
+    monkeypatch.setattr(ding, 'hpc_rl_backend', backend)
+    B = 5
+    coef, bias, init = torch.rand(T, B), torch.randn(T, B), torch.randn(B)
+    expected = naive_reverse_scan(coef, bias, init)
+    assert torch.allclose(reverse_linear_scan(coef, bias, init), expected, atol=1e-5)
+    # init is zero by default
+    assert torch.allclose(reverse_linear_scan(coef, bias), naive_reverse_scan(coef, bias, 0.), atol=1e-5)
+    # coef is broadcast to bias
+    coef = torch.rand(T, B, 1)
+    bias = torch.randn(T, B, 3)
+    expected = naive_reverse_scan(coef.expand_as(bias), bias, 1.)
+    assert torch.allclose(reverse_linear_scan(coef, bias, 1.), expected, atol=1e-5)
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('backend', ['scan', 'jit'])
+def test_reverse_linear_scan_grad(backend, monkeypatch):
+    T, B = 16, 3
+    coef = torch.rand(T, B, requires_grad=True)
+    bias = torch.randn(T, B, requires_grad=True)
+    naive_reverse_scan(coef, bias, 0.).sum().backward()
+    expected = coef.grad.clone(), bias.grad.clone()
+    coef.grad, bias.grad = None, None
+    monkeypatch.setattr(ding, 'hpc_rl_backend', backend)
+    reverse_linear_scan(coef, bias).sum().backward()
+    assert torch.allclose(coef.grad, expected[0], atol=1e-5)
+    assert torch.allclose(bias.grad, expected[1], atol=1e-5)
+
+
+@pytest.mark.unittest
+def test_reverse_linear_scan_np():
+    T, B = 10, 4
+    coef, bias, init = np.random.rand(T, B), np.random.randn(T, B), np.random.randn(B)
+    result = reverse_linear_scan_np(coef, bias, init)
+    expected = naive_reverse_scan(torch.as_tensor(coef), torch.as_tensor(bias), torch.as_tensor(init))
+    assert result.shape == (T, B)
+    assert np.allclose(result, expected.numpy())
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('backend', backends[1:])
+def test_rl_utils_backend(backend, monkeypatch):
+    T, B, N = 20, 4, 3
+    value, next_value, reward = torch.randn(T, B), torch.randn(T, B), torch.randn(T, B)
+    done = (torch.rand(T, B) < 0.2).float()
+    bootstrap_values = torch.randn(T + 1, B)
+    rhos, cs, gammas, lambdas = torch.rand(T, B), torch.rand(T, B), torch.rand(T, B), torch.rand(T, B)
+    q_values, v_pred = torch.randn(T + 1, B, N), torch.randn(T + 1, B, 1)
+    actions, weights, ratio = torch.randint(0, N, (T, B)), torch.rand(T, B), torch.rand(T, B, N) * 2
+
+    def run():
+        return [
+            gae(gae_data(value, next_value, reward, done, None)),
+            vtrace_nstep_return(rhos, cs, reward, bootstrap_values),
+            multistep_forward_view(bootstrap_values[1:], reward, gammas, lambdas),
+            upgo_returns(reward, bootstrap_values),
+            compute_q_retraces(q_values, v_pred, reward, actions, weights, ratio),
+        ]
+
+    expected = run()
+    monkeypatch.setattr(ding, 'hpc_rl_backend', backend)
+    for r, e in zip(run(), expected):
+        assert r.shape == e.shape
+        assert torch.allclose(r, e, atol=1e-5)
+
+
+@pytest.mark.benchmark
+def test_reverse_linear_scan_benchmark(monkeypatch):
+    repeat = 10
+    for T in [16, 128, 1024]:
+        for B in [8, 256]:
+            coef, bias = torch.rand(T, B), torch.randn(T, B)
+            latency = {}
+            for backend in backends:
+                monkeypatch.setattr(ding, 'hpc_rl_backend', backend)
+                reverse_linear_scan(coef, bias)  # warm up, e.g. compile
+                start = time.time()
+                for _ in range(repeat):
+                    reverse_linear_scan(coef, bias)
+                latency[backend] = (time.time() - start) / repeat
+            latency_str = ', '.join(['{}: {:.6f}s'.format(k, v) for k, v in latency.items()])
+            print('T: {}, B: {}, latency: {}'.format(T, B, latency_str))
+            # log-depth scan wins when the time loop dominates, and it is memory bound when B is large
+            if T >= 1024 and B <= 8:
+                assert latency['scan'] < latency[None]
+            if T >= 128:
+                assert latency['numba'] < latency[None]
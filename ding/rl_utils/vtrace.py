@@ -3,6 +3,7 @@ import torch.nn.functional as F
 from collections import namedtuple
 from .isw import compute_importance_weights
 from ding.hpc_rl import hpc_wrapper
+from .scan import reverse_linear_scan
 
 
 def vtrace_nstep_return(clipped_rhos, clipped_cs, reward, bootstrap_values, gamma=0.99, lambda_=0.95):
@@ -20,12 +21,7 @@ def vtrace_nstep_return(clipped_rhos, clipped_cs, reward, bootstrap_values, gamm
     """
     deltas = clipped_rhos * (reward + gamma * bootstrap_values[1:] - bootstrap_values[:-1])
     factor = gamma * lambda_
-    result = bootstrap_values[:-1].clone()
-    vtrace_item = 0.
-    for t in reversed(range(reward.size()[0])):
-        vtrace_item = deltas[t] + factor * clipped_cs[t] * vtrace_item
-        result[t] += vtrace_item
-    return result
+    return bootstrap_values[:-1] + reverse_linear_scan(factor * clipped_cs, deltas)
 
 
 def vtrace_advantage(clipped_pg_rhos, reward, return_, bootstrap_values, gamma):
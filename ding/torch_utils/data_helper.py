@@ -148,6 +148,9 @@ def to_tensor(
             return item
         else:
             return item.to(dtype)
+    elif hasattr(item, '__array__'):
+        # Array-like object, e.g. LazyFrames
+        return to_tensor(np.asarray(item), dtype, ignore_keys, transform_scalar)
     else:
         raise TypeError("not support item type: {}".format(type(item)))
 
@@ -206,6 +209,9 @@ def to_ndarray(item: Any, dtype: np.dtype = None) -> np.ndarray:
         return np.array(item)
     elif item is None:
         return None
+    elif hasattr(item, '__array__'):
+        # Array-like object, e.g. LazyFrames
+        return to_ndarray(np.asarray(item), dtype)
     else:
         raise TypeError("not support item type: {}".format(type(item)))
 
@@ -303,14 +309,37 @@ class LogDict(dict):
             self.__setitem__(k, v)
 
 
-def build_log_buffer():
+class DeferredLogDict(dict):
+    '''
+    Overview:
+        Derived from ``dict``; Would keep all the values of each key in a list, and ``torch.Tensor`` is only detached \
+        without being transformed, so that no device synchronization happens until the values are reduced.
+    '''
+
+    def __setitem__(self, key, value):
+        if isinstance(value, torch.Tensor):
+            value = value.detach()
+        if key in self:
+            self[key].append(value)
+        else:
+            super().__setitem__(key, [value])
+
+    def update(self, data):
+        for k, v in data.items():
+            self.__setitem__(k, v)
+
+
+def build_log_buffer(deferred: bool = False):
     r"""
     Overview:
         Builg log buffer, a subclass of dict, which can transform the input data into log format.
+    Arguments:
+        - deferred (:obj:`bool`): Whether to build ``DeferredLogDict``, which keeps the values of all the \
+            iterations until they are reduced.
     Returns:
-        - log_buffer (:obj:`LogDict`): Log buffer dict
+        - log_buffer (:obj:`Union[LogDict, DeferredLogDict]`): Log buffer dict
     """
-    return LogDict()
+    return DeferredLogDict() if deferred else LogDict()
 
 
 class CudaFetcher(object):
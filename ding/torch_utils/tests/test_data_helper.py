@@ -143,6 +143,17 @@ def test_log_dict():
     assert log_buffer['not_tensor'] == 4
 
 
+@pytest.mark.unittest
+def test_deferred_log_dict():
+    log_buffer = build_log_buffer(deferred=True)
+    x = torch.randn(3, requires_grad=True)
+    log_buffer['tensor'] = x.sum()
+    log_buffer.update({'tensor': x.mean(), 'a': 5})
+    assert isinstance(log_buffer['tensor'], list) and len(log_buffer['tensor']) == 2
+    assert all([isinstance(v, torch.Tensor) and not v.requires_grad for v in log_buffer['tensor']])
+    assert log_buffer['a'] == [5]
+
+
 @pytest.mark.cudatest
 class TestCudaFetcher:
 
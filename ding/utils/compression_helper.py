@@ -1,7 +1,16 @@
+from typing import Any, Callable
 import pickle
+import struct
 import zlib
 
 import lz4.block
+import numpy as np
+import torch
+
+# The first byte of raw codecs' output, tell whether the payload is a raw array or a pickled object.
+_RAW_FLAG_PICKLE = b'\x00'
+_RAW_FLAG_NDARRAY = b'\x01'
+_RAW_FLAG_TENSOR = b'\x02'
 
 
 def dummy_compressor(data):
@@ -34,9 +43,76 @@ def lz4_data_compressor(data):
     return lz4.block.compress(pickle.dumps(data))
 
 
+def _raw_data_compressor(data: Any, compress_fn: Callable) -> bytes:
+    """
+    Overview:
+        Compress the underlying buffer of ``np.ndarray`` or ``torch.Tensor`` directly, only a small header of \
+        dtype and shape is pickled. Other data is pickled as a whole, the same as ``lz4`` and ``zlib``.
+    """
+    if isinstance(data, torch.Tensor) and data.dtype != torch.bfloat16:
+        flag, array = _RAW_FLAG_TENSOR, data.detach().cpu().numpy()
+    elif isinstance(data, np.ndarray) and data.dtype != object:
+        flag, array = _RAW_FLAG_NDARRAY, data
+    else:
+        return _RAW_FLAG_PICKLE + compress_fn(pickle.dumps(data))
+    array = np.ascontiguousarray(array)
+    header = pickle.dumps((array.dtype.str, array.shape))
+    return flag + struct.pack('<I', len(header)) + header + compress_fn(array.data)
+
+
+def _raw_data_decompressor(compressed_data: bytes, decompress_fn: Callable) -> Any:
+    flag = compressed_data[:1]
+    if flag == _RAW_FLAG_PICKLE:
+        return pickle.loads(decompress_fn(compressed_data[1:]))
+    header_len, = struct.unpack('<I', compressed_data[1:5])
+    dtype, shape = pickle.loads(compressed_data[5:5 + header_len])
+    # Decompress into a bytearray, so that the array is writable without another copy
+    array = np.frombuffer(decompress_fn(compressed_data[5 + header_len:], writable=True), dtype=dtype).reshape(shape)
+    return torch.from_numpy(array) if flag == _RAW_FLAG_TENSOR else array
+
+
+def _lz4_compress(data: Any) -> bytes:
+    return lz4.block.compress(data)
+
+
+def _lz4_decompress(data: bytes, writable: bool = False) -> bytes:
+    return lz4.block.decompress(data, return_bytearray=writable)
+
+
+def _zlib_compress(data: Any) -> bytes:
+    return zlib.compress(data)
+
+
+def _zlib_decompress(data: bytes, writable: bool = False) -> bytes:
+    data = zlib.decompress(data)
+    return bytearray(data) if writable else data
+
+
+def lz4_raw_data_compressor(data):
+    r"""
+    Overview:
+        Return the compressed original data (lz4 compressor) in binary format. For ``np.ndarray`` and \
+        ``torch.Tensor``, the array buffer is compressed without pickle, which is faster for large observations.
+    Examples:
+        >>> compressed_data = lz4_raw_data_compressor(np.zeros((4, 84, 84), dtype=np.uint8))
+    """
+    return _raw_data_compressor(data, _lz4_compress)
+
+
+def zlib_raw_data_compressor(data):
+    r"""
+    Overview:
+        Return the compressed original data (zlib compressor) in binary format. For ``np.ndarray`` and \
+        ``torch.Tensor``, the array buffer is compressed without pickle.
+    """
+    return _raw_data_compressor(data, _zlib_compress)
+
+
 _COMPRESSORS_MAP = {
     'lz4': lz4_data_compressor,
     'zlib': zlib_data_compressor,
+    'lz4_raw': lz4_raw_data_compressor,
+    'zlib_raw': zlib_raw_data_compressor,
     'none': dummy_compressor,
 }
 
@@ -46,7 +122,7 @@ def get_data_compressor(name: str):
     Overview:
         Get the data compressor according to the input name
     Arguments:
-        - name(:obj:`str`): Name of the compressor, support ``['lz4', 'zlib', 'none']``
+        - name(:obj:`str`): Name of the compressor, support ``['lz4', 'zlib', 'lz4_raw', 'zlib_raw', 'none']``
     Return:
         - (:obj:`Callable`): Corresponding data_compressor, taking input data returning compressed data.
     Example:
@@ -80,9 +156,27 @@ def zlib_data_decompressor(compressed_data):
     return pickle.loads(zlib.decompress(compressed_data))
 
 
+def lz4_raw_data_decompressor(compressed_data):
+    r"""
+    Overview:
+        Return the decompressed original data (lz4_raw compressor).
+    """
+    return _raw_data_decompressor(compressed_data, _lz4_decompress)
+
+
+def zlib_raw_data_decompressor(compressed_data):
+    r"""
+    Overview:
+        Return the decompressed original data (zlib_raw compressor).
+    """
+    return _raw_data_decompressor(compressed_data, _zlib_decompress)
+
+
 _DECOMPRESSORS_MAP = {
     'lz4': lz4_data_decompressor,
     'zlib': zlib_data_decompressor,
+    'lz4_raw': lz4_raw_data_decompressor,
+    'zlib_raw': zlib_raw_data_decompressor,
     'none': dummy_decompressor,
 }
 
@@ -92,7 +186,7 @@ def get_data_decompressor(name: str):
     Overview:
         Get the data decompressor according to the input name
     Arguments:
-        - name(:obj:`str`): Name of the decompressor, support ``['lz4', 'zlib', 'none']``
+        - name(:obj:`str`): Name of the decompressor, support ``['lz4', 'zlib', 'lz4_raw', 'zlib_raw', 'none']``
 
     .. note::
 
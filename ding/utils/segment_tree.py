@@ -1,5 +1,5 @@
 from functools import partial, lru_cache
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 import numpy as np
 
@@ -29,6 +29,10 @@ def njit():
     return _njit
 
 
+def _numba_enabled() -> bool:
+    return njit() is not partial
+
+
 class SegmentTree:
     """
     Overview:
@@ -86,27 +90,46 @@ class SegmentTree:
         end += self.capacity
         return _reduce(self.value, start, end, self.neutral_element, self.operation)
 
-    def __setitem__(self, idx: int, val: float) -> None:
+    def __setitem__(self, idx: Union[int, np.ndarray], val: Union[float, np.ndarray]) -> None:
         """
         Overview:
-            Set ``leaf[idx] = val``; Then update the related nodes.
+            Set ``leaf[idx] = val``; Then update the related nodes. ``idx`` can also be an index array, then all the \
+            leaves are set at once and each ancestor node is only updated one time.
         Arguments:
-            - idx (:obj:`int`): Leaf node index(relative index), should add ``capacity`` to change to absolute index.
-            - val (:obj:`float`): The value that will be assigned to ``leaf[idx]``.
+            - idx (:obj:`Union[int, np.ndarray]`): Leaf node index(relative index), should add ``capacity`` to change \
+                to absolute index. If it is an array, duplicated indices follow the last assigned value.
+            - val (:obj:`Union[float, np.ndarray]`): The value that will be assigned to ``leaf[idx]``, can be an array \
+                with the same shape as ``idx`` or a scalar broadcast to all the indices.
         """
+        if isinstance(idx, np.ndarray):
+            idx = idx.astype(np.int64).reshape(-1)
+            if idx.shape[0] == 0:
+                return
+            assert np.all((0 <= idx) & (idx < self.capacity)), idx
+            val = np.broadcast_to(np.asarray(val, dtype=self.value.dtype), idx.shape)
+            if _numba_enabled():
+                _setitem_batch(self.value, idx + self.capacity, np.ascontiguousarray(val), self.operation)
+            else:
+                _setitem_batch_np(self.value, idx + self.capacity, val, self.operation)
+            return
         assert (0 <= idx < self.capacity), idx
         # ``idx`` should add ``capacity`` to change to absolute index.
         _setitem(self.value, idx + self.capacity, val, self.operation)
 
-    def __getitem__(self, idx: int) -> float:
+    def __getitem__(self, idx: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Overview:
-            Get ``leaf[idx]``
+            Get ``leaf[idx]``, ``idx`` can also be an index array, then all the leaves are gathered at once.
         Arguments:
-            - idx (:obj:`int`): Leaf node ``index(relative index)``, add ``capacity`` to change to absolute index.
+            - idx (:obj:`Union[int, np.ndarray]`): Leaf node ``index(relative index)``, add ``capacity`` to change \
+                to absolute index.
         Returns:
-            - val (:obj:`float`): The value of ``leaf[idx]``
+            - val (:obj:`Union[float, np.ndarray]`): The value of ``leaf[idx]``, an array if ``idx`` is an array.
         """
+        if isinstance(idx, np.ndarray):
+            idx = idx.astype(np.int64)
+            assert np.all((0 <= idx) & (idx < self.capacity)), idx
+            return self.value[idx + self.capacity]
         assert (0 <= idx < self.capacity)
         return self.value[idx + self.capacity]
 
@@ -118,6 +141,9 @@ class SegmentTree:
             _setitem(d, 0, 3.0, 'sum')
             _reduce(d, 0, 1, 0.0, 'min')
             _find_prefixsum_idx(d, 1, 0.5, 0.0)
+            if _numba_enabled():
+                _setitem_batch(d, np.array([1], dtype=np.int64), d[1:].copy(), 'sum')
+                _find_prefixsum_idx_batch(d, 1, np.array([0.5]), 0.0)
 
 
 class SumSegmentTree(SegmentTree):
@@ -146,6 +172,25 @@ class SumSegmentTree(SegmentTree):
             assert 0 <= prefixsum <= self.reduce() + 1e-5, prefixsum
         return _find_prefixsum_idx(self.value, self.capacity, prefixsum, self.neutral_element)
 
+    def find_prefixsum_idx_batch(self, prefixsum: np.ndarray, trust_caller: bool = True) -> np.ndarray:
+        """
+        Overview:
+            Batch version of ``find_prefixsum_idx``, all the queries descend the tree together, which avoids \
+            calling ``find_prefixsum_idx`` once for every sampled item.
+        Arguments:
+            - prefixsum (:obj:`np.ndarray`): The target prefixsum array, whose shape is :math:`(B, )`.
+            - trust_caller (:obj:`bool`): Whether to trust caller, refer to ``find_prefixsum_idx`` for details.
+        Returns:
+            - idx (:obj:`np.ndarray`): Eligible index array, whose shape is :math:`(B, )` and dtype is ``np.int64``.
+        """
+        prefixsum = np.asarray(prefixsum, dtype=np.float64).reshape(-1)
+        if not trust_caller:
+            assert np.all((0 <= prefixsum) & (prefixsum <= self.reduce() + 1e-5)), prefixsum
+        if _numba_enabled():
+            return _find_prefixsum_idx_batch(self.value, self.capacity, prefixsum, self.neutral_element)
+        else:
+            return _find_prefixsum_idx_batch_np(self.value, self.capacity, prefixsum, self.neutral_element)
+
 
 class MinSegmentTree(SegmentTree):
 
@@ -222,3 +267,56 @@ def _find_prefixsum_idx(tree: np.ndarray, capacity: int, prefixsum: float, neutr
             raise ValueError("All elements in tree are the neutral_element(0), can't find non-zero element")
     assert (tree[idx] != neutral_element)
     return idx - capacity
+
+
+@njit()
+def _setitem_batch(tree: np.ndarray, idx: np.ndarray, val: np.ndarray, operation: str) -> None:
+    for i in range(idx.shape[0]):
+        _setitem(tree, idx[i], val[i], operation)
+
+
+def _setitem_batch_np(tree: np.ndarray, idx: np.ndarray, val: np.ndarray, operation: str) -> None:
+    tree[idx] = val
+    # Update level by level from leaf nodes to the root node, so that each ancestor node is only calculated once
+    idx = np.unique(idx >> 1)
+    while idx[-1] >= 1:
+        idx = idx[idx >= 1]
+        left, right = tree[2 * idx], tree[2 * idx + 1]
+        if operation == 'sum':
+            tree[idx] = left + right
+        elif operation == 'min':
+            tree[idx] = np.minimum(left, right)
+        idx = np.unique(idx >> 1)
+
+
+@njit()
+def _find_prefixsum_idx_batch(
+        tree: np.ndarray, capacity: int, prefixsum: np.ndarray, neutral_element: float
+) -> np.ndarray:
+    result = np.empty(prefixsum.shape[0], dtype=np.int64)
+    for i in range(prefixsum.shape[0]):
+        result[i] = _find_prefixsum_idx(tree, capacity, prefixsum[i], neutral_element)
+    return result
+
+
+def _find_prefixsum_idx_batch_np(
+        tree: np.ndarray, capacity: int, prefixsum: np.ndarray, neutral_element: float
+) -> np.ndarray:
+    # Same descent as ``_find_prefixsum_idx``, but all the queries move down one level of the tree at each step.
+    prefixsum = prefixsum.copy()
+    idx = np.ones(prefixsum.shape[0], dtype=np.int64)
+    while idx.shape[0] > 0 and idx[0] < capacity:
+        left = tree[2 * idx]
+        go_right = left <= prefixsum
+        prefixsum -= np.where(go_right, left, 0)
+        idx = 2 * idx + go_right
+    # Special case, refer to ``_find_prefixsum_idx`` for details.
+    last = 2 * capacity - 1
+    special = (idx == last) & (tree[last] == neutral_element)
+    if special.any():
+        non_neutral = np.nonzero(tree[capacity + 1:last] != neutral_element)[0]
+        if len(non_neutral) == 0:
+            raise ValueError("All elements in tree are the neutral_element(0), can't find non-zero element")
+        idx[special] = non_neutral[-1] + capacity + 1
+    assert np.all(tree[idx] != neutral_element)
+    return idx - capacity
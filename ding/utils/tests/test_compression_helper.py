@@ -1,4 +1,6 @@
 import random
+import numpy as np
+import torch
 
 from ding.utils.compression_helper import get_data_compressor, get_data_decompressor
 
@@ -12,9 +14,24 @@ class TestCompression():
         return {'input': [random.randint(10, 100) for i in range(100)]}
 
     def testnaive(self):
-        compress_names = ['lz4', 'zlib', 'none']
+        compress_names = ['lz4', 'zlib', 'lz4_raw', 'zlib_raw', 'none']
         for s in compress_names:
             compressor = get_data_compressor(s)
             decompressor = get_data_decompressor(s)
             data = self.get_step_data()
             assert data == decompressor(compressor(data))
+
+    def test_raw_array(self):
+        for s in ['lz4_raw', 'zlib_raw']:
+            compressor = get_data_compressor(s)
+            decompressor = get_data_decompressor(s)
+            data = np.random.randint(0, 255, size=(4, 84, 84), dtype=np.uint8)
+            decompressed = decompressor(compressor(data))
+            assert decompressed.dtype == np.uint8
+            assert (decompressed == data).all()
+            # Decompressed array is writable
+            decompressed[0] = 0
+            data = torch.randn(3, 5)
+            decompressed = decompressor(compressor(data))
+            assert isinstance(decompressed, torch.Tensor)
+            assert torch.equal(decompressed, data)
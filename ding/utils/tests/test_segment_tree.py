@@ -58,6 +58,39 @@ class TestSumSegmentTree:
         assert (tree.find_prefixsum_idx(0.8) == 6)
         assert (tree.find_prefixsum_idx(tree.reduce()) == 6)
 
+    def test_find_prefixsum_idx_batch(self):
+        tree = SumSegmentTree(capacity=8)
+        elements = [0, 0.1, 0.5, 0, 0, 0.2, 0.8, 0]
+        tree[np.arange(8)] = np.array(elements)
+        assert np.isclose(tree.reduce(), sum(elements))
+        with pytest.raises(AssertionError):
+            tree.find_prefixsum_idx_batch(np.array([0.1, tree.reduce() + 1e-4]), trust_caller=False)
+
+        prefixsum = np.array([0, 0.09, 0.1, 0.59, 0.6, 0.799, 0.8, tree.reduce()])
+        idx = tree.find_prefixsum_idx_batch(prefixsum)
+        assert idx.dtype == np.int64
+        assert idx.tolist() == [1, 1, 2, 2, 5, 5, 6, 6]
+        assert idx.tolist() == [tree.find_prefixsum_idx(p) for p in prefixsum]
+        assert tree.find_prefixsum_idx_batch(np.array([])).shape == (0, )
+
+        mass = np.random.uniform(size=(256, )) * tree.reduce()
+        assert tree.find_prefixsum_idx_batch(mass).tolist() == [tree.find_prefixsum_idx(m) for m in mass]
+
+    def test_set_item_batch(self):
+        capacity = 64
+        batch_tree, tree = SumSegmentTree(capacity), SumSegmentTree(capacity)
+        idx = np.random.randint(0, capacity, size=(32, ))
+        val = np.random.uniform(size=(32, ))
+        batch_tree[idx] = val
+        for i, v in zip(idx, val):
+            tree[i] = v
+        assert np.allclose(batch_tree.value, tree.value)
+        assert batch_tree[idx].tolist() == [tree[i] for i in idx]
+        batch_tree[idx] = 0.
+        assert batch_tree.reduce() == 0.
+        with pytest.raises(AssertionError):
+            batch_tree[np.array([0, capacity])] = 1.
+
 
 @pytest.mark.unittest
 class TestMinSegmentTree:
@@ -85,3 +118,12 @@ class TestMinSegmentTree:
         assert (tree.reduce(1, 3) == min(elements[1:3]))
         assert (tree.reduce(1, 2) == min(elements[1:2]))
         assert (tree.reduce(2, 3) == min(elements[2:3]))
+
+    def test_set_item_batch(self):
+        tree = MinSegmentTree(capacity=8)
+        elements = np.array([1, -10, 10, 7, 3, 2, 5, 8])
+        tree[np.arange(8)] = elements
+        assert tree.reduce() == elements.min()
+        assert tree.reduce(2, 8) == elements[2:].min()
+        tree[np.array([1, 5])] = np.inf
+        assert tree.reduce() == 1
@@ -1,7 +1,8 @@
 import pytest
 import numpy as np
+import signal
 import time
-from ding.utils.time_helper import build_time_helper, WatchDog, TimeWrapperTime, EasyTimer
+from ding.utils.time_helper import build_time_helper, WatchDog, HeartbeatWatchDog, TimeWrapperTime, EasyTimer
 
 
 @pytest.mark.unittest
@@ -72,3 +73,43 @@ class TestWatchDog:
         with pytest.raises(TimeoutError):
             time.sleep(2)
         watchdog.stop()
+
+
+@pytest.mark.unittest
+class TestHeartbeatWatchDog:
+
+    def test_naive(self):
+        watchdog = HeartbeatWatchDog(check_interval=0.05)
+        watchdog.start()
+        sleep_fn = watchdog.watch(time.sleep, timeout=0.5)
+        assert watchdog.watch(time.sleep, timeout=None) is time.sleep
+        for _ in range(5):
+            sleep_fn(0.2)
+        # The deadline is cleared after each call, so sleep out of watched calls is not interrupted
+        time.sleep(0.6)
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            sleep_fn(3)
+        assert time.time() - start < 1
+        sleep_fn(0.1)
+        watchdog.stop()
+
+    def test_multiple(self):
+        prev_handler = signal.getsignal(signal.SIGALRM)
+        watchdogs = [HeartbeatWatchDog(check_interval=0.05) for _ in range(2)]
+        for w in watchdogs:
+            w.start()
+        sleep_fns = [w.watch(time.sleep, timeout=0.3) for w in watchdogs]
+        # The watchdog started first is still effective after the second one starts
+        for sleep_fn in sleep_fns:
+            start = time.time()
+            with pytest.raises(TimeoutError):
+                sleep_fn(3)
+            assert time.time() - start < 1
+        # Stopping one watchdog doesn't disarm or kill the other one
+        watchdogs[1].stop()
+        with pytest.raises(TimeoutError):
+            sleep_fns[0](3)
+        sleep_fns[0](0.1)
+        watchdogs[0].stop()
+        assert signal.getsignal(signal.SIGALRM) == prev_handler
@@ -1,6 +1,9 @@
+import os
 import signal
 import time
-from typing import Any, Callable
+import threading
+from functools import wraps
+from typing import Any, Callable, Optional
 
 import torch
 from easydict import EasyDict
@@ -168,3 +171,150 @@ class WatchDog(object):
         """
         signal.alarm(0)
         signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+
+class _HeartbeatMonitor(object):
+    r"""
+    Overview:
+        The per-process ``SIGALRM`` handler and monitor thread shared by all the running ``HeartbeatWatchDog``. \
+        The handler is installed when the first watchdog starts, and the previous handler is restored when the \
+        last one stops, so watchdogs of different env managers don't overwrite each other's handler.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._watchdogs = set()
+        self._thread_ident = None
+        self._prev_handler = None
+        self._stop_event = None
+        self._monitor_thread = None
+
+    def register(self, watchdog: 'HeartbeatWatchDog') -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked from a process with running watchdogs, whose monitor thread doesn't exist in this process
+                self._pid = os.getpid()
+                self._watchdogs = set()
+            if len(self._watchdogs) == 0:
+                self._prev_handler = signal.signal(signal.SIGALRM, self._event)
+                self._thread_ident = threading.get_ident()
+                self._stop_event = threading.Event()
+                self._monitor_thread = threading.Thread(
+                    target=self._monitor, args=(self._stop_event, ), name='heartbeat_watchdog', daemon=True
+                )
+                self._monitor_thread.start()
+            elif threading.get_ident() != self._thread_ident:
+                raise ValueError("all the heartbeat watchdogs in a process must be started in the same thread")
+            self._watchdogs.add(watchdog)
+
+    def unregister(self, watchdog: 'HeartbeatWatchDog') -> None:
+        with self._lock:
+            if self._pid != os.getpid() or watchdog not in self._watchdogs:
+                return
+            self._watchdogs.remove(watchdog)
+            if len(self._watchdogs) > 0:
+                return
+            self._stop_event.set()
+            monitor_thread, self._monitor_thread = self._monitor_thread, None
+            if threading.get_ident() == self._thread_ident:
+                signal.signal(signal.SIGALRM, self._prev_handler)
+        monitor_thread.join()
+
+    def _expired(self) -> Optional['HeartbeatWatchDog']:
+        now = time.monotonic()
+        for watchdog in list(self._watchdogs):
+            deadline = watchdog._deadline
+            if deadline is not None and now >= deadline:
+                return watchdog
+        return None
+
+    def _event(self, signum: Any, frame: Any) -> None:
+        # The watched call may have finished when the signal is handled
+        watchdog = self._expired()
+        if watchdog is not None:
+            watchdog._deadline = None
+            raise TimeoutError()
+
+    def _monitor(self, stop_event: threading.Event) -> None:
+        while True:
+            check_interval = min([w._check_interval for w in list(self._watchdogs)], default=0.1)
+            if stop_event.wait(check_interval):
+                break
+            if self._expired() is not None:
+                signal.pthread_kill(self._thread_ident, signal.SIGALRM)
+
+
+_heartbeat_monitor = _HeartbeatMonitor()
+
+
+class HeartbeatWatchDog(object):
+    r"""
+    Overview:
+        Watchdog which is armed once and watches many calls. A watched call only writes its deadline before \
+        running and clears it after, and a daemon monitor thread checks the deadline periodically. When the \
+        deadline expires, the monitor interrupts the thread which starts the watchdog by ``SIGALRM``, and \
+        ``TimeoutError`` is raised in the watched call. Compared with ``WatchDog``, there is no signal setup and \
+        teardown in each call. All the watchdogs in a process share one ``SIGALRM`` handler and monitor thread, \
+        so several watchdogs (e.g. of collector and evaluator env managers) can run at the same time.
+
+    Arguments:
+        - check_interval (:obj:`float`): The interval of deadline checks of the monitor thread, in seconds.
+
+    .. note::
+        ``start`` must be called in the main thread, and the watched calls must run in the main thread too.
+
+    Interface:
+        ``start``, ``stop``, ``watch``
+
+    Examples:
+        >>> watchdog = HeartbeatWatchDog()
+        >>> watchdog.start()
+        >>> step_fn = watchdog.watch(env.step, timeout=5)
+        >>> step_fn(action)  # raise TimeoutError if env.step takes more than about 5 seconds
+        >>> watchdog.stop()
+    """
+
+    def __init__(self, check_interval: float = 0.1):
+        self._check_interval = check_interval
+        self._deadline = None
+
+    def start(self) -> None:
+        r"""
+        Overview:
+            Register the watchdog to the ``SIGALRM`` handler and monitor thread of this process, which are \
+            started by the first watchdog. Raise ``ValueError`` if not called in the main thread.
+        """
+        _heartbeat_monitor.register(self)
+
+    def watch(self, func: Callable, timeout: Optional[float]) -> Callable:
+        r"""
+        Overview:
+            Wrap ``func`` so that ``TimeoutError`` is raised if a call of it takes more than ``timeout`` seconds.
+        Arguments:
+            - func (:obj:`Callable`): The function to watch.
+            - timeout (:obj:`Optional[float]`): Timeout of each call, None means not to watch.
+        Returns:
+            - wrapper (:obj:`Callable`): The watched function.
+        """
+        if timeout is None:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._deadline = time.monotonic() + timeout
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._deadline = None
+
+        return wrapper
+
+    def stop(self) -> None:
+        r"""
+        Overview:
+            Unregister the watchdog, the monitor thread is stopped and the previous ``SIGALRM`` handler is \
+            restored when no watchdog is running in this process.
+        """
+        self._deadline = None
+        _heartbeat_monitor.unregister(self)
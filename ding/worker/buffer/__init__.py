@@ -1,3 +1,4 @@
 from .buffer import Buffer, apply_middleware, BufferedData
 from .deque_buffer import DequeBuffer
 from .deque_buffer_wrapper import DequeBufferWrapper
+from .array_buffer import ArrayBuffer, BufferedBatch
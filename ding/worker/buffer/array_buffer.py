@@ -0,0 +1,283 @@
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
+import random
+import uuid
+import logging
+import numpy as np
+import torch
+
+from ding.worker.buffer import Buffer, apply_middleware, BufferedData
+
+
+def _create_field(value: Any, size: int) -> Union[dict, np.ndarray, torch.Tensor]:
+    """
+    Overview:
+        Infer the schema of one field from the first pushed value, and preallocate a ring array for it.
+        Dict fields are expanded recursively, arrays and scalars are stored in contiguous arrays with a leading \
+        ``size`` dim, other objects (str, list, None, etc.) are stored in an object array.
+    """
+    if isinstance(value, dict):
+        return {k: _create_field(v, size) for k, v in value.items()}
+    elif isinstance(value, torch.Tensor):
+        return torch.zeros((size, *value.shape), dtype=value.dtype)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        return np.zeros((size, *value.shape), dtype=value.dtype)
+    elif isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+        return np.zeros((size, ), dtype=np.asarray(value).dtype)
+    else:
+        return np.empty((size, ), dtype=object)
+
+
+def _write_field(field: Union[dict, np.ndarray, torch.Tensor], value: Any, slot: int) -> None:
+    if isinstance(field, dict):
+        if not isinstance(value, dict) or value.keys() != field.keys():
+            got = list(value.keys()) if isinstance(value, dict) else type(value)
+            raise ValueError(
+                "Pushed data doesn't match the schema inferred from the first data, expect keys {}, but get {}".format(
+                    list(field.keys()), got
+                )
+            )
+        for k, v in value.items():
+            _write_field(field[k], v, slot)
+    else:
+        field[slot] = value
+
+
+def _gather_field(field: Union[dict, np.ndarray, torch.Tensor], slots: np.ndarray) -> Any:
+    if isinstance(field, dict):
+        return {k: _gather_field(v, slots) for k, v in field.items()}
+    elif isinstance(field, torch.Tensor):
+        return field[torch.from_numpy(slots)]
+    elif field.dtype == object:
+        return field[slots].tolist()
+    else:
+        return field[slots]
+
+
+def _slice_field(batch: Any, i: int) -> Any:
+    if isinstance(batch, dict):
+        return {k: _slice_field(v, i) for k, v in batch.items()}
+    else:
+        return batch[i]
+
+
+@dataclass
+class BufferedBatch:
+    """
+    Overview:
+        A batch of sampled data from ``ArrayBuffer``, ``data`` is already stacked along the first dim, ``index`` and \
+        ``meta`` are lists whose i-th element belongs to the i-th sample. It behaves like a list of \
+        ``BufferedData``, so that middleware written for ``DequeBuffer`` can visit each sample by ``len``, \
+        ``__getitem__`` and ``__iter__``. ``weight`` is the importance sampling weight of the whole batch, which is \
+        set by ``PriorityExperienceReplay`` as a single tensor instead of an entry in each meta.
+    """
+    data: Any
+    index: List[str]
+    meta: List[dict]
+    weight: Optional[torch.Tensor] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> BufferedData:
+        return BufferedData(data=_slice_field(self.data, i), index=self.index[i], meta=self.meta[i])
+
+    def __iter__(self) -> Iterator[BufferedData]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ArrayStorage:
+    """
+    Overview:
+        The ring storage of ``ArrayBuffer``, which is shared among all the views of a buffer. ``fields`` is \
+        created from the first pushed data, index string and meta of each slot are kept in python lists.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.fields = None
+        self.clear()
+
+    def clear(self) -> None:
+        # Index string of each slot, None means the slot is empty or deleted.
+        self.index = [None for _ in range(self.size)]
+        self.meta = [None for _ in range(self.size)]
+        self.slot_of = {}
+        # Point to the position where next data will be written.
+        self.tail = 0
+        # How many slots have been written, no more than ``size``.
+        self.filled = 0
+
+    def append(self, data: Any, index: str, meta: dict) -> None:
+        if self.fields is None:
+            self.fields = _create_field(data, self.size)
+        slot = self.tail
+        _write_field(self.fields, data, slot)
+        # Overwrite the oldest data when the ring is full
+        if self.index[slot] is not None:
+            self.slot_of.pop(self.index[slot])
+        self.index[slot] = index
+        self.meta[slot] = meta
+        self.slot_of[index] = slot
+        self.tail = (self.tail + 1) % self.size
+        self.filled = min(self.filled + 1, self.size)
+
+    def remove(self, index: str) -> None:
+        slot = self.slot_of.pop(index, None)
+        if slot is not None:
+            self.index[slot] = None
+            self.meta[slot] = None
+
+    def valid_slots(self) -> np.ndarray:
+        """
+        Overview:
+            Get the slots of all the valid data, ordered from the oldest to the newest.
+        """
+        start = (self.tail - self.filled) % self.size
+        slots = (start + np.arange(self.filled)) % self.size
+        if len(self) != self.filled:
+            # Some data has been deleted, filter out the holes.
+            slots = slots[[self.index[s] is not None for s in slots.tolist()]]
+        return slots
+
+    def gather(self, slots: np.ndarray) -> BufferedBatch:
+        if self.fields is None or len(slots) == 0:
+            return BufferedBatch(data=None, index=[], meta=[])
+        slot_list = slots.tolist()
+        return BufferedBatch(
+            data=_gather_field(self.fields, slots),
+            index=[self.index[s] for s in slot_list],
+            meta=[self.meta[s] for s in slot_list],
+        )
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+
+class ArrayBuffer(Buffer):
+    """
+    Overview:
+        Columnar buffer, the schema is inferred from the first pushed data, and each field is stored in \
+        a preallocated contiguous ring array. Sampling gathers all the fields by fancy indexing, so the result \
+        is already stacked, no per-item copy or collate is needed.
+    Interface:
+        push, sample, update, batch_update, delete, count, clear, get
+    .. note::
+        All the pushed data should share the same structure and shape as the first data. Deleted data leaves \
+        a hole in the ring, which will be reused when the ring overwrites it.
+    """
+
+    def __init__(self, size: int) -> None:
+        super().__init__()
+        self.storage = ArrayStorage(size)
+
+    @apply_middleware("push")
+    def push(self, data: Any, meta: Optional[dict] = None) -> BufferedData:
+        return self._push(data, meta)
+
+    @apply_middleware("sample")
+    def sample(
+            self,
+            size: Optional[int] = None,
+            indices: Optional[List[str]] = None,
+            replace: bool = False,
+            sample_range: Optional[slice] = None,
+            ignore_insufficient: bool = False,
+            groupby: str = None,
+            rolling_window: int = None
+    ) -> BufferedBatch:
+        assert size or indices, "One of size and indices must not be empty."
+        if (size and indices) and (size != len(indices)):
+            raise AssertionError("Size and indices length must be equal.")
+        assert groupby is None and rolling_window is None, "ArrayBuffer doesn't support groupby and rolling_window."
+        if not size:
+            size = len(indices)
+
+        if indices:
+            missing = [index for index in indices if index not in self.storage.slot_of]
+            if missing:
+                raise ValueError("Indices {} are not in buffer({})".format(missing, self.count()))
+            slots = np.array([self.storage.slot_of[index] for index in indices], dtype=np.int64)
+        else:
+            valid_slots = self.storage.valid_slots()
+            if sample_range:
+                valid_slots = valid_slots[sample_range]
+            if replace and len(valid_slots) > 0:
+                slots = valid_slots[np.random.randint(0, len(valid_slots), size=size)]
+            elif not replace and len(valid_slots) >= size:
+                slots = valid_slots[random.sample(range(len(valid_slots)), k=size)]
+            else:
+                if ignore_insufficient:
+                    logging.warning(
+                        "Sample operation is ignored due to data insufficient, current buffer is {} while sample is {}".
+                        format(self.count(), size)
+                    )
+                    slots = np.zeros((0, ), dtype=np.int64)
+                else:
+                    raise ValueError("There are less than {} records in buffer({})".format(size, self.count()))
+        return self.storage.gather(slots)
+
+    @apply_middleware("update")
+    def update(self, index: str, data: Optional[Any] = None, meta: Optional[dict] = None) -> bool:
+        if index not in self.storage.slot_of:
+            return False
+        slot = self.storage.slot_of[index]
+        if data is not None:
+            _write_field(self.storage.fields, data, slot)
+        if meta is not None:
+            self.storage.meta[slot] = meta
+        return True
+
+    @apply_middleware("batch_update")
+    def batch_update(
+            self,
+            indices: List[str],
+            datas: Optional[List[Optional[Any]]] = None,
+            metas: Optional[List[Optional[dict]]] = None
+    ) -> None:
+        datas = datas if datas is not None else [None] * len(indices)
+        metas = metas if metas is not None else [None] * len(indices)
+        for index, data, meta in zip(indices, datas, metas):
+            self.update(index, data, meta)
+
+    @apply_middleware("delete")
+    def delete(self, indices: Union[str, Iterable[str]]) -> None:
+        if isinstance(indices, str):
+            indices = [indices]
+        for index in indices:
+            self.storage.remove(index)
+
+    def count(self) -> int:
+        return len(self.storage)
+
+    def get(self, idx: int) -> BufferedData:
+        slot = self.storage.valid_slots()[idx]
+        return self.storage.gather(np.array([slot]))[0]
+
+    @apply_middleware("clear")
+    def clear(self) -> None:
+        self.storage.clear()
+
+    def import_data(self, data_with_meta: List[Tuple[Any, dict]]) -> None:
+        for data, meta in data_with_meta:
+            self._push(data, meta)
+
+    def export_data(self) -> List[BufferedData]:
+        return list(self)
+
+    def _push(self, data: Any, meta: Optional[dict] = None) -> BufferedData:
+        index = uuid.uuid1().hex
+        if meta is None:
+            meta = {}
+        self.storage.append(data, index, meta)
+        return BufferedData(data=data, index=index, meta=meta)
+
+    def __iter__(self) -> Iterator[BufferedData]:
+        for slot in self.storage.valid_slots():
+            yield self.storage.gather(np.array([slot]))[0]
+
+    def __copy__(self) -> "ArrayBuffer":
+        buffer = type(self)(size=self.storage.size)
+        buffer.storage = self.storage
+        return buffer
@@ -12,19 +12,24 @@ import logging
 class BufferIndex():
     """
     Overview:
-        Save index string and offset in key value pair.
+        Save index string and offset in key value pair. The offset is a monotonically increasing serial number \
+        of the pushed data, and ``head`` is the serial number of the first data in the storage, so the position \
+        of a data in the storage is ``offset - head``. The buffered data of each index is also kept, so all the \
+        operations are O(1) and don't need to visit the storage.
     """
 
     def __init__(self, maxlen: int, *args, **kwargs):
         self.maxlen = maxlen
-        self.__map = OrderedDict(*args, **kwargs)
-        self._last_key = next(reversed(self.__map)) if len(self) > 0 else None
-        self._cumlen = len(self.__map)
+        self.__map = dict(*args, **kwargs)
+        self.__buffered = {}
+        self._head = 0
+        self._next = max(self.__map.values()) + 1 if len(self) > 0 else 0
 
     def get(self, key: str) -> int:
-        value = self.__map[key]
-        value = value % self._cumlen + min(0, (self.maxlen - self._cumlen))
-        return value
+        return self.__map[key] - self._head
+
+    def get_buffered(self, key: str) -> BufferedData:
+        return self.__buffered[key]
 
     def __len__(self) -> int:
         return len(self.__map)
@@ -32,23 +37,34 @@ class BufferIndex():
     def has(self, key: str) -> bool:
         return key in self.__map
 
-    def append(self, key: str):
-        self.__map[key] = self.__map[self._last_key] + 1 if self._last_key else 0
-        self._last_key = key
-        self._cumlen += 1
-        if len(self) > self.maxlen:
-            self.__map.popitem(last=False)
+    def append(self, key: str, buffered: Optional[BufferedData] = None):
+        self.__map[key] = self._next
+        self.__buffered[key] = buffered
+        self._next += 1
+
+    def pop(self, key: str):
+        self.__map.pop(key)
+        self.__buffered.pop(key, None)
+
+    def shift(self):
+        """
+        Overview:
+            Called when the first record in the storage is popped out, all the positions decrease by 1.
+        """
+        self._head += 1
 
     def clear(self):
-        self.__map = OrderedDict()
-        self._last_key = None
-        self._cumlen = 0
+        self.__map = {}
+        self.__buffered = {}
+        self._head = 0
+        self._next = 0
 
 
 class DequeBuffer(Buffer):
 
     def __init__(self, size: int) -> None:
         super().__init__()
+        # Deleted records are kept in storage until ``_compact``, a record is valid only if it's still in indices.
         self.storage = deque(maxlen=size)
         # Meta index is a dict which use deque as values
         self.indices = BufferIndex(maxlen=size)
@@ -69,6 +85,9 @@ class DequeBuffer(Buffer):
             groupby: str = None,
             rolling_window: int = None
     ) -> Union[List[BufferedData], List[List[BufferedData]]]:
+        if sample_range or groupby or rolling_window:
+            # These sample methods rely on the position of records, so remove deleted records first.
+            self._compact()
         storage = self.storage
         if sample_range:
             storage = list(itertools.islice(self.storage, sample_range.start, sample_range.stop, sample_range.step))
@@ -88,18 +107,16 @@ class DequeBuffer(Buffer):
         value_error = None
         sampled_data = []
         if indices:
-            indices_set = set(indices)
-            hashed_data = filter(lambda item: item.index in indices_set, storage)
-            hashed_data = map(lambda item: (item.index, item), hashed_data)
-            hashed_data = dict(hashed_data)
-            # Re-sample and return in indices order
-            sampled_data = [hashed_data[index] for index in indices]
+            # Look up each index directly, which is independent of the buffer size
+            sampled_data = [self.indices.get_buffered(index) for index in indices]
         elif groupby:
             sampled_data = self._sample_by_group(size=size, groupby=groupby, replace=replace, storage=storage)
         elif rolling_window:
             sampled_data = self._sample_by_rolling_window(
                 size=size, replace=replace, rolling_window=rolling_window, storage=storage
             )
+        elif len(self.storage) != self.count():
+            sampled_data = self._sample_valid(size=size, replace=replace)
         else:
             if replace:
                 sampled_data = random.choices(storage, k=size)
@@ -126,50 +143,48 @@ class DequeBuffer(Buffer):
     def update(self, index: str, data: Optional[Any] = None, meta: Optional[dict] = None) -> bool:
         if not self.indices.has(index):
             return False
-        i = self.indices.get(index)
-        item = self.storage[i]
+        item = self.indices.get_buffered(index)
         if data is not None:
             item.data = data
         if meta is not None:
             item.meta = meta
-            for key in self.meta_index:
-                self.meta_index[key][i] = meta[key] if key in meta else None
+            if len(self.meta_index) > 0:
+                i = self.indices.get(index)
+                for key in self.meta_index:
+                    self.meta_index[key][i] = meta[key] if key in meta else None
         return True
 
     @apply_middleware("delete")
     def delete(self, indices: Union[str, Iterable[str]]) -> None:
         if isinstance(indices, str):
             indices = [indices]
-        del_idx = []
+        # Only remove the index, deleted records are removed from storage in batch when they make up half of it,
+        # so the amortized cost of deleting is O(1) for each record.
         for index in indices:
             if self.indices.has(index):
-                del_idx.append(self.indices.get(index))
-        if len(del_idx) == 0:
-            return
-        del_idx = sorted(del_idx, reverse=True)
-        for idx in del_idx:
-            del self.storage[idx]
-        remain_indices = [item.index for item in self.storage]
-        key_value_pairs = zip(remain_indices, range(len(indices)))
-        self.indices = BufferIndex(self.storage.maxlen, key_value_pairs)
+                self.indices.pop(index)
+        if len(self.storage) - self.count() >= self.count():
+            self._compact()
 
     def count(self) -> int:
-        return len(self.storage)
+        return len(self.indices)
 
     def get(self, idx: int) -> BufferedData:
+        self._compact()
         return self.storage[idx]
 
     @apply_middleware("clear")
     def clear(self) -> None:
         self.storage.clear()
         self.indices.clear()
-        self.meta_index = {}
+        self.meta_index.clear()
 
     def import_data(self, data_with_meta: List[Tuple[Any, dict]]) -> None:
         for data, meta in data_with_meta:
             self._push(data, meta)
 
     def export_data(self) -> List[BufferedData]:
+        self._compact()
         return list(self.storage)
 
     def _push(self, data: Any, meta: Optional[dict] = None) -> BufferedData:
@@ -177,14 +192,70 @@ class DequeBuffer(Buffer):
         if meta is None:
             meta = {}
         buffered = BufferedData(data=data, index=index, meta=meta)
+        if len(self.storage) == self.storage.maxlen:
+            # The first record will be popped out by deque
+            first = self.storage[0]
+            if self.indices.has(first.index):
+                self.indices.pop(first.index)
+            self.indices.shift()
         self.storage.append(buffered)
-        self.indices.append(index)
+        self.indices.append(index, buffered)
         # Add meta index
         for key in self.meta_index:
             self.meta_index[key].append(meta[key] if key in meta else None)
 
         return buffered
 
+    def _compact(self) -> None:
+        """
+        Overview:
+            Remove deleted records from storage and meta index in place, then rebuild the offsets in indices.
+        """
+        if len(self.storage) == self.count():
+            return
+        valid = [self.indices.has(item.index) for item in self.storage]
+        records = [item for item, v in zip(self.storage, valid) if v]
+        self.storage.clear()
+        self.storage.extend(records)
+        self.indices.clear()
+        for item in records:
+            self.indices.append(item.index, item)
+        for values in self.meta_index.values():
+            remain_values = [value for value, v in zip(values, valid) if v]
+            values.clear()
+            values.extend(remain_values)
+
+    def _sample_valid(self, size: int, replace: bool = False) -> List[BufferedData]:
+        """
+        Overview:
+            Sample when some deleted records are still in storage, deleted records are rejected and resampled. \
+            Since deleted records are less than half of the storage, the expected number of tries is O(size).
+        """
+        count = self.count()
+        if replace:
+            sampled_data = []
+            while count > 0 and len(sampled_data) < size:
+                candidates = random.choices(self.storage, k=size - len(sampled_data))
+                sampled_data += [item for item in candidates if self.indices.has(item.index)]
+            return sampled_data
+        elif size > count:
+            return []
+        elif size * 2 > count:
+            # Rejection is inefficient when sampling most of the records
+            return random.sample([item for item in self.storage if self.indices.has(item.index)], k=size)
+        else:
+            sampled_pos = set()
+            sampled_data = []
+            while len(sampled_data) < size:
+                pos = random.randrange(len(self.storage))
+                if pos in sampled_pos:
+                    continue
+                sampled_pos.add(pos)
+                item = self.storage[pos]
+                if self.indices.has(item.index):
+                    sampled_data.append(item)
+            return sampled_data
+
     def _independence(
         self, buffered_samples: Union[List[BufferedData], List[List[BufferedData]]]
     ) -> Union[List[BufferedData], List[List[BufferedData]]]:
@@ -274,9 +345,12 @@ class DequeBuffer(Buffer):
             self.meta_index[meta_key].append(data.meta[meta_key] if meta_key in data.meta else None)
 
     def __iter__(self) -> deque:
+        self._compact()
         return iter(self.storage)
 
     def __copy__(self) -> "DequeBuffer":
         buffer = type(self)(size=self.storage.maxlen)
         buffer.storage = self.storage
+        buffer.indices = self.indices
+        buffer.meta_index = self.meta_index
         return buffer
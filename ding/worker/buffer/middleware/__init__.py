@@ -4,3 +4,5 @@ from .staleness_check import staleness_check
 from .priority import PriorityExperienceReplay
 from .padding import padding
 from .group_sample import group_sample
+from .frame_dedup import frame_dedup
+from .compression import compression
@@ -0,0 +1,197 @@
+from typing import Callable, Any, Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import time
+import weakref
+import numpy as np
+import torch
+from ding.utils import get_data_compressor, get_data_decompressor
+from ding.worker.buffer.buffer import BufferedData
+from ding.worker.buffer.array_buffer import BufferedBatch
+
+
+class CompressedField:
+    """
+    Overview:
+        Compressed value of a field in buffer, ``codec`` is the name of the compressor in \
+        ``ding.utils.compression_helper``.
+    """
+    __slots__ = ['codec', 'payload']
+
+    def __init__(self, codec: str, payload: bytes) -> None:
+        self.codec = codec
+        self.payload = payload
+
+
+class CompressionCounter:
+    """
+    Overview:
+        Counters of the compression middleware, show how much memory is saved and how much latency is added.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.compress_count = 0
+        self.compress_time = 0.
+        self.decompressed_bytes = 0
+        self.decompress_count = 0
+        self.decompress_time = 0.
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Overview:
+            Summary of all the pushed and sampled data since the last reset. The throughput is in MB/s of raw data, \
+            the decompress latency is the time of decompressing one sampled batch.
+        """
+        mb = 1024 * 1024
+        return {
+            'raw_mb': self.raw_bytes / mb,
+            'compressed_mb': self.compressed_bytes / mb,
+            'saved_mb': (self.raw_bytes - self.compressed_bytes) / mb,
+            'compress_ratio': self.raw_bytes / max(self.compressed_bytes, 1),
+            'compress_throughput': self.raw_bytes / mb / max(self.compress_time, 1e-8),
+            'decompress_throughput': self.decompressed_bytes / mb / max(self.decompress_time, 1e-8),
+            'decompress_latency': self.decompress_time / max(self.decompress_count, 1),
+        }
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif isinstance(value, torch.Tensor):
+        return value.element_size() * value.numel()
+    else:
+        return len(pickle.dumps(value))
+
+
+def compression(
+        buffer_: 'Buffer',  # noqa
+        fields: Union[List[str], Dict[str, str]] = ['obs', 'next_obs'],
+        codec: str = 'lz4_raw',
+        num_workers: int = 0
+) -> Callable:
+    """
+    Overview:
+        This middleware keeps large fields (e.g. image observations) compressed in buffer. Fields are compressed \
+        when pushing, and only the sampled data is decompressed.
+    Arguments:
+        - buffer_ (:obj:`Buffer`): The buffer, ``DequeBuffer`` or ``ArrayBuffer``.
+        - fields (:obj:`Union[List[str], Dict[str, str]]`): Fields to compress, or a dict of field and its codec.
+        - codec (:obj:`str`): Default codec of fields, refer to ``ding.utils.compression_helper``, ``lz4_raw`` and \
+            ``zlib_raw`` compress ``np.ndarray`` and ``torch.Tensor`` without pickle.
+        - num_workers (:obj:`int`): Number of threads to decompress sampled data, 0 means decompressing in the \
+            caller thread. Both lz4 and zlib release the GIL, so large batches are decompressed in parallel.
+    .. note::
+        The data returned by ``get``, ``export_data`` and iterating the buffer is still compressed. Statistics can \
+        be found in ``counter`` of the returned middleware. The decompression threads are released by ``close`` \
+        of the returned middleware, or when the middleware (e.g. with its buffer) is garbage collected.
+    """
+    if not isinstance(fields, dict):
+        fields = {k: codec for k in fields}
+    compressors = {k: get_data_compressor(c) for k, c in fields.items()}
+    decompressors = {c: get_data_decompressor(c) for c in fields.values()}
+    counter = CompressionCounter()
+    pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='buffer_decompress') \
+        if num_workers > 0 else None
+
+    def _compress(data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        start = time.time()
+        for k, compressor in compressors.items():
+            if k in data and not isinstance(data[k], CompressedField):
+                value = data[k]
+                data[k] = CompressedField(fields[k], compressor(value))
+                counter.raw_bytes += _nbytes(value)
+                counter.compressed_bytes += len(data[k].payload)
+                counter.compress_count += 1
+        counter.compress_time += time.time() - start
+        return data
+
+    def _decompress_field(field: CompressedField) -> Any:
+        return decompressors[field.codec](field.payload)
+
+    def _decompress_all(compressed: List[CompressedField]) -> List[Any]:
+        start = time.time()
+        if pool is not None and len(compressed) > 1:
+            values = list(pool.map(_decompress_field, compressed))
+        else:
+            values = [_decompress_field(field) for field in compressed]
+        counter.decompress_time += time.time() - start
+        counter.decompressed_bytes += sum([_nbytes(v) for v in values if isinstance(v, (np.ndarray, torch.Tensor))])
+        counter.decompress_count += 1
+        return values
+
+    def _decompress(sampled_data: List[BufferedData]) -> List[BufferedData]:
+        # Copy the data dict, because sampled data may share the same object with data in buffer.
+        decompressed = [dict(item.data) if isinstance(item.data, dict) else item.data for item in sampled_data]
+        positions = [(i, k) for i, d in enumerate(decompressed) if isinstance(d, dict) for k in fields]
+        positions = [(i, k) for i, k in positions if isinstance(decompressed[i].get(k), CompressedField)]
+        if len(positions) == 0:
+            return sampled_data
+        values = _decompress_all([decompressed[i][k] for i, k in positions])
+        for (i, k), v in zip(positions, values):
+            decompressed[i][k] = v
+        return [BufferedData(data=d, index=item.index, meta=item.meta) for d, item in zip(decompressed, sampled_data)]
+
+    def _decompress_batch(batch: BufferedBatch) -> BufferedBatch:
+        if not isinstance(batch.data, dict):
+            return batch
+        batch.data = dict(batch.data)
+        keys = [k for k in fields if k in batch.data]
+        compressed = [field for k in keys for field in batch.data[k]]
+        if len(compressed) == 0:
+            return batch
+        values = _decompress_all(compressed)
+        for j, k in enumerate(keys):
+            field_values = values[j * len(batch):(j + 1) * len(batch)]
+            if isinstance(field_values[0], np.ndarray):
+                batch.data[k] = np.stack(field_values)
+            elif isinstance(field_values[0], torch.Tensor):
+                batch.data[k] = torch.stack(field_values)
+            else:
+                batch.data[k] = field_values
+        return batch
+
+    def push(chain: Callable, data: Any, *args, **kwargs) -> BufferedData:
+        return chain(_compress(data), *args, **kwargs)
+
+    def sample(chain: Callable, *args, **kwargs) -> Union[List[BufferedData], List[List[BufferedData]], BufferedBatch]:
+        sampled_data = chain(*args, **kwargs)
+        if isinstance(sampled_data, BufferedBatch):
+            return _decompress_batch(sampled_data)
+        elif len(sampled_data) > 0 and isinstance(sampled_data[0], list):
+            return [_decompress(grouped_data) for grouped_data in sampled_data]
+        else:
+            return _decompress(sampled_data)
+
+    def update(chain: Callable, index: str, data: Optional[Any] = None, *args, **kwargs) -> bool:
+        if data is not None:
+            data = _compress(data)
+        return chain(index, data, *args, **kwargs)
+
+    def _compression(action: str, chain: Callable, *args, **kwargs) -> Any:
+        if action == "push":
+            return push(chain, *args, **kwargs)
+        elif action == "sample":
+            return sample(chain, *args, **kwargs)
+        elif action == "update":
+            return update(chain, *args, **kwargs)
+        return chain(*args, **kwargs)
+
+    def close() -> None:
+        nonlocal pool
+        if pool is not None:
+            pool.shutdown(wait=True)
+            pool = None
+
+    _compression.counter = counter
+    _compression.close = close
+    if pool is not None:
+        weakref.finalize(_compression, pool.shutdown, wait=False)
+    return _compression
@@ -0,0 +1,86 @@
+from typing import Callable, Any, List, Union, Iterable
+import numpy as np
+from ding.worker.buffer.buffer import BufferedData
+from ding.worker.buffer.array_buffer import ArrayStorage, BufferedBatch
+from ding.worker.buffer.utils import FrameStorage
+
+
+def frame_dedup(buffer_: 'Buffer', keys: List[str] = ['obs', 'next_obs'], capacity: int = 1024) -> Callable:  # noqa
+    """
+    Overview:
+        This middleware stores each unique frame of stacked observations (e.g. atari ``FrameStack``) only once. \
+        Stacked observations of ``keys`` are replaced by frame ids when pushing, and reconstructed when sampling.
+    Arguments:
+        - buffer_ (:obj:`Buffer`): The buffer, ``DequeBuffer`` or ``ArrayBuffer``.
+        - keys (:obj:`List[str]`): Keys of stacked observations in data.
+        - capacity (:obj:`int`): Initial capacity of the frame pool, it will grow if needed.
+    """
+    frame_storage = FrameStorage(capacity)
+
+    def _referenced() -> Iterable[np.ndarray]:
+        # Deleted records may be included, which just keeps some frames a bit longer
+        storage = buffer_.storage
+        if isinstance(storage, ArrayStorage):
+            if storage.fields is None:
+                return []
+            return [storage.fields[k][:storage.filled] for k in keys if k in storage.fields]
+        return [item.data[k] for item in storage if isinstance(item.data, dict) for k in keys if k in item.data]
+
+    def _encode(data: Any) -> Any:
+        if isinstance(data, dict):
+            return frame_storage.encode(data, keys, _referenced)
+        return data
+
+    def _decode(sampled_data: List[BufferedData]) -> List[BufferedData]:
+        if len(sampled_data) == 0:
+            return sampled_data
+        decoded = [dict(item.data) if isinstance(item.data, dict) else item.data for item in sampled_data]
+        for k in keys:
+            pos = [i for i, d in enumerate(decoded) if isinstance(d, dict) and k in d]
+            if len(pos) == 0:
+                continue
+            # Reconstruct all the stacked observations of the same key in one gather
+            frames = frame_storage.get(np.stack([decoded[i][k] for i in pos]))
+            for j, i in enumerate(pos):
+                decoded[i][k] = frames[j]
+        return [BufferedData(data=d, index=item.index, meta=item.meta) for d, item in zip(decoded, sampled_data)]
+
+    def push(chain: Callable, data: Any, *args, **kwargs) -> BufferedData:
+        return chain(_encode(data), *args, **kwargs)
+
+    def sample(chain: Callable, *args, **kwargs) -> Union[List[BufferedData], List[List[BufferedData]], BufferedBatch]:
+        sampled_data = chain(*args, **kwargs)
+        if isinstance(sampled_data, BufferedBatch):
+            if isinstance(sampled_data.data, dict):
+                sampled_data.data = dict(sampled_data.data)
+                for k in keys:
+                    if k in sampled_data.data:
+                        sampled_data.data[k] = frame_storage.get(sampled_data.data[k])
+            return sampled_data
+        elif len(sampled_data) > 0 and isinstance(sampled_data[0], list):
+            return [_decode(grouped_data) for grouped_data in sampled_data]
+        else:
+            return _decode(sampled_data)
+
+    def update(chain: Callable, index: str, data: Any = None, *args, **kwargs) -> bool:
+        if data is not None:
+            data = _encode(data)
+        return chain(index, data, *args, **kwargs)
+
+    def clear(chain: Callable) -> None:
+        frame_storage.clear()
+        return chain()
+
+    def _frame_dedup(action: str, chain: Callable, *args, **kwargs) -> Any:
+        if action == "push":
+            return push(chain, *args, **kwargs)
+        elif action == "sample":
+            return sample(chain, *args, **kwargs)
+        elif action == "update":
+            return update(chain, *args, **kwargs)
+        elif action == "clear":
+            return clear(chain)
+        return chain(*args, **kwargs)
+
+    _frame_dedup.frame_storage = frame_storage
+    return _frame_dedup
@@ -1,8 +1,10 @@
 from typing import Callable, Any, List, Dict, Optional, Union
 import copy
 import numpy as np
+import torch
 from ding.utils import SumSegmentTree, MinSegmentTree
 from ding.worker.buffer.buffer import BufferedData
+from ding.worker.buffer.array_buffer import BufferedBatch
 
 
 class PriorityExperienceReplay:
@@ -17,7 +19,9 @@ class PriorityExperienceReplay:
             IS_weight_anneal_train_iter: int = int(1e5),
     ) -> None:
         self.buffer = buffer
+        # Map the position in sum tree to the index of buffered data, and vice versa.
         self.buffer_idx = {}
+        self.tree_idx = {}
         self.buffer_size = buffer_size
         self.IS_weight = IS_weight
         self.priority_power_factor = priority_power_factor
@@ -44,34 +48,40 @@ class PriorityExperienceReplay:
         self._update_tree(meta['priority'], self.pivot)
         buffered = chain(data, meta=meta, *args, **kwargs)
         index = buffered.index
+        if self.pivot in self.buffer_idx:
+            self.tree_idx.pop(self.buffer_idx[self.pivot], None)
         self.buffer_idx[self.pivot] = index
+        self.tree_idx[index] = self.pivot
         self.pivot = (self.pivot + 1) % self.buffer_size
         return buffered
 
     def sample(self, chain: Callable, size: int, *args,
-               **kwargs) -> Union[List[BufferedData], List[List[BufferedData]]]:
+               **kwargs) -> Union[List[BufferedData], List[List[BufferedData]], BufferedBatch]:
         # Divide [0, 1) into size intervals on average
-        intervals = np.array([i * 1.0 / size for i in range(size)])
+        intervals = np.arange(size) * 1.0 / size
         # Uniformly sample within each interval
         mass = intervals + np.random.uniform(size=(size, )) * 1. / size
         # Rescale to [0, S), where S is the sum of all datas' priority (root value of sum tree)
         mass *= self.sum_tree.reduce()
-        indices = [self.sum_tree.find_prefixsum_idx(m) for m in mass]
-        indices = [self.buffer_idx[i] for i in indices]
+        indices = self.sum_tree.find_prefixsum_idx_batch(mass)
+        indices = [self.buffer_idx[i] for i in indices.tolist()]
         # Sample with indices
         data = chain(indices=indices, *args, **kwargs)
         if self.IS_weight:
-            # Calculate max weight for normalizing IS
+            # Calculate IS of the whole batch, priorities are gathered from the leaves of sum tree at once
             sum_tree_root = self.sum_tree.reduce()
             p_min = self.min_tree.reduce() / sum_tree_root
             buffer_count = self.buffer.count()
             max_weight = (buffer_count * p_min) ** (-self.IS_weight_power_factor)
-            for i in range(len(data)):
-                meta = data[i].meta
-                priority_idx = meta['priority_idx']
-                p_sample = self.sum_tree[priority_idx] / sum_tree_root
-                weight = (buffer_count * p_sample) ** (-self.IS_weight_power_factor)
-                meta['priority_IS'] = weight / max_weight
+            priority_idx = np.array([meta['priority_idx'] for meta in data.meta]) \
+                if isinstance(data, BufferedBatch) else np.array([d.meta['priority_idx'] for d in data])
+            p_sample = self.sum_tree[priority_idx] / sum_tree_root
+            weight = (buffer_count * p_sample) ** (-self.IS_weight_power_factor) / max_weight
+            if isinstance(data, BufferedBatch):
+                data.weight = torch.from_numpy(weight.astype(np.float32))
+            else:
+                for d, w in zip(data, weight.tolist()):
+                    d.meta['priority_IS'] = w
             self.IS_weight_power_factor = min(1.0, self.IS_weight_power_factor + self.delta_anneal)
         return data
 
@@ -85,13 +95,16 @@ class PriorityExperienceReplay:
             self._update_tree(new_priority, idx)
             self.max_priority = max(self.max_priority, new_priority)
 
-    def delete(self, chain: Callable, index: str, *args, **kwargs) -> None:
-        for item in self.buffer.storage:
-            meta = item.meta
-            priority_idx = meta['priority_idx']
+    def delete(self, chain: Callable, index: Union[str, List[str]], *args, **kwargs) -> None:
+        indices = [index] if isinstance(index, str) else index
+        priority_idx = [self.tree_idx.pop(i) for i in indices if i in self.tree_idx]
+        if len(priority_idx) > 0:
+            priority_idx = np.array(priority_idx)
             self.sum_tree[priority_idx] = self.sum_tree.neutral_element
-            self.min_tree[priority_idx] = self.min_tree.neutral_element
-            self.buffer_idx.pop(priority_idx)
+            if self.IS_weight:
+                self.min_tree[priority_idx] = self.min_tree.neutral_element
+            for i in priority_idx.tolist():
+                self.buffer_idx.pop(i)
         return chain(index, *args, **kwargs)
 
     def clear(self, chain: Callable) -> None:
@@ -101,6 +114,7 @@ class PriorityExperienceReplay:
         if self.IS_weight:
             self.min_tree = MinSegmentTree(capacity)
         self.buffer_idx = {}
+        self.tree_idx = {}
         self.pivot = 0
         chain()
 
@@ -0,0 +1,130 @@
+import pytest
+import numpy as np
+import torch
+from ding.worker.buffer import ArrayBuffer, BufferedBatch
+from ding.worker.buffer.buffer import BufferedData
+from ding.worker.buffer.middleware import PriorityExperienceReplay, use_time_check
+
+
+def get_data(i: int = 0) -> dict:
+    return {
+        'obs': np.full((4, ), i, dtype=np.float32),
+        'action': torch.LongTensor([i]),
+        'reward': float(i),
+        'done': False,
+        'info': {
+            'str': 'xxx'
+        },
+    }
+
+
+@pytest.mark.unittest
+def test_push_sample():
+    buffer = ArrayBuffer(size=10)
+    for i in range(20):
+        buffer.push(get_data(i))
+    assert buffer.count() == 10
+    assert isinstance(buffer.storage.fields['obs'], np.ndarray)
+    assert buffer.storage.fields['obs'].shape == (10, 4)
+    assert isinstance(buffer.storage.fields['action'], torch.Tensor)
+
+    batch = buffer.sample(5)
+    assert isinstance(batch, BufferedBatch)
+    assert len(batch) == 5
+    assert batch.data['obs'].shape == (5, 4)
+    assert batch.data['action'].shape == (5, 1)
+    assert batch.data['reward'].shape == (5, )
+    assert batch.data['done'].dtype == np.bool_
+    assert batch.data['info']['str'] == ['xxx'] * 5
+    assert all(batch.data['reward'] >= 10)
+    # Sampled data is a copy, modifying it won't change the data in buffer
+    batch.data['obs'][:] = -1
+    assert (buffer.storage.fields['obs'] >= 0).all()
+
+    # Each item of the batch is a BufferedData
+    item = batch[0]
+    assert isinstance(item, BufferedData)
+    assert item.data['obs'].shape == (4, )
+    assert item.data['reward'] >= 10
+
+    # Sample range and the order of the ring
+    for i in range(3):
+        buffer.push(get_data(20 + i))
+    batch = buffer.sample(3, sample_range=slice(-3, None))
+    assert sorted(batch.data['reward'].tolist()) == [20., 21., 22.]
+    assert buffer.get(0).data['reward'] == 13.
+    assert [item.data['reward'] for item in buffer] == list(range(13, 23))
+
+    # Replace and insufficient
+    assert len(buffer.sample(20, replace=True)) == 20
+    with pytest.raises(ValueError):
+        buffer.sample(20)
+    assert len(buffer.sample(20, ignore_insufficient=True)) == 0
+
+    # Schema mismatch
+    with pytest.raises(ValueError):
+        buffer.push({'obs': np.zeros(4)})
+
+    buffer.clear()
+    assert buffer.count() == 0
+
+
+@pytest.mark.unittest
+def test_indices_update_delete():
+    buffer = ArrayBuffer(size=10)
+    with pytest.raises(ValueError):
+        buffer.sample(indices=['invalidindex'])
+    indices = [buffer.push(get_data(i), {'meta': i}).index for i in range(10)]
+    batch = buffer.sample(indices=indices[3:6])
+    assert batch.index == indices[3:6]
+    assert batch.data['reward'].tolist() == [3., 4., 5.]
+    assert [m['meta'] for m in batch.meta] == [3, 4, 5]
+
+    assert buffer.update(indices[0], get_data(100), {'meta': 100})
+    assert not buffer.update('invalidindex', get_data(0))
+    item = buffer.sample(indices=[indices[0]])[0]
+    assert item.data['reward'] == 100.
+    assert item.meta['meta'] == 100
+
+    buffer.delete(indices[:5])
+    assert buffer.count() == 5
+    with pytest.raises(ValueError):
+        buffer.sample(indices=indices[4:6])
+    assert all(buffer.sample(5).data['reward'] >= 5)
+    with pytest.raises(ValueError):
+        buffer.sample(6)
+    # Deleted slots are reused by the ring
+    for i in range(5):
+        buffer.push(get_data(10 + i))
+    assert buffer.count() == 10
+    assert [item.data['reward'] for item in buffer] == list(range(5, 15))
+
+    # View shares the storage
+    view = buffer.view()
+    view.push(get_data(15))
+    assert buffer.count() == 10
+    assert buffer.get(-1).data['reward'] == 15.
+
+
+@pytest.mark.unittest
+def test_middleware():
+    buffer = ArrayBuffer(size=10)
+    buffer.use(PriorityExperienceReplay(buffer, buffer_size=10, IS_weight=True))
+    for i in range(10):
+        buffer.push(get_data(i), {'priority': float(i + 1)})
+    batch = buffer.sample(4)
+    assert batch.data['obs'].shape == (4, 4)
+    # IS weights of the whole batch are a single tensor
+    assert isinstance(batch.weight, torch.Tensor) and batch.weight.shape == (4, )
+    assert batch.weight.max().item() <= 1. + 1e-6
+    for item in batch:
+        item.meta['priority'] = 1.
+        buffer.update(item.index, None, item.meta)
+
+    buffer = ArrayBuffer(size=10)
+    buffer.use(use_time_check(buffer, max_use=2))
+    for i in range(6):
+        buffer.push(get_data(i))
+    for _ in range(2):
+        assert len(buffer.sample(6)) == 6
+    assert buffer.count() == 0
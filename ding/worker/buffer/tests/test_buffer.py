@@ -176,6 +176,37 @@ def test_delete():
         assert buf.indices.get(index) == i
 
 
+@pytest.mark.unittest
+def test_lazy_delete():
+    buf = DequeBuffer(size=10)
+    indices = [buf.push(i).index for i in range(10)]
+    # Delete less than half, deleted records are only removed from indices
+    buf.delete(indices[:4])
+    assert buf.count() == 6
+    assert len(buf.storage) == 10
+    for _ in range(10):
+        assert all(item.data >= 4 for item in buf.sample(3))
+        assert all(item.data >= 4 for item in buf.sample(6))
+        assert all(item.data >= 4 for item in buf.sample(12, replace=True))
+    with pytest.raises(ValueError):
+        buf.sample(7)
+    assert buf.sample(indices=[indices[5]])[0].data == 5
+    assert not buf.update(indices[0], -1)
+    assert buf.update(indices[5], -1)
+    # Deleted records are overwritten first when the buffer is full
+    for i in range(10, 14):
+        buf.push(i)
+    assert buf.count() == 10
+    assert len(buf.storage) == 10
+    assert [item.data for item in buf] == [4, -1, 6, 7, 8, 9, 10, 11, 12, 13]
+    # Storage will be compacted before using position
+    buf.delete(indices[6])
+    assert buf.get(2).data == 7
+    assert len(buf.storage) == 9
+    for i in range(9):
+        assert buf.indices.get(buf.storage[i].index) == i
+
+
 @pytest.mark.unittest
 def test_ignore_insufficient():
     buffer = DequeBuffer(size=10)
@@ -0,0 +1,25 @@
+import time
+import random
+import pytest
+import numpy as np
+from ding.worker.buffer import DequeBuffer
+
+
+def get_sample_latency(buffer_size: int, batch_size: int = 64, repeat: int = 100) -> float:
+    buffer = DequeBuffer(size=buffer_size)
+    indices = [buffer.push({'obs': np.zeros(4)}).index for _ in range(buffer_size)]
+    sampled_indices = [random.sample(indices, k=batch_size) for _ in range(repeat)]
+    start = time.time()
+    for index in sampled_indices:
+        buffer.sample(indices=index)
+        buffer.update(index[0], meta={'priority': 1.})
+    return (time.time() - start) / repeat
+
+
+@pytest.mark.benchmark
+def test_sample_with_indices_benchmark():
+    latency = {size: get_sample_latency(size) for size in [int(1e3), int(1e4), int(1e5)]}
+    for size, t in latency.items():
+        print('buffer size: {}, sample latency: {:.6f}s'.format(size, t))
+    # Sample with indices should be independent of the buffer size
+    assert latency[int(1e5)] < latency[int(1e3)] * 5
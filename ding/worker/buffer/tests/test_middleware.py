@@ -1,7 +1,8 @@
 import pytest
 import torch
-from ding.worker.buffer import DequeBuffer
-from ding.worker.buffer.middleware import clone_object, use_time_check, staleness_check
+import numpy as np
+from ding.worker.buffer import DequeBuffer, ArrayBuffer
+from ding.worker.buffer.middleware import clone_object, use_time_check, staleness_check, frame_dedup, compression
 from ding.worker.buffer.middleware import PriorityExperienceReplay, group_sample
 from ding.worker.buffer.middleware.padding import padding
 
@@ -104,8 +105,13 @@ def test_priority():
         buffer.update(index, data, meta)
     data = buffer.sample(size=1)
     assert data[0].meta['priority'] == 3.0
+    priority_idx = data[0].meta['priority_idx']
     buffer.delete(data[0].index)
     assert buffer.count() == N + N - 1
+    # Only the deleted data is removed from the sum tree
+    priority = buffer.middleware[0]
+    assert priority.sum_tree[priority_idx] == 0
+    assert data[0].index not in [item.index for item in buffer.sample(size=N + N - 1)]
     buffer.clear()
     assert buffer.count() == 0
 
@@ -153,3 +159,71 @@ def test_group_sample():
             check_group1(grouped_data)
         else:
             check_group0(grouped_data)
+
+
+def get_frame_stack_data(n: int, n_frames: int = 4) -> list:
+    frames = [np.full((8, 8), i, dtype=np.float32) for i in range(n + n_frames)]
+    return [
+        {
+            'obs': np.stack(frames[t:t + n_frames]),
+            'next_obs': np.stack(frames[t + 1:t + 1 + n_frames]),
+            'reward': float(t)
+        } for t in range(n)
+    ]
+
+
+@pytest.mark.unittest
+def test_frame_dedup():
+    for buffer_type in [DequeBuffer, ArrayBuffer]:
+        buffer = buffer_type(size=10)
+        dedup = frame_dedup(buffer, capacity=8)
+        buffer.use(dedup)
+        data = get_frame_stack_data(30)
+        for d in data:
+            buffer.push(d)
+        assert buffer.count() == 10
+        # Each transition only adds one new frame, so the frame pool is collected instead of growing too much
+        assert dedup.frame_storage.capacity <= 32
+        sampled_data = buffer.sample(5)
+        if buffer_type == ArrayBuffer:
+            assert sampled_data.data['obs'].shape == (5, 4, 8, 8)
+            sampled_data = list(sampled_data)
+        for item in sampled_data:
+            t = int(item.data['reward'])
+            assert t >= 20
+            assert (item.data['obs'] == data[t]['obs']).all()
+            assert (item.data['next_obs'] == data[t]['next_obs']).all()
+        buffer.clear()
+        assert len(dedup.frame_storage) == 0
+
+
+@pytest.mark.unittest
+def test_compression():
+    for buffer_type in [DequeBuffer, ArrayBuffer]:
+        for num_workers in [0, 2]:
+            buffer = buffer_type(size=10)
+            compress = compression(buffer, fields={'obs': 'lz4_raw', 'action': 'zlib_raw'}, num_workers=num_workers)
+            buffer.use(compress)
+            for i in range(10):
+                buffer.push({'obs': np.full((4, 84, 84), i, dtype=np.uint8), 'action': torch.LongTensor([i])})
+            # Data in buffer is compressed
+            assert not isinstance(buffer.get(0).data['obs'], np.ndarray)
+            sampled_data = buffer.sample(5)
+            if buffer_type == ArrayBuffer:
+                assert sampled_data.data['obs'].shape == (5, 4, 84, 84)
+                assert sampled_data.data['action'].shape == (5, 1)
+                sampled_data = list(sampled_data)
+            for item in sampled_data:
+                assert item.data['obs'].dtype == np.uint8
+                assert (item.data['obs'] == item.data['action'].item()).all()
+            summary = compress.counter.summary()
+            assert summary['compress_ratio'] > 10
+            assert summary['saved_mb'] > 0
+            assert compress.counter.decompress_count == 1
+            # Decompress in the caller thread after the threads are released
+            compress.close()
+            sampled_data = buffer.sample(2)
+            if buffer_type == ArrayBuffer:
+                sampled_data = list(sampled_data)
+            for item in sampled_data:
+                assert (item.data['obs'] == item.data['action'].item()).all()
@@ -1 +1,2 @@
 from .fast_copy import FastCopy, fastcopy
+from .frame_storage import FrameStorage
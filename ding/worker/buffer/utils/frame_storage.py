@@ -0,0 +1,126 @@
+from typing import Any, Callable, Iterable, List
+import itertools
+import numpy as np
+
+
+class FrameStorage:
+    """
+    Overview:
+        Store each unique frame of stacked observations only once. A stacked observation (e.g. the output of \
+        ``FrameStack``, or ``LazyFrames``) is split into frames, each frame is deduplicated by its content and \
+        saved in a frame pool, and the observation is replaced by the frame ids. Consecutive observations and \
+        ``obs``/``next_obs`` of a transition share most of their frames, so the memory cost is about one frame \
+        per transition instead of ``2 * n_frames``.
+    Interface:
+        ``__init__``, ``add``, ``encode``, ``get``, ``collect``, ``clear``, ``__len__``
+    .. note::
+        Frames are never freed one by one, when the pool is full, ``referenced_fn`` passed to ``add`` is called \
+        to collect all the frame ids still referenced by the buffer, and the other frames are freed. The pool \
+        doubles its capacity if less than half of it is freed.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.capacity = capacity
+        self.pool = None
+        self.clear()
+
+    def clear(self) -> None:
+        # Map frame hash to its id in the pool, and the inverse map of each id.
+        self._hash_id = {}
+        self._id_hash = [None for _ in range(self.capacity)]
+        self._free_ids = list(range(self.capacity - 1, -1, -1))
+
+    def add(self, stacked: Any, referenced_fn: Callable[[], Iterable[np.ndarray]]) -> np.ndarray:
+        """
+        Overview:
+            Add a stacked observation into storage.
+        Arguments:
+            - stacked (:obj:`Any`): Stacked observation, ``np.ndarray`` or ``LazyFrames`` whose first dim is frame.
+            - referenced_fn (:obj:`Callable`): Return all the frame id arrays in use, called when the pool is full.
+        Returns:
+            - ids (:obj:`np.ndarray`): Frame ids of the stacked observation, whose shape is ``(n_frames, )``.
+        """
+        ids = np.empty((len(stacked), ), dtype=np.int64)
+        for i in range(len(stacked)):
+            frame = np.asarray(stacked[i])
+            if self.pool is None:
+                self.pool = np.zeros((self.capacity, *frame.shape), dtype=frame.dtype)
+            key = hash(frame.tobytes())
+            frame_id = self._hash_id.get(key)
+            if frame_id is None or not np.array_equal(self.pool[frame_id], frame):
+                if len(self._free_ids) == 0:
+                    self.collect(referenced_fn(), keep=ids[:i])
+                frame_id = self._free_ids.pop()
+                self.pool[frame_id] = frame
+                if key not in self._hash_id:
+                    # If different frames have the same hash, only the first one can be shared.
+                    self._hash_id[key] = frame_id
+                    self._id_hash[frame_id] = key
+            ids[i] = frame_id
+        return ids
+
+    def encode(self, data: dict, keys: List[str], referenced_fn: Callable[[], Iterable[np.ndarray]]) -> dict:
+        """
+        Overview:
+            Replace the stacked observations of ``keys`` in data by frame ids, return a new dict.
+        Arguments:
+            - data (:obj:`dict`): Data dict, e.g. a transition.
+            - keys (:obj:`List[str]`): Keys of stacked observations, e.g. ``['obs', 'next_obs']``.
+            - referenced_fn (:obj:`Callable`): Return all the frame id arrays in use, refer to ``add``.
+        Returns:
+            - data (:obj:`dict`): The shallow copy of data, whose stacked observations are replaced by frame ids.
+        """
+        data = dict(data)
+        encoded = []
+        for k in keys:
+            if k in data:
+                # Frames of previous keys are not referenced by the buffer yet, so they should be kept
+                data[k] = self.add(data[k], lambda: itertools.chain(referenced_fn(), encoded))
+                encoded.append(data[k])
+        return data
+
+    def get(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Overview:
+            Reconstruct the stacked observations from frame ids.
+        Arguments:
+            - ids (:obj:`np.ndarray`): Frame ids, shape is ``(..., n_frames)``.
+        Returns:
+            - stacked (:obj:`np.ndarray`): Stacked observations, shape is ``(..., n_frames, *frame_shape)``.
+        """
+        return self.pool[ids]
+
+    def collect(self, referenced: Iterable[np.ndarray], keep: np.ndarray = None) -> None:
+        """
+        Overview:
+            Free all the frames that are not referenced, grow the pool if less than half of it can be freed.
+        Arguments:
+            - referenced (:obj:`Iterable[np.ndarray]`): Frame id arrays in use.
+            - keep (:obj:`np.ndarray`): Extra frame ids which should not be freed, e.g. the adding ones.
+        """
+        used = np.zeros((self.capacity, ), dtype=bool)
+        for ids in referenced:
+            used[ids] = True
+        if keep is not None:
+            used[keep] = True
+        for frame_id in np.nonzero(~used)[0].tolist():
+            key = self._id_hash[frame_id]
+            if key is not None:
+                self._hash_id.pop(key)
+                self._id_hash[frame_id] = None
+        self._free_ids = np.nonzero(~used)[0][::-1].tolist()
+        if len(self._free_ids) < self.capacity // 2:
+            new_capacity = self.capacity * 2
+            pool = np.zeros((new_capacity, *self.pool.shape[1:]), dtype=self.pool.dtype)
+            pool[:self.capacity] = self.pool
+            self.pool = pool
+            self._id_hash += [None for _ in range(new_capacity - self.capacity)]
+            self._free_ids = list(range(new_capacity - 1, self.capacity - 1, -1)) + self._free_ids
+            self.capacity = new_capacity
+
+    def __len__(self) -> int:
+        """
+        Overview:
+            The number of frames in the pool, including frames that are not referenced but not collected yet.
+        """
+        return self.capacity - len(self._free_ids)
@@ -1,6 +1,6 @@
 # serial
 from .base_serial_collector import ISerialCollector, create_serial_collector, get_serial_collector_cls, \
-    to_tensor_transitions
+    to_tensor_transitions, ColumnarTrajBuffer
 
 from .sample_serial_collector_ngu import SampleCollectorNGU
 from .sample_serial_collector import SampleSerialCollector
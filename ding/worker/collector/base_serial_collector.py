@@ -3,6 +3,8 @@ from typing import List, Dict, Any, Optional, Union
 from collections import namedtuple
 from easydict import EasyDict
 import copy
+import numpy as np
+import torch
 
 from ding.envs import BaseEnvManager
 from ding.utils import SERIAL_COLLECTOR_REGISTRY, import_module
@@ -193,6 +195,81 @@ class TrajBuffer(list):
         super().append(data)
 
 
+class ColumnarTrajBuffer(object):
+    """
+    Overview:
+        Columnar version of ``TrajBuffer`` for all the envs. Each key of transition is stored in a preallocated \
+        array whose shape is (env_num, capacity, ...), so transitions of many envs are written in one operation.
+        Like ``to_tensor_transitions``, ``next_obs`` is not stored as a column, the next_obs of a transition is \
+        the obs of the next one, and only the next_obs of the last appended transition is kept.
+    Interfaces:
+        __init__, append, pop, clear, length
+    """
+
+    def __init__(self, env_num: int, maxlen: Optional[int] = None, init_capacity: int = 64) -> None:
+        """
+        Overview:
+            Initialization columnar trajBuffer, the arrays are allocated by the first appended data.
+        Arguments:
+            - env_num (:obj:`int`): The number of envs.
+            - maxlen (:obj:`Optional[int]`): The maximum length of trajectory, None means the arrays grow on demand.
+            - init_capacity (:obj:`int`): The initial capacity of arrays if ``maxlen`` is None.
+        """
+        self._env_num = env_num
+        self._maxlen = maxlen
+        self._capacity = maxlen if maxlen is not None else init_capacity
+        self._columns = {}
+        self._next_obs = None
+        self._length = np.zeros(env_num, dtype=np.int64)
+
+    def append(self, env_id: np.ndarray, data: Dict[str, np.ndarray]) -> None:
+        """
+        Overview:
+            Append one transition for each env in ``env_id``.
+        Arguments:
+            - env_id (:obj:`np.ndarray`): Env ids, whose shape is (B, ) and elements are unique.
+            - data (:obj:`Dict[str, np.ndarray]`): Stacked transitions, the i-th row of each value belongs to \
+                ``env_id[i]``.
+        """
+        data = dict(data)
+        next_obs = data.pop('next_obs', None)
+        if len(self._columns) == 0:
+            for k, v in data.items():
+                self._columns[k] = np.zeros((self._env_num, self._capacity, *v.shape[1:]), dtype=v.dtype)
+            if next_obs is not None:
+                self._next_obs = np.zeros((self._env_num, *next_obs.shape[1:]), dtype=next_obs.dtype)
+        pos = self._length[env_id]
+        if len(pos) > 0 and pos.max() >= self._capacity:
+            assert self._maxlen is None, "traj length exceeds maxlen({})".format(self._maxlen)
+            for k, v in self._columns.items():
+                self._columns[k] = np.concatenate([v, np.zeros_like(v)], axis=1)
+            self._capacity *= 2
+        for k, v in data.items():
+            self._columns[k][env_id, pos] = v
+        if next_obs is not None:
+            self._next_obs[env_id] = next_obs
+        self._length[env_id] += 1
+
+    def length(self, env_id: int) -> int:
+        return int(self._length[env_id])
+
+    def pop(self, env_id: int) -> Dict[str, torch.Tensor]:
+        """
+        Overview:
+            Pop the whole traj of an env as a dict of tensors, whose leading dim is the traj length.
+        """
+        n = self._length[env_id]
+        traj = {k: torch.from_numpy(v[env_id, :n].copy()) for k, v in self._columns.items()}
+        if self._next_obs is not None:
+            next_obs = torch.from_numpy(self._next_obs[env_id:env_id + 1].copy())
+            traj['next_obs'] = torch.cat([traj['obs'][1:], next_obs]) if 'obs' in traj else next_obs
+        self._length[env_id] = 0
+        return traj
+
+    def clear(self, env_id: int) -> None:
+        self._length[env_id] = 0
+
+
 def to_tensor_transitions(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Overview:
@@ -1,4 +1,4 @@
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Dict, Callable
 from collections import namedtuple
 from easydict import EasyDict
 import numpy as np
@@ -7,7 +7,8 @@ import torch
 from ding.envs import BaseEnvManager
 from ding.utils import build_logger, EasyTimer, SERIAL_COLLECTOR_REGISTRY, one_time_warning
 from ding.torch_utils import to_tensor, to_ndarray
-from .base_serial_collector import ISerialCollector, CachePool, TrajBuffer, INF, to_tensor_transitions
+from .base_serial_collector import ISerialCollector, CachePool, TrajBuffer, ColumnarTrajBuffer, INF, \
+    to_tensor_transitions
 
 
 @SERIAL_COLLECTOR_REGISTRY.register('sample')
@@ -23,7 +24,20 @@ class SampleSerialCollector(ISerialCollector):
         envstep
     """
 
-    config = dict(deepcopy_obs=False, transform_obs=False, collect_print_freq=100)
+    config = dict(
+        deepcopy_obs=False,
+        transform_obs=False,
+        collect_print_freq=100,
+        # Whether to forward the stacked obs of all the ready envs as one tensor by policy ``forward_batch``, \
+        # only for array obs and policies which implement ``_forward_collect_batch``.
+        batch_forward=False,
+        # Whether to use a pinned tensor as the input of ``forward_batch``, only valid with cuda.
+        pin_memory=False,
+        # Whether to store transitions in preallocated arrays of all the envs rather than lists of dicts, \
+        # only valid with ``batch_forward``, and for policies whose transition is <s, a, r, d, s'> and which \
+        # implement ``_get_train_sample_columnar``.
+        columnar_traj=False,
+    )
 
     def __init__(
             self,
@@ -48,6 +62,11 @@ class SampleSerialCollector(ISerialCollector):
         self._collect_print_freq = cfg.collect_print_freq
         self._deepcopy_obs = cfg.deepcopy_obs
         self._transform_obs = cfg.transform_obs
+        self._batch_forward = cfg.batch_forward
+        self._pin_memory = cfg.pin_memory and torch.cuda.is_available()
+        self._columnar_traj = cfg.columnar_traj and cfg.batch_forward
+        # Preallocated input tensor of ``forward_batch``, which is reused in each step.
+        self._obs_batch_buffer = None
         self._cfg = cfg
         self._timer = EasyTimer()
         self._end_flag = False
@@ -134,6 +153,10 @@ class SampleSerialCollector(ISerialCollector):
         # _traj_buffer is {env_id: TrajBuffer}, is used to store traj_len pieces of transitions
         maxlen = self._traj_len if self._traj_len != INF else None
         self._traj_buffer = {env_id: TrajBuffer(maxlen=maxlen) for env_id in range(self._env_num)}
+        if self._columnar_traj:
+            self._columnar_traj_buffer = ColumnarTrajBuffer(self._env_num, maxlen=maxlen)
+            # obs and action of the last forward of each env, which are the (s, a) of the next returned timestep
+            self._step_obs, self._step_action = None, None
         self._env_info = {env_id: {'time': 0., 'step': 0, 'train_sample': 0} for env_id in range(self._env_num)}
 
         self._episode_info = []
@@ -154,6 +177,8 @@ class SampleSerialCollector(ISerialCollector):
             - env_id (:obj:`int`): the id where we need to reset the collector's state
         """
         self._traj_buffer[env_id].clear()
+        if self._columnar_traj:
+            self._columnar_traj_buffer.clear(env_id)
         self._obs_pool.reset(env_id)
         self._policy_output_pool.reset(env_id)
         self._env_info[env_id] = {'time': 0., 'step': 0, 'train_sample': 0}
@@ -218,25 +243,40 @@ class SampleSerialCollector(ISerialCollector):
         collected_sample = 0
         return_data = []
 
+        # Random collect policy and the policies which don't override ``_forward_collect_batch`` have no \
+        # ``forward_batch`` and fall back to the dict forward
+        forward_batch = getattr(self._policy, 'forward_batch', None) if self._batch_forward else None
+        # The policies which don't override ``_get_train_sample_columnar`` fall back to the list of dicts traj
+        get_train_sample_columnar = getattr(self._policy, 'get_train_sample_columnar', None)
+        columnar = self._columnar_traj and forward_batch is not None and get_train_sample_columnar is not None
         while collected_sample < n_sample:
             with self._timer:
-                # Get current env obs.
-                obs = self._env.ready_obs
-                # Policy forward.
-                self._obs_pool.update(obs)
-                if self._transform_obs:
-                    obs = to_tensor(obs, dtype=torch.float32)
-                policy_output = self._policy.forward(obs, **policy_kwargs)
-                self._policy_output_pool.update(policy_output)
-                # Interact with env.
-                actions = {env_id: output['action'] for env_id, output in policy_output.items()}
-                actions = to_ndarray(actions)
-                timesteps = self._env.step(actions)
+                if forward_batch is not None:
+                    timesteps = self._batch_forward_step(forward_batch, policy_kwargs, columnar)
+                else:
+                    # Get current env obs.
+                    obs = self._env.ready_obs
+                    # Policy forward.
+                    self._obs_pool.update(obs)
+                    if self._transform_obs:
+                        obs = to_tensor(obs, dtype=torch.float32)
+                    policy_output = self._policy.forward(obs, **policy_kwargs)
+                    self._policy_output_pool.update(policy_output)
+                    # Interact with env.
+                    actions = {env_id: output['action'] for env_id, output in policy_output.items()}
+                    actions = to_ndarray(actions)
+                    timesteps = self._env.step(actions)
 
             # TODO(nyz) this duration may be inaccurate in async env
             interaction_duration = self._timer.value / len(timesteps)
 
-            # TODO(nyz) vectorize this for loop
+            if columnar:
+                train_sample = self._columnar_process(
+                    timesteps, train_iter, interaction_duration, get_train_sample_columnar
+                )
+                return_data.extend(train_sample)
+                collected_sample += len(train_sample)
+                continue
             for env_id, timestep in timesteps.items():
                 with self._timer:
                     if timestep.info.get('abnormal', False):
@@ -278,18 +318,7 @@ class SampleSerialCollector(ISerialCollector):
 
                 # If env is done, record episode info and reset
                 if timestep.done:
-                    self._total_episode_count += 1
-                    reward = timestep.info['final_eval_reward']
-                    info = {
-                        'reward': reward,
-                        'time': self._env_info[env_id]['time'],
-                        'step': self._env_info[env_id]['step'],
-                        'train_sample': self._env_info[env_id]['train_sample'],
-                    }
-                    self._episode_info.append(info)
-                    # Env reset is done by env_manager automatically
-                    self._policy.reset([env_id])
-                    self._reset_stat(env_id)
+                    self._finish_episode(env_id, timestep)
         # log
         self._output_log(train_iter)
         # on-policy reset
@@ -299,6 +328,131 @@ class SampleSerialCollector(ISerialCollector):
 
         return return_data[:n_sample]
 
+    def _finish_episode(self, env_id: int, timestep: namedtuple) -> None:
+        """
+        Overview:
+            Record the episode info of a done env, and reset the policy and collector's state of this env.
+        Arguments:
+            - env_id (:obj:`int`): the id of the done env
+            - timestep (:obj:`namedtuple`): the last timestep of the episode
+        """
+        self._total_episode_count += 1
+        reward = timestep.info['final_eval_reward']
+        info = {
+            'reward': reward,
+            'time': self._env_info[env_id]['time'],
+            'step': self._env_info[env_id]['step'],
+            'train_sample': self._env_info[env_id]['train_sample'],
+        }
+        self._episode_info.append(info)
+        # Env reset is done by env_manager automatically
+        self._policy.reset([env_id])
+        self._reset_stat(env_id)
+
+    def _columnar_process(
+            self, timesteps: Dict[int, namedtuple], train_iter: int, interaction_duration: float,
+            get_train_sample_columnar: Callable
+    ) -> List[Any]:
+        """
+        Overview:
+            Columnar version of the per-env transition processing in ``collect``. Transitions of all the returned \
+            envs are written into ``ColumnarTrajBuffer`` at once, and the trajs of done or full envs are processed \
+            into train samples by the policy ``get_train_sample_columnar``.
+        Arguments:
+            - timesteps (:obj:`Dict[int, namedtuple]`): The timesteps returned by env manager.
+            - train_iter (:obj:`int`): the number of training iteration
+            - interaction_duration (:obj:`float`): the interaction time of each env in this step
+            - get_train_sample_columnar (:obj:`Callable`): ``get_train_sample_columnar`` of policy collect mode.
+        Returns:
+            - train_sample (:obj:`List[Any]`): The train samples generated in this step.
+        """
+        train_sample = []
+        with self._timer:
+            env_id = []
+            for i, timestep in timesteps.items():
+                if timestep.info.get('abnormal', False):
+                    # If there is an abnormal timestep, reset all the related variables(including this env).
+                    self._env.reset({i: None})
+                    self._policy.reset([i])
+                    self._reset_stat(i)
+                    self._logger.info('env_id {}, abnormal step {}', i, timestep.info)
+                    continue
+                env_id.append(i)
+            env_id = np.array(env_id, dtype=np.int64)
+            if len(env_id) > 0:
+                valid_timesteps = [timesteps[i] for i in env_id.tolist()]
+                self._columnar_traj_buffer.append(
+                    env_id, {
+                        'obs': self._step_obs[env_id],
+                        'action': self._step_action[env_id],
+                        'reward': np.stack([to_ndarray(t.reward) for t in valid_timesteps]),
+                        'done': np.array([t.done for t in valid_timesteps]),
+                        'next_obs': np.stack([t.obs for t in valid_timesteps]),
+                    }
+                )
+            self._total_envstep_count += len(env_id)
+        process_duration = self._timer.value / max(1, len(timesteps))
+        for i in env_id.tolist():
+            timestep = timesteps[i]
+            with self._timer:
+                self._env_info[i]['step'] += 1
+                if timestep.done or self._columnar_traj_buffer.length(i) == self._traj_len:
+                    samples = get_train_sample_columnar(self._columnar_traj_buffer.pop(i))
+                    for s in samples:
+                        s['collect_iter'] = train_iter
+                    train_sample.extend(samples)
+                    self._total_train_sample_count += len(samples)
+                    self._env_info[i]['train_sample'] += len(samples)
+            self._env_info[i]['time'] += self._timer.value + process_duration + interaction_duration
+            if timestep.done:
+                self._finish_episode(i, timestep)
+        return train_sample
+
+    def _batch_forward_step(self,
+                            forward_batch: Callable,
+                            policy_kwargs: dict,
+                            columnar: bool = False) -> Dict[int, namedtuple]:
+        """
+        Overview:
+            Forward the stacked obs of the ready envs in a preallocated tensor, and step envs with the actions \
+            sliced from one action array. Obs and policy output of each env are views of the batch.
+        Arguments:
+            - forward_batch (:obj:`Callable`): ``forward_batch`` of policy collect mode.
+            - policy_kwargs (:obj:`dict`): the keyword args for policy forward
+            - columnar (:obj:`bool`): Whether to record obs and action for ``ColumnarTrajBuffer`` rather than pools.
+        Returns:
+            - timesteps (:obj:`Dict[int, namedtuple]`): The timesteps returned by env manager.
+        """
+        env_id, obs = self._env.ready_obs_batch()
+        batch_size = len(env_id)
+        dtype = torch.float32 if self._transform_obs else torch.from_numpy(obs[:1]).dtype
+        buffer = self._obs_batch_buffer
+        if buffer is None or buffer.shape[1:] != obs.shape[1:] or buffer.dtype != dtype:
+            buffer = torch.empty((self._env_num, *obs.shape[1:]), dtype=dtype, pin_memory=self._pin_memory)
+            self._obs_batch_buffer = buffer
+        buffer[:batch_size].copy_(torch.from_numpy(obs))
+        output = forward_batch(buffer[:batch_size], **policy_kwargs)
+        if not isinstance(output['action'], torch.Tensor):
+            raise TypeError(
+                "batch_forward only supports tensor action, but got {}, please set it False".format(
+                    type(output['action'])
+                )
+            )
+        action = to_ndarray(output['action'])
+        if columnar:
+            if self._step_obs is None:
+                self._step_obs = np.zeros((self._env_num, *obs.shape[1:]), dtype=obs.dtype)
+                self._step_action = np.zeros((self._env_num, *action.shape[1:]), dtype=action.dtype)
+            self._step_obs[env_id] = obs
+            self._step_action[env_id] = action
+        else:
+            # Only the per-env views are built here, transitions are assembled when timesteps come back.
+            env_output = [{k: v[idx] for k, v in output.items()} for idx in range(batch_size)]
+            self._obs_pool.update({i: obs[idx] for idx, i in enumerate(env_id.tolist())})
+            self._policy_output_pool.update({i: env_output[idx] for idx, i in enumerate(env_id.tolist())})
+        # ``action[idx, ...]`` is a 0-dim array rather than a numpy scalar for discrete action.
+        return self._env.step({i: action[idx, ...] for idx, i in enumerate(env_id.tolist())})
+
     def _output_log(self, train_iter: int) -> None:
         """
         Overview:
@@ -335,6 +489,8 @@ class SampleSerialCollector(ISerialCollector):
                 'total_duration': self._total_duration,
                 # 'each_reward': episode_reward,
             }
+            # Step latency statistics tracked by env manager
+            info.update({'env_' + k: v for k, v in getattr(self._env, 'latency_stats', {}).items()})
             self._episode_info.clear()
             self._logger.info("collect end:\n{}".format('\n'.join(['{}: {}'.format(k, v) for k, v in info.items()])))
             for k, v in info.items():
@@ -11,8 +11,7 @@ from ding.envs import get_vec_env_setting, create_env_manager, AsyncSubprocessEn
     BaseEnvManager, get_env_manager_cls
 from ding.utils import deep_merge_dicts, set_pkg_seed, pretty_print
 
-from ding.worker.collector.tests.speed_test.fake_policy import FakePolicy
-from ding.worker.collector.tests.speed_test.fake_env import FakeEnv
+from ding.entry.benchmark import FakeEnv, FakePolicy
 
 env_policy_cfg_dict = dict(
     # Small env and policy, such as Atari/Mujoco
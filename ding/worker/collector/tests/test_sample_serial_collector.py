@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+import torch
+from ding.worker import SampleSerialCollector
+from ding.envs import BaseEnvManager, SyncSubprocessEnvManager
+from ding.policy import Policy, DQNPolicy, PPOPolicy
+from ding.model import DQN, VAC
+from dizoo.classic_control.cartpole.envs import CartPoleEnv
+from dizoo.common.policy.md_dqn import MultiDiscreteDQNPolicy
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('env_manager_type', [BaseEnvManager, SyncSubprocessEnvManager])
+def test_batch_forward(env_manager_type):
+    env = env_manager_type([lambda: CartPoleEnv({}) for _ in range(4)], env_manager_type.default_config())
+    env.seed(0)
+    model = DQN(obs_shape=4, action_shape=2)
+    policy = DQNPolicy(DQNPolicy.default_config(), model=model).collect_mode
+    cfg = SampleSerialCollector.default_config()
+    cfg.batch_forward = True
+    collector = SampleSerialCollector(cfg, env, policy)
+
+    data = collector.collect(n_sample=64, policy_kwargs={'eps': 0.5})
+    assert len(data) == 64
+    assert collector.envstep >= 64
+    assert collector._obs_batch_buffer.shape == (4, 4)
+    for d in data:
+        assert d['obs'].shape == (4, ) and d['next_obs'].shape == (4, )
+        assert d['action'].shape == () and d['action'].dtype == torch.int64
+    collector.close()
+
+
+@pytest.mark.unittest
+def test_batch_forward_unsupported():
+    env = BaseEnvManager([lambda: CartPoleEnv({}) for _ in range(2)], BaseEnvManager.default_config())
+    # PPO doesn't override ``_forward_collect_batch`` and falls back to the dict forward
+    policy = PPOPolicy(PPOPolicy.default_config(), model=VAC(obs_shape=4, action_shape=2)).collect_mode
+    assert policy.forward_batch is None
+    cfg = SampleSerialCollector.default_config()
+    cfg.batch_forward = True
+    collector = SampleSerialCollector(cfg, env, policy)
+    assert len(collector.collect(n_sample=8)) == 8
+    assert collector._obs_batch_buffer is None
+    collector.close()
+    # The action of multi-discrete DQN is a list, which can't be batch forwarded
+    policy = MultiDiscreteDQNPolicy(DQNPolicy.default_config(), model=DQN(obs_shape=4, action_shape=[2, 2]))
+    assert policy.collect_mode.forward_batch is None
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize('env_manager_type', [BaseEnvManager, SyncSubprocessEnvManager])
+def test_columnar_traj(env_manager_type):
+    env = env_manager_type([lambda: CartPoleEnv({}) for _ in range(4)], env_manager_type.default_config())
+    env.seed(0)
+    policy_cfg = DQNPolicy.default_config()
+    policy_cfg.nstep = 3
+    policy = DQNPolicy(policy_cfg, model=DQN(obs_shape=4, action_shape=2)).collect_mode
+    cfg = SampleSerialCollector.default_config()
+    cfg.batch_forward = True
+    cfg.columnar_traj = True
+    collector = SampleSerialCollector(cfg, env, policy)
+
+    data = collector.collect(n_sample=64, train_iter=3, policy_kwargs={'eps': 0.5})
+    assert len(data) == 64
+    assert collector._traj_buffer[0] == []
+    for d in data:
+        assert d['obs'].shape == (4, ) and d['next_obs'].shape == (4, )
+        assert d['action'].shape == () and d['action'].dtype == torch.int64
+        assert d['reward'].shape == (3, )
+        assert d['collect_iter'] == 3
+    # Samples of one traj are in order, the next_obs of a complete nstep sample is the obs 3 steps later
+    gamma = policy_cfg.discount_factor
+    complete = [i for i in range(len(data) - 3) if abs(data[i]['value_gamma'].item() - gamma ** 3) < 1e-6]
+    assert len(complete) > 0
+    for i in complete:
+        assert torch.equal(data[i]['next_obs'], data[i + 3]['obs'])
+    collector.close()
+
+
+class DQNListTrajPolicy(DQNPolicy):
+    # Batch forward but no columnar traj
+    _get_train_sample_columnar = Policy._get_train_sample_columnar
+
+
+@pytest.mark.unittest
+def test_columnar_traj_unsupported():
+    env = BaseEnvManager([lambda: CartPoleEnv({}) for _ in range(2)], BaseEnvManager.default_config())
+    policy = DQNListTrajPolicy(DQNPolicy.default_config(), model=DQN(obs_shape=4, action_shape=2)).collect_mode
+    assert policy.forward_batch is not None and policy.get_train_sample_columnar is None
+    cfg = SampleSerialCollector.default_config()
+    cfg.batch_forward = True
+    cfg.columnar_traj = True
+    collector = SampleSerialCollector(cfg, env, policy)
+    data = collector.collect(n_sample=16, policy_kwargs={'eps': 0.5})
+    assert len(data) == 16
+    assert collector._obs_batch_buffer is not None
+    assert collector._columnar_traj_buffer.length(0) == 0 and collector._columnar_traj_buffer.length(1) == 0
+    collector.close()
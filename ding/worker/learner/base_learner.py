@@ -2,7 +2,9 @@ from typing import Any, Union, Callable, List, Dict, Optional, Tuple
 import time
 import copy
 import logging
+import torch
 from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from easydict import EasyDict
 from collections import namedtuple
 
@@ -22,8 +24,8 @@ class BaseLearner(object):
     Interface:
         train, call_hook, register_hook, save_checkpoint, start, setup_dataloader, close
     Property:
-        learn_info, priority_info, last_iter, train_iter, rank, world_size, policy
-        monitor, log_buffer, logger, tb_logger, ckpt_name, exp_name, instance_name
+        learn_info, priority_info, last_iter, train_iter, collector_envstep, rank, world_size, policy
+        monitor, log_buffer, logger, tb_logger, ckpt_name, exp_name, instance_name, deferred_log, log_executor
     """
 
     @classmethod
@@ -36,6 +38,10 @@ class BaseLearner(object):
         train_iterations=int(1e9),
         dataloader=dict(num_workers=0, ),
         log_policy=True,
+        # (bool) Whether to defer the logging of learn info, i.e. keep the logged tensors of each iteration on
+        # device, and transfer and reduce them in a background thread at the frequency of ``log_show_after_iter``.
+        # It avoids the device synchronization of each iteration, and is only valid for single process learner.
+        deferred_log=False,
         # --- Hooks ---
         hook=dict(
             load_ckpt_before_run='',
@@ -109,11 +115,16 @@ class BaseLearner(object):
                 './{}/log/{}'.format(self._exp_name, self._instance_name), self._instance_name, need_tb=False
             )
             self._tb_logger = None
+        self._deferred_log = self._cfg.get('deferred_log', False) and self._world_size == 1
         self._log_buffer = {
-            'scalar': build_log_buffer(),
-            'scalars': build_log_buffer(),
-            'histogram': build_log_buffer(),
+            'scalar': build_log_buffer(self._deferred_log),
+            'scalars': build_log_buffer(self._deferred_log),
+            'histogram': build_log_buffer(self._deferred_log),
         }
+        # The deferred logs are reduced and shown in this thread, refer to ``LogShowHook``
+        self._log_executor = ThreadPoolExecutor(1, 'learner_log') if self._deferred_log else None
+        # Cache of the type and name of each key in ``log_vars``
+        self._log_var_types = {}
 
         # Setup policy
         if policy is not None:
@@ -123,6 +134,7 @@ class BaseLearner(object):
         self._hooks = {'before_run': [], 'before_iter': [], 'after_iter': [], 'after_run': []}
         # Last iteration. Used to record current iter.
         self._last_iter = CountVar(init_val=0)
+        self._collector_envstep = 0
 
         # Setup time wrapper and hook.
         self._setup_wrapper()
@@ -210,8 +222,14 @@ class BaseLearner(object):
         else:
             raise TypeError("not support type for log_vars: {}".format(type(log_vars)))
         if priority is not None:
-            replay_buffer_idx = [d.get('replay_buffer_idx', None) for d in data]
-            replay_unique_id = [d.get('replay_unique_id', None) for d in data]
+            if isinstance(priority, torch.Tensor):
+                priority = priority.detach().cpu().numpy()
+            if hasattr(data, 'replay_buffer_idx'):
+                # Data sampled from buffer carries index arrays, refer to ``SampledData``
+                replay_buffer_idx, replay_unique_id = data.replay_buffer_idx, data.replay_unique_id
+            else:
+                replay_buffer_idx = [d.get('replay_buffer_idx', None) for d in data]
+                replay_unique_id = [d.get('replay_unique_id', None) for d in data]
             self.priority_info = {
                 'priority': priority,
                 'replay_buffer_idx': replay_buffer_idx,
@@ -225,11 +243,10 @@ class BaseLearner(object):
         for elem in log_vars:
             scalars_vars, histogram_vars = {}, {}
             for k in list(elem.keys()):
-                if "[scalars]" in k:
-                    new_k = k.split(']')[-1]
+                var_type, new_k = self._log_var_type(k)
+                if var_type == 'scalars':
                     scalars_vars[new_k] = elem.pop(k)
-                elif "[histogram]" in k:
-                    new_k = k.split(']')[-1]
+                elif var_type == 'histogram':
                     histogram_vars[new_k] = elem.pop(k)
             # Update log_buffer
             self._log_buffer['scalar'].update(elem)
@@ -241,6 +258,26 @@ class BaseLearner(object):
 
         return log_vars
 
+    def _log_var_type(self, key: str) -> Tuple[str, str]:
+        """
+        Overview:
+            Get the type and name of a key in ``log_vars`` according to its prefix, e.g. '[histogram]action' is \
+            ('histogram', 'action'). The result is cached because the keys are the same in each iteration.
+        Arguments:
+            - key (:obj:`str`): The key in ``log_vars``.
+        Returns:
+            - var_type (:obj:`str`): Variable type in ['scalar', 'scalars', 'histogram'].
+            - var_name (:obj:`str`): Variable name without prefix.
+        """
+        if key not in self._log_var_types:
+            if "[scalars]" in key:
+                self._log_var_types[key] = ('scalars', key.split(']')[-1])
+            elif "[histogram]" in key:
+                self._log_var_types[key] = ('histogram', key.split(']')[-1])
+            else:
+                self._log_var_types[key] = ('scalar', key)
+        return self._log_var_types[key]
+
     @auto_checkpoint
     def start(self) -> None:
         """
@@ -308,6 +345,9 @@ class BaseLearner(object):
         self._end_flag = True
         if hasattr(self, '_dataloader'):
             self._dataloader.close()
+        if self._log_executor is not None:
+            # Wait for the deferred logs before the tb_logger is closed
+            self._log_executor.shutdown(wait=True)
         if self._tb_logger:
             self._tb_logger.flush()
             self._tb_logger.close()
@@ -383,6 +423,18 @@ class BaseLearner(object):
     def train_iter(self) -> int:
         return self._last_iter.val
 
+    @property
+    def collector_envstep(self) -> int:
+        return self._collector_envstep
+
+    @property
+    def deferred_log(self) -> bool:
+        return self._deferred_log
+
+    @property
+    def log_executor(self) -> Optional[ThreadPoolExecutor]:
+        return self._log_executor
+
     @property
     def monitor(self) -> 'TickMonitor':  # noqa
         return self._monitor
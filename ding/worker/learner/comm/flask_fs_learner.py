@@ -7,6 +7,7 @@ from threading import Thread
 
 from ding.utils import read_file, save_file, get_data_decompressor, COMM_LEARNER_REGISTRY
 from ding.utils.file_helper import read_from_di_store
+from ding.torch_utils import to_list
 from ding.interaction import Slave, TaskFail
 from .base_comm_learner import BaseCommLearner
 from ..learner_hook import LearnerHook
@@ -299,9 +300,12 @@ class FlaskFileSystemLearner(BaseCommLearner):
         Arguments:
             - learn_info (:obj:`dict`): Learn info in `dict` type. Keys are like 'learner_step', 'priority_info' \
                 'finished_task', etc. You can refer to ``learn_info``(``worker/learner/base_learner.py``) for details.
+        .. note::
+            Learn info is sent to coordinator in json, so the arrays and tensors in it (e.g. priority) are \
+            transformed to lists.
         """
         assert self._learn_info_queue.qsize() == 0
-        self._learn_info_queue.put(learn_info)
+        self._learn_info_queue.put(to_list(learn_info))
 
     @property
     def hooks4call(self) -> List[LearnerHook]:
@@ -1,6 +1,8 @@
 import pytest
 import os
 import time
+import json
+import numpy as np
 from multiprocessing import Process
 
 from ding.worker import Coordinator, create_comm_learner
@@ -74,3 +76,26 @@ class TestLearnerWithCoordinator:
                 coordinator._commander._learner_info[i]
             ) == setup_config.main.policy.learn.learner.train_iterations
         os.popen('rm -rf {}*'.format(DATA_PREFIX))
+
+
+@pytest.mark.unittest
+def test_send_learn_info(setup_config):
+    learner_cfg = [v for k, v in setup_config.system.items() if k.startswith('learner')][0]
+    learner = create_comm_learner(learner_cfg)
+    learner_info = {
+        'learner_step': 1,
+        'priority_info': {
+            'priority': np.array([1., 2.]),
+            'replay_buffer_idx': np.array([0, 3]),
+            'replay_unique_id': np.array(['buffer_0', 'buffer_3'], dtype=object),
+        },
+        'learner_done': False,
+    }
+    learner.send_learn_info(learner_info)
+    # Learn info is sent to coordinator in json by the learner slave
+    sent_info = json.loads(json.dumps(learner._learn_info_queue.get()))
+    assert sent_info['priority_info'] == {
+        'priority': [1., 2.],
+        'replay_buffer_idx': [0, 3],
+        'replay_unique_id': ['buffer_0', 'buffer_3'],
+    }
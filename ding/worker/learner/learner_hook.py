@@ -7,6 +7,7 @@ from easydict import EasyDict
 
 import ding
 from ding.utils import allreduce, read_file, save_file, get_rank
+from ding.torch_utils import build_log_buffer
 
 
 class Hook(ABC):
@@ -192,6 +193,7 @@ class LogShowHook(LearnerHook):
             self._freq = 1
         else:
             self._freq = ext_args.freq
+        self._deferred_future = None
 
     def __call__(self, engine: 'BaseLearner') -> None:  # noqa
         """
@@ -201,6 +203,9 @@ class LogShowHook(LearnerHook):
         Arguments:
             - engine (:obj:`BaseLearner`): the BaseLearner
         """
+        if engine.deferred_log:
+            self._deferred_call(engine)
+            return
         # Only show log for rank 0 learner
         if engine.rank != 0:
             for k in engine.log_buffer:
@@ -224,7 +229,7 @@ class LogShowHook(LearnerHook):
             engine.logger.info(engine.logger.get_tabulate_vars_hor(var_dict))
             for k, v in var_dict.items():
                 engine.tb_logger.add_scalar('{}_iter/'.format(engine.instance_name) + k, v, iters)
-                engine.tb_logger.add_scalar('{}_step/'.format(engine.instance_name) + k, v, engine._collector_envstep)
+                engine.tb_logger.add_scalar('{}_step/'.format(engine.instance_name) + k, v, engine.collector_envstep)
             # For 'histogram' type variables: log_buffer -> tb_var_dict -> tb_logger
             tb_var_dict = {}
             for k in engine.log_buffer['histogram']:
@@ -235,6 +240,60 @@ class LogShowHook(LearnerHook):
         for k in engine.log_buffer:
             engine.log_buffer[k].clear()
 
+    def _deferred_call(self, engine: 'BaseLearner') -> None:  # noqa
+        """
+        Overview:
+            Hand the log buffer over to the log thread of learner at interval iterations, where the logs of all \
+            the iterations since the last call are transferred, reduced and shown. Nothing is done in the other \
+            iterations, so the cost doesn't scale with the iteration rate.
+        Arguments:
+            - engine (:obj:`BaseLearner`): the BaseLearner
+        """
+        iters = engine.last_iter.val
+        if iters % self._freq != 0:
+            return
+        log_buffer = engine.log_buffer
+        engine.log_buffer = {k: build_log_buffer(deferred=True) for k in log_buffer}
+        if self._deferred_future is not None:
+            # Raise the error of the last call, and avoid piling up logs if the log thread falls behind
+            self._deferred_future.result()
+        self._deferred_future = engine.log_executor.submit(
+            self._show_deferred_log, engine, log_buffer, iters, engine.collector_envstep
+        )
+
+    @staticmethod
+    def _show_deferred_log(engine: 'BaseLearner', log_buffer: dict, iters: int, envstep: int) -> None:  # noqa
+        engine.info("=== Training Iteration {} Result ===".format(iters))
+        # For 'scalar' type variables: the average of all the iterations in log_buffer -> text_logger & tb_logger
+        var_dict = {}
+        for k in engine.policy.monitor_vars():
+            var_dict[k + '_avg'] = _reduce_mean(log_buffer['scalar'].get(k, []))
+        engine.logger.info(engine.logger.get_tabulate_vars_hor(var_dict))
+        for k, v in var_dict.items():
+            engine.tb_logger.add_scalar('{}_iter/'.format(engine.instance_name) + k, v, iters)
+            engine.tb_logger.add_scalar('{}_step/'.format(engine.instance_name) + k, v, envstep)
+        # For 'histogram' type variables: the last value in log_buffer -> tb_logger
+        for k, v in log_buffer['histogram'].items():
+            v = v[-1].cpu() if isinstance(v[-1], torch.Tensor) else v[-1]
+            engine.tb_logger.add_histogram('{}/'.format(engine.instance_name) + k, v, iters)
+
+
+def _reduce_mean(values: List[Any]) -> float:
+    """
+    Overview:
+        Average a list of python scalars and scalar tensors, the tensors on each device are transferred at once.
+    """
+    if len(values) == 0:
+        return 0
+    total = sum([v for v in values if not isinstance(v, torch.Tensor)])
+    tensors = {}
+    for v in values:
+        if isinstance(v, torch.Tensor):
+            tensors.setdefault(v.device, []).append(v.reshape(()).float())
+    for v in tensors.values():
+        total += torch.stack(v).sum().item()
+    return total / len(values)
+
 
 class LogReduceHook(LearnerHook):
     """
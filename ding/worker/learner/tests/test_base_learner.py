@@ -9,6 +9,7 @@ from functools import partial
 
 from ding.worker import BaseLearner
 from ding.worker.learner import LearnerHook, add_learner_hook, create_learner
+from ding.worker.learner.learner_hook import LogShowHook
 
 
 class FakeLearner(BaseLearner):
@@ -134,3 +135,31 @@ class TestBaseLearner:
         os.popen('rm -rf learner')
         os.popen('rm -rf log')
         learner.close()
+
+    def test_deferred_log(self):
+        cfg = self._get_cfg('')
+        cfg.deferred_log = True
+        cfg.train_iterations = 12
+        learner = FakeLearner(cfg, exp_name='exp_test_deferred')
+        learner.policy = FakePolicy()
+        learner.setup_dataloader()
+        assert learner.deferred_log
+        shown = []
+        show_log = LogShowHook._show_deferred_log
+
+        def fake_show_log(engine, log_buffer, iters, envstep):
+            shown.append((iters, len(log_buffer['scalar']['total_loss'])))
+            show_log(engine, log_buffer, iters, envstep)
+
+        LogShowHook._show_deferred_log = staticmethod(fake_show_log)
+        try:
+            learner.start()
+            learner.close()
+        finally:
+            LogShowHook._show_deferred_log = staticmethod(show_log)
+        # logs of all the iterations since the last show are handed over to the log thread at once
+        assert shown == [(0, 1), (5, 5), (10, 5)]
+        # the last iterations are kept on the main thread until the next show
+        assert len(learner.log_buffer['scalar']['total_loss']) == 1
+        assert isinstance(learner.log_buffer['scalar']['total_loss'][0], torch.Tensor)
+        os.popen('rm -rf ' + learner.exp_name)
@@ -2,3 +2,7 @@ from .base_buffer import IBuffer, create_buffer, get_buffer_cls
 from .naive_buffer import NaiveReplayBuffer
 from .advanced_buffer import AdvancedReplayBuffer
 from .episode_buffer import EpisodeReplayBuffer
+from .mmap_buffer import MmapReplayBuffer
+from .sharded_buffer import ShardedReplayBuffer
+from .prefetch_sampler import PrefetchSampler
+from .sequence_buffer import SequenceReplayBuffer
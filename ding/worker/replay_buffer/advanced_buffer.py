@@ -1,13 +1,19 @@
 import copy
 import time
-from typing import Union, NoReturn, Any, Optional, List, Dict, Tuple
+import itertools
+from typing import Union, NoReturn, Any, Optional, List, Dict, Tuple, Iterable
 import numpy as np
 
 from ding.worker.replay_buffer import IBuffer
 from ding.utils import SumSegmentTree, MinSegmentTree, BUFFER_REGISTRY
 from ding.utils import LockContext, LockContextType, build_logger
 from ding.utils.autolog import TickTime
-from .utils import UsedDataRemover, generate_id, SampledDataAttrMonitor, PeriodicThruputMonitor, ThruputController
+from ding.worker.buffer.utils import FrameStorage
+from .utils import UsedDataRemover, generate_id, SampledDataAttrMonitor, PeriodicThruputMonitor, ThruputController, \
+    SampledData, priority_info_to_array
+
+# Placeholder of ``collect_iter`` for the data which is not generated by collector, e.g. demonstration data
+NO_COLLECT_ITER = np.iinfo(np.int64).max
 
 
 def to_positive_index(idx: Union[int, None], size: int) -> int:
@@ -53,6 +59,11 @@ class AdvancedReplayBuffer(IBuffer):
         enable_track_used_data=False,
         # Whether to deepcopy data when willing to insert and sample data. For security purpose.
         deepcopy=False,
+        # Whether to store each unique frame of stacked observations (e.g. atari ``FrameStack``) only once.
+        # If True, stacked observations in ``frame_dedup_keys`` are replaced by frame ids when pushing,
+        # and reconstructed when sampling.
+        frame_dedup=False,
+        frame_dedup_keys=['obs', 'next_obs'],
         thruput_controller=dict(
             # Rate limit. The ratio of "Sample Count" to "Push Count" should be in [min, max] range.
             # If greater than max ratio, return `None` when calling ``sample```;
@@ -123,8 +134,12 @@ class AdvancedReplayBuffer(IBuffer):
         # filled with data head would always be 0, so ``head`` may be not equal to ``tail``;
         # Otherwise, they two should be the same. Head is used to optimize staleness check in ``_sample_check``.
         self._head = 0
-        # use_count is {position_idx: use_count}
-        self._use_count = {idx: 0 for idx in range(self._cfg.replay_buffer_size)}
+        # Use count of the data at each position
+        self._use_count = np.zeros(self._replay_buffer_size, dtype=np.int64)
+        # ``collect_iter`` of the data at each position, ``NO_COLLECT_ITER`` means the data has no ``collect_iter``
+        self._collect_iter = np.full(self._replay_buffer_size, NO_COLLECT_ITER, dtype=np.int64)
+        # Unique id of the data at each position, None means empty, which is used to verify priority update
+        self._unique_id = np.full(self._replay_buffer_size, None, dtype=object)
         # Max priority till now. Is used to initizalize a data's priority if "priority" is not passed in with the data.
         self._max_priority = 1.0
         # A small positive number to avoid edge-case, e.g. "priority" == 0.
@@ -190,6 +205,11 @@ class AdvancedReplayBuffer(IBuffer):
         if self._enable_track_used_data:
             self._used_data_remover = UsedDataRemover()
 
+        # Frame dedup storage
+        self._frame_dedup = self._cfg.frame_dedup
+        self._frame_dedup_keys = self._cfg.frame_dedup_keys
+        self._frame_storage = FrameStorage() if self._frame_dedup else None
+
     def start(self) -> None:
         """
         Overview:
@@ -244,8 +264,26 @@ class AdvancedReplayBuffer(IBuffer):
                 )
             )
             return None
+        return self._sample(size, cur_learner_iter, sample_range)
+
+    def _sample(self,
+                size: int,
+                cur_learner_iter: int,
+                sample_range: slice = None,
+                monitor_attr: bool = True) -> Optional[list]:
+        r"""
+        Overview:
+            Sample data with length ``size`` without any check, the caller should make sure the buffer has enough \
+            data, refer to ``sample`` for arguments. If ``monitor_attr`` is False, sampled data attributes are not \
+            monitored, which is the most time-consuming part of monitor. Return None if the buffer is empty, \
+            e.g. all the data is removed by other threads after the caller's check.
+        """
         with self._lock:
+            if self._valid_count == 0:
+                return None
             indices = self._get_indices(size, sample_range)
+            # Unique ids are taken before the data used too many times is removed in ``_sample_with_indices``
+            unique_id = self._unique_id[indices]
             result = self._sample_with_indices(indices, cur_learner_iter)
             # Deepcopy ``result``'s same indice datas in case ``self._get_indices`` may get datas with
             # the same indices, i.e. the same datas would be sampled afterwards.
@@ -259,8 +297,8 @@ class AdvancedReplayBuffer(IBuffer):
                             tmp.append(j)
                     for j in tmp:
                         result[j] = copy.deepcopy(result[j])
-            self._monitor_update_of_sample(result, cur_learner_iter)
-            return result
+            self._monitor_update_of_sample(result, cur_learner_iter, monitor_attr)
+            return SampledData(result, np.array(indices, dtype=np.int64), unique_id)
 
     def push(self, data: Union[List[Any], Any], cur_collector_envstep: int) -> None:
         r"""
@@ -353,6 +391,8 @@ class AdvancedReplayBuffer(IBuffer):
                 # If data check fails, log it and return without any operations.
                 self._logger.info('Illegal data type [{}], reject it...'.format(type(data)))
                 return
+            if self._frame_dedup:
+                [data] = self._encode_frames([data])
             self._push_count += 1
             # remove->set weight->set data
             if self._data[self._tail] is not None:
@@ -361,6 +401,8 @@ class AdvancedReplayBuffer(IBuffer):
             data['replay_unique_id'] = generate_id(self._instance_name, self._next_unique_id)
             data['replay_buffer_idx'] = self._tail
             self._set_weight(data)
+            self._set_collect_iter(data)
+            self._unique_id[self._tail] = data['replay_unique_id']
             self._data[self._tail] = data
             self._valid_count += 1
             self._periodic_thruput_monitor.valid_count = self._valid_count
@@ -385,6 +427,8 @@ class AdvancedReplayBuffer(IBuffer):
             check_result = [self._data_check(d) for d in data]
             # Only keep data items that pass ``_data_check`.
             valid_data = [d for d, flag in zip(data, check_result) if flag]
+            if self._frame_dedup:
+                valid_data = self._encode_frames(valid_data)
             length = len(valid_data)
             # When updating ``_data`` and ``_use_count``, should consider two cases regarding
             # the relationship between "tail + data length" and "queue max length" to check whether
@@ -398,8 +442,10 @@ class AdvancedReplayBuffer(IBuffer):
                     valid_data[i]['replay_unique_id'] = generate_id(self._instance_name, self._next_unique_id + i)
                     valid_data[i]['replay_buffer_idx'] = (self._tail + i) % self._replay_buffer_size
                     self._set_weight(valid_data[i])
+                    self._set_collect_iter(valid_data[i])
                     self._push_count += 1
                 self._data[self._tail:self._tail + length] = valid_data
+                self._unique_id[self._tail:self._tail + length] = [d['replay_unique_id'] for d in valid_data]
             else:
                 data_start = self._tail
                 valid_data_start = 0
@@ -415,8 +461,12 @@ class AdvancedReplayBuffer(IBuffer):
                         valid_data[i]['replay_unique_id'] = generate_id(self._instance_name, self._next_unique_id + i)
                         valid_data[i]['replay_buffer_idx'] = (self._tail + i) % self._replay_buffer_size
                         self._set_weight(valid_data[i])
+                        self._set_collect_iter(valid_data[i])
                         self._push_count += 1
                     self._data[data_start:data_start + L] = valid_data[valid_data_start:valid_data_start + L]
+                    self._unique_id[data_start:data_start + L] = [
+                        d['replay_unique_id'] for d in valid_data[valid_data_start:valid_data_start + L]
+                    ]
                     residual_num -= L
                     if residual_num <= 0:
                         break
@@ -437,28 +487,37 @@ class AdvancedReplayBuffer(IBuffer):
         Arguments:
             - info (:obj:`dict`): Info dict containing all necessary keys for priority update.
         ArgumentsKeys:
-            - necessary: `replay_unique_id`, `replay_buffer_idx`, `priority`. All values are lists with the same length.
+            - necessary: `replay_unique_id`, `replay_buffer_idx`, `priority`. All values are lists, arrays or \
+                tensors with the same length.
         """
         with self._lock:
             if 'priority' not in info:
                 return
-            data = [info['replay_unique_id'], info['replay_buffer_idx'], info['priority']]
-            for id_, idx, priority in zip(*data):
-                # Only if the data still exists in the queue, will the update operation be done.
-                if self._data[idx] is not None \
-                        and self._data[idx]['replay_unique_id'] == id_:  # Verify the same transition(data)
-                    assert priority >= 0, priority
-                    assert self._data[idx]['replay_buffer_idx'] == idx
-                    self._data[idx]['priority'] = priority + self._eps  # Add epsilon to avoid priority == 0
-                    self._set_weight(self._data[idx])
-                    # Update max priority
-                    self._max_priority = max(self._max_priority, priority)
-                else:
-                    self._logger.debug(
-                        '[Skip Update]: buffer_idx: {}; id_in_buffer: {}; id_in_update_info: {}'.format(
-                            idx, id_, priority
-                        )
+            unique_id, idx, priority = priority_info_to_array(info)
+            # Only if the data still exists in the queue, will the update operation be done.
+            # Verify the same transition(data) by unique id, which is None if the position is empty.
+            valid = self._unique_id[idx] == unique_id
+            for i in np.flatnonzero(~valid).tolist():
+                self._logger.debug(
+                    '[Skip Update]: buffer_idx: {}; id_in_buffer: {}; id_in_update_info: {}'.format(
+                        idx[i], self._unique_id[idx[i]], unique_id[i]
                     )
+                )
+            if not valid.any():
+                return
+            update_idx, update_priority = idx[valid], priority[valid]
+            assert (update_priority >= 0).all(), update_priority
+            # Update max priority
+            self._max_priority = max(self._max_priority, float(update_priority.max()))
+            update_priority = update_priority + self._eps  # Add epsilon to avoid priority == 0
+            # Data dict is still the record of priority, e.g. for sample monitor and state dict
+            for i, p in zip(update_idx.tolist(), update_priority.tolist()):
+                self._data[i]['priority'] = p
+            # Set all the valid new weights in sumtree and mintree in one batch call. If an index appears more than
+            # once, the last priority wins, the same as the sequential update.
+            weight = update_priority ** self.alpha
+            self._sum_tree[update_idx] = weight
+            self._min_tree[update_idx] = weight
 
     def clear(self) -> None:
         """
@@ -472,6 +531,8 @@ class AdvancedReplayBuffer(IBuffer):
             self._head = 0
             self._tail = 0
             self._max_priority = 1.0
+            if self._frame_dedup:
+                self._frame_storage.clear()
 
     def __del__(self) -> None:
         """
@@ -496,6 +557,19 @@ class AdvancedReplayBuffer(IBuffer):
         self._sum_tree[idx] = weight
         self._min_tree[idx] = weight
 
+    def _set_collect_iter(self, data: Dict) -> None:
+        r"""
+        Overview:
+            Record the input data's ``collect_iter`` in ``self._collect_iter``, which is used to calculate staleness.
+        Arguments:
+            - data (:obj:`Dict`): The data whose ``collect_iter`` should be recorded.
+        """
+        collect_iter = data.get('collect_iter', None)
+        if isinstance(collect_iter, list):
+            # Timestep transition's collect_iter is a list
+            collect_iter = min(collect_iter)
+        self._collect_iter[data['replay_buffer_idx']] = NO_COLLECT_ITER if collect_iter is None else collect_iter
+
     def _data_check(self, d: Any) -> bool:
         r"""
         Overview:
@@ -518,7 +592,7 @@ class AdvancedReplayBuffer(IBuffer):
             - index_list (:obj:`list`): A list including all the sample indices, whose length should equal to ``size``.
         """
         # Divide [0, 1) into size intervals on average
-        intervals = np.array([i * 1.0 / size for i in range(size)])
+        intervals = np.arange(size) * 1.0 / size
         # Uniformly sample within each interval
         mass = intervals + np.random.uniform(size=(size, )) * 1. / size
         if sample_range is None:
@@ -531,8 +605,8 @@ class AdvancedReplayBuffer(IBuffer):
             a = self._sum_tree.reduce(0, start)
             b = self._sum_tree.reduce(0, end)
             mass = mass * (b - a) + a
-        # Find prefix sum index to sample with probability
-        return [self._sum_tree.find_prefixsum_idx(m) for m in mass]
+        # Find prefix sum index to sample with probability, all the indices are found in one batch call
+        return self._sum_tree.find_prefixsum_idx_batch(mass).tolist()
 
     def _remove(self, idx: int, use_too_many_times: bool = False) -> None:
         r"""
@@ -563,6 +637,8 @@ class AdvancedReplayBuffer(IBuffer):
             self._sum_tree[idx] = self._sum_tree.neutral_element
             self._min_tree[idx] = self._min_tree.neutral_element
             self._use_count[idx] = 0
+            self._collect_iter[idx] = NO_COLLECT_ITER
+            self._unique_id[idx] = None
 
     def _sample_with_indices(self, indices: List[int], cur_learner_iter: int) -> list:
         r"""
@@ -574,36 +650,87 @@ class AdvancedReplayBuffer(IBuffer):
         Returns:
             - data (:obj:`list`) Sampled data.
         """
-        # Calculate max weight for normalizing IS
+        indices = np.array(indices, dtype=np.int64)
+        # Update use count of all the sampled positions, a position which is sampled for several times is counted
+        # several times, so ``np.add.at`` is used instead of ``+=``
+        np.add.at(self._use_count, indices, 1)
+        use = self._use_count[indices]
+        staleness = self._calculate_staleness(indices, cur_learner_iter)
+        # IS(importance sampling weight for gradient step) of the whole batch, normalized by the max weight
         sum_tree_root = self._sum_tree.reduce()
         p_min = self._min_tree.reduce() / sum_tree_root
         max_weight = (self._valid_count * p_min) ** (-self._beta)
+        p_sample = self._sum_tree[indices] / sum_tree_root
+        IS = (self._valid_count * p_sample) ** (-self._beta) / max_weight
         data = []
-        for idx in indices:
+        for idx, u, st, w in zip(indices.tolist(), use.tolist(), staleness.tolist(), IS.tolist()):
             assert self._data[idx] is not None
             assert self._data[idx]['replay_buffer_idx'] == idx, (self._data[idx]['replay_buffer_idx'], idx)
             if self._deepcopy:
                 copy_data = copy.deepcopy(self._data[idx])
+            elif self._frame_dedup:
+                # Frame ids in buffer should not be replaced by the reconstructed observations
+                copy_data = copy.copy(self._data[idx])
             else:
                 copy_data = self._data[idx]
-            # Store staleness, use and IS(importance sampling weight for gradient step) for monitor and outer use
-            self._use_count[idx] += 1
-            copy_data['staleness'] = self._calculate_staleness(idx, cur_learner_iter)
-            copy_data['use'] = self._use_count[idx]
-            p_sample = self._sum_tree[idx] / sum_tree_root
-            weight = (self._valid_count * p_sample) ** (-self._beta)
-            copy_data['IS'] = weight / max_weight
+            # Store staleness, use and IS for monitor and outer use
+            copy_data['staleness'] = st
+            copy_data['use'] = u
+            copy_data['IS'] = w
             data.append(copy_data)
+        if self._frame_dedup:
+            self._decode_frames(data)
         if self._max_use != float("inf"):
             # Remove datas whose "use count" is greater than ``max_use``
-            for idx in indices:
-                if self._use_count[idx] >= self._max_use:
-                    self._remove(idx, use_too_many_times=True)
+            for idx in np.unique(indices[use >= self._max_use]).tolist():
+                self._remove(idx, use_too_many_times=True)
         # Beta annealing
         if self._anneal_step != 0:
             self._beta = min(1.0, self._beta + self._beta_anneal_step)
         return data
 
+    def _referenced_frames(self) -> Iterable[np.ndarray]:
+        for d in self._data:
+            if d is not None:
+                for k in self._frame_dedup_keys:
+                    if k in d:
+                        yield d[k]
+
+    def _encode_frames(self, data: List[dict]) -> List[dict]:
+        r"""
+        Overview:
+            Replace stacked observations in data by frame ids of ``self._frame_storage``.
+        Arguments:
+            - data (:obj:`List[dict]`): Data list which will be inserted.
+        Returns:
+            - encoded_data (:obj:`List[dict]`): Shallow copy of each data, with stacked observations replaced.
+        """
+        encoded = []
+
+        def referenced() -> Iterable[np.ndarray]:
+            # Data which is encoded but not inserted yet should also be kept
+            pending = [d[k] for d in encoded for k in self._frame_dedup_keys if k in d]
+            return itertools.chain(self._referenced_frames(), pending)
+
+        for d in data:
+            encoded.append(self._frame_storage.encode(d, self._frame_dedup_keys, referenced))
+        return encoded
+
+    def _decode_frames(self, data: List[dict]) -> None:
+        r"""
+        Overview:
+            Reconstruct stacked observations of sampled data in place, each key is reconstructed in one batch.
+        Arguments:
+            - data (:obj:`List[dict]`): Sampled data, which should be copies of data in buffer.
+        """
+        for k in self._frame_dedup_keys:
+            pos = [i for i, d in enumerate(data) if k in d]
+            if len(pos) == 0:
+                continue
+            frames = self._frame_storage.get(np.stack([data[i][k] for i in pos]))
+            for j, i in enumerate(pos):
+                data[i][k] = frames[j]
+
     def _monitor_update_of_push(self, add_count: int, cur_collector_envstep: int = -1) -> None:
         r"""
         Overview:
@@ -618,7 +745,7 @@ class AdvancedReplayBuffer(IBuffer):
             self._thruput_controller.history_push_count += add_count
         self._cur_collector_envstep = cur_collector_envstep
 
-    def _monitor_update_of_sample(self, sample_data: list, cur_learner_iter: int) -> None:
+    def _monitor_update_of_sample(self, sample_data: list, cur_learner_iter: int, monitor_attr: bool = True) -> None:
         r"""
         Overview:
             Update values in monitor, then update text logger and tensorboard logger.
@@ -627,11 +754,14 @@ class AdvancedReplayBuffer(IBuffer):
             - sample_data (:obj:`list`): Sampled data. Used to get sample length and data's attributes, \
                 e.g. use, priority, staleness, etc.
             - cur_learner_iter (:obj:`int`): Learner iteration, passed in by learner.
+            - monitor_attr (:obj:`bool`): Whether to monitor sampled data attributes, or only update counts.
         """
         self._periodic_thruput_monitor.sample_data_count += len(sample_data)
         if self._use_thruput_controller:
             self._thruput_controller.history_sample_count += len(sample_data)
         self._cur_learner_iter = cur_learner_iter
+        if not monitor_attr:
+            return
         use_avg = sum([d['use'] for d in sample_data]) / len(sample_data)
         use_max = max([d['use'] for d in sample_data])
         priority_avg = sum([d['priority'] for d in sample_data]) / len(sample_data)
@@ -669,32 +799,34 @@ class AdvancedReplayBuffer(IBuffer):
                     self._tb_logger.add_scalar('{}_step/'.format(self._instance_name) + k, v, step_metric)
         self._sampled_data_attr_print_count += 1
 
-    def _calculate_staleness(self, pos_index: int, cur_learner_iter: int) -> Optional[int]:
+    def _calculate_staleness(self, pos_index: Union[int, np.ndarray], cur_learner_iter: int) -> Union[int, np.ndarray]:
         r"""
         Overview:
             Calculate a data's staleness according to its own attribute ``collect_iter``
             and input parameter ``cur_learner_iter``.
         Arguments:
-            - pos_index (:obj:`int`): The position index. Staleness of the data at this index will be calculated.
+            - pos_index (:obj:`Union[int, np.ndarray]`): The position index. Staleness of the data at this index \
+                will be calculated. It can also be an index array, then staleness of all the data is calculated at once.
             - cur_learner_iter (:obj:`int`): Learner's current iteration, used to calculate staleness.
         Returns:
-            - staleness (:obj:`int`): Staleness of data at position ``pos_index``.
+            - staleness (:obj:`Union[int, np.ndarray]`): Staleness of data at position ``pos_index``.
 
         .. note::
             Caller should guarantee that data at ``pos_index`` is not None; Otherwise this function may raise an error.
         """
+        if isinstance(pos_index, np.ndarray):
+            collect_iter = self._collect_iter[pos_index]
+            # ``staleness`` might be -1, means invalid, refer to the int index case below
+            return np.where(collect_iter == NO_COLLECT_ITER, -1, cur_learner_iter - collect_iter)
         if self._data[pos_index] is None:
             raise ValueError("Prioritized's data at index {} is None".format(pos_index))
         else:
-            # Calculate staleness, remove it if too stale
-            collect_iter = self._data[pos_index].get('collect_iter', cur_learner_iter + 1)
-            if isinstance(collect_iter, list):
-                # Timestep transition's collect_iter is a list
-                collect_iter = min(collect_iter)
+            collect_iter = self._collect_iter[pos_index]
             # ``staleness`` might be -1, means invalid, e.g. collector does not report collecting model iter,
             # or it is a demonstration buffer(which means data is not generated by collector) etc.
-            staleness = cur_learner_iter - collect_iter
-            return staleness
+            if collect_iter == NO_COLLECT_ITER:
+                return -1
+            return cur_learner_iter - int(collect_iter)
 
     def count(self) -> int:
         """
@@ -734,6 +866,7 @@ class AdvancedReplayBuffer(IBuffer):
             'push_count': self._push_count,
             'sum_tree': self._sum_tree,
             'min_tree': self._min_tree,
+            'frame_storage': self._frame_storage,
         }
 
     def load_state_dict(self, _state_dict: dict, deepcopy: bool = False) -> None:
@@ -752,6 +885,18 @@ class AdvancedReplayBuffer(IBuffer):
                     setattr(self, '_{}'.format(k), copy.deepcopy(v))
                 else:
                     setattr(self, '_{}'.format(k), v)
+            if isinstance(self._use_count, dict):
+                # Compatible with the old state dict, whose use count is {position_idx: use_count}
+                self._use_count = np.array(
+                    [self._use_count[i] for i in range(self._replay_buffer_size)], dtype=np.int64
+                )
+            # ``collect_iter`` and unique id are not in state dict, they are recorded from the loaded data again
+            self._collect_iter = np.full(self._replay_buffer_size, NO_COLLECT_ITER, dtype=np.int64)
+            self._unique_id = np.full(self._replay_buffer_size, None, dtype=object)
+            for d in self._data:
+                if d is not None:
+                    self._set_collect_iter(d)
+                    self._unique_id[d['replay_buffer_idx']] = d['replay_unique_id']
 
     @property
     def replay_buffer_size(self) -> int:
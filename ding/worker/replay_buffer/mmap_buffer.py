@@ -0,0 +1,358 @@
+import os
+import io
+import copy
+import json
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import torch
+
+from ding.utils import BUFFER_REGISTRY
+from .naive_buffer import NaiveReplayBuffer
+
+
+def _infer_schema(data: dict, prefix: Tuple[str, ...] = ()) -> Dict[Tuple[str, ...], Tuple[str, str, tuple]]:
+    """
+    Overview:
+        Infer the fields which can be saved in ``np.memmap`` from the first pushed data. Nested dicts are expanded, \
+        each field is identified by its key path, and described by its kind, dtype and shape.
+    """
+    schema = {}
+    for k, v in data.items():
+        path = prefix + (k, )
+        if isinstance(v, dict):
+            schema.update(_infer_schema(v, path))
+        elif isinstance(v, torch.Tensor) and v.dtype != torch.bfloat16:
+            schema[path] = ('tensor', v.detach().cpu().numpy().dtype.str, tuple(v.shape))
+        elif isinstance(v, np.ndarray) and v.dtype != object:
+            schema[path] = ('ndarray', v.dtype.str, v.shape)
+        elif isinstance(v, (bool, int, float, np.bool_, np.integer, np.floating)):
+            schema[path] = ('scalar', np.asarray(v).dtype.str, ())
+    return schema
+
+
+def _split_data(data: dict, schema: Dict[Tuple[str, ...], Any]) -> Tuple[Dict[Tuple[str, ...], Any], dict]:
+    """
+    Overview:
+        Split data into the values of schema fields and a dict of all the other (object) values.
+    """
+    arrays = {}
+
+    def _split(d: dict, prefix: Tuple[str, ...]) -> dict:
+        objects = {}
+        for k, v in d.items():
+            path = prefix + (k, )
+            if path in schema:
+                arrays[path] = v.detach().cpu().numpy() if isinstance(v, torch.Tensor) else v
+            elif isinstance(v, dict) and any([p[:len(path)] == path for p in schema]):
+                objects[k] = _split(v, path)
+            else:
+                objects[k] = v
+        return objects
+
+    objects = _split(data, ())
+    if len(arrays) != len(schema):
+        missing = [p for p in schema if p not in arrays]
+        raise ValueError("Pushed data doesn't have the fields inferred from the first data: {}".format(missing))
+    return arrays, objects
+
+
+def _copy_dict(d: dict) -> dict:
+    # Copy all the nested dicts, so that setting array fields won't change the object values in buffer
+    return {k: _copy_dict(v) if isinstance(v, dict) else v for k, v in d.items()}
+
+
+def _set_path(d: dict, path: Tuple[str, ...], value: Any) -> None:
+    for k in path[:-1]:
+        d = d.setdefault(k, {})
+    d[path[-1]] = value
+
+
+@BUFFER_REGISTRY.register('mmap')
+class MmapReplayBuffer(NaiveReplayBuffer):
+    r"""
+    Overview:
+        Disk-backed replay buffer, array fields of data (``np.ndarray``, ``torch.Tensor`` and scalars, nested dicts \
+        are expanded) are stored in ``np.memmap`` files, whose schema is inferred from the first pushed data. \
+        Only the sampled rows are read from disk, so the buffer can be larger than RAM, and the OS writes back \
+        dirty pages incrementally. Other values (e.g. ``info`` dicts) are kept in memory, and the values of the \
+        slots written since the last ``flush`` are appended to a log file, which is compacted once it holds twice \
+        as many records as the buffer size.
+        Checkpoint is just ``flush`` and saving a small state dict of counters, no data is serialized. With \
+        ``resume=True``, the buffer reopens the files in ``mmap_dir`` when it's created after a restart.
+    Interface:
+        start, close, push, update, sample, clear, count, flush, state_dict, load_state_dict, default_config
+    Property:
+        replay_buffer_size, push_count, mmap_dir
+    """
+
+    config = dict(
+        type='mmap',
+        replay_buffer_size=10000,
+        deepcopy=False,
+        # default `False` for serial pipeline
+        enable_track_used_data=False,
+        periodic_thruput_seconds=60,
+        # Directory of memmap files, default is './{exp_name}/mmap_buffer/{instance_name}'.
+        mmap_dir=None,
+        # Whether to reopen the memmap files in ``mmap_dir`` if they exist, e.g. when the learner restarts.
+        resume=False,
+        # Flush memmap files and metadata every ``flush_interval`` pushed data, 0 means only flush manually.
+        flush_interval=1000,
+    )
+
+    def __init__(
+            self,
+            cfg: 'EasyDict',  # noqa
+            tb_logger: Optional['SummaryWriter'] = None,  # noqa
+            exp_name: Optional[str] = 'default_experiment',
+            instance_name: Optional[str] = 'buffer',
+    ) -> None:
+        """
+        Overview:
+            Initialize the buffer
+        Arguments:
+            - cfg (:obj:`dict`): Config dict.
+            - tb_logger (:obj:`Optional['SummaryWriter']`): Outer tb logger. Usually get this argument in serial mode.
+            - exp_name (:obj:`Optional[str]`): Name of this experiment.
+            - instance_name (:obj:`Optional[str]`): Name of this instance.
+        """
+        super().__init__(cfg, tb_logger, exp_name, instance_name)
+        assert not self._enable_track_used_data, "MmapReplayBuffer doesn't support track used data."
+        # Data is saved in memmap fields, release the list allocated by ``NaiveReplayBuffer``.
+        self._data = None
+        self._mmap_dir = self._cfg.mmap_dir or './{}/mmap_buffer/{}'.format(self._exp_name, self._instance_name)
+        self._flush_interval = self._cfg.flush_interval
+        self._schema = None
+        self._fields = None
+        self._objects = [None for _ in range(self._replay_buffer_size)]
+        self._unflushed_count = 0
+        # Slots whose object values are not in the object log yet
+        self._dirty_slots = set()
+        # Object values are appended to ``objects.{generation}.log`` as pickled (slot, objects) records,
+        # only the first ``size`` bytes of the log recorded in metadata are valid.
+        self._log_generation = 0
+        self._log_size = 0
+        self._log_records = 0
+        if self._cfg.resume and os.path.exists(os.path.join(self._mmap_dir, 'meta.json')):
+            self._resume()
+
+    def _field_path(self, path: Tuple[str, ...]) -> str:
+        return os.path.join(self._mmap_dir, '.'.join(path) + '.mmap')
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self._mmap_dir, 'objects.{}.log'.format(generation))
+
+    def _open_fields(self, mode: str) -> None:
+        shapes = {path: (self._replay_buffer_size, *shape) for path, (_, _, shape) in self._schema.items()}
+        self._fields = {
+            path: np.memmap(self._field_path(path), dtype=dtype, mode=mode, shape=shapes[path])
+            for path, (_, dtype, _) in self._schema.items()
+        }
+
+    def _create_fields(self, data: dict) -> None:
+        if not isinstance(data, dict):
+            raise TypeError("MmapReplayBuffer only supports dict data, but get {}".format(type(data)))
+        os.makedirs(self._mmap_dir, exist_ok=True)
+        self._schema = _infer_schema(data)
+        self._open_fields('w+')
+
+    def _write(self, data: Any, slot: int) -> None:
+        if self._fields is None:
+            self._create_fields(data)
+        arrays, objects = _split_data(data, self._schema)
+        for path, value in arrays.items():
+            self._fields[path][slot] = value
+        # Array fields are copied into memmap anyway, only object values need to be copied
+        self._objects[slot] = copy.deepcopy(objects) if self._deepcopy else objects
+        self._dirty_slots.add(slot)
+
+    def _append(self, ori_data: Any, cur_collector_envstep: int = -1) -> None:
+        r"""
+        Overview:
+            Write a data item into the memmap fields.
+        Arguments:
+            - ori_data (:obj:`Any`): The data which will be inserted.
+            - cur_collector_envstep (:obj:`int`): Not used in this method, but preserved for compatibility.
+        """
+        self._extend([ori_data], cur_collector_envstep)
+
+    def _extend(self, ori_data: List[Any], cur_collector_envstep: int = -1) -> None:
+        r"""
+        Overview:
+            Write a data list into the memmap fields, the oldest data is overwritten when the buffer is full.
+        Arguments:
+            - ori_data (:obj:`List[Any]`): The data list.
+            - cur_collector_envstep (:obj:`int`): Not used in this method, but preserved for compatibility.
+        """
+        with self._lock:
+            for data in ori_data:
+                self._write(data, self._tail)
+                self._tail = (self._tail + 1) % self._replay_buffer_size
+            self._push_count += len(ori_data)
+            self._valid_count = min(self._valid_count + len(ori_data), self._replay_buffer_size)
+            self._periodic_thruput_monitor.valid_count = self._valid_count
+            self._unflushed_count += len(ori_data)
+            if self._flush_interval > 0 and self._unflushed_count >= self._flush_interval:
+                self._flush()
+
+    def _sample_with_indices(self, indices: List[int], cur_learner_iter: int) -> list:
+        r"""
+        Overview:
+            Gather the sampled rows of each memmap field, and assemble them with object values into data dicts.
+        Arguments:
+            - indices (:obj:`List[int]`): A list including all the sample indices.
+            - cur_learner_iter (:obj:`int`): Not used in this method, but preserved for compatibility.
+        Returns:
+            - data (:obj:`list`) Sampled data.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        gathered = {path: np.asarray(field[indices]) for path, field in self._fields.items()}
+        data = []
+        for i, idx in enumerate(indices.tolist()):
+            item = copy.deepcopy(self._objects[idx]) if self._deepcopy else _copy_dict(self._objects[idx])
+            for path, (kind, _, _) in self._schema.items():
+                value = gathered[path][i]
+                if kind == 'tensor':
+                    value = torch.from_numpy(value)
+                elif kind == 'scalar':
+                    value = value.item()
+                _set_path(item, path, value)
+            data.append(item)
+        return data
+
+    def close(self) -> None:
+        """
+        Overview:
+            Flush the buffer to disk so that it can be resumed, then close the logger.
+        """
+        self.flush()
+        self._tb_logger.flush()
+        self._tb_logger.close()
+
+    def clear(self) -> None:
+        """
+        Overview:
+            Clear all the data and reset the related variables, memmap files are kept and will be overwritten.
+        """
+        with self._lock:
+            self._objects = [None for _ in range(self._replay_buffer_size)]
+            self._dirty_slots.clear()
+            # Records in the object log are all stale, start a new log in the next flush
+            self._log_records = float('inf')
+            self._valid_count = 0
+            self._periodic_thruput_monitor.valid_count = self._valid_count
+            self._push_count = 0
+            self._tail = 0
+
+    def flush(self) -> None:
+        """
+        Overview:
+            Write dirty pages of memmap fields, object values and counters to disk, so that the buffer can be \
+            resumed from ``mmap_dir``.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._fields is None:
+            return
+        for field in self._fields.values():
+            field.flush()
+        old_generation = None
+        if self._log_records + len(self._dirty_slots) > 2 * self._replay_buffer_size:
+            # Compact: write all the valid slots to a new log, the old one is removed after metadata points to the new
+            old_generation = self._log_generation
+            self._log_generation += 1
+            self._log_size = 0
+            self._log_records = 0
+            self._dirty_slots = {i for i, objects in enumerate(self._objects) if objects is not None}
+        with open(self._log_path(self._log_generation), 'r+b' if self._log_size > 0 else 'wb') as f:
+            # Drop the tail which is not recorded in metadata, e.g. written by a killed process
+            f.seek(self._log_size)
+            f.truncate()
+            for slot in sorted(self._dirty_slots):
+                pickle.dump((slot, self._objects[slot]), f)
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_size = f.tell()
+        self._log_records += len(self._dirty_slots)
+        self._dirty_slots.clear()
+        meta = {
+            'replay_buffer_size': self._replay_buffer_size,
+            'schema': [[list(path), kind, dtype, list(shape)] for path, (kind, dtype, shape) in self._schema.items()],
+            'tail': self._tail,
+            'valid_count': self._valid_count,
+            'push_count': self._push_count,
+            'log_generation': self._log_generation,
+            'log_size': self._log_size,
+        }
+        # Write to a temp file and rename, so that the metadata is always complete even if the process is killed
+        meta_path = os.path.join(self._mmap_dir, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        if old_generation is not None and os.path.exists(self._log_path(old_generation)):
+            os.remove(self._log_path(old_generation))
+        self._unflushed_count = 0
+
+    def _resume(self) -> None:
+        with open(os.path.join(self._mmap_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        assert meta['replay_buffer_size'] == self._replay_buffer_size, \
+            "Replay buffer size mismatch: {} in {}, {} in config".format(
+                meta['replay_buffer_size'], self._mmap_dir, self._replay_buffer_size
+            )
+        self._schema = {tuple(path): (kind, dtype, tuple(shape)) for path, kind, dtype, shape in meta['schema']}
+        self._open_fields('r+')
+        self._objects = [None for _ in range(self._replay_buffer_size)]
+        self._dirty_slots = set()
+        self._log_generation = meta['log_generation']
+        self._log_size = meta['log_size']
+        self._log_records = 0
+        with open(self._log_path(self._log_generation), 'rb') as f:
+            log = io.BytesIO(f.read(self._log_size))
+        # Replay the records, the later record of a slot overwrites the earlier one
+        while log.tell() < self._log_size:
+            slot, objects = pickle.load(log)
+            self._objects[slot] = objects
+            self._log_records += 1
+        self._tail = meta['tail']
+        self._valid_count = meta['valid_count']
+        self._push_count = meta['push_count']
+        self._periodic_thruput_monitor.valid_count = self._valid_count
+
+    def state_dict(self) -> dict:
+        """
+        Overview:
+            Flush the buffer and provide a state dict of counters, data stays in memmap files of ``mmap_dir``.
+        Returns:
+            - state_dict (:obj:`Dict[str, Any]`): A dict containing ``mmap_dir`` and counters of the buffer.
+        """
+        self.flush()
+        return {
+            'mmap_dir': self._mmap_dir,
+            'tail': self._tail,
+            'valid_count': self._valid_count,
+            'push_count': self._push_count,
+        }
+
+    def load_state_dict(self, _state_dict: dict) -> None:
+        """
+        Overview:
+            Reopen the memmap files and restore counters from the state dict.
+        Arguments:
+            - state_dict (:obj:`Dict[str, Any]`): A dict returned by ``state_dict``.
+        """
+        with self._lock:
+            self._mmap_dir = _state_dict['mmap_dir']
+            self._resume()
+            # Counters in state dict may be older than the metadata, data pushed after it will be overwritten.
+            self._tail = _state_dict['tail']
+            self._valid_count = _state_dict['valid_count']
+            self._push_count = _state_dict['push_count']
+            self._periodic_thruput_monitor.valid_count = self._valid_count
+
+    @property
+    def mmap_dir(self) -> str:
+        return self._mmap_dir
@@ -0,0 +1,191 @@
+from typing import Optional
+from collections import deque
+from threading import Thread, Condition, Lock
+import time
+
+from .utils import SampledData
+
+
+class PrefetchSampler:
+    """
+    Overview:
+        Sample batches from a replay buffer in a background thread, so that sampling the next batch overlaps with \
+        training on the current one. It has the same ``sample`` and ``update`` interface as ``IBuffer``, and can \
+        be used in place of the buffer in serial entry.
+        When priority is used, a batch sampled before some priority updates are applied is stale. Batch ``k`` is \
+        sampled only after at least ``k - max_staleness`` updates have been applied, so ``max_staleness=0`` is \
+        the same as sampling synchronously and ``1`` overlaps sampling with one training iteration.
+        Buffers without deepcopy return the stored data dicts and set their sampling attributes (e.g. ``IS``) in \
+        place, so each sampled dict is shallow copied before the next batch is sampled, otherwise prefetching the \
+        next batch would overwrite the attributes of the batch being trained.
+    Interface:
+        __init__, sample, update, close
+    Property:
+        overlap_time, wait_time, prefetch_time
+    """
+
+    def __init__(
+            self,
+            replay_buffer: 'IBuffer',  # noqa
+            prefetch_num: int = 2,
+            max_staleness: int = 1,
+            priority: bool = False
+    ) -> None:
+        """
+        Overview:
+            Initialize the prefetch sampler, the background thread is started when ``sample`` is called first time.
+        Arguments:
+            - replay_buffer (:obj:`IBuffer`): Thread-safe replay buffer, e.g. ``AdvancedReplayBuffer``.
+            - prefetch_num (:obj:`int`): Max number of batches kept ready.
+            - max_staleness (:obj:`int`): Max number of priority updates that a batch can miss.
+            - priority (:obj:`bool`): Whether priority updates are applied by ``update``, if not, batches never \
+                become stale.
+        """
+        self._replay_buffer = replay_buffer
+        self._prefetch_num = prefetch_num
+        self._max_staleness = max_staleness
+        self._priority = priority
+        self._queue = deque()
+        self._cond = Condition()
+        self._end_flag = False
+        self._thread = None
+        # Sampling and copying of a batch is done before the next batch is sampled
+        self._sample_lock = Lock()
+        # Arguments of the latest ``sample`` call, the background thread samples with them.
+        self._size = None
+        self._cur_learner_iter = 0
+        # The background thread stops when the buffer can't sample enough data, until next ``sample`` call.
+        self._active = False
+        self._sampling = False
+        # Number of sampled (or being sampled) batches, and number of applied priority updates.
+        self._sample_count = 0
+        self._update_count = 0
+        self._prefetch_time = 0.
+        self._wait_time = 0.
+
+    def sample(self, size: int, cur_learner_iter: int) -> Optional[list]:
+        """
+        Overview:
+            Get a prefetched batch, sample it synchronously if there is no prefetched batch.
+        Arguments:
+            - size (:obj:`int`): The number of the data that will be sampled.
+            - cur_learner_iter (:obj:`int`): Learner's current iteration.
+        Returns:
+            - sampled_data (:obj:`Optional[list]`): Sampled data, ``None`` if the buffer can't sample enough data.
+        """
+        start = time.time()
+        with self._cond:
+            if size != self._size:
+                # Batches of other size are useless
+                self._sample_count -= len(self._queue)
+                self._queue.clear()
+                self._size = size
+            self._cur_learner_iter = cur_learner_iter
+            self._active = True
+            if self._thread is None:
+                self._thread = Thread(target=self._prefetch, name='prefetch_sampler', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+            while len(self._queue) == 0 and self._sampling:
+                self._cond.wait()
+            if len(self._queue) > 0:
+                data, cost = self._queue.popleft()
+                self._cond.notify_all()
+                self._wait_time += time.time() - start
+                self._prefetch_time += cost
+                return data
+            # Reserve the batch before sampling, so that the background thread won't sample the same batch.
+            self._sample_count += 1
+        data = self._sample(size, cur_learner_iter)
+        if data is None:
+            with self._cond:
+                self._sample_count -= 1
+        return data
+
+    def update(self, info: dict) -> None:
+        """
+        Overview:
+            Update priority of the buffer, and allow the background thread to sample the next batch.
+        Arguments:
+            - info (:obj:`dict`): Info dict, e.g. ``learner.priority_info``.
+        """
+        self._replay_buffer.update(info)
+        with self._cond:
+            self._update_count += 1
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """
+        Overview:
+            Stop the background thread and drop all the prefetched batches.
+        """
+        with self._cond:
+            self._end_flag = True
+            self._queue.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _can_prefetch(self) -> bool:
+        if not self._active or len(self._queue) >= self._prefetch_num:
+            return False
+        return not self._priority or self._sample_count - self._update_count <= self._max_staleness
+
+    def _sample(self, size: int, cur_learner_iter: int) -> Optional[list]:
+        with self._sample_lock:
+            data = self._replay_buffer.sample(size, cur_learner_iter)
+            if data is None:
+                return None
+            copied = [dict(d) if isinstance(d, dict) else d for d in data]
+        if isinstance(data, SampledData):
+            return SampledData(copied, data.replay_buffer_idx, data.replay_unique_id)
+        return copied
+
+    def _prefetch(self) -> None:
+        while True:
+            with self._cond:
+                while not self._end_flag and not self._can_prefetch():
+                    self._cond.wait()
+                if self._end_flag:
+                    break
+                size, cur_learner_iter = self._size, self._cur_learner_iter
+                self._sampling = True
+                self._sample_count += 1
+            start = time.time()
+            data = self._sample(size, cur_learner_iter)
+            cost = time.time() - start
+            with self._cond:
+                self._sampling = False
+                if data is None:
+                    self._active = False
+                    self._sample_count -= 1
+                elif size == self._size and not self._end_flag:
+                    self._queue.append((data, cost))
+                else:
+                    self._sample_count -= 1
+                self._cond.notify_all()
+
+    @property
+    def prefetch_time(self) -> float:
+        """
+        Overview:
+            Total sampling time of all the consumed prefetched batches.
+        """
+        return self._prefetch_time
+
+    @property
+    def wait_time(self) -> float:
+        """
+        Overview:
+            Total time that ``sample`` waits for prefetched batches.
+        """
+        return self._wait_time
+
+    @property
+    def overlap_time(self) -> float:
+        """
+        Overview:
+            Total wall time saved by prefetching, i.e. the sampling time hidden behind training.
+        """
+        return max(self._prefetch_time - self._wait_time, 0.)
@@ -0,0 +1,385 @@
+import copy
+from collections import OrderedDict
+from typing import Union, Optional, List, Dict
+import numpy as np
+import torch
+
+from ding.worker.replay_buffer import IBuffer
+from ding.utils import SumSegmentTree, MinSegmentTree, LockContext, LockContextType, BUFFER_REGISTRY, \
+    build_logger, lists_to_dicts
+from .utils import generate_id, split_id, priority_info_to_array, SampledData
+
+
+@BUFFER_REGISTRY.register('sequence')
+class SequenceReplayBuffer(IBuffer):
+    r"""
+    Overview:
+        Prioritized replay buffer for recurrent policies (e.g. R2D2, NGU), which stores each traj segment only once \
+        and samples burnin + unroll sequences as windows of segments. The pushed data are windows generated by \
+        ``ding.rl_utils.get_sequence_window``, windows which refer to the same segment share its transitions, \
+        so overlapping sequences don't duplicate any data. Windows are sliced, padded and collated to the same \
+        format as ``get_train_sample`` at sample time, and each window has its own priority.
+        Buffer size is counted in transitions, the oldest segment is removed with all its windows when the buffer \
+        is full.
+    Interface:
+        start, close, push, update, sample, clear, count, state_dict, load_state_dict, default_config
+    Property:
+        beta, replay_buffer_size, push_count, step_count
+    """
+
+    config = dict(
+        type='sequence',
+        # Max number of transitions in the buffer.
+        replay_buffer_size=10000,
+        # Step between starts of two adjacent sequences of a segment, which is used by policy when it generates
+        # sequences for this buffer. Sequences overlap if it is less than the sequence length, None means no overlap.
+        seq_stride=None,
+        # Length of traj segment which is cut by collector, windows can only overlap when a segment is longer than
+        # the sequence length. None means the sequence length.
+        segment_len=None,
+        # (Float type) How much prioritization is used: 0 means no prioritization while 1 means full prioritization
+        alpha=0.6,
+        # (Float type)  How much correction is used: 0 means no correction while 1 means full correction
+        beta=0.4,
+        # Anneal step for beta: 0 means no annealing
+        anneal_step=int(1e5),
+    )
+
+    def __init__(
+            self,
+            cfg: dict,
+            tb_logger: Optional['SummaryWriter'] = None,  # noqa
+            exp_name: Optional[str] = 'default_experiment',
+            instance_name: Optional[str] = 'buffer',
+    ) -> None:
+        """
+        Overview:
+            Initialize the buffer
+        Arguments:
+            - cfg (:obj:`dict`): Config dict.
+            - tb_logger (:obj:`Optional['SummaryWriter']`): Outer tb logger. Usually get this argument in serial mode.
+            - exp_name (:obj:`Optional[str]`): Name of this experiment.
+            - instance_name (:obj:`Optional[str]`): Name of this instance.
+        """
+        self._exp_name = exp_name
+        self._instance_name = instance_name
+        self._end_flag = False
+        self._cfg = cfg
+        self._replay_buffer_size = self._cfg.replay_buffer_size
+        self.alpha = self._cfg.alpha
+        self._beta = self._cfg.beta
+        self._anneal_step = self._cfg.anneal_step
+        if self._anneal_step != 0:
+            self._beta_anneal_step = (1 - self._beta) / self._anneal_step
+        # Each window start is a different transition, so there are no more windows than transitions.
+        capacity = int(np.power(2, np.ceil(np.log2(self._replay_buffer_size))))
+        self._sum_tree = SumSegmentTree(capacity)
+        self._min_tree = MinSegmentTree(capacity)
+        self._lock = LockContext(type_=LockContextType.THREAD_LOCK)
+        # A small positive number to avoid edge-case, e.g. "priority" == 0.
+        self._eps = 1e-5
+        if tb_logger is not None:
+            self._logger, _ = build_logger(
+                './{}/log/{}'.format(self._exp_name, self._instance_name), self._instance_name, need_tb=False
+            )
+            self._tb_logger = tb_logger
+        else:
+            self._logger, self._tb_logger = build_logger(
+                './{}/log/{}'.format(self._exp_name, self._instance_name),
+                self._instance_name,
+            )
+        self._reset()
+
+    def _reset(self) -> None:
+        # Segments in push order, {segment_id: {'data': transition list, 'slots': window positions}}
+        self._segments = OrderedDict()
+        self._next_segment_id = 0
+        # How many transitions are stored in all the segments.
+        self._step_count = 0
+        # Window of each position in the circular queue, -1 segment means the position is empty.
+        self._window_segment = np.full(self._replay_buffer_size, -1, dtype=np.int64)
+        self._window_start = np.zeros(self._replay_buffer_size, dtype=np.int64)
+        self._window_len = np.zeros(self._replay_buffer_size, dtype=np.int64)
+        self._window_unique_id = np.zeros(self._replay_buffer_size, dtype=np.int64)
+        self._window_priority = np.zeros(self._replay_buffer_size, dtype=np.float64)
+        self._tail = 0
+        self._valid_count = 0
+        self._push_count = 0
+        self._next_unique_id = 0
+        self._max_priority = 1.0
+        self._sum_tree.value[:] = self._sum_tree.neutral_element
+        self._min_tree.value[:] = self._min_tree.neutral_element
+
+    def start(self) -> None:
+        """
+        Overview:
+            Sequence buffer has no background thread, this method is preserved for compatibility.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Overview:
+            Clear the buffer and close tensorboard logger.
+        """
+        if self._end_flag:
+            return
+        self._end_flag = True
+        self.clear()
+        self._tb_logger.flush()
+        self._tb_logger.close()
+
+    def push(self, data: Union[List[Dict], Dict], cur_collector_envstep: int) -> None:
+        r"""
+        Overview:
+            Push windows into buffer, a segment is stored when its first window is pushed, and the other windows \
+            of the same segment only refer to it.
+        Arguments:
+            - data (:obj:`Union[List[Dict], Dict]`): Windows generated by ``get_sequence_window``, optionally \
+                with key ``priority``.
+            - cur_collector_envstep (:obj:`int`): Collector's current env step. \
+                Not used in sequence buffer, but preserved for compatibility.
+        """
+        if not isinstance(data, list):
+            data = [data]
+        with self._lock:
+            # Map ``id`` of segment list to segment id, only valid in this push.
+            segment_of = {}
+            for window in data:
+                segment = window['segment']
+                if id(segment) not in segment_of:
+                    segment_of[id(segment)] = self._add_segment(segment)
+                segment_id = segment_of[id(segment)]
+                if segment_id is None:
+                    continue
+                self._add_window(segment_id, window)
+
+    def _add_segment(self, segment: List[Dict]) -> Optional[int]:
+        if len(segment) > self._replay_buffer_size:
+            self._logger.info(
+                'Refuse to push segment with length {} > replay_buffer_size({})'.format(
+                    len(segment), self._replay_buffer_size
+                )
+            )
+            return None
+        while self._step_count + len(segment) > self._replay_buffer_size:
+            self._remove_segment(next(iter(self._segments)))
+        segment_id = self._next_segment_id
+        self._next_segment_id += 1
+        self._segments[segment_id] = {'data': segment, 'slots': []}
+        self._step_count += len(segment)
+        return segment_id
+
+    def _add_window(self, segment_id: int, window: Dict) -> None:
+        idx = self._tail
+        if self._window_segment[idx] != -1:
+            # Only happens when a segment has more windows than transitions, i.e. duplicated window starts
+            self._remove_segment(int(self._window_segment[idx]))
+        priority = window.get('priority', None)
+        priority = self._max_priority if priority is None else priority
+        self._window_segment[idx] = segment_id
+        self._window_start[idx] = window['segment_start']
+        self._window_len[idx] = window['seq_len']
+        self._window_unique_id[idx] = self._next_unique_id
+        self._window_priority[idx] = priority
+        weight = priority ** self.alpha
+        self._sum_tree[idx] = weight
+        self._min_tree[idx] = weight
+        self._segments[segment_id]['slots'].append(idx)
+        self._tail = (self._tail + 1) % self._replay_buffer_size
+        self._next_unique_id += 1
+        self._valid_count += 1
+        self._push_count += 1
+
+    def _remove_segment(self, segment_id: int) -> None:
+        segment = self._segments.pop(segment_id)
+        slots = np.array(segment['slots'], dtype=np.int64)
+        self._window_segment[slots] = -1
+        self._sum_tree[slots] = self._sum_tree.neutral_element
+        self._min_tree[slots] = self._min_tree.neutral_element
+        self._valid_count -= len(slots)
+        self._step_count -= len(segment['data'])
+
+    def sample(self, size: int, cur_learner_iter: int, sample_range: slice = None) -> Optional[list]:
+        """
+        Overview:
+            Sample sequences with length ``size`` according to the priority of windows.
+        Arguments:
+            - size (:obj:`int`): The number of the sequences that will be sampled.
+            - cur_learner_iter (:obj:`int`): Learner's current iteration, not used in sequence buffer.
+            - sample_range (:obj:`slice`): Not supported by sequence buffer.
+        Returns:
+            - sample_data (:obj:`list`): A list of sequences with length ``size``, each sequence has the same \
+                format as the output of ``get_train_sample``.
+        ReturnsKeys:
+            - necessary: original keys of transitions, each is a list of ``seq_len`` values, \
+                `replay_unique_id`, `replay_buffer_idx`, `priority`, `IS`
+        """
+        assert sample_range is None, "SequenceReplayBuffer doesn't support sample_range"
+        if size == 0:
+            return []
+        with self._lock:
+            if self._valid_count < size:
+                self._logger.info(
+                    "Refuse to sample: valid sequences({}) < sample size({})".format(self._valid_count, size)
+                )
+                return None
+            # Divide [0, 1) into size intervals on average, and uniformly sample within each interval
+            mass = (np.arange(size) + np.random.uniform(size=(size, ))) / size * self._sum_tree.reduce()
+            indices = self._sum_tree.find_prefixsum_idx_batch(mass)
+            sum_tree_root = self._sum_tree.reduce()
+            p_min = self._min_tree.reduce() / sum_tree_root
+            max_weight = (self._valid_count * p_min) ** (-self._beta)
+            p_sample = self._sum_tree[indices] / sum_tree_root
+            IS = (self._valid_count * p_sample) ** (-self._beta) / max_weight
+            segment_ids = self._window_segment[indices].tolist()
+            starts = self._window_start[indices].tolist()
+            lens = self._window_len[indices].tolist()
+            unique_ids = self._window_unique_id[indices].tolist()
+            priorities = self._window_priority[indices].tolist()
+            result, result_ids = [], []
+            for i, idx in enumerate(indices.tolist()):
+                segment = self._segments[segment_ids[i]]['data']
+                sequence = lists_to_dicts(self._get_window(segment, starts[i], lens[i]), recursive=True)
+                sequence['replay_unique_id'] = generate_id(self._instance_name, unique_ids[i])
+                sequence['replay_buffer_idx'] = idx
+                sequence['priority'] = priorities[i]
+                sequence['IS'] = IS[i]
+                result.append(sequence)
+                result_ids.append(sequence['replay_unique_id'])
+            if self._anneal_step != 0:
+                self._beta = min(1.0, self._beta + self._beta_anneal_step)
+            return SampledData(result, np.asarray(indices, dtype=np.int64), np.array(result_ids, dtype=object))
+
+    @staticmethod
+    def _get_window(segment: List[Dict], start: int, seq_len: int) -> List[Dict]:
+        r"""
+        Overview:
+            Slice a window from segment, the missing transitions of a short segment are padded by a null \
+            transition like ``null_padding`` of ``get_train_sample``, which is generated at sample time.
+        """
+        window = segment[start:start + seq_len]
+        miss_num = seq_len - len(window)
+        if miss_num > 0:
+            null_transition = copy.copy(window[-1])
+            for k in ['obs', 'action', 'reward']:
+                if k in null_transition:
+                    null_transition[k] = torch.zeros_like(null_transition[k])
+            null_transition['done'] = True
+            if 'value_gamma' in null_transition:
+                null_transition['value_gamma'] = 0.
+            window = window + [null_transition for _ in range(miss_num)]
+        return window
+
+    def update(self, info: dict) -> None:
+        r"""
+        Overview:
+            Update priority of sequences. Use `replay_buffer_idx` to locate, and use `replay_unique_id` to verify.
+        Arguments:
+            - info (:obj:`dict`): Info dict containing all necessary keys for priority update.
+        ArgumentsKeys:
+            - necessary: `replay_unique_id`, `replay_buffer_idx`, `priority`. All values are lists, arrays or \
+                tensors with the same length.
+        """
+        if 'priority' not in info:
+            return
+        unique_id, idx, priority = priority_info_to_array(info)
+        if len(unique_id) == 0:
+            return
+        name, data_id = split_id(unique_id)
+        with self._lock:
+            valid = (name == self._instance_name) & (self._window_segment[idx] != -1) & \
+                (self._window_unique_id[idx] == data_id)
+            if valid.any():
+                update_idx, update_priority = idx[valid], priority[valid]
+                assert (update_priority >= 0).all(), update_priority
+                self._max_priority = max(self._max_priority, float(update_priority.max()))
+                update_priority = update_priority + self._eps
+                self._window_priority[update_idx] = update_priority
+                weight = update_priority ** self.alpha
+                self._sum_tree[update_idx] = weight
+                self._min_tree[update_idx] = weight
+
+    def clear(self) -> None:
+        """
+        Overview:
+            Clear all the segments and windows.
+        """
+        with self._lock:
+            self._reset()
+
+    def __del__(self) -> None:
+        """
+        Overview:
+            Call ``close`` to delete the object.
+        """
+        if not self._end_flag:
+            self.close()
+
+    def count(self) -> int:
+        """
+        Overview:
+            Count how many sequences (windows) there are in the buffer.
+        Returns:
+            - count (:obj:`int`): Number of valid sequences.
+        """
+        return self._valid_count
+
+    @property
+    def beta(self) -> float:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: float) -> None:
+        self._beta = beta
+
+    def state_dict(self) -> dict:
+        """
+        Overview:
+            Provide a state dict to keep a record of current buffer.
+        Returns:
+            - state_dict (:obj:`Dict[str, Any]`): A dict containing all important values in the buffer.
+        """
+        return {
+            'segments': self._segments,
+            'next_segment_id': self._next_segment_id,
+            'step_count': self._step_count,
+            'window_segment': self._window_segment,
+            'window_start': self._window_start,
+            'window_len': self._window_len,
+            'window_unique_id': self._window_unique_id,
+            'window_priority': self._window_priority,
+            'tail': self._tail,
+            'valid_count': self._valid_count,
+            'push_count': self._push_count,
+            'next_unique_id': self._next_unique_id,
+            'max_priority': self._max_priority,
+            'beta': self._beta,
+            'sum_tree': self._sum_tree,
+            'min_tree': self._min_tree,
+        }
+
+    def load_state_dict(self, _state_dict: dict, deepcopy: bool = False) -> None:
+        """
+        Overview:
+            Load state dict to reproduce the buffer.
+        Arguments:
+            - state_dict (:obj:`Dict[str, Any]`): A dict returned by ``state_dict``.
+        """
+        for k, v in _state_dict.items():
+            if deepcopy:
+                setattr(self, '_{}'.format(k), copy.deepcopy(v))
+            else:
+                setattr(self, '_{}'.format(k), v)
+
+    @property
+    def replay_buffer_size(self) -> int:
+        return self._replay_buffer_size
+
+    @property
+    def push_count(self) -> int:
+        return self._push_count
+
+    @property
+    def step_count(self) -> int:
+        return self._step_count
@@ -0,0 +1,324 @@
+import copy
+import itertools
+from typing import Union, Any, Optional, List, Dict
+import numpy as np
+from easydict import EasyDict
+
+from ding.worker.replay_buffer import IBuffer
+from ding.utils import BUFFER_REGISTRY, build_logger
+from .advanced_buffer import AdvancedReplayBuffer
+from .utils import ThruputController, SampledData, split_id, priority_info_to_array
+
+
+@BUFFER_REGISTRY.register('sharded')
+class ShardedReplayBuffer(IBuffer):
+    r"""
+    Overview:
+        Prioritized replay buffer which partitions data, sum tree and min tree into ``shard_num`` \
+        ``AdvancedReplayBuffer`` shards. Each shard has its own lock, so pushing into one shard doesn't block \
+        sampling from or updating other shards, e.g. collector and learner threads of coordinator in parallel mode.
+        Sample size of each shard is drawn from a multinomial distribution whose probability is proportional to \
+        the total priority of the shard, so each data is sampled with the same probability as a single \
+        ``AdvancedReplayBuffer``, and IS weights are corrected to the whole buffer.
+    Interface:
+        start, close, push, update, sample, clear, count, state_dict, load_state_dict, default_config
+    Property:
+        beta, replay_buffer_size, push_count
+
+    .. note::
+        ``sample_range`` is not supported, because data of different shards is not in a single circular queue.
+    """
+
+    config = dict(
+        copy.deepcopy(AdvancedReplayBuffer.config),
+        type='sharded',
+        # Number of shards, replay buffer size of each shard is ``replay_buffer_size / shard_num``.
+        shard_num=4,
+    )
+
+    def __init__(
+            self,
+            cfg: dict,
+            tb_logger: Optional['SummaryWriter'] = None,  # noqa
+            exp_name: Optional[str] = 'default_experiment',
+            instance_name: Optional[str] = 'buffer',
+    ) -> None:
+        """
+        Overview:
+            Initialize the buffer
+        Arguments:
+            - cfg (:obj:`dict`): Config dict.
+            - tb_logger (:obj:`Optional['SummaryWriter']`): Outer tb logger. Usually get this argument in serial mode.
+            - exp_name (:obj:`Optional[str]`): Name of this experiment.
+            - instance_name (:obj:`Optional[str]`): Name of this instance.
+        """
+        self._exp_name = exp_name
+        self._instance_name = instance_name
+        self._end_flag = False
+        self._cfg = cfg
+        self._replay_buffer_size = self._cfg.replay_buffer_size
+        self._shard_num = self._cfg.shard_num
+        assert self._replay_buffer_size >= self._shard_num, (self._replay_buffer_size, self._shard_num)
+        self._beta = self._cfg.beta
+        self._anneal_step = self._cfg.anneal_step
+        if self._anneal_step != 0:
+            self._beta_anneal_step = (1 - self._beta) / self._anneal_step
+        self._sample_min_limit_ratio = self._cfg.thruput_controller.sample_min_limit_ratio
+        assert self._sample_min_limit_ratio >= 1
+
+        # Thruput controller is shared by all the shards
+        push_sample_rate_limit = self._cfg.thruput_controller.push_sample_rate_limit
+        self._always_can_push = True if push_sample_rate_limit['max'] == float('inf') else False
+        self._always_can_sample = True if push_sample_rate_limit['min'] == 0 else False
+        self._use_thruput_controller = not self._always_can_push or not self._always_can_sample
+        if self._use_thruput_controller:
+            self._thruput_controller = ThruputController(self._cfg.thruput_controller)
+
+        if tb_logger is not None:
+            self._logger, _ = build_logger(
+                './{}/log/{}'.format(self._exp_name, self._instance_name), self._instance_name, need_tb=False
+            )
+            self._tb_logger = tb_logger
+        else:
+            self._logger, self._tb_logger = build_logger(
+                './{}/log/{}'.format(self._exp_name, self._instance_name),
+                self._instance_name,
+            )
+
+        # Shards never refuse to push or sample, and beta is annealed by the sharded buffer.
+        shard_cfg = EasyDict(copy.deepcopy(self._cfg))
+        shard_cfg.type = 'advanced'
+        shard_cfg.replay_buffer_size = int(np.ceil(self._replay_buffer_size / self._shard_num))
+        shard_cfg.anneal_step = 0
+        shard_cfg.thruput_controller.push_sample_rate_limit = dict(max=float('inf'), min=0)
+        self._shards = [
+            AdvancedReplayBuffer(
+                shard_cfg,
+                tb_logger=self._tb_logger,
+                exp_name=self._exp_name,
+                instance_name='{}_shard{}'.format(self._instance_name, i)
+            ) for i in range(self._shard_num)
+        ]
+        # Data's ``replay_unique_id`` is generated by its shard's instance name, which is used to route update info.
+        self._shard_of_name = {shard._instance_name: shard for shard in self._shards}
+        # ``next`` of ``itertools.count`` is atomic in CPython, so push threads can pick shards without a lock.
+        self._push_counter = itertools.count()
+
+    def start(self) -> None:
+        """
+        Overview:
+            Start all the shards.
+        """
+        for shard in self._shards:
+            shard.start()
+
+    def close(self) -> None:
+        """
+        Overview:
+            Close all the shards and flush tensorboard logger.
+        """
+        if self._end_flag:
+            return
+        self._end_flag = True
+        for shard in self._shards:
+            shard.close()
+
+    def push(self, data: Union[List[Any], Any], cur_collector_envstep: int) -> None:
+        r"""
+        Overview:
+            Push a data into buffer. A data list is split into shards in a round-robin way, which only locks one \
+            shard at a time.
+        Arguments:
+            - data (:obj:`Union[List[Any], Any]`): The data which will be pushed into buffer. Can be one \
+                (in `Any` type), or many(int `List[Any]` type).
+            - cur_collector_envstep (:obj:`int`): Collector's current env step.
+        """
+        push_size = len(data) if isinstance(data, list) else 1
+        if not self._always_can_push:
+            can_push, push_info = self._thruput_controller.can_push(push_size)
+            if not can_push:
+                self._logger.info('Refuse to push because {}'.format(push_info))
+                return
+        start = next(self._push_counter)
+        if isinstance(data, list):
+            for i in range(min(self._shard_num, len(data))):
+                self._shards[(start + i) % self._shard_num].push(data[i::self._shard_num], cur_collector_envstep)
+        else:
+            self._shards[start % self._shard_num].push(data, cur_collector_envstep)
+        if self._use_thruput_controller:
+            self._thruput_controller.history_push_count += push_size
+
+    def sample(self, size: int, cur_learner_iter: int, sample_range: slice = None) -> Optional[list]:
+        """
+        Overview:
+            Sample data with length ``size``, sample size of each shard is proportional to its total priority.
+        Arguments:
+            - size (:obj:`int`): The number of the data that will be sampled.
+            - cur_learner_iter (:obj:`int`): Learner's current iteration, used to calculate staleness.
+            - sample_range (:obj:`slice`): Not supported by sharded buffer.
+        Returns:
+            - sample_data (:obj:`list`): A list of data with length ``size``
+        """
+        assert sample_range is None, "ShardedReplayBuffer doesn't support sample_range"
+        if size == 0:
+            return []
+        if self._cfg.max_staleness != float("inf"):
+            for shard in self._shards:
+                # Only remove stale data in each shard, whether the whole buffer can sample is checked below
+                shard._sample_check(1, cur_learner_iter)
+        valid_count = self.count()
+        if valid_count / size < self._sample_min_limit_ratio:
+            self._logger.info(
+                "Refuse to sample: valid({}) / sample({}) < sample_min_limit_ratio({})".format(
+                    valid_count, size, self._sample_min_limit_ratio
+                )
+            )
+            return None
+        if not self._always_can_sample:
+            can_sample, thruput_info = self._thruput_controller.can_sample(size)
+            if not can_sample:
+                self._logger.info('Refuse to sample due to thruput: {}'.format(thruput_info))
+                return None
+
+        # Snapshot the totals under the lock of each shard, they are only used as the probabilities of shards.
+        totals, mins = np.zeros(self._shard_num), np.zeros(self._shard_num)
+        for i, shard in enumerate(self._shards):
+            with shard._lock:
+                if shard._valid_count > 0:
+                    totals[i], mins[i] = shard._sum_tree.reduce(), shard._min_tree.reduce()
+        if totals.sum() <= 0:
+            self._logger.info("Refuse to sample: all the data has zero priority")
+            return None
+        global_min = mins[totals > 0].min()
+        shard_sizes = np.random.multinomial(size, totals / totals.sum())
+        # Sampled data attributes are only monitored in the shard with the most sampled data
+        monitor_shard = int(np.argmax(shard_sizes))
+        result, indices, unique_ids = [], [], []
+        while True:
+            missing_size = 0
+            for i in np.nonzero(shard_sizes)[0].tolist():
+                shard = self._shards[i]
+                shard.beta = self._beta
+                shard_data = shard._sample(int(shard_sizes[i]), cur_learner_iter, monitor_attr=(i == monitor_shard))
+                if shard_data is None:
+                    # The shard is emptied by other threads after the snapshot, redistribute its size to other shards
+                    missing_size += shard_sizes[i]
+                    totals[i] = 0.
+                    continue
+                # IS weight of shard is normalized by the min priority of shard, rescale it to the whole buffer.
+                correction = (mins[i] / global_min) ** (-self._beta)
+                for d in shard_data:
+                    d['IS'] = d['IS'] * correction
+                result += shard_data
+                indices.append(shard_data.replay_buffer_idx)
+                unique_ids.append(shard_data.replay_unique_id)
+            if missing_size == 0:
+                break
+            if totals.sum() <= 0:
+                self._logger.info("Refuse to sample: all the shards are emptied during sampling")
+                return None
+            shard_sizes = np.random.multinomial(missing_size, totals / totals.sum())
+            monitor_shard = None
+        if self._anneal_step != 0:
+            self._beta = min(1.0, self._beta + self._beta_anneal_step)
+        if self._use_thruput_controller:
+            self._thruput_controller.history_sample_count += size
+        return SampledData(result, np.concatenate(indices), np.concatenate(unique_ids))
+
+    def update(self, info: dict) -> None:
+        r"""
+        Overview:
+            Update data's priority, info is split by shards and each shard is updated with its own lock.
+        Arguments:
+            - info (:obj:`dict`): Info dict containing all necessary keys for priority update.
+        ArgumentsKeys:
+            - necessary: `replay_unique_id`, `replay_buffer_idx`, `priority`. All values are lists, arrays or \
+                tensors with the same length.
+        """
+        if 'priority' not in info:
+            return
+        unique_id, idx, priority = priority_info_to_array(info)
+        if len(unique_id) == 0:
+            return
+        name, _ = split_id(unique_id)
+        for shard_name in np.unique(name).tolist():
+            shard = self._shard_of_name.get(shard_name)
+            if shard is None:
+                continue
+            mask = name == shard_name
+            shard.update(
+                {
+                    'replay_unique_id': unique_id[mask],
+                    'replay_buffer_idx': idx[mask],
+                    'priority': priority[mask]
+                }
+            )
+        # New data is initialized with the max priority of the whole buffer
+        max_priority = max([shard._max_priority for shard in self._shards])
+        for shard in self._shards:
+            shard._max_priority = max_priority
+
+    def clear(self) -> None:
+        """
+        Overview:
+            Clear all the shards.
+        """
+        for shard in self._shards:
+            shard.clear()
+
+    def __del__(self) -> None:
+        """
+        Overview:
+            Call ``close`` to delete the object.
+        """
+        if not self._end_flag:
+            self.close()
+
+    def count(self) -> int:
+        """
+        Overview:
+            Count how many valid datas there are in all the shards.
+        Returns:
+            - count (:obj:`int`): Number of valid data.
+        """
+        return sum([shard.count() for shard in self._shards])
+
+    @property
+    def beta(self) -> float:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: float) -> None:
+        self._beta = beta
+
+    def state_dict(self) -> dict:
+        """
+        Overview:
+            Provide a state dict to keep a record of current buffer.
+        Returns:
+            - state_dict (:obj:`Dict[str, Any]`): A dict containing state dicts of all the shards and beta.
+        """
+        return {
+            'shards': [shard.state_dict() for shard in self._shards],
+            'beta': self._beta,
+        }
+
+    def load_state_dict(self, _state_dict: dict, deepcopy: bool = False) -> None:
+        """
+        Overview:
+            Load state dict to reproduce the buffer.
+        Arguments:
+            - state_dict (:obj:`Dict[str, Any]`): A dict returned by ``state_dict``.
+        """
+        assert len(_state_dict['shards']) == self._shard_num
+        for shard, shard_state_dict in zip(self._shards, _state_dict['shards']):
+            shard.load_state_dict(shard_state_dict, deepcopy=deepcopy)
+        self._beta = _state_dict['beta']
+
+    @property
+    def replay_buffer_size(self) -> int:
+        return self._replay_buffer_size
+
+    @property
+    def push_count(self) -> int:
+        return sum([shard.push_count for shard in self._shards])
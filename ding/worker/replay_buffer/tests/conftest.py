@@ -27,3 +27,26 @@ def generate_data(meta: bool = False) -> dict:
 
 def generate_data_list(count: int, meta: bool = False) -> List[dict]:
     return [generate_data(meta) for _ in range(0, count)]
+
+
+def generate_frame_stack_data_list(count: int, n_frames: int = 4, episode_len: int = 10) -> List[dict]:
+    """
+    Generate transitions whose ``obs`` and ``next_obs`` are stacked frames like atari ``FrameStack``.
+    """
+    data = []
+    frame_count = 0
+    while len(data) < count:
+        frames = [np.full((8, 8), frame_count + i, dtype=np.float32) for i in range(episode_len + 1)]
+        frame_count += episode_len + 1
+        # The first frame is repeated at reset
+        frames = [frames[0]] * (n_frames - 1) + frames
+        for t in range(episode_len):
+            data.append(
+                {
+                    'obs': np.stack(frames[t:t + n_frames]),
+                    'next_obs': np.stack(frames[t + 1:t + 1 + n_frames]),
+                    'action': np.array([t]),
+                    'data_id': len(data),
+                }
+            )
+    return data[:count]
@@ -2,6 +2,7 @@ import copy
 from collections import defaultdict
 import numpy as np
 import pytest
+import torch
 from easydict import EasyDict
 import os
 import pickle
@@ -9,7 +10,8 @@ import time
 
 from ding.worker.replay_buffer import AdvancedReplayBuffer
 from ding.utils import deep_merge_dicts
-from ding.worker.replay_buffer.tests.conftest import generate_data, generate_data_list
+from ding.worker.replay_buffer.tests.conftest import generate_data, generate_data_list, \
+    generate_frame_stack_data_list
 
 demo_data_path = "test_demo_data"
 
@@ -99,10 +101,32 @@ class TestAdvancedBuffer:
         for i in range(2, 5):
             assert (info['priority'][i] + eps == advanced_buffer._data[selected_idx[i]]['priority'])
         # test case when data is None(such as max use remove)
-        advanced_buffer._data[selected_idx[0]] = None
-        advanced_buffer._valid_count -= 1
+        advanced_buffer._remove(selected_idx[0])
         advanced_buffer.update(info)
 
+        # priority in tensor and index arrays carried by the sampled data
+        batch = advanced_buffer.sample(16, 0)
+        assert isinstance(batch.replay_buffer_idx, np.ndarray)
+        assert batch.replay_buffer_idx.tolist() == [b['replay_buffer_idx'] for b in batch]
+        assert batch.replay_unique_id.tolist() == [b['replay_unique_id'] for b in batch]
+        priority = torch.rand(16, requires_grad=True) * 0.5
+        info = {
+            'priority': priority,
+            'replay_buffer_idx': batch.replay_buffer_idx,
+            'replay_unique_id': batch.replay_unique_id.copy()
+        }
+        # the first data is stale, e.g. replaced by new data
+        info['replay_unique_id'][0] = 'test_-1'
+        origin_priority = advanced_buffer._data[batch.replay_buffer_idx[0]]['priority']
+        advanced_buffer.update(info)
+        priority = priority.tolist()
+        last_priority = dict(zip(batch.replay_buffer_idx[1:].tolist(), priority[1:]))
+        if batch.replay_buffer_idx[0] not in last_priority:
+            assert advanced_buffer._data[batch.replay_buffer_idx[0]]['priority'] == origin_priority
+        for idx, p in last_priority.items():
+            assert abs(advanced_buffer._data[idx]['priority'] - p - eps) < 1e-6
+            assert abs(advanced_buffer._sum_tree[idx] - (p + eps) ** advanced_buffer.alpha) < 1e-6
+
         # test beta
         advanced_buffer.beta = 1.
         assert (advanced_buffer.beta == 1.)
@@ -140,6 +164,19 @@ class TestAdvancedBuffer:
         batch = advanced_buffer.sample(10, 0, sample_range=slice(-20, -2))
         assert len(batch) == 10
 
+        # staleness and use count are calculated from the int arrays of the whole batch
+        advanced_buffer.clear()
+        for i in range(64):
+            data = generate_data()
+            data['priority'] = None
+            data['collect_iter'] = [i, i + 1]
+            advanced_buffer.push(data, 0)
+        batch = advanced_buffer.sample(16, 100)
+        for b in batch:
+            assert b['staleness'] == 100 - b['replay_buffer_idx']
+            assert b['use'] <= advanced_buffer._use_count[b['replay_buffer_idx']]
+        assert advanced_buffer._use_count.sum() == 16
+
     def test_head_tail(self):
         buffer_cfg = deep_merge_dicts(
             AdvancedReplayBuffer.default_config(), EasyDict(dict(replay_buffer_size=64, max_use=4))
@@ -206,6 +243,36 @@ class TestAdvancedBuffer:
         weights = get_weights(data[-36:])
         assert (np.fabs(weights.sum() - advanced_buffer._sum_tree.reduce(start=0, end=36)) < 1e-6)
 
+    def test_frame_dedup(self):
+        buffer_cfg = deep_merge_dicts(
+            AdvancedReplayBuffer.default_config(), EasyDict(dict(replay_buffer_size=64, frame_dedup=True))
+        )
+        advanced_buffer = AdvancedReplayBuffer(buffer_cfg, tb_logger=None, instance_name='test')
+        data = generate_frame_stack_data_list(100, n_frames=4, episode_len=10)
+        origin_data = copy.deepcopy(data)
+        advanced_buffer.push(data[:50], 0)
+        for d in data[50:]:
+            advanced_buffer.push(d, 0)
+        assert advanced_buffer.count() == 64
+        # Pushed data is not modified
+        assert data[0]['obs'].shape == (4, 8, 8)
+        # Each frame is stored only once, there are 11 unique frames in each episode with 10 transitions
+        assert len(advanced_buffer._frame_storage) == 10 * 11
+        assert advanced_buffer._data[0]['obs'].shape == (4, )
+
+        sampled_data = advanced_buffer.sample(32, 0)
+        for d in sampled_data:
+            origin = origin_data[d['data_id']]
+            assert d['obs'].shape == (4, 8, 8)
+            assert (d['obs'] == origin['obs']).all()
+            assert (d['next_obs'] == origin['next_obs']).all()
+        # Data in buffer still keeps frame ids
+        assert advanced_buffer._data[0]['obs'].shape == (4, )
+        state_dict = advanced_buffer.state_dict()
+        assert state_dict['frame_storage'] is advanced_buffer._frame_storage
+        advanced_buffer.clear()
+        assert len(advanced_buffer._frame_storage) == 0
+
     @pytest.mark.rate
     def test_rate_limit(self):
         buffer_cfg = AdvancedReplayBuffer.default_config()
@@ -0,0 +1,116 @@
+import os
+import pytest
+from easydict import EasyDict
+import numpy as np
+import torch
+
+from ding.worker.replay_buffer import MmapReplayBuffer, create_buffer
+from ding.utils import deep_merge_dicts
+
+
+def generate_data(i: int) -> dict:
+    return {
+        'obs': np.full((4, 8, 8), i, dtype=np.uint8),
+        'action': torch.LongTensor([i]),
+        'reward': float(i),
+        'done': False,
+        'info': {
+            'id': i,
+            'name': 'data_{}'.format(i)
+        },
+    }
+
+
+@pytest.mark.unittest
+class TestMmapBuffer:
+
+    def test_push_sample(self, tmp_path):
+        buffer_cfg = deep_merge_dicts(
+            MmapReplayBuffer.default_config(), EasyDict(dict(replay_buffer_size=64, mmap_dir=str(tmp_path)))
+        )
+        buffer = create_buffer(buffer_cfg, instance_name='test')
+        assert isinstance(buffer, MmapReplayBuffer)
+        buffer.push([generate_data(i) for i in range(50)], 0)
+        for i in range(50, 100):
+            buffer.push(generate_data(i), 0)
+        assert buffer.count() == 64
+        assert buffer.push_count == 100
+        assert isinstance(buffer._fields[('obs', )], np.memmap)
+        assert isinstance(buffer._fields[('info', 'id')], np.memmap)
+
+        batch = buffer.sample(32, 0)
+        assert len(batch) == 32
+        for data in batch:
+            i = data['info']['id']
+            assert i >= 36
+            assert data['obs'].shape == (4, 8, 8)
+            assert (data['obs'] == i).all()
+            assert isinstance(data['action'], torch.Tensor) and data['action'].item() == i
+            assert data['reward'] == float(i)
+            assert data['info']['name'] == 'data_{}'.format(i)
+            assert data['done'] is False
+        # Same as naive buffer, sample range is the range of slots
+        last_one_batch = buffer.sample(1, 0, sample_range=slice(-1, None))
+        assert last_one_batch[0]['info']['id'] == 63
+        # Modifying sampled data won't change the object values in buffer
+        batch[0]['info']['name'] = 'modified'
+        assert all([d['info']['name'] != 'modified' for d in buffer.sample(64, 0)])
+
+        with pytest.raises(ValueError):
+            buffer.push({'obs': np.zeros((4, 8, 8), dtype=np.uint8)}, 0)
+        buffer.clear()
+        assert buffer.count() == 0
+
+    def test_resume(self, tmp_path):
+        buffer_cfg = deep_merge_dicts(
+            MmapReplayBuffer.default_config(),
+            EasyDict(dict(replay_buffer_size=64, mmap_dir=str(tmp_path), resume=True, flush_interval=10))
+        )
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        buffer.push([generate_data(i) for i in range(25)], 0)
+        state_dict = buffer.state_dict()
+        assert set(state_dict.keys()) == {'mmap_dir', 'tail', 'valid_count', 'push_count'}
+        buffer.push([generate_data(i) for i in range(25, 30)], 0)
+        buffer.close()
+
+        # Restart with resume, all the data is loaded from mmap_dir
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        assert buffer.count() == 30
+        assert sorted([d['info']['id'] for d in buffer.sample(30, 0)]) == list(range(30))
+
+        # Load from a checkpoint state dict
+        buffer_cfg.resume = False
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        assert buffer.count() == 0
+        buffer.load_state_dict(state_dict)
+        assert buffer.count() == 25
+        assert sorted([d['info']['id'] for d in buffer.sample(25, 0)]) == list(range(25))
+
+    def test_object_log(self, tmp_path):
+        buffer_cfg = deep_merge_dicts(
+            MmapReplayBuffer.default_config(),
+            EasyDict(dict(replay_buffer_size=16, mmap_dir=str(tmp_path), resume=True, flush_interval=4))
+        )
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        buffer.push([generate_data(i) for i in range(4)], 0)
+        size = buffer._log_size
+        # Only the object values of the pushed slots are appended
+        buffer.push([generate_data(i) for i in range(4, 8)], 0)
+        assert buffer._log_records == 8
+        assert abs(buffer._log_size - 2 * size) < size * 0.1
+        # The log is compacted once it has more than 2 * replay_buffer_size records
+        for i in range(8, 36, 4):
+            buffer.push([generate_data(j) for j in range(i, i + 4)], 0)
+        assert buffer._log_generation == 1 and buffer._log_records == 16
+        assert os.listdir(str(tmp_path)).count('objects.0.log') == 0
+        # Bytes after the recorded log size, e.g. a record half written by a killed process, are ignored
+        with open(buffer._log_path(1), 'ab') as f:
+            f.write(b'broken record')
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        assert buffer.count() == 16
+        assert sorted([d['info']['id'] for d in buffer.sample(16, 0)]) == list(range(20, 36))
+        buffer.push([generate_data(i) for i in range(36, 40)], 0)
+        buffer.close()
+        buffer = MmapReplayBuffer(buffer_cfg, instance_name='test')
+        assert sorted([d['info']['id'] for d in buffer.sample(16, 0)]) == list(range(24, 40))
+        buffer.close()
@@ -0,0 +1,90 @@
+import pytest
+import time
+import threading
+import numpy as np
+from easydict import EasyDict
+
+from ding.worker.replay_buffer import PrefetchSampler, NaiveReplayBuffer
+from ding.worker.replay_buffer.utils import SampledData
+from ding.utils import deep_merge_dicts
+from ding.worker.replay_buffer.tests.conftest import generate_data_list
+
+
+class FakePriorityBuffer:
+
+    def __init__(self, count: int, sample_time: float = 0.) -> None:
+        self.count = count
+        self.sample_time = sample_time
+        self.update_count = 0
+        self.lock = threading.Lock()
+
+    def sample(self, size: int, cur_learner_iter: int) -> list:
+        time.sleep(self.sample_time)
+        if size > self.count:
+            return None
+        with self.lock:
+            # Record how many priority updates have been applied when sampling
+            return [self.update_count for _ in range(size)]
+
+    def update(self, info: dict) -> None:
+        with self.lock:
+            self.update_count += 1
+
+
+class FakeSharedBuffer:
+
+    def __init__(self, count: int) -> None:
+        # Data dicts are returned without copy, and sampling attributes are set in place
+        self.data = [{'obs': i} for i in range(count)]
+        self.sample_count = 0
+
+    def sample(self, size: int, cur_learner_iter: int) -> list:
+        self.sample_count += 1
+        for d in self.data[:size]:
+            d['IS'] = self.sample_count
+        return SampledData(self.data[:size], np.arange(size), np.arange(size).astype(object))
+
+
+@pytest.mark.unittest
+class TestPrefetchSampler:
+
+    def test_naive(self):
+        buffer_cfg = deep_merge_dicts(NaiveReplayBuffer.default_config(), EasyDict(dict(replay_buffer_size=64)))
+        buffer = NaiveReplayBuffer(buffer_cfg, instance_name='test')
+        sampler = PrefetchSampler(buffer, prefetch_num=2)
+        assert sampler.sample(4, 0) is None
+        buffer.push(generate_data_list(16), 0)
+        for i in range(10):
+            batch = sampler.sample(4, i)
+            assert len(batch) == 4
+        assert len(sampler.sample(8, 10)) == 8
+        assert sampler.sample(32, 11) is None
+        sampler.close()
+
+    @pytest.mark.parametrize('max_staleness', [0, 1, 2])
+    def test_staleness(self, max_staleness):
+        buffer = FakePriorityBuffer(count=8, sample_time=0.01)
+        sampler = PrefetchSampler(buffer, prefetch_num=4, max_staleness=max_staleness, priority=True)
+        for k in range(20):
+            batch = sampler.sample(4, k)
+            # Batch k is sampled after at least k - max_staleness updates
+            assert k - batch[0] <= max_staleness
+            time.sleep(0.02)
+            sampler.update({})
+        if max_staleness > 0:
+            # Sampling is hidden behind the training
+            assert sampler.overlap_time > 0.
+        sampler.close()
+
+    def test_copy(self):
+        buffer = FakeSharedBuffer(count=4)
+        sampler = PrefetchSampler(buffer, prefetch_num=2)
+        for _ in range(5):
+            batch = sampler.sample(4, 0)
+            is_weight = batch[0]['IS']
+            # Wait for the next batches prefetched from the same data dicts
+            time.sleep(0.05)
+            assert buffer.sample_count > is_weight
+            assert all([d['IS'] == is_weight for d in batch])
+            assert isinstance(batch, SampledData) and batch.replay_buffer_idx.tolist() == [0, 1, 2, 3]
+        sampler.close()
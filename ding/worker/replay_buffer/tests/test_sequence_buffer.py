@@ -0,0 +1,101 @@
+import copy
+import pytest
+import numpy as np
+import torch
+from easydict import EasyDict
+
+from ding.worker.replay_buffer import SequenceReplayBuffer, create_buffer
+from ding.rl_utils import get_sequence_window
+from ding.utils import deep_merge_dicts
+from ding.utils.data import timestep_collate
+
+
+def generate_segment(length: int) -> list:
+    return [
+        {
+            'obs': torch.full((4, ), float(i)),
+            'action': torch.LongTensor([i % 2]),
+            'reward': torch.rand(3),
+            'done': i == length - 1,
+            'prev_state': [torch.randn(1, 8), torch.randn(1, 8)],
+        } for i in range(length)
+    ]
+
+
+def create_sequence_buffer(replay_buffer_size: int, **kwargs) -> SequenceReplayBuffer:
+    buffer_cfg = deep_merge_dicts(
+        SequenceReplayBuffer.default_config(), EasyDict(dict(replay_buffer_size=replay_buffer_size, **kwargs))
+    )
+    return create_buffer(buffer_cfg, instance_name='test_sequence')
+
+
+@pytest.mark.unittest
+class TestSequenceBuffer:
+
+    def test_push_sample(self):
+        buffer = create_sequence_buffer(64, alpha=1., beta=1., anneal_step=0)
+        assert isinstance(buffer, SequenceReplayBuffer)
+        segment = generate_segment(20)
+        windows = get_sequence_window(segment, unroll_len=8, stride=4)
+        buffer.push(windows, 0)
+        # The segment is stored only once though windows overlap
+        assert buffer.count() == len(windows) == 4
+        assert buffer.step_count == 20
+
+        batch = buffer.sample(4, 0)
+        assert len(batch) == 4
+        for sequence in batch:
+            assert len(sequence['obs']) == 8 and len(sequence['prev_state']) == 8
+            start = int(sequence['obs'][0][0].item())
+            assert start in [0, 4, 8, 12]
+            assert sequence['obs'][0] is segment[start]['obs']
+            assert sequence['IS'] == pytest.approx(1.)
+        collated = timestep_collate(copy.deepcopy(batch))
+        assert collated['obs'].shape == (8, 4, 4)
+
+        # Short segment is padded at sample time
+        buffer.clear()
+        buffer.push(get_sequence_window(generate_segment(5), unroll_len=8), 0)
+        [sequence] = buffer.sample(1, 0)
+        assert sequence['done'] == [False] * 4 + [True] * 4
+        assert (sequence['obs'][-1] == 0).all() and (sequence['reward'][-1] == 0).all()
+
+    def test_remove_update(self):
+        buffer = create_sequence_buffer(32, alpha=1., beta=1., anneal_step=0)
+        segments = [generate_segment(12) for _ in range(3)]
+        for s in segments:
+            buffer.push(get_sequence_window(s, unroll_len=4, stride=2), 0)
+        # The oldest segment is removed with all its windows
+        assert buffer.step_count == 24
+        assert buffer.count() == 10
+        assert buffer.push_count == 15
+        assert all([s['data'] is not segments[0] for s in buffer._segments.values()])
+
+        batch = buffer.sample(8, 0)
+        high = batch[0]['replay_buffer_idx']
+        info = {
+            'replay_unique_id': [d['replay_unique_id'] for d in batch],
+            'replay_buffer_idx': [d['replay_buffer_idx'] for d in batch],
+            'priority': [1000. if d['replay_buffer_idx'] == high else 0. for d in batch],
+        }
+        buffer.update(info)
+        assert buffer._max_priority == 1000.
+        batch = buffer.sample(8, 0)
+        assert sum([d['replay_buffer_idx'] == high for d in batch]) >= 7
+        # Update by the index arrays carried by the batch, the stale id of another buffer is skipped
+        unique_id = batch.replay_unique_id.copy()
+        stale = batch.replay_buffer_idx == high
+        unique_id[stale] = ['other_' + i.rsplit('_', 1)[1] for i in unique_id[stale]]
+        info = {'replay_unique_id': unique_id, 'replay_buffer_idx': batch.replay_buffer_idx, 'priority': np.ones(8)}
+        buffer.update(info)
+        assert buffer._window_priority[high] == pytest.approx(1000., abs=1e-4)
+        info['replay_unique_id'] = batch.replay_unique_id
+        buffer.update(info)
+        assert buffer._window_priority[high] == pytest.approx(1., abs=1e-4)
+
+        state_dict = copy.deepcopy(buffer.state_dict())
+        buffer.clear()
+        assert buffer.count() == 0
+        buffer.load_state_dict(state_dict)
+        assert buffer.count() == 10
+        assert len(buffer.sample(4, 0)) == 4
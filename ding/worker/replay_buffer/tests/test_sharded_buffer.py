@@ -0,0 +1,158 @@
+import copy
+import time
+import threading
+from collections import Counter
+import numpy as np
+import pytest
+from easydict import EasyDict
+
+from ding.worker.replay_buffer import ShardedReplayBuffer, AdvancedReplayBuffer, create_buffer
+from ding.utils import deep_merge_dicts
+from ding.worker.replay_buffer.tests.conftest import generate_data, generate_data_list
+
+
+def create_sharded_buffer(replay_buffer_size: int, shard_num: int, **kwargs) -> ShardedReplayBuffer:
+    buffer_cfg = deep_merge_dicts(
+        ShardedReplayBuffer.default_config(),
+        EasyDict(dict(replay_buffer_size=replay_buffer_size, shard_num=shard_num, **kwargs))
+    )
+    return create_buffer(buffer_cfg, instance_name='test_sharded')
+
+
+@pytest.mark.unittest
+class TestShardedBuffer:
+
+    def test_push_sample_update(self):
+        buffer = create_sharded_buffer(64, 4, alpha=1., beta=1., anneal_step=0)
+        assert isinstance(buffer, ShardedReplayBuffer)
+        data = generate_data_list(50)
+        for d in data:
+            d['priority'] = 1.
+        buffer.push(data[:30], 0)
+        for d in data[30:]:
+            buffer.push(d, 0)
+        assert buffer.count() == 50
+        assert buffer.push_count == 50
+        assert [shard.count() for shard in buffer._shards] == [13, 13, 12, 12]
+
+        batch = buffer.sample(32, 0)
+        assert len(batch) == 32
+        assert all([d['IS'] == pytest.approx(1.) for d in batch])
+        # Update priority of the sampled data, the data in different shards should be routed correctly
+        info = {
+            'replay_unique_id': [d['replay_unique_id'] for d in batch],
+            'replay_buffer_idx': [d['replay_buffer_idx'] for d in batch],
+            'priority': [10. for _ in batch],
+        }
+        buffer.update(info)
+        for d in batch:
+            shard = buffer._shard_of_name[d['replay_unique_id'].rsplit('_', 1)[0]]
+            assert shard._data[d['replay_buffer_idx']]['priority'] == pytest.approx(10., abs=1e-4)
+        assert all([shard._max_priority == 10. for shard in buffer._shards])
+        # The index arrays carried by the batch are the same as the keys in data
+        assert batch.replay_buffer_idx.tolist() == info['replay_buffer_idx']
+        assert batch.replay_unique_id.tolist() == info['replay_unique_id']
+        # IS weights are normalized by the min priority of the whole buffer
+        batch = buffer.sample(48, 0)
+        for d in batch:
+            expected = 1. if d['priority'] < 1.1 else 0.1
+            assert d['IS'] == pytest.approx(expected, rel=1e-3)
+
+        state_dict = copy.deepcopy(buffer.state_dict())
+        buffer.clear()
+        assert buffer.count() == 0
+        buffer.load_state_dict(state_dict)
+        assert buffer.count() == 50
+        buffer.close()
+
+    def test_proportional_sample(self):
+        buffer = create_sharded_buffer(64, 2, alpha=1.)
+        # Single data is pushed into shards in turn
+        for i in range(40):
+            buffer.push({'obs': np.zeros(4), 'priority': 1. if i % 2 == 0 else 3.}, 0)
+        # Sample size of each shard is proportional to its total priority
+        counter = Counter([d['priority'] for _ in range(100) for d in buffer.sample(20, 0)])
+        assert counter[3.] / counter[1.] == pytest.approx(3., rel=0.1)
+        buffer.close()
+
+    def test_shard_emptied(self):
+        buffer = create_sharded_buffer(64, 2)
+        buffer.push(generate_data_list(20), 0)
+
+        def empty_before_sample(shard):
+            shard_sample = shard._sample
+
+            def _sample(*args, **kwargs):
+                # Another thread removes all the data of the shard after the sharded buffer takes the snapshot
+                shard.clear()
+                return shard_sample(*args, **kwargs)
+
+            shard._sample = _sample
+
+        empty_before_sample(buffer._shards[0])
+        batch = buffer.sample(16, 0)
+        assert len(batch) == 16 and len(batch.replay_buffer_idx) == 16
+        assert all([d['replay_unique_id'].startswith(buffer._shards[1]._instance_name) for d in batch])
+        # Refuse to sample if all the shards are emptied
+        buffer._shards[0].push(generate_data_list(4), 0)
+        empty_before_sample(buffer._shards[1])
+        assert buffer.sample(16, 0) is None
+        buffer.close()
+
+
+def stress(buffer, thread_num: int, duration: float = 1.) -> tuple:
+    push_count, sample_count = [0], [0]
+    end_flag = [False]
+    lock = threading.Lock()
+    data = generate_data_list(16)
+
+    def push_loop():
+        count = 0
+        while not end_flag[0]:
+            # Buffer adds keys into the pushed data, so each push should use new dicts
+            buffer.push([dict(d) for d in data], 0)
+            count += len(data)
+        with lock:
+            push_count[0] += count
+
+    def sample_loop():
+        count = 0
+        while not end_flag[0]:
+            batch = buffer.sample(32, 0)
+            if batch is not None:
+                buffer.update(
+                    {
+                        'replay_unique_id': [d['replay_unique_id'] for d in batch],
+                        'replay_buffer_idx': [d['replay_buffer_idx'] for d in batch],
+                        'priority': np.random.uniform(size=len(batch)).tolist(),
+                    }
+                )
+                count += len(batch)
+        with lock:
+            sample_count[0] += count
+
+    threads = [threading.Thread(target=push_loop) for _ in range(thread_num)]
+    threads += [threading.Thread(target=sample_loop) for _ in range(thread_num)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    end_flag[0] = True
+    for t in threads:
+        t.join()
+    return push_count[0] / duration, sample_count[0] / duration
+
+
+@pytest.mark.benchmark
+def test_sharded_buffer_stress():
+    for shard_num in [1, 4]:
+        for thread_num in [1, 2, 4, 8]:
+            buffer = create_sharded_buffer(4096, shard_num)
+            buffer.push(generate_data_list(1024), 0)
+            push_thruput, sample_thruput = stress(buffer, thread_num)
+            print(
+                'shard_num: {}, thread_num: {}, push: {:.0f}/s, sample: {:.0f}/s'.format(
+                    shard_num, thread_num, push_thruput, sample_thruput
+                )
+            )
+            assert push_thruput > 0 and sample_thruput > 0
+            buffer.close()
@@ -1,9 +1,11 @@
 from typing import Any
 import time
 from queue import Queue
-from typing import Union, Tuple
+from typing import Union, Tuple, List
 from threading import Thread
 from functools import partial
+import numpy as np
+import torch
 
 from ding.utils.autolog import LoggedValue, LoggedModel
 from ding.utils import LockContext, LockContextType, remove_file
@@ -21,6 +23,58 @@ def generate_id(name, data_id: int) -> str:
     return "{}_{}".format(name, str(data_id))
 
 
+def split_id(unique_id: Union[List[str], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Overview:
+        Split unique ids generated by ``generate_id`` into buffer names and data ids in a vectorized way.
+    Arguments:
+        - unique_id (:obj:`Union[List[str], np.ndarray]`): Unique ids.
+    Returns:
+        - name (:obj:`np.ndarray`): Buffer names, in str dtype.
+        - data_id (:obj:`np.ndarray`): Data ids, in int64 dtype.
+    """
+    parts = np.char.rpartition(np.asarray(unique_id, dtype=str), '_')
+    return parts[..., 0], parts[..., 2].astype(np.int64)
+
+
+def priority_info_to_array(info: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Overview:
+        Convert the priority info of learner, whose values can be lists, arrays or tensors, into arrays.
+    Arguments:
+        - info (:obj:`dict`): Info dict with keys `replay_unique_id`, `replay_buffer_idx` and `priority`.
+    Returns:
+        - unique_id (:obj:`np.ndarray`): Unique ids, in object dtype.
+        - idx (:obj:`np.ndarray`): Position indices in buffer, in int64 dtype.
+        - priority (:obj:`np.ndarray`): New priorities, in float64 dtype.
+    """
+    priority = info['priority']
+    if isinstance(priority, torch.Tensor):
+        priority = priority.detach().cpu().numpy()
+    priority = np.asarray(priority, dtype=np.float64).reshape(-1)
+    idx = np.asarray(info['replay_buffer_idx'], dtype=np.int64).reshape(-1)
+    unique_id = np.asarray(info['replay_unique_id'], dtype=object).reshape(-1)
+    assert len(unique_id) == len(idx) == len(priority), (len(unique_id), len(idx), len(priority))
+    return unique_id, idx, priority
+
+
+class SampledData(list):
+    """
+    Overview:
+        The list of sampled data, which also carries the position indices and unique ids of the data as arrays, \
+        so that the priority can be fed back without iterating the data.
+    Interface:
+        __init__
+    Property:
+        replay_buffer_idx, replay_unique_id
+    """
+
+    def __init__(self, data: list, replay_buffer_idx: np.ndarray, replay_unique_id: np.ndarray) -> None:
+        super().__init__(data)
+        self.replay_buffer_idx = replay_buffer_idx
+        self.replay_unique_id = replay_unique_id
+
+
 class UsedDataRemover:
     """
     Overview:
@@ -1,7 +1,7 @@
 from typing import Any, List, Union, Sequence
 import copy
 import numpy as np
-from ding.envs import BaseEnv, BaseEnvTimestep, BaseEnvInfo, update_shape
+from ding.envs import BaseEnv, BaseEnvTimestep, BaseEnvInfo, update_shape, LazyFrames
 from ding.envs.common.env_element import EnvElement, EnvElementInfo
 from ding.utils import ENV_REGISTRY
 from ding.torch_utils import to_tensor, to_ndarray, to_list
@@ -168,7 +168,8 @@ class AtariEnv(BaseEnv):
         elif hasattr(self, '_seed'):
             self._env.seed(self._seed)
         obs = self._env.reset()
-        obs = to_ndarray(obs)
+        if not isinstance(obs, LazyFrames):
+            obs = to_ndarray(obs)
         self._final_eval_reward = 0.
         return obs
 
@@ -188,7 +189,8 @@ class AtariEnv(BaseEnv):
         obs, rew, done, info = self._env.step(action)
         # self._env.render()
         self._final_eval_reward += rew
-        obs = to_ndarray(obs)
+        if not isinstance(obs, LazyFrames):
+            obs = to_ndarray(obs)
         rew = to_ndarray([rew])  # wrapped to be transfered to a Tensor with shape (1,)
         if done:
             info['final_eval_reward'] = self._final_eval_reward
@@ -215,7 +217,8 @@ class AtariEnv(BaseEnv):
             frame_stack=self._cfg.frame_stack,
             episode_life=self._cfg.is_train,
             clip_rewards=self._cfg.is_train,
-            only_info=only_info
+            only_info=only_info,
+            lazy_frame_stack=self._cfg.get('lazy_frame_stack', False),
         )
 
     def __repr__(self) -> str:
@@ -10,7 +10,14 @@ from ding.envs import NoopResetEnv, MaxAndSkipEnv, EpisodicLifeEnv, FireResetEnv
 
 
 def wrap_deepmind(
-    env_id, episode_life=True, clip_rewards=True, frame_stack=4, scale=True, warp_frame=True, only_info=False
+    env_id,
+    episode_life=True,
+    clip_rewards=True,
+    frame_stack=4,
+    scale=True,
+    warp_frame=True,
+    only_info=False,
+    lazy_frame_stack=False
 ):
     """Configure environment for DeepMind-style Atari. The observation is
     channel-first: (c, h, w) instead of (h, w, c).
@@ -21,6 +28,7 @@ def wrap_deepmind(
     :param int frame_stack: wrap the frame stacking wrapper.
     :param bool scale: wrap the scaling observation wrapper.
     :param bool warp_frame: wrap the grayscale + resize observation wrapper.
+    :param bool lazy_frame_stack: return ``LazyFrames`` from the frame stacking wrapper to defer stacking.
     :return: the wrapped atari environment.
     """
     assert 'NoFrameskip' in env_id
@@ -39,7 +47,7 @@ def wrap_deepmind(
         if clip_rewards:
             env = ClipRewardEnv(env)
         if frame_stack:
-            env = FrameStack(env, frame_stack)
+            env = FrameStack(env, frame_stack, lazy=lazy_frame_stack)
         return env
     else:
         wrapper_info = NoopResetEnv.__name__ + '\n'
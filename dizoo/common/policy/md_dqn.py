@@ -1,7 +1,7 @@
 from typing import Dict, Any
 import torch
 from ding.rl_utils import q_nstep_td_data, q_nstep_td_error
-from ding.policy import DQNPolicy
+from ding.policy import Policy, DQNPolicy
 from ding.utils import POLICY_REGISTRY
 from ding.policy.common_utils import default_preprocess_learn
 from ding.torch_utils import to_device
@@ -14,6 +14,9 @@ class MultiDiscreteDQNPolicy(DQNPolicy):
         Policy class of Multi-discrete action space DQN algorithm.
     """
 
+    # The action of multi-discrete action space is a list of tensors, which can't be sliced by env in batch collect
+    _forward_collect_batch = Policy._forward_collect_batch
+
     def _forward_learn(self, data: dict) -> Dict[str, Any]:
         """
         Overview:
@@ -94,10 +97,10 @@ class MultiDiscreteDQNPolicy(DQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
             'q_value_mean': q_value_mean,
-            'priority': td_error_per_sample.abs().tolist(),
+            'priority': td_error_per_sample.abs(),
         }
@@ -2,7 +2,7 @@ from typing import Dict, Any
 import torch
 from ding.torch_utils import to_device
 from ding.rl_utils import dist_nstep_td_data, dist_nstep_td_error, dist_1step_td_data, dist_1step_td_error
-from ding.policy import RainbowDQNPolicy
+from ding.policy import Policy, RainbowDQNPolicy
 from ding.utils import POLICY_REGISTRY
 from ding.policy.common_utils import default_preprocess_learn
 
@@ -14,6 +14,9 @@ class MultiDiscreteRainbowDQNPolicy(RainbowDQNPolicy):
         Multi-discrete action space Rainbow DQN algorithms.
     """
 
+    # The action of multi-discrete action space is a list of tensors, which can't be sliced by env in batch collect
+    _forward_collect_batch = Policy._forward_collect_batch
+
     def _forward_learn(self, data: dict) -> Dict[str, Any]:
         """
         Overview:
@@ -97,9 +100,9 @@ class MultiDiscreteRainbowDQNPolicy(RainbowDQNPolicy):
         # =============
         # after update
         # =============
-        self._target_model.update(self._learn_model.state_dict())
+        self._target_model.update(self._learn_model)
         return {
             'cur_lr': self._optimizer.defaults['lr'],
             'total_loss': loss.item(),
-            'priority': td_error_per_sample_mean.abs().tolist(),
+            'priority': td_error_per_sample_mean.abs(),
         }
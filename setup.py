@@ -158,7 +158,13 @@ setup(
             'kubernetes',
         ]
     },
-    entry_points={'console_scripts': ['ding=ding.entry.cli:cli', 'ditask=ding.entry.cli_ditask:cli_ditask']},
+    entry_points={
+        'console_scripts': [
+            'ding=ding.entry.cli:cli',
+            'ditask=ding.entry.cli_ditask:cli_ditask',
+            'ding_collector_benchmark=ding.entry.cli_collector_benchmark:cli_collector_benchmark',
+        ]
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         "Intended Audience :: Science/Research",